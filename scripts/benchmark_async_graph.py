@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+FusionAI 异步图吞吐量基准测试
+
+对比同步节点（llm.invoke，由 LangGraph 派发到线程池）与异步节点
+（llm.ainvoke，直接运行在事件循环上）在不同并发工作流数量下的吞吐量。
+
+两个图与 src/graph/builder.py 的拓扑一致：
+coordinator -> planner -> supervisor -> researcher -> supervisor -> coder
+-> supervisor -> FINISH，每个节点发起一次模拟延迟的 LLM 调用，
+因此结果只反映调度方式的差异，不依赖真实的模型服务。
+
+使用方法：
+python scripts/benchmark_async_graph.py [--concurrency 10 50 200] [--latency 0.2]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+# 添加项目根目录到系统路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.graph import START, MessagesState, StateGraph
+from langgraph.types import Command
+
+# 每个工作流依次执行的智能体
+PLAN = ["researcher", "coder"]
+
+
+class LatencyChatModel(BaseChatModel):
+    """模拟固定网络延迟的聊天模型"""
+
+    latency: float = 0.2
+
+    @property
+    def _llm_type(self) -> str:
+        return "latency-fake"
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+
+class BenchState(MessagesState):
+    step: int
+
+
+def _next_agent(state: BenchState) -> str:
+    return PLAN[state["step"]] if state["step"] < len(PLAN) else "__end__"
+
+
+def build_sync_graph(llm: LatencyChatModel):
+    """同步节点版本：节点内调用 invoke"""
+
+    def coordinator(state: BenchState) -> Command:
+        llm.invoke(state["messages"])
+        return Command(goto="planner")
+
+    def planner(state: BenchState) -> Command:
+        llm.invoke(state["messages"])
+        return Command(goto="supervisor", update={"step": 0})
+
+    def supervisor(state: BenchState) -> Command:
+        llm.invoke(state["messages"])
+        return Command(goto=_next_agent(state))
+
+    def agent(state: BenchState) -> Command:
+        llm.invoke(state["messages"])
+        return Command(goto="supervisor", update={"step": state["step"] + 1})
+
+    return _compile(coordinator, planner, supervisor, agent)
+
+
+def build_async_graph(llm: LatencyChatModel):
+    """异步节点版本：节点内调用 ainvoke"""
+
+    async def coordinator(state: BenchState) -> Command:
+        await llm.ainvoke(state["messages"])
+        return Command(goto="planner")
+
+    async def planner(state: BenchState) -> Command:
+        await llm.ainvoke(state["messages"])
+        return Command(goto="supervisor", update={"step": 0})
+
+    async def supervisor(state: BenchState) -> Command:
+        await llm.ainvoke(state["messages"])
+        return Command(goto=_next_agent(state))
+
+    async def agent(state: BenchState) -> Command:
+        await llm.ainvoke(state["messages"])
+        return Command(goto="supervisor", update={"step": state["step"] + 1})
+
+    return _compile(coordinator, planner, supervisor, agent)
+
+
+def _compile(coordinator, planner, supervisor, agent):
+    builder = StateGraph(BenchState)
+    builder.add_edge(START, "coordinator")
+    builder.add_node("coordinator", coordinator)
+    builder.add_node("planner", planner)
+    builder.add_node("supervisor", supervisor)
+    for name in PLAN:
+        builder.add_node(name, agent)
+    return builder.compile()
+
+
+async def _run_workflow(graph) -> None:
+    # 与 run_agent_workflow 一致，通过 astream_events 驱动图
+    async for _ in graph.astream_events(
+        {"messages": [{"role": "user", "content": "benchmark"}], "step": 0},
+        version="v2",
+        config={"recursion_limit": 50},
+    ):
+        pass
+
+
+async def measure(graph, concurrency: int) -> tuple[float, float]:
+    """并发运行工作流，返回吞吐量(工作流/s)与总耗时"""
+    started = time.perf_counter()
+    await asyncio.gather(*(_run_workflow(graph) for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return concurrency / elapsed, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="FusionAI 异步图吞吐量基准测试")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument(
+        "--latency", type=float, default=0.2, help="模拟的单次LLM调用延迟(秒)"
+    )
+    args = parser.parse_args()
+
+    llm = LatencyChatModel(latency=args.latency)
+    graphs = {"sync": build_sync_graph(llm), "async": build_async_graph(llm)}
+    calls = 3 + 2 * len(PLAN)
+
+    print(f"每个工作流 {calls} 次LLM调用，单次延迟 {args.latency}s")
+    print(f"{'并发数':>6} | {'模式':>5} | {'耗时(s)':>8} | {'吞吐量(工作流/s)':>14}")
+    print("-" * 48)
+    for concurrency in args.concurrency:
+        results = {}
+        for mode, graph in graphs.items():
+            throughput, elapsed = asyncio.run(measure(graph, concurrency))
+            results[mode] = throughput
+            print(
+                f"{concurrency:>6} | {mode:>5} | {elapsed:>8.2f} | {throughput:>14.2f}"
+            )
+        print(f"{'':>6}   加速比: {results['async'] / results['sync']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
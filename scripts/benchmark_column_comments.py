@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+字段注释查询基准测试
+
+对比 execute_oracle_query 解析中文别名的两种方式：
+- 逐列查询：每个结果列、每张引用表分别查询 user_col_comments 和
+  all_col_comments（改造前的实现）
+- 批量缓存：每张表一次查询取出全部字段注释并缓存（当前实现）
+
+使用 SQLite 内存库模拟 Oracle 数据字典视图，每次数据库往返额外等待
+--latency 秒模拟网络延迟，统计往返次数与耗时。
+
+使用方法：
+python scripts/benchmark_column_comments.py [--tables 3] [--columns 30] [--queries 20] [--latency 0.002]
+"""
+
+import argparse
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.tools.oracle_db import (
+    extract_table_names_from_sql,
+    invalidate_column_comments,
+    resolve_chinese_aliases,
+)
+
+
+class CountingCursor:
+    """统计往返次数并模拟网络延迟的游标"""
+
+    def __init__(self, cursor: sqlite3.Cursor, latency: float):
+        self._cursor = cursor
+        self.latency = latency
+        self.round_trips = 0
+
+    def execute(self, sql, params=None):
+        self.round_trips += 1
+        time.sleep(self.latency)
+        return self._cursor.execute(sql, params or {})
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+
+def build_stand_in(tables: int, columns: int) -> sqlite3.Connection:
+    """创建模拟的 user_col_comments / all_col_comments"""
+    conn = sqlite3.connect(":memory:")
+    for view in ("user_col_comments", "all_col_comments"):
+        conn.execute(
+            f"CREATE TABLE {view} (owner TEXT, table_name TEXT, column_name TEXT, comments TEXT)"
+        )
+    for t in range(tables):
+        for c in range(columns):
+            row = ("APP", f"T{t}", f"T{t}_COL{c}", f"表{t}字段{c}")
+            conn.execute("INSERT INTO user_col_comments VALUES (?, ?, ?, ?)", row)
+            conn.execute("INSERT INTO all_col_comments VALUES (?, ?, ?, ?)", row)
+    return conn
+
+
+def legacy_aliases(cursor, columns, sql):
+    """改造前的实现：逐列、逐表查询（rownum = 1 以 LIMIT 1 代替）"""
+    aliases = []
+    for column_name in columns:
+        alias = None
+        for table_name in extract_table_names_from_sql(sql):
+            cursor.execute(
+                "SELECT comments FROM user_col_comments "
+                "WHERE table_name = :table_name AND column_name = :column_name",
+                {"table_name": table_name, "column_name": column_name},
+            )
+            result = cursor.fetchone()
+            if result and result[0]:
+                alias = result[0]
+                break
+            cursor.execute(
+                "SELECT comments FROM all_col_comments "
+                "WHERE table_name = :table_name AND column_name = :column_name LIMIT 1",
+                {"table_name": table_name, "column_name": column_name},
+            )
+            result = cursor.fetchone()
+            if result and result[0]:
+                alias = result[0]
+                break
+        aliases.append(alias or column_name)
+    return aliases
+
+
+def run(name, resolve, cursor, columns, sql, queries):
+    started = time.perf_counter()
+    for _ in range(queries):
+        aliases = resolve(cursor, columns, sql)
+    elapsed = time.perf_counter() - started
+    print(f"{name:>8} | {cursor.round_trips:>8} | {elapsed:>8.3f}")
+    return aliases
+
+
+def main():
+    parser = argparse.ArgumentParser(description="字段注释查询基准测试")
+    parser.add_argument("--tables", type=int, default=3, help="查询引用的表数量")
+    parser.add_argument("--columns", type=int, default=30, help="结果列数量")
+    parser.add_argument("--queries", type=int, default=20, help="重复执行的查询次数")
+    parser.add_argument(
+        "--latency", type=float, default=0.002, help="模拟的单次往返延迟(秒)"
+    )
+    args = parser.parse_args()
+
+    conn = build_stand_in(args.tables, args.columns)
+    tables = [f"T{t}" for t in range(args.tables)]
+    sql = f"SELECT * FROM {tables[0]} " + " ".join(
+        f"JOIN {table} ON 1 = 1" for table in tables[1:]
+    )
+    # 结果列平均分布在各表中
+    columns = [f"T{i % args.tables}_COL{i}" for i in range(args.columns)]
+
+    print(
+        f"{args.tables} 张表，{args.columns} 个结果列，重复 {args.queries} 次查询，"
+        f"单次往返延迟 {args.latency}s"
+    )
+    print(f"{'方式':>6} | {'往返次数':>6} | {'耗时(s)':>8}")
+    print("-" * 34)
+
+    legacy = run(
+        "逐列查询",
+        legacy_aliases,
+        CountingCursor(conn.cursor(), args.latency),
+        columns,
+        sql,
+        args.queries,
+    )
+
+    invalidate_column_comments()
+    batched = run(
+        "批量缓存",
+        resolve_chinese_aliases,
+        CountingCursor(conn.cursor(), args.latency),
+        columns,
+        sql,
+        args.queries,
+    )
+
+    assert legacy == batched, "两种方式解析出的别名不一致"
+
+
+if __name__ == "__main__":
+    main()
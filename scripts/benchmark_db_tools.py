@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+数据库工具负载基准测试
+
+在 SQLite 后端（按 tests/fixtures/sample_schema.sql 初始化）上并发调用
+db_analyst 的数据库工具，不需要Oracle即可对比执行器、查询结果缓存与
+结果格式化的开销。每轮统计总耗时、吞吐量与执行器的排队情况。
+
+使用方法：
+python scripts/benchmark_db_tools.py [--concurrency 20] [--calls 500] [--fetch-size 100]
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import src.tools.oracle_db as oracle_db
+from src.tools.oracle_executor import close_oracle_executor, get_oracle_executor
+from src.tools.sqlite_backend import SQLiteBackend
+
+QUERIES = [
+    "SELECT o.id, o.amount, c.name FROM orders o JOIN customers c ON c.id = o.customer_id WHERE o.status = :status",
+    "SELECT r.name, COUNT(*) cnt, SUM(o.amount) total FROM orders o "
+    "JOIN customers c ON c.id = o.customer_id JOIN regions r ON r.id = c.region_id "
+    "WHERE o.status = :status GROUP BY r.name",
+    "SELECT p.category, SUM(i.quantity) qty FROM order_items i "
+    "JOIN products p ON p.id = i.product_id JOIN orders o ON o.id = i.order_id "
+    "WHERE o.status = :status GROUP BY p.category",
+]
+STATUSES = ["NEW", "PAID", "SHIPPED", "CLOSED"]
+
+
+async def run_round(name: str, calls: int, concurrency: int, fetch_size: int) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            await oracle_db.execute_oracle_query.ainvoke(
+                {
+                    "sql": QUERIES[i % len(QUERIES)],
+                    "fetch_size": fetch_size,
+                    "binds": {"status": STATUSES[i // len(QUERIES) % len(STATUSES)]},
+                }
+            )
+
+    close_oracle_executor()
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    elapsed = time.perf_counter() - started
+    stats = get_oracle_executor().stats()
+    print(
+        f"{name:>8} | {elapsed:>8.3f} | {calls / elapsed:>8.1f} | "
+        f"{stats['peak_queued']:>6} | {stats['avg_wait_ms']:>8.2f} | {stats['avg_run_ms']:>8.2f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库工具负载基准测试")
+    parser.add_argument(
+        "--concurrency", type=int, default=20, help="同时进行的工具调用数"
+    )
+    parser.add_argument("--calls", type=int, default=500, help="每轮工具调用总数")
+    parser.add_argument(
+        "--fetch-size", type=int, default=100, help="每次查询返回的行数"
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = SQLiteBackend(
+            str(Path(tmp) / "benchmark.sqlite"),
+            str(project_root / "tests" / "fixtures" / "sample_schema.sql"),
+        )
+        oracle_db.get_db_backend = lambda: backend
+
+        print(
+            f"并发 {args.concurrency}，每轮 {args.calls} 次调用，每次返回最多 {args.fetch_size} 行"
+        )
+        print(
+            f"{'轮次':>6} | {'耗时(s)':>8} | {'次/秒':>7} | {'峰值排队':>4} | {'平均等待ms':>6} | {'平均执行ms':>6}"
+        )
+        print("-" * 72)
+
+        oracle_db.invalidate_query_results()
+        asyncio.run(run_round("冷缓存", args.calls, args.concurrency, args.fetch_size))
+        asyncio.run(run_round("热缓存", args.calls, args.concurrency, args.fetch_size))
+        close_oracle_executor()
+        print("\n查询结果缓存:", oracle_db.query_result_cache_stats())
+
+
+if __name__ == "__main__":
+    main()
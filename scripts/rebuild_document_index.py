@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+从 MinIO 存储桶重建文档元数据索引
+
+索引丢失、从其他环境迁移存储桶或切换索引实现后运行。
+
+使用方法：
+python scripts/rebuild_document_index.py
+"""
+
+import sys
+from pathlib import Path
+
+# 添加项目根目录到系统路径
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.tools.document_parser import get_document_parser
+
+
+def main():
+    count = get_document_parser().rebuild_index()
+    print(f"文档索引已重建，共 {count} 个文档")
+
+
+if __name__ == "__main__":
+    main()
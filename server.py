@@ -98,7 +98,7 @@ def display_model_configuration():
 if __name__ == "__main__":
     logger.info("Starting FusionAI API server")
     
-    # 显示模型配置
+    # 显示模型配置；各模块导入及初始化步骤耗时由服务进程在启动完成时输出
     display_model_configuration()
     
     uvicorn.run(
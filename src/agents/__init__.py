@@ -1,3 +1,10 @@
-from .agents import research_agent, coder_agent, db_analyst_agent, document_parser_agent, reporter_agent, chart_generator_agent
+from .agents import AGENT_NAMES, agent_initialized, get_agent
 
-__all__ = ["research_agent", "coder_agent", "db_analyst_agent", "document_parser_agent", "reporter_agent", "chart_generator_agent"]
+__all__ = ["research_agent", "coder_agent", "db_analyst_agent", "document_parser_agent", "reporter_agent", "chart_generator_agent", "get_agent", "agent_initialized"]
+
+
+def __getattr__(name: str):
+    # Agents are built lazily on first access, e.g. `from src.agents import research_agent`
+    if name in AGENT_NAMES:
+        return get_agent(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,58 +1,131 @@
 from langgraph.prebuilt import create_react_agent
 
 from src.prompts import apply_prompt_template
-from src.tools import (
-    bash_tool,
-
-    crawl_tool,
-    python_repl_tool,
-    tavily_tool,
-    oracle_table_info_tool,
-    oracle_query_tool,
-    oracle_relationships_tool,
-    document_analysis_tool,
-)
-# chart_generation_tool removed - chart_generator now uses direct LLM generation
-from src.tools.file_info_tool import task_files_json_tool
+from src.utils.startup import LazySingleton
 
 from .llm import get_llm_by_type
 from src.config.agents import AGENT_LLM_MAP
+from src.config.database import DB_BACKEND
 
-# Create agents using configured LLM types
-research_agent = create_react_agent(
-    get_llm_by_type(AGENT_LLM_MAP["researcher"]),
-    tools=[tavily_tool, crawl_tool],
-    prompt=lambda state: apply_prompt_template("researcher", state),
-)
-
-coder_agent = create_react_agent(
-    get_llm_by_type(AGENT_LLM_MAP["coder"]),
-    tools=[python_repl_tool, bash_tool],
-    prompt=lambda state: apply_prompt_template("coder", state),
-)
-
-
-
-db_analyst_agent = create_react_agent(
-    get_llm_by_type(AGENT_LLM_MAP["db_analyst"]),
-    tools=[oracle_table_info_tool, oracle_query_tool, oracle_relationships_tool],
-    prompt=lambda state: apply_prompt_template("db_analyst", state),
-)
-
-document_parser_agent = create_react_agent(
-    get_llm_by_type(AGENT_LLM_MAP["document_parser"]),
-    tools=[document_analysis_tool],
-    prompt=lambda state: apply_prompt_template("document_parser", state),
-)
-
-reporter_agent = create_react_agent(
-    get_llm_by_type(AGENT_LLM_MAP["reporter"]),
-    tools=[task_files_json_tool],
-    prompt=lambda state: apply_prompt_template("reporter", state),
-)
-
-chart_generator_agent = create_react_agent(
-    get_llm_by_type(AGENT_LLM_MAP["chart_generator"]),
-    tools=[],  # No tools needed - direct LLM generation
-    prompt=lambda state: apply_prompt_template("chart_generator", state),
-)
+
+# Agents are compiled on first use. Tool modules are imported inside the
+# factories so that importing this module does not pull in Oracle, MinIO or
+# search clients.
+def _build_research_agent():
+    from src.tools import tavily_tool, crawl_tool
+
+    return create_react_agent(
+        get_llm_by_type(AGENT_LLM_MAP["researcher"]),
+        tools=[tavily_tool, crawl_tool],
+        prompt=lambda state: apply_prompt_template("researcher", state),
+    )
+
+
+def _build_coder_agent():
+    from src.tools import python_repl_tool, bash_tool
+
+    return create_react_agent(
+        get_llm_by_type(AGENT_LLM_MAP["coder"]),
+        tools=[python_repl_tool, bash_tool],
+        prompt=lambda state: apply_prompt_template("coder", state),
+    )
+
+
+def _db_analyst_tools():
+    """
+    db_analyst 使用的数据库工具
+
+    表信息、查询、外键与索引工具通过 DatabaseBackend 访问数据库，任何后端都可用；
+    表结构检索、连接路径、表画像与导出依赖 Oracle 数据字典、采样与驱动类型，
+    只在 DB_BACKEND=oracle 时提供。
+    """
+    from src.tools import (
+        oracle_table_info_tool,
+        oracle_query_tool,
+        oracle_relationships_tool,
+        oracle_schema_search_tool,
+        oracle_export_tool,
+        oracle_profile_tool,
+        oracle_join_path_tool,
+    )
+
+    tools = [oracle_table_info_tool, oracle_query_tool, oracle_relationships_tool]
+    if DB_BACKEND == "oracle":
+        tools = [
+            oracle_schema_search_tool,
+            *tools,
+            oracle_join_path_tool,
+            oracle_profile_tool,
+            oracle_export_tool,
+        ]
+    return tools
+
+
+def _build_db_analyst_agent():
+    return create_react_agent(
+        get_llm_by_type(AGENT_LLM_MAP["db_analyst"]),
+        tools=_db_analyst_tools(),
+        prompt=lambda state: apply_prompt_template("db_analyst", state),
+    )
+
+
+def _build_document_parser_agent():
+    from src.tools import document_analysis_tool
+
+    return create_react_agent(
+        get_llm_by_type(AGENT_LLM_MAP["document_parser"]),
+        tools=[document_analysis_tool],
+        prompt=lambda state: apply_prompt_template("document_parser", state),
+    )
+
+
+def _build_reporter_agent():
+    from src.tools.file_info_tool import task_files_json_tool
+
+    return create_react_agent(
+        get_llm_by_type(AGENT_LLM_MAP["reporter"]),
+        tools=[task_files_json_tool],
+        prompt=lambda state: apply_prompt_template("reporter", state),
+    )
+
+
+def _build_chart_generator_agent():
+    # chart_generation_tool removed - chart_generator now uses direct LLM generation
+    return create_react_agent(
+        get_llm_by_type(AGENT_LLM_MAP["chart_generator"]),
+        tools=[],  # No tools needed - direct LLM generation
+        prompt=lambda state: apply_prompt_template("chart_generator", state),
+    )
+
+
+_AGENTS = {
+    name: LazySingleton(f"agent:{name}", factory)
+    for name, factory in {
+        "research_agent": _build_research_agent,
+        "coder_agent": _build_coder_agent,
+        "db_analyst_agent": _build_db_analyst_agent,
+        "document_parser_agent": _build_document_parser_agent,
+        "reporter_agent": _build_reporter_agent,
+        "chart_generator_agent": _build_chart_generator_agent,
+    }.items()
+}
+
+AGENT_NAMES = list(_AGENTS)
+
+
+def get_agent(name: str):
+    """Return the compiled agent, building it on first use."""
+    if name not in _AGENTS:
+        raise ValueError(f"Unknown agent: {name}")
+    return _AGENTS[name].get()
+
+
+def agent_initialized(name: str) -> bool:
+    """Whether the agent has been built."""
+    return _AGENTS[name].initialized
+
+
+def __getattr__(name: str):
+    if name in _AGENTS:
+        return _AGENTS[name].get()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
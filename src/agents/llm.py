@@ -1,6 +1,7 @@
 from langchain_openai import ChatOpenAI
 from langchain_deepseek import ChatDeepSeek
 from langchain_google_genai import ChatGoogleGenerativeAI
+import threading
 from typing import Optional
 
 from src.config import (
@@ -16,6 +17,7 @@ from src.config import (
     GOOGLE_API_KEY,
 )
 from src.config.agents import LLMType
+from src.utils.startup import startup_timings
 
 
 def create_openai_llm(
@@ -81,7 +83,7 @@ def create_google_llm(
 
 # Cache for LLM instances
 _llm_cache: dict[LLMType, ChatOpenAI | ChatDeepSeek | ChatGoogleGenerativeAI] = {}
-
+_llm_cache_lock = threading.Lock()
 
 def _create_llm_by_model_name(
     model: str, 
@@ -117,49 +119,64 @@ def _create_llm_by_model_name(
 
 def get_llm_by_type(llm_type: LLMType) -> ChatOpenAI | ChatDeepSeek | ChatGoogleGenerativeAI:
     """
-    Get LLM instance by type. Returns cached instance if available.
+    Get LLM instance by type. The instance is created on first use and cached;
+    concurrent callers share a single instance.
     """
     if llm_type in _llm_cache:
         return _llm_cache[llm_type]
 
-    print(f"llm_type: {BASIC_MODEL}")
+    with _llm_cache_lock:
+        if llm_type in _llm_cache:
+            return _llm_cache[llm_type]
+        with startup_timings.step(f"llm:{llm_type}"):
+            llm = _create_llm_by_type(llm_type)
+        _llm_cache[llm_type] = llm
+    return llm
+
+
+def _create_llm_by_type(llm_type: LLMType) -> ChatOpenAI | ChatDeepSeek | ChatGoogleGenerativeAI:
     if llm_type == "reasoning":
-        llm = _create_llm_by_model_name(
+        return _create_llm_by_model_name(
             model=REASONING_MODEL,
             base_url=REASONING_BASE_URL,
             api_key=REASONING_API_KEY,
         )
     elif llm_type == "basic":
-        llm = _create_llm_by_model_name(
+        return _create_llm_by_model_name(
             model=BASIC_MODEL,
             base_url=BASIC_BASE_URL,
             api_key=BASIC_API_KEY,
         )
     elif llm_type == "vision":
-        llm = _create_llm_by_model_name(
+        return _create_llm_by_model_name(
             model=VL_MODEL,
             base_url=VL_BASE_URL,
             api_key=VL_API_KEY,
         )
-    else:
-        raise ValueError(f"Unknown LLM type: {llm_type}")
+    raise ValueError(f"Unknown LLM type: {llm_type}")
 
-    _llm_cache[llm_type] = llm
-    return llm
+
+# The LLMs are no longer built at import time; these names are resolved on
+# first access so that a misconfigured provider only breaks its own users.
+_LAZY_LLMS: dict[str, LLMType] = {
+    "reasoning_llm": "reasoning",
+    "basic_llm": "basic",
+    "vl_llm": "vision",
+}
 
 
-# Initialize LLMs for different purposes - now these will be cached
-reasoning_llm = get_llm_by_type("reasoning")
-basic_llm = get_llm_by_type("basic")
-vl_llm = get_llm_by_type("vision")
+def __getattr__(name: str):
+    if name in _LAZY_LLMS:
+        return get_llm_by_type(_LAZY_LLMS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
-    stream = reasoning_llm.stream("what is mcp?")
+    stream = get_llm_by_type("reasoning").stream("what is mcp?")
     full_response = ""
     for chunk in stream:
         full_response += chunk.content
     print(full_response)
 
-    basic_llm.invoke("Hello")
-    vl_llm.invoke("Hello")
+    get_llm_by_type("basic").invoke("Hello")
+    get_llm_by_type("vision").invoke("Hello")
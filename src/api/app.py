@@ -6,6 +6,7 @@ This module defines the FastAPI application for the FusionAI LangGraph-based age
 
 import json
 import logging
+from contextlib import asynccontextmanager
 from typing import Dict, List, Any, Optional, Union
 
 from fastapi import FastAPI, HTTPException, Request
@@ -15,19 +16,50 @@ from sse_starlette.sse import EventSourceResponse
 import asyncio
 from typing import AsyncGenerator, Dict, List, Any
 
-from src.graph import build_graph
+from src.utils.startup import startup_timings
+
+# 逐个计时导入的模块，依赖较重的第三方库放在前面单独统计，耗时计入启动报告
+STARTUP_IMPORTS = [
+    "langchain_openai",
+    "langgraph.prebuilt",
+    "src.graph",
+    "src.service.workflow_service",
+]
+for module_name in STARTUP_IMPORTS:
+    startup_timings.timed_import(module_name)
+
 from src.config import TEAM_MEMBERS
-from src.service.workflow_service import run_agent_workflow
+from src.config.env import STARTUP_WARMUP
+from src.service.workflow_service import run_agent_workflow, warm_up, warm_up_status
+from src.tools.document_jobs import close_document_parse_pool
+from src.tools.oracle_db import query_result_cache_stats
+from src.tools.oracle_executor import close_oracle_executor, get_oracle_executor
+from src.tools.oracle_pool import check_oracle_pool, close_oracle_pool
 from .document_routes import router as document_router
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Run the optional warm-up before the server starts accepting requests."""
+    if STARTUP_WARMUP:
+        logger.info("Warming up LLMs, agents and workflow graph")
+        await asyncio.to_thread(warm_up)
+    startup_timings.log_report()
+    yield
+    close_oracle_executor()
+    close_document_parse_pool()
+    await asyncio.to_thread(close_oracle_pool)
+
+
 # Create FastAPI app
 app = FastAPI(
     title="FusionAI API",
     description="API for FusionAI LangGraph-based agent workflow with document processing capabilities",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -42,9 +74,6 @@ app.add_middleware(
 # Include document router
 app.include_router(document_router, prefix="/api")
 
-# Create the graph
-graph = build_graph()
-
 
 class ContentItem(BaseModel):
     type: str = Field(..., description="The type of content (text, image, etc.)")
@@ -73,6 +102,38 @@ class ChatRequest(BaseModel):
     search_before_planning: Optional[bool] = Field(
         False, description="Whether to search before planning"
     )
+    plan_executor_mode: Optional[bool] = Field(
+        False,
+        description=(
+            "Whether to route plan steps by their depends_on without a supervisor "
+            "LLM call between steps; independent steps run in parallel"
+        ),
+    )
+
+
+@app.get("/api/health/ready")
+async def readiness():
+    """Readiness probe reporting which of the graph and agents have been built.
+
+    With STARTUP_WARMUP every one of them must be built; a failed warm-up step keeps
+    the probe at 503 until a later request builds it. Without warm-up they are built
+    on first use, so the probe is always ready and only reports their state.
+    """
+    initialized = warm_up_status()
+    if STARTUP_WARMUP and not all(initialized.values()):
+        raise HTTPException(status_code=503, detail={"status": "not_ready", "initialized": initialized})
+    return {"status": "ready", "initialized": initialized}
+
+
+@app.get("/api/health/oracle")
+async def oracle_health():
+    """Oracle health check: pool usage, a round-trip ping, result cache and executor queue counters."""
+    status = await asyncio.to_thread(check_oracle_pool)
+    status["result_cache"] = query_result_cache_stats()
+    status["executor"] = get_oracle_executor().stats()
+    if not status["healthy"]:
+        raise HTTPException(status_code=503, detail=status)
+    return status
 
 
 @app.post("/api/chat/stream")
@@ -112,13 +173,15 @@ async def chat_endpoint(request: ChatRequest, req: Request):
             messages.append(message_dict)
 
         async def event_generator():
+            workflow = run_agent_workflow(
+                messages,
+                request.debug,
+                request.deep_thinking_mode,
+                request.search_before_planning,
+                request.plan_executor_mode,
+            )
             try:
-                async for event in run_agent_workflow(
-                    messages,
-                    request.debug,
-                    request.deep_thinking_mode,
-                    request.search_before_planning,
-                ):
+                async for event in workflow:
                     # Check if client is still connected
                     if await req.is_disconnected():
                         logger.info("Client disconnected, stopping workflow")
@@ -130,6 +193,10 @@ async def chat_endpoint(request: ChatRequest, req: Request):
             except asyncio.CancelledError:
                 logger.info("Stream processing cancelled")
                 raise
+            finally:
+                # Closing the workflow closes the graph's event stream, cancelling in-flight
+                # tool calls; Oracle tools cancel their running query when cancelled
+                await workflow.aclose()
 
         return EventSourceResponse(
             event_generator(),
@@ -1,26 +1,51 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Query, Request
-from fastapi.responses import StreamingResponse
-from typing import Optional
+from fastapi.responses import JSONResponse, RedirectResponse, Response, StreamingResponse
+from pathlib import Path
+from typing import Optional, Tuple
+import asyncio
 import io
 import urllib.parse
 
-from src.tools.document_parser import document_parser
+from src.config.documents import DOCUMENT_DOWNLOAD_CONFIG, DOCUMENT_UPLOAD_CONFIG
+from src.tools.document_index import PARSE_DONE
+from src.tools.document_jobs import DocumentNotReady
+from src.tools.document_parser import DocumentTooLarge, get_document_parser, parse_page_ranges
 
 router = APIRouter(prefix="/documents", tags=["文档管理"])
 
 
+def _base_url(request: Optional[Request]) -> str:
+    return f"{request.url.scheme}://{request.url.netloc}" if request else ""
+
+
+def _parsing_response(file_id: str, error: DocumentNotReady, request: Optional[Request]) -> JSONResponse:
+    """文档仍在解析中，返回 202 与解析状态查询地址，不作为服务端错误"""
+    return JSONResponse(
+        status_code=202,
+        content={
+            "success": False,
+            "message": str(error),
+            "file_id": file_id,
+            "status_url": f"{_base_url(request)}/api/documents/{file_id}/status",
+        },
+    )
+
+
 @router.post("/upload", summary="上传文档")
 async def upload_document(file: UploadFile = File(...), request: Request = None):
     """
-    上传文档文件到MinIO并解析内容
+    上传文档文件到MinIO，解析任务在解析进程池中执行
     
     支持的文件格式：
     - PDF (.pdf)
     - Word (.docx, .doc)
     
+    文件按分段流式写入MinIO，上传的同时计算内容哈希，超过大小上限时返回413。
+    
     返回：
     - file_id: 文件唯一标识符
     - download_url: 可在浏览器直接打开的文件下载地址
+    - status_url: 解析状态查询地址
     - 文档基本信息
     """
     # 检查文件类型
@@ -33,43 +58,78 @@ async def upload_document(file: UploadFile = File(...), request: Request = None)
             detail=f"不支持的文件类型。支持的格式: {', '.join(allowed_extensions)}"
         )
     
+    max_size = DOCUMENT_UPLOAD_CONFIG["max_size"]
+    if file.size is not None and file.size > max_size:
+        raise HTTPException(status_code=413, detail=f"文件超过大小上限 {max_size // (1024 * 1024)}MB")
+    
+    parser = get_document_parser()
     try:
-        # 读取文件内容
-        file_content = await file.read()
-        
-        # 上传并解析文档
-        document_info = document_parser.upload_file(file_content, file.filename)
-        
-        # 获取文件ID
-        file_id = document_info['file_id']
-        
-        # 构建可在浏览器直接打开的下载URL
-        if request:
-            base_url = f"{request.url.scheme}://{request.url.netloc}"
-            download_url = f"{base_url}/api/documents/{file_id}/download"
-        else:
-            download_url = f"/api/documents/{file_id}/download"
-        
-        return {
-            "success": True,
-            "message": "文档上传成功",
-            "file_id": file_id,
-            "download_url": download_url,  # 🎯 唯一的URL，可直接在浏览器打开
-            "document_info": {
-                "filename": document_info['filename'],
-                "file_type": document_info['file_type'],
-                "file_size": document_info['file_size'],
-                "content_length": document_info['content_length'],
-                "uploaded_at": document_info['uploaded_at']
-            }
-        }
-        
+        # 请求体已由框架暂存到临时文件，在线程中分段读取并上传，不占用事件循环
+        record = await asyncio.to_thread(parser.upload_stream, file.file, file.filename, max_size)
+    except DocumentTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"文档上传失败: {str(e)}")
+    
+    file_id = record.file_id
+    if record.parse_status != PARSE_DONE:
+        # 存储桶中已有相同内容且已解析时直接复用解析结果
+        parser.jobs.submit(record)
+    
+    # 构建可在浏览器直接打开的下载URL
+    base_url = _base_url(request)
+    
+    return {
+        "success": True,
+        "message": "文档上传成功" if record.parse_status == PARSE_DONE else "文档上传成功，正在解析",
+        "file_id": file_id,
+        "download_url": f"{base_url}/api/documents/{file_id}/download",  # 🎯 唯一的URL，可直接在浏览器打开
+        "status_url": f"{base_url}/api/documents/{file_id}/status",
+        "document_info": {
+            "filename": record.filename,
+            "file_type": Path(record.filename).suffix.lower(),
+            "file_size": record.file_size,
+            "content_hash": record.content_hash,
+            "uploaded_at": record.uploaded_at,
+            "parse_status": record.parse_status,
+        }
+    }
+
+
+@router.get("/{file_id}/status", summary="获取解析状态")
+async def get_document_status(file_id: str):
+    """
+    查询文档的解析状态：queued、parsing、done、failed
+    
+    Args:
+        file_id: 文件ID
+    
+    Returns:
+        解析状态、已尝试次数与最近一次失败原因
+    """
+    parser = get_document_parser()
+    # 本地索引中没有的文件（例如由其他实例上传）按存储桶中的文件记录查找
+    record = await asyncio.to_thread(parser.find_document, file_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"未找到文件ID为 {file_id} 的文档")
+    job = await asyncio.to_thread(parser.index.get_job, file_id)
+    
+    return {
+        "success": True,
+        "data": {
+            "file_id": file_id,
+            "filename": record.filename,
+            "parse_status": record.parse_status,
+            "content_hash": record.content_hash,
+            "attempts": job.attempts if job else 0,
+            "error": job.error if job else None,
+            "updated_at": job.updated_at if job else None,
+        }
+    }
 
 
 @router.get("/{file_id}/info", summary="获取文档信息")
-async def get_document_info(file_id: str):
+async def get_document_info(file_id: str, request: Request = None):
     """
     获取文档的基本信息（不包含内容）
     
@@ -80,19 +140,23 @@ async def get_document_info(file_id: str):
         文档基本信息
     """
     try:
-        document_info = document_parser.get_file_info(file_id)
+        # 只读取解析结果的元数据，不下载全文；尚未解析时在线程中等待解析任务
+        document_info = await asyncio.to_thread(
+            get_document_parser().get_file_info, file_id, include_content=False
+        )
         
         if document_info is None:
             raise HTTPException(status_code=404, detail=f"未找到文件ID为 {file_id} 的文档")
         
-        # 移除content字段，只返回基本信息
-        info_data = {k: v for k, v in document_info.items() if k != 'content'}
-        
         return {
             "success": True,
-            "data": info_data
+            "data": document_info
         }
         
+    except HTTPException:
+        raise
+    except DocumentNotReady as e:
+        return _parsing_response(file_id, e, request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取文档信息失败: {str(e)}")
 
@@ -100,7 +164,8 @@ async def get_document_info(file_id: str):
 @router.get("/{file_id}/content", summary="获取文档内容")
 async def get_document_content(
     file_id: str,
-    include_metadata: bool = Query(True, description="是否包含元数据")
+    include_metadata: bool = Query(True, description="是否包含元数据"),
+    request: Request = None
 ):
     """
     获取文档的完整内容和分析信息
@@ -113,7 +178,7 @@ async def get_document_content(
         文档完整信息包括内容
     """
     try:
-        document_info = document_parser.get_file_info(file_id)
+        document_info = await asyncio.to_thread(get_document_parser().get_file_info, file_id)
         
         if document_info is None:
             raise HTTPException(status_code=404, detail=f"未找到文件ID为 {file_id} 的文档")
@@ -132,83 +197,198 @@ async def get_document_content(
                 }
             }
         
+    except HTTPException:
+        raise
+    except DocumentNotReady as e:
+        return _parsing_response(file_id, e, request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"获取文档内容失败: {str(e)}")
 
 
+@router.get("/{file_id}/pages", summary="获取指定页内容")
+async def get_document_pages(
+    file_id: str,
+    pages: str = Query(..., description="页码或页码范围，从 1 开始，例如 3、3-5、1,4-6"),
+    request: Request = None
+):
+    """
+    获取文档指定页的文本，不读取全文
+    
+    尚未解析完成的 PDF 只提取所需页，不等待整个文档解析完成。Word 文档整体视为一页。
+    
+    Args:
+        file_id: 文件ID
+        pages: 页码范围
+    
+    Returns:
+        文件名、总页数与各页文本，超出总页数的页码被忽略
+    """
+    try:
+        ranges = parse_page_ranges(pages)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    try:
+        result = await asyncio.to_thread(get_document_parser().read_pages, file_id, ranges)
+    except DocumentNotReady as e:
+        return _parsing_response(file_id, e, request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"获取文档页内容失败: {str(e)}")
+    
+    if result is None:
+        raise HTTPException(status_code=404, detail=f"未找到文件ID为 {file_id} 的文档")
+    
+    return {
+        "success": True,
+        "data": result
+    }
+
+
+def _content_disposition(filename: str) -> str:
+    """生成下载文件名，支持中文"""
+    # 对文件名进行URL编码，使用RFC 5987标准的文件名编码格式
+    encoded_filename = urllib.parse.quote(filename, safe='')
+    
+    # 如果文件名只包含ASCII字符，也提供标准的filename参数作为兼容
+    try:
+        filename.encode('ascii')
+        return f"attachment; filename=\"{filename}\"; filename*=UTF-8''{encoded_filename}"
+    except UnicodeEncodeError:
+        # 文件名包含非ASCII字符，只使用UTF-8编码格式
+        return f"attachment; filename*=UTF-8''{encoded_filename}"
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match / If-Range 是否与实体标签匹配，弱比较"""
+    candidates = [tag.strip() for tag in header.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    解析单个字节范围，返回 [起始, 结束] 闭区间
+    
+    格式无法识别或包含多个范围时返回 None，按完整文件响应；范围无法满足时抛出 416。
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    start, _, end = spec.strip().partition("-")
+    try:
+        if start == "":
+            # bytes=-500：最后 500 字节
+            length = int(end)
+            if length <= 0:
+                raise ValueError
+            first, last = max(size - length, 0), size - 1
+        else:
+            first = int(start)
+            last = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if first >= size:
+        raise HTTPException(status_code=416, detail="请求的范围超出文件大小", headers={"Content-Range": f"bytes */{size}"})
+    if last < first:
+        return None
+    return first, min(last, size - 1)
+
+
 @router.get("/{file_id}/download", summary="下载原始文档")
-async def download_document(file_id: str):
+async def download_document(
+    file_id: str,
+    request: Request,
+    redirect: Optional[bool] = Query(None, description="重定向到MinIO预签名地址，默认按 DOCUMENT_DOWNLOAD_MODE")
+):
     """
     下载原始文档文件
     
+    从MinIO分块流式转发，支持 Range（206）与 ETag/If-None-Match（304），
+    浏览器查看大PDF时只请求所需的字节范围。预签名模式下重定向到短时有效的
+    MinIO预签名地址，文件内容不经过API服务。
+    
     Args:
         file_id: 文件ID
+        redirect: 是否重定向到预签名地址
     
     Returns:
-        文件流下载
+        文件流下载或重定向
     """
+    parser = get_document_parser()
     try:
-        # 获取文档信息
-        document_info = document_parser.get_file_info(file_id)
-        if document_info is None:
-            raise HTTPException(status_code=404, detail=f"未找到文件ID为 {file_id} 的文档")
-        
-        # 下载文件内容
-        file_content = document_parser.download_file(file_id)
-        if file_content is None:
-            raise HTTPException(status_code=404, detail=f"无法下载文件ID为 {file_id} 的文档")
-        
-        # 获取文件信息
-        filename = document_info.get('filename', 'document')
-        file_type = document_info.get('file_type', '.pdf')
-        
-        # 设置正确的媒体类型
-        media_type_map = {
-            '.pdf': 'application/pdf',
-            '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            '.doc': 'application/msword'
-        }
-        media_type = media_type_map.get(file_type, 'application/octet-stream')
-        
-        # 处理中文文件名编码问题
-        # 对文件名进行URL编码，支持中文
-        encoded_filename = urllib.parse.quote(filename, safe='')
-        
-        # 使用RFC 5987标准的文件名编码格式
-        # 同时提供fallback和UTF-8编码的文件名
-        content_disposition = f"attachment; filename*=UTF-8''{encoded_filename}"
-        
-        # 如果文件名只包含ASCII字符，也提供标准的filename参数作为兼容
+        record = await asyncio.to_thread(parser.find_document, file_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"下载文档失败: {str(e)}")
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"未找到文件ID为 {file_id} 的文档")
+    
+    content_disposition = _content_disposition(record.filename)
+    
+    if redirect if redirect is not None else DOCUMENT_DOWNLOAD_CONFIG["mode"] == "presigned":
         try:
-            filename.encode('ascii')
-            content_disposition = f"attachment; filename=\"{filename}\"; filename*=UTF-8''{encoded_filename}"
-        except UnicodeEncodeError:
-            # 文件名包含非ASCII字符，只使用UTF-8编码格式
-            pass
-        
-        # 创建文件流
-        def iter_file():
-            yield file_content
-        
-        return StreamingResponse(
-            iter_file(),
-            media_type=media_type,
-            headers={
-                "Content-Disposition": content_disposition,
-                "Content-Length": str(len(file_content)),
-                "Cache-Control": "no-cache",
-                "Content-Transfer-Encoding": "binary"
-            }
-        )
-        
+            url = await asyncio.to_thread(
+                parser.presigned_download_url, record, DOCUMENT_DOWNLOAD_CONFIG["presigned_expiry"], content_disposition
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"生成下载地址失败: {str(e)}")
+        return RedirectResponse(url, status_code=307, headers={"Cache-Control": "no-store"})
+    
+    try:
+        etag = f'"{await asyncio.to_thread(parser.original_etag, record)}"'
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"下载文档失败: {str(e)}")
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        # 允许缓存，但每次使用前按 ETag 重新验证
+        "Cache-Control": "no-cache",
+    }
+    
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    
+    size = record.file_size
+    byte_range = None
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and size > 0 and (not if_range or _etag_matches(if_range, etag)):
+        byte_range = _parse_range(range_header, size)
+    
+    if byte_range is None:
+        status_code, offset, length = 200, 0, size
+    else:
+        first, last = byte_range
+        status_code, offset, length = 206, first, last - first + 1
+        headers["Content-Range"] = f"bytes {first}-{last}/{size}"
+    headers["Content-Length"] = str(length)
+    headers["Content-Disposition"] = content_disposition
+    
+    try:
+        # 先打开对象再返回响应，对象不存在等错误不会出现在已发送响应头之后
+        response = await asyncio.to_thread(parser.open_original, record, offset, length)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"下载文档失败: {str(e)}")
+    
+    def iter_file():
+        try:
+            yield from response.stream(DOCUMENT_DOWNLOAD_CONFIG["chunk_size"])
+        finally:
+            response.close()
+            response.release_conn()
+    
+    return StreamingResponse(
+        iter_file(),
+        status_code=status_code,
+        media_type=record.content_type,
+        headers=headers
+    )
 
 
 @router.post("/{file_id}/analyze", summary="文档分析")
 async def analyze_document(
     file_id: str,
-    analysis_request: Optional[str] = Query(None, description="分析要求")
+    analysis_request: Optional[str] = Query(None, description="分析要求"),
+    request: Request = None
 ):
     """
     对指定文档进行分析
@@ -221,12 +401,15 @@ async def analyze_document(
         文档分析结果
     """
     try:
-        document_info = document_parser.get_file_info(file_id)
+        parser = get_document_parser()
+        document_info = await asyncio.to_thread(parser.get_file_info, file_id, include_content=False)
         
         if document_info is None:
             raise HTTPException(status_code=404, detail=f"未找到文件ID为 {file_id} 的文档")
         
-        content = document_info.get("content", "")
+        # 统计信息在解析时已计算，预览只读取全文开头
+        statistics = document_info["statistics"]
+        preview = await asyncio.to_thread(parser.read_content, file_id, max_chars=500)
         
         # 构建分析结果
         analysis = {
@@ -237,14 +420,9 @@ async def analyze_document(
                 "file_size": document_info.get("file_size"),
                 "uploaded_at": document_info.get("uploaded_at")
             },
-            "content_statistics": {
-                "content_length": len(content),
-                "word_count": len(content.split()) if content else 0,
-                "line_count": len(content.split('\n')) if content else 0,
-                "paragraph_count": len([p for p in content.split('\n\n') if p.strip()]) if content else 0
-            },
+            "content_statistics": statistics,
             "analysis_request": analysis_request or "基础文档分析",
-            "content_preview": content[:500] + "..." if len(content) > 500 else content,
+            "content_preview": preview + "..." if statistics["content_length"] > 500 else preview,
             "analyzed_at": document_info.get("parsed_at")
         }
         
@@ -253,6 +431,10 @@ async def analyze_document(
             "data": analysis
         }
         
+    except HTTPException:
+        raise
+    except DocumentNotReady as e:
+        return _parsing_response(file_id, e, request)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"文档分析失败: {str(e)}")
 
@@ -269,7 +451,7 @@ async def delete_document(file_id: str):
         删除结果
     """
     try:
-        success = document_parser.delete_file(file_id)
+        success = await asyncio.to_thread(get_document_parser().delete_file, file_id)
         
         if not success:
             raise HTTPException(status_code=404, detail=f"未找到文件ID为 {file_id} 的文档")
@@ -1,3 +1,4 @@
+import os
 from typing import Literal
 
 # Define available LLM types
@@ -16,3 +17,17 @@ AGENT_LLM_MAP: dict[str, LLMType] = {
     "document_parser": "basic",  # 文档解析使用basic llm
     "chart_generator": "basic",  # 图表生成使用basic llm
 }
+
+# 是否按角色压缩传给智能体的历史消息
+CONTEXT_COMPACTION_ENABLED = os.getenv("CONTEXT_COMPACTION", "true").lower() != "false"
+
+# 各角色可见历史消息的 token 预算（不含系统提示词）
+AGENT_CONTEXT_BUDGET: dict[str, int] = {
+    "supervisor": 4000,  # 只需了解各步骤的进展
+    "researcher": 6000,
+    "coder": 8000,
+    "db_analyst": 8000,
+    "document_parser": 6000,
+    "chart_generator": 12000,  # 需要前序步骤的完整数据
+    "reporter": 16000,
+}
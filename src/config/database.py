@@ -1,6 +1,15 @@
 import os
 from typing import Dict, Any
 
+# db_analyst 数据库工具使用的后端：oracle，或离线测试与基准测试使用的 sqlite
+DB_BACKEND = os.getenv("DB_BACKEND", "oracle").lower()
+
+# SQLite 后端：数据库文件与首次创建时执行的夹具脚本
+SQLITE_BACKEND_CONFIG: Dict[str, Any] = {
+    "path": os.getenv("SQLITE_DB_PATH", "data/sqlite_backend.sqlite"),
+    "fixture": os.getenv("SQLITE_DB_FIXTURE", "tests/fixtures/sample_schema.sql"),
+}
+
 # Oracle数据库连接配置
 # 建议通过环境变量或配置文件来设置这些值
 ORACLE_DB_CONFIG: Dict[str, Any] = {
@@ -11,6 +20,83 @@ ORACLE_DB_CONFIG: Dict[str, Any] = {
     "password": os.getenv("ORACLE_PASSWORD", ""),
 }
 
+# Oracle会话池配置，所有 db_analyst 工具共享同一个进程级会话池
+ORACLE_POOL_CONFIG: Dict[str, Any] = {
+    "min": int(os.getenv("ORACLE_POOL_MIN", "2")),
+    "max": int(os.getenv("ORACLE_POOL_MAX", "10")),
+    "increment": int(os.getenv("ORACLE_POOL_INCREMENT", "1")),
+    # 空闲会话超过该秒数后被回收
+    "timeout": int(os.getenv("ORACLE_POOL_IDLE_TIMEOUT", "300")),
+    # 会话池耗尽时获取会话的最长等待时间(毫秒)
+    "wait_timeout": int(os.getenv("ORACLE_POOL_WAIT_TIMEOUT", "10000")),
+    # 会话空闲超过该秒数时，获取前先ping检查可用性
+    "ping_interval": int(os.getenv("ORACLE_POOL_PING_INTERVAL", "60")),
+    # 每个会话缓存的语句数
+    "stmtcachesize": int(os.getenv("ORACLE_STMT_CACHE_SIZE", "40")),
+    # 单次数据库往返的超时时间(毫秒)，0 表示不限制
+    "call_timeout": int(os.getenv("ORACLE_CALL_TIMEOUT", "60000")),
+}
+
+# Oracle工具专用执行器：工作线程数与最多排队的调用数
+ORACLE_EXECUTOR_CONFIG: Dict[str, Any] = {
+    "workers": int(os.getenv("ORACLE_EXECUTOR_WORKERS", os.getenv("ORACLE_POOL_MAX", "10"))),
+    "max_queue": int(os.getenv("ORACLE_EXECUTOR_MAX_QUEUE", "50")),
+}
+
+# 字段注释等数据字典元数据的进程内缓存时间(秒)
+ORACLE_METADATA_CACHE_TTL = int(os.getenv("ORACLE_METADATA_CACHE_TTL", "600"))
+
+# db_analyst 查询结果缓存
+ORACLE_RESULT_CACHE_CONFIG: Dict[str, Any] = {
+    "enabled": os.getenv("ORACLE_RESULT_CACHE", "true").lower() == "true",
+    # 默认缓存时间(秒)与最大条目数
+    "ttl": int(os.getenv("ORACLE_RESULT_CACHE_TTL", "300")),
+    "maxsize": int(os.getenv("ORACLE_RESULT_CACHE_SIZE", "256")),
+    # 按表覆盖缓存时间，格式 "ORDERS=60,AUDIT_LOG=0"，0 表示涉及该表的查询不缓存
+    "table_ttl": {
+        table.strip().upper(): int(ttl)
+        for table, _, ttl in (
+            rule.partition("=") for rule in os.getenv("ORACLE_RESULT_CACHE_TABLE_TTL", "").split(",")
+        )
+        if table.strip() and ttl.strip()
+    },
+}
+
+# 本地数据字典目录（表、字段、注释、外键），供 db_analyst 按需检索相关表结构
+SCHEMA_CATALOG_CONFIG: Dict[str, Any] = {
+    "path": os.getenv("SCHEMA_CATALOG_PATH", "data/schema_catalog.sqlite"),
+    # 逗号分隔的模式名，不设置时使用当前登录用户的模式
+    "owners": [
+        owner.strip().upper()
+        for owner in os.getenv("SCHEMA_CATALOG_OWNERS", "").split(",")
+        if owner.strip()
+    ],
+    # 距上次刷新超过该秒数时，检索前先按 last_ddl_time 增量刷新
+    "refresh_interval": int(os.getenv("SCHEMA_CATALOG_REFRESH_INTERVAL", "600")),
+}
+
+# 查询结果导出（oracle_export_tool）
+ORACLE_EXPORT_CONFIG = {
+    # 每次网络往返取回的行数
+    "arraysize": int(os.getenv("ORACLE_EXPORT_ARRAYSIZE", "5000")),
+    # 随 execute 一起预取的行数，省去首次 fetch 的往返
+    "prefetchrows": int(os.getenv("ORACLE_EXPORT_PREFETCHROWS", "5000")),
+    # 单次导出的最大行数
+    "max_rows": int(os.getenv("ORACLE_EXPORT_MAX_ROWS", "1000000")),
+    # 导出的大查询允许更长的单次往返时间(毫秒)
+    "call_timeout": int(os.getenv("ORACLE_EXPORT_CALL_TIMEOUT", "600000")),
+}
+
+# 表画像（oracle_profile_tool）
+ORACLE_PROFILE_CONFIG = {
+    # 按统计信息中的行数换算 SAMPLE 百分比，使样本约为该行数
+    "sample_rows": int(os.getenv("ORACLE_PROFILE_SAMPLE_ROWS", "100000")),
+    # 优化器统计信息在该天数内收集且未过期时直接使用
+    "stats_max_age_days": int(os.getenv("ORACLE_PROFILE_STATS_MAX_AGE_DAYS", "7")),
+    # 单次画像最多统计的列数
+    "max_columns": int(os.getenv("ORACLE_PROFILE_MAX_COLUMNS", "100")),
+}
+
 def validate_db_config() -> bool:
     """验证数据库配置是否完整"""
     required_fields = ["host", "service_name", "username", "password"]
@@ -0,0 +1,43 @@
+import os
+from typing import Any, Dict
+
+# 文档元数据索引：file_id -> 对象名、大小、类型、内容哈希与解析状态
+DOCUMENT_INDEX_CONFIG: Dict[str, Any] = {
+    # 索引实现，目前支持 sqlite
+    "backend": os.getenv("DOCUMENT_INDEX_BACKEND", "sqlite").lower(),
+    "path": os.getenv("DOCUMENT_INDEX_PATH", "data/document_index.sqlite"),
+}
+
+# 文档上传：单个文件的大小上限与分段上传到 MinIO 的分段大小（不小于 5MB）
+DOCUMENT_UPLOAD_CONFIG: Dict[str, Any] = {
+    "max_size": int(os.getenv("DOCUMENT_UPLOAD_MAX_MB", "100")) * 1024 * 1024,
+    "part_size": max(int(os.getenv("DOCUMENT_UPLOAD_PART_MB", "8")), 5) * 1024 * 1024,
+}
+
+# 文档解析任务：解析在独立的进程池中执行，失败时按 retry_delay 递增间隔重试。
+# 内容无法解析或解析超时不重试
+DOCUMENT_PARSE_CONFIG: Dict[str, Any] = {
+    "workers": int(
+        os.getenv("DOCUMENT_PARSE_WORKERS", str(min(4, os.cpu_count() or 1)))
+    ),
+    "max_retries": int(os.getenv("DOCUMENT_PARSE_MAX_RETRIES", "2")),
+    "retry_delay": float(os.getenv("DOCUMENT_PARSE_RETRY_DELAY", "1.0")),
+    # PDF 按页分批并行提取，每批的页数
+    "pdf_pages_per_task": max(
+        int(os.getenv("DOCUMENT_PARSE_PDF_PAGES_PER_TASK", "20")), 1
+    ),
+    # 单次解析的超时(秒)
+    "parse_timeout": float(os.getenv("DOCUMENT_PARSE_TIMEOUT", "300")),
+    # 读取文档时等待解析完成的最长时间(秒)
+    "wait_timeout": float(os.getenv("DOCUMENT_PARSE_WAIT_TIMEOUT", "120")),
+    # 解析失败后，在此时间(秒)内读取文档直接返回记录的失败原因，不重新排队解析
+    "failed_retry_after": float(os.getenv("DOCUMENT_PARSE_FAILED_RETRY_AFTER", "600")),
+}
+
+# 原始文档下载：stream 由API服务从MinIO分块转发，presigned 重定向到短时有效的MinIO预签名地址
+DOCUMENT_DOWNLOAD_CONFIG: Dict[str, Any] = {
+    "mode": os.getenv("DOCUMENT_DOWNLOAD_MODE", "stream").lower(),
+    "chunk_size": int(os.getenv("DOCUMENT_DOWNLOAD_CHUNK_KB", "256")) * 1024,
+    # 预签名地址的有效期(秒)
+    "presigned_expiry": int(os.getenv("DOCUMENT_DOWNLOAD_PRESIGNED_SECONDS", "300")),
+}
@@ -29,3 +29,7 @@ FIRECRAWL_API_KEY = os.getenv("FIRECRAWL_API_KEY")
 
 # File server configuration
 AGENT_FILE_BASE_URL = os.getenv("AGENT_FILE_BASE_URL", "https://agentfile.fusiontech.cn")
+
+# Startup configuration: build LLMs, agents and the workflow graph before the
+# server reports ready, instead of on the first request
+STARTUP_WARMUP = os.getenv("STARTUP_WARMUP", "false").lower() == "true"
@@ -1,5 +1,7 @@
-from .builder import build_graph
+from .builder import build_graph, get_graph, graph_initialized
 
 __all__ = [
     "build_graph",
+    "get_graph",
+    "graph_initialized",
 ]
@@ -1,5 +1,7 @@
 from langgraph.graph import StateGraph, START
 
+from src.utils.startup import LazySingleton
+
 from .types import State
 from .nodes import (
     supervisor_node,
@@ -30,3 +32,16 @@ def build_graph():
     builder.add_node("document_parser", document_parser_node)
     builder.add_node("chart_generator", chart_generator_node)
     return builder.compile()
+
+
+_graph = LazySingleton("graph", build_graph)
+
+
+def get_graph():
+    """Return the shared compiled workflow graph, compiling it on first use."""
+    return _graph.get()
+
+
+def graph_initialized() -> bool:
+    """Whether the shared workflow graph has been compiled."""
+    return _graph.initialized
@@ -0,0 +1,205 @@
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from src.config import TEAM_MEMBERS
+from src.config.agents import AGENT_CONTEXT_BUDGET, CONTEXT_COMPACTION_ENABLED
+from .plan_executor import parse_plan_steps, step_dependencies
+
+logger = logging.getLogger(__name__)
+
+# 摘要形式保留的智能体输出字符数
+EXCERPT_CHARS = 300
+
+DEFAULT_CONTEXT_BUDGET = 8000
+
+_RESPONSE_PATTERN = re.compile(r"<response>\n?(.*?)\n?</response>", re.DOTALL)
+_CJK_PATTERN = re.compile(r"[\u3000-\u303f\u4e00-\u9fff\uff00-\uffef]")
+
+# 智能体输出的三种展示级别
+FULL, EXCERPT, REFERENCE = "full", "excerpt", "reference"
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    估算文本的 token 数
+
+    中文字符按每字 1 个 token，其余字符按每 4 个字符 1 个 token 估算，
+    不依赖具体模型的分词器。
+    """
+    if not text:
+        return 0
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def message_tokens(message: BaseMessage) -> int:
+    """估算单条消息的 token 数"""
+    content = message.content
+    if isinstance(content, list):
+        content = "".join(
+            part.get("text", "") if isinstance(part, dict) else str(part)
+            for part in content
+        )
+    return estimate_tokens(content)
+
+
+def _is_agent_output(message: BaseMessage) -> bool:
+    return isinstance(message, HumanMessage) and message.name in TEAM_MEMBERS
+
+
+def _response_body(message: BaseMessage) -> str:
+    match = _RESPONSE_PATTERN.search(message.content)
+    return match.group(1) if match else message.content
+
+
+def _compact_message(
+    message: BaseMessage, level: str, reference: Optional[str]
+) -> HumanMessage:
+    """生成智能体输出的摘要或引用形式"""
+    body = _response_body(message)
+    lines = [
+        f"Response from {message.name} (compacted, ~{estimate_tokens(body)} tokens):"
+    ]
+    if level == EXCERPT:
+        excerpt = body[:EXCERPT_CHARS] + ("..." if len(body) > EXCERPT_CHARS else "")
+        lines.append(f"\n<summary>\n{excerpt}\n</summary>")
+    if reference:
+        lines.append(f"\nFull output saved to: {reference}")
+    return HumanMessage(
+        content="\n".join(lines),
+        name=message.name,
+        additional_kwargs=message.additional_kwargs,
+    )
+
+
+def _expand_priority(
+    state: Dict[str, Any], outputs: List[int], messages: List[BaseMessage]
+) -> List[int]:
+    """完整展示智能体输出的优先顺序：当前步骤的依赖步骤优先，其余按时间倒序"""
+    preferred = []
+    plan_step = state.get("plan_step")
+    if plan_step is not None:
+        steps = parse_plan_steps(state.get("full_plan"))
+        if plan_step < len(steps):
+            dependencies = set(step_dependencies(steps, plan_step))
+            preferred = [
+                i
+                for i in reversed(outputs)
+                if messages[i].additional_kwargs.get("plan_step") in dependencies
+            ]
+    return preferred + [i for i in reversed(outputs) if i not in preferred]
+
+
+def compact_messages(
+    role: str,
+    state: Dict[str, Any],
+    references: Optional[Dict[str, str]] = None,
+    budget: Optional[int] = None,
+) -> Tuple[List[BaseMessage], Dict[str, Any]]:
+    """
+    为指定角色生成 token 预算内的历史消息视图
+
+    用户消息、计划和当前步骤指令始终完整保留；之前智能体的输出先以摘要
+    形式展示，超出预算时从最早的输出开始降级为仅保留文件引用，再在预算
+    允许的范围内按优先级恢复完整内容。完整输出已由 ExecutionFileManager
+    保存在任务目录中，引用指向对应的文件。
+
+    Args:
+        role: 角色名称（智能体名称或 supervisor）
+        state: 当前工作流状态
+        references: summary_id 到总结文件路径的映射
+        budget: token 预算，默认取 AGENT_CONTEXT_BUDGET 中的配置
+
+    Returns:
+        (压缩后的消息列表, 本次压缩的 token 统计)
+    """
+    messages = list(state["messages"])
+    original_tokens = sum(message_tokens(m) for m in messages)
+    record = {
+        "role": role,
+        "original_tokens": original_tokens,
+        "compacted_tokens": original_tokens,
+    }
+    outputs = [i for i, m in enumerate(messages) if _is_agent_output(m)]
+    if not CONTEXT_COMPACTION_ENABLED or not outputs:
+        return messages, record
+
+    budget = budget or AGENT_CONTEXT_BUDGET.get(role, DEFAULT_CONTEXT_BUDGET)
+    references = references or {}
+
+    def reference_for(i: int) -> Optional[str]:
+        return references.get(messages[i].additional_kwargs.get("summary_id"))
+
+    # 每条智能体输出在各展示级别下的 token 数
+    variants = {}
+    for i in outputs:
+        variants[i] = {FULL: messages[i]}
+        for level in (EXCERPT, REFERENCE):
+            variants[i][level] = _compact_message(messages[i], level, reference_for(i))
+    cost = {
+        i: {level: message_tokens(m) for level, m in v.items()}
+        for i, v in variants.items()
+    }
+
+    levels = {i: EXCERPT for i in outputs}
+    fixed = sum(message_tokens(m) for i, m in enumerate(messages) if i not in levels)
+    total = fixed + sum(cost[i][EXCERPT] for i in outputs)
+
+    for i in outputs:
+        if total <= budget:
+            break
+        total += cost[i][REFERENCE] - cost[i][EXCERPT]
+        levels[i] = REFERENCE
+
+    for i in _expand_priority(state, outputs, messages):
+        extra = cost[i][FULL] - cost[i][levels[i]]
+        if total + extra <= budget:
+            total += extra
+            levels[i] = FULL
+
+    compacted = [
+        variants[i][levels[i]] if i in levels else message
+        for i, message in enumerate(messages)
+    ]
+    record["compacted_tokens"] = min(total, original_tokens)
+    if record["compacted_tokens"] < original_tokens:
+        logger.info(
+            f"{role} 上下文压缩: {original_tokens} -> {record['compacted_tokens']} tokens "
+            f"(预算 {budget})"
+        )
+    else:
+        compacted = messages
+    return compacted, record
+
+
+def summarize_compaction(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    汇总一次工作流运行的上下文压缩统计
+
+    Args:
+        records: 各节点返回的 context_compaction 记录
+
+    Returns:
+        总计与按角色划分的 token 统计
+    """
+    by_role: Dict[str, Dict[str, int]] = {}
+    for record in records:
+        stats = by_role.setdefault(
+            record["role"], {"calls": 0, "original_tokens": 0, "compacted_tokens": 0}
+        )
+        stats["calls"] += 1
+        stats["original_tokens"] += record["original_tokens"]
+        stats["compacted_tokens"] += record["compacted_tokens"]
+
+    original = sum(s["original_tokens"] for s in by_role.values())
+    compacted = sum(s["compacted_tokens"] for s in by_role.values())
+    return {
+        "original_tokens": original,
+        "compacted_tokens": compacted,
+        "saved_tokens": original - compacted,
+        "saved_ratio": round((original - compacted) / original, 4) if original else 0.0,
+        "by_role": by_role,
+    }
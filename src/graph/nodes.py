@@ -1,3 +1,4 @@
+import asyncio
 import logging
 import json
 import uuid
@@ -6,15 +7,16 @@ from copy import deepcopy
 from datetime import datetime
 from typing import Literal
 from langchain_core.messages import HumanMessage
-from langgraph.types import Command
+from langgraph.types import Command, Send
 from langgraph.graph import END
 
 from src.agents.llm import get_llm_by_type
 from src.config import TEAM_MEMBERS
 from src.config.agents import AGENT_LLM_MAP
-from src.tools.search import tavily_tool
-from src.utils.file_manager import ExecutionFileManager
+from src.utils.file_manager import ExecutionFileManager, current_task_id
 from src.utils.json_cleaner import clean_json_response
+from .context_compactor import compact_messages
+from .plan_executor import parse_plan_steps, ready_plan_steps
 from .types import State, Router
 
 logger = logging.getLogger(__name__)
@@ -25,223 +27,206 @@ RESPONSE_FORMAT = "Response from {}:\n\n<response>\n{}\n</response>\n\n*Please e
 file_manager = ExecutionFileManager()
 
 
-def research_node(state: State) -> Command[Literal["supervisor"]]:
-    """Node for the researcher agent that performs research tasks."""
-    from src.agents import research_agent
-    logger.info("Research agent starting task")
-    result = research_agent.invoke(state)
-    logger.info("Research agent completed task")
-    logger.debug(f"Research agent response: {result['messages'][-1].content}")
-    
-    # 生成执行总结文件
+def _plan_step_message(state: State) -> HumanMessage:
+    """生成当前计划步骤的执行指令"""
+    index = state["plan_step"]
+    steps = parse_plan_steps(state.get("full_plan"))
+    step = steps[index] if index < len(steps) else {}
+    content = f"Please execute step {index + 1} of the plan: {step.get('title', '')}"
+    if step.get("description"):
+        content += f"\n\n{step['description']}"
+    if step.get("note"):
+        content += f"\n\nNote: {step['note']}"
+    return HumanMessage(content=content, name="supervisor")
+
+
+def _compact_context(role: str, state: State) -> tuple[list, dict]:
+    """按角色的 token 预算压缩历史消息，完整输出通过任务目录中的总结文件引用"""
     task_id = state.get("task_id")
-    execution_summaries = state.get("execution_summaries", [])
-    
+    references = file_manager.summary_references(task_id) if task_id else {}
+    return compact_messages(role, state, references)
+
+
+async def _run_agent_step(
+    state: State,
+    agent_name: str,
+    agent,
+    label: str,
+    saved_log: str,
+    failed_log: str,
+) -> Command[Literal["supervisor"]]:
+    """执行智能体，保存执行总结，并将结果交回 supervisor"""
+    logger.info(f"{label} starting task")
+    messages = state["messages"]
+    if state.get("plan_step") is not None:
+        # 由计划执行模式派发的步骤，明确告知智能体需要完成的步骤
+        messages = messages + [_plan_step_message(state)]
+    messages, compaction = _compact_context(agent_name, {**state, "messages": messages})
+    agent_input = {**state, "messages": messages}
+    task_token = current_task_id.set(state.get("task_id"))
+    try:
+        result = await agent.ainvoke(agent_input)
+    except Exception as e:
+        if not state.get("plan_executor_mode"):
+            raise
+        # 计划执行模式下记录失败，由 supervisor 回退到 LLM 决策
+        logger.error(f"{label} failed: {e}")
+        return Command(
+            update={
+                "messages": [
+                    HumanMessage(
+                        content=RESPONSE_FORMAT.format(agent_name, f"执行失败: {e}"),
+                        name=agent_name,
+                    )
+                ],
+                "plan_step_failed": True,
+                "context_compaction": [compaction],
+            },
+            goto="supervisor",
+        )
+    finally:
+        current_task_id.reset(task_token)
+    content = result["messages"][-1].content
+    logger.info(f"{label} completed task")
+    logger.debug(f"{label} response: {content}")
+
+    # 生成执行总结文件，只返回本步骤的总结，由 State 的 reducer 合并
+    task_id = state.get("task_id")
+    execution_summaries = []
+    # 记录总结与计划步骤，供后续节点压缩上下文时引用
+    reference = {}
+    if state.get("plan_step") is not None:
+        reference["plan_step"] = state["plan_step"]
+
     if task_id:
         try:
-            summary = file_manager.save_execution_summary(
+            summary = await file_manager.asave_execution_summary(
                 task_id=task_id,
-                agent_name="researcher", 
-                result_content=result["messages"][-1].content,
-                original_messages=state["messages"]
+                agent_name=agent_name,
+                result_content=content,
+                original_messages=state["messages"],
             )
             execution_summaries.append(summary)
-            logger.info(f"研究总结已保存到: {summary['file_path']}")
+            reference["summary_id"] = summary["summary_id"]
+            logger.info(f"{saved_log}: {summary['file_path']}")
         except Exception as e:
-            logger.error(f"保存研究总结失败: {e}")
-    
+            logger.error(f"{failed_log}: {e}")
+
     return Command(
         update={
             "messages": [
                 HumanMessage(
-                    content=RESPONSE_FORMAT.format(
-                        "researcher", result["messages"][-1].content
-                    ),
-                    name="researcher",
+                    content=RESPONSE_FORMAT.format(agent_name, content),
+                    name=agent_name,
+                    additional_kwargs=reference,
                 )
             ],
-            "execution_summaries": execution_summaries
+            "execution_summaries": execution_summaries,
+            "context_compaction": [compaction],
         },
         goto="supervisor",
     )
 
 
-def code_node(state: State) -> Command[Literal["supervisor"]]:
-    """Node for the coder agent that executes Python code."""
-    from src.agents import coder_agent
-    logger.info("Code agent starting task")
-    result = coder_agent.invoke(state)
-    logger.info("Code agent completed task")
-    logger.debug(f"Code agent response: {result['messages'][-1].content}")
-    
-    # 生成执行总结文件
-    task_id = state.get("task_id")
-    execution_summaries = state.get("execution_summaries", [])
-    
-    if task_id:
-        try:
-            summary = file_manager.save_execution_summary(
-                task_id=task_id,
-                agent_name="coder", 
-                result_content=result["messages"][-1].content,
-                original_messages=state["messages"]
-            )
-            execution_summaries.append(summary)
-            logger.info(f"代码执行总结已保存到: {summary['file_path']}")
-        except Exception as e:
-            logger.error(f"保存代码执行总结失败: {e}")
-    
-    return Command(
-        update={
-            "messages": [
-                HumanMessage(
-                    content=RESPONSE_FORMAT.format(
-                        "coder", result["messages"][-1].content
-                    ),
-                    name="coder",
-                )
-            ],
-            "execution_summaries": execution_summaries
-        },
-        goto="supervisor",
+async def research_node(state: State) -> Command[Literal["supervisor"]]:
+    """Node for the researcher agent that performs research tasks."""
+    from src.agents import research_agent
+
+    return await _run_agent_step(
+        state,
+        "researcher",
+        research_agent,
+        "Research agent",
+        "研究总结已保存到",
+        "保存研究总结失败",
     )
 
 
+async def code_node(state: State) -> Command[Literal["supervisor"]]:
+    """Node for the coder agent that executes Python code."""
+    from src.agents import coder_agent
 
+    return await _run_agent_step(
+        state,
+        "coder",
+        coder_agent,
+        "Code agent",
+        "代码执行总结已保存到",
+        "保存代码执行总结失败",
+    )
 
 
-def db_analyst_node(state: State) -> Command[Literal["supervisor"]]:
+async def db_analyst_node(state: State) -> Command[Literal["supervisor"]]:
     """Node for the database analyst agent that performs database queries and analysis."""
     from src.agents import db_analyst_agent
-    logger.info("Database analyst agent starting task")
-    result = db_analyst_agent.invoke(state)
-    logger.info("Database analyst agent completed task")
-    logger.debug(f"Database analyst agent response: {result['messages'][-1].content}")
-    
-    # 生成执行总结文件
-    task_id = state.get("task_id")
-    execution_summaries = state.get("execution_summaries", [])
-    
-    if task_id:
-        try:
-            summary = file_manager.save_execution_summary(
-                task_id=task_id,
-                agent_name="db_analyst", 
-                result_content=result["messages"][-1].content,
-                original_messages=state["messages"]
-            )
-            execution_summaries.append(summary)
-            logger.info(f"数据分析总结已保存到: {summary['file_path']}")
-        except Exception as e:
-            logger.error(f"保存数据分析总结失败: {e}")
-    
-    return Command(
-        update={
-            "messages": [
-                HumanMessage(
-                    content=RESPONSE_FORMAT.format(
-                        "db_analyst", result["messages"][-1].content
-                    ),
-                    name="db_analyst",
-                )
-            ],
-            "execution_summaries": execution_summaries
-        },
-        goto="supervisor",
+
+    return await _run_agent_step(
+        state,
+        "db_analyst",
+        db_analyst_agent,
+        "Database analyst agent",
+        "数据分析总结已保存到",
+        "保存数据分析总结失败",
     )
 
 
-def document_parser_node(state: State) -> Command[Literal["supervisor"]]:
+async def document_parser_node(state: State) -> Command[Literal["supervisor"]]:
     """Node for the document parser agent that processes and analyzes documents."""
     from src.agents import document_parser_agent
-    logger.info("Document parser agent starting task")
-    result = document_parser_agent.invoke(state)
-    logger.info("Document parser agent completed task")
-    logger.debug(f"Document parser agent response: {result['messages'][-1].content}")
-    
-    # 生成执行总结文件
-    task_id = state.get("task_id")
-    execution_summaries = state.get("execution_summaries", [])
-    
-    if task_id:
-        try:
-            summary = file_manager.save_execution_summary(
-                task_id=task_id,
-                agent_name="document_parser", 
-                result_content=result["messages"][-1].content,
-                original_messages=state["messages"]
-            )
-            execution_summaries.append(summary)
-            logger.info(f"文档解析总结已保存到: {summary['file_path']}")
-        except Exception as e:
-            logger.error(f"保存文档解析总结失败: {e}")
-    
-    return Command(
-        update={
-            "messages": [
-                HumanMessage(
-                    content=RESPONSE_FORMAT.format(
-                        "document_parser", result["messages"][-1].content
-                    ),
-                    name="document_parser",
-                )
-            ],
-            "execution_summaries": execution_summaries
-        },
-        goto="supervisor",
+
+    return await _run_agent_step(
+        state,
+        "document_parser",
+        document_parser_agent,
+        "Document parser agent",
+        "文档解析总结已保存到",
+        "保存文档解析总结失败",
     )
 
 
-def chart_generator_node(state: State) -> Command[Literal["supervisor"]]:
+async def chart_generator_node(state: State) -> Command[Literal["supervisor"]]:
     """Node for the chart generator agent that creates ECharts visualizations."""
     from src.agents import chart_generator_agent
-    logger.info("Chart generator agent starting task")
-    result = chart_generator_agent.invoke(state)
-    logger.info("Chart generator agent completed task")
-    logger.debug(f"Chart generator agent response: {result['messages'][-1].content}")
-    
-    # 生成执行总结文件
-    task_id = state.get("task_id")
-    execution_summaries = state.get("execution_summaries", [])
-    
-    if task_id:
-        try:
-            summary = file_manager.save_execution_summary(
-                task_id=task_id,
-                agent_name="chart_generator", 
-                result_content=result["messages"][-1].content,
-                original_messages=state["messages"]
-            )
-            execution_summaries.append(summary)
-            logger.info(f"图表生成总结已保存到: {summary['file_path']}")
-        except Exception as e:
-            logger.error(f"保存图表生成总结失败: {e}")
-    
-    return Command(
-        update={
-            "messages": [
-                HumanMessage(
-                    content=RESPONSE_FORMAT.format(
-                        "chart_generator", result["messages"][-1].content
-                    ),
-                    name="chart_generator",
-                )
-            ],
-            "execution_summaries": execution_summaries
-        },
-        goto="supervisor",
+
+    return await _run_agent_step(
+        state,
+        "chart_generator",
+        chart_generator_agent,
+        "Chart generator agent",
+        "图表生成总结已保存到",
+        "保存图表生成总结失败",
     )
 
 
-def supervisor_node(state: State) -> Command[Literal[*TEAM_MEMBERS, "__end__"]]:
+async def supervisor_node(state: State) -> Command[Literal[*TEAM_MEMBERS, "__end__"]]:
     """Supervisor node that decides which agent should act next."""
     from src.prompts.template import apply_prompt_template
+
+    # 计划执行模式：按步骤依赖路由，相互独立的步骤并行派发，
+    # 仅在失败或计划执行完毕时调用 LLM
+    if state.get("plan_executor_mode"):
+        ready = ready_plan_steps(state)
+        if ready:
+            agents = [step["agent_name"] for _, step in ready]
+            logger.info(f"Plan executor delegating to: {', '.join(agents)}")
+            return Command(
+                goto=[
+                    Send(step["agent_name"], {**state, "plan_step": index})
+                    for index, step in ready
+                ],
+                update={
+                    "next": ",".join(agents),
+                    "plan_dispatched_steps": [index for index, _ in ready],
+                },
+            )
+
     logger.info("Supervisor evaluating next action")
-    messages = apply_prompt_template("supervisor", state)
-    response = (
+    compacted, compaction = _compact_context("supervisor", state)
+    messages = apply_prompt_template("supervisor", {**state, "messages": compacted})
+    response = await (
         get_llm_by_type(AGENT_LLM_MAP["supervisor"])
         .with_structured_output(Router)
-        .invoke(messages)
+        .ainvoke(messages)
     )
     goto = response["next"]
     logger.debug(f"Current state messages: {state['messages']}")
@@ -253,10 +238,17 @@ def supervisor_node(state: State) -> Command[Literal[*TEAM_MEMBERS, "__end__"]]:
     else:
         logger.info(f"Supervisor delegating to: {goto}")
 
-    return Command(goto=goto, update={"next": goto})
+    return Command(
+        goto=goto,
+        update={
+            "next": goto,
+            "plan_step_failed": False,
+            "context_compaction": [compaction],
+        },
+    )
 
 
-def planner_node(state: State) -> Command[Literal["supervisor", "__end__"]]:
+async def planner_node(state: State) -> Command[Literal["supervisor", "__end__"]]:
     """Planner node that generate the full plan."""
     from src.prompts.template import apply_prompt_template
     logger.info("Planner generating full plan")
@@ -266,14 +258,17 @@ def planner_node(state: State) -> Command[Literal["supervisor", "__end__"]]:
     if state.get("deep_thinking_mode"):
         llm = get_llm_by_type("reasoning")
     if state.get("search_before_planning"):
-        searched_content = tavily_tool.invoke({"query": state["messages"][-1].content})
+        from src.tools.search import tavily_tool
+
+        searched_content = await tavily_tool.ainvoke(
+            {"query": state["messages"][-1].content}
+        )
         messages = deepcopy(messages)
         messages[
             -1
         ].content += f"\n\n# Relative Search Results\n\n{json.dumps([{'titile': elem['title'], 'content': elem['content']} for elem in searched_content], ensure_ascii=False)}"
-    stream = llm.stream(messages)
     full_response = ""
-    for chunk in stream:
+    async for chunk in llm.astream(messages):
         full_response += chunk.content
     logger.debug(f"Current state messages: {state['messages']}")
     logger.debug(f"Planner response: {full_response}")
@@ -288,7 +283,7 @@ def planner_node(state: State) -> Command[Literal["supervisor", "__end__"]]:
         # 保存计划文件
         task_id = state.get("task_id")
         if task_id:
-            plan_file_path = file_manager.save_plan(task_id, cleaned_response)
+            plan_file_path = await file_manager.asave_plan(task_id, cleaned_response)
             logger.info(f"计划已保存到: {plan_file_path}")
         
     except json.JSONDecodeError as e:
@@ -306,7 +301,7 @@ def planner_node(state: State) -> Command[Literal["supervisor", "__end__"]]:
     )
 
 
-def coordinator_node(state: State) -> Command[Literal["planner", "__end__"]]:
+async def coordinator_node(state: State) -> Command[Literal["planner", "__end__"]]:
     """Coordinator node that communicate with customers."""
     from src.prompts.template import apply_prompt_template
     logger.info("Coordinator talking.")
@@ -322,7 +317,7 @@ def coordinator_node(state: State) -> Command[Literal["planner", "__end__"]]:
         output_directory = state["output_directory"]
     
     messages = apply_prompt_template("coordinator", state)
-    response = get_llm_by_type(AGENT_LLM_MAP["coordinator"]).invoke(messages)
+    response = await get_llm_by_type(AGENT_LLM_MAP["coordinator"]).ainvoke(messages)
     logger.debug(f"Current state messages: {state['messages']}")
     logger.debug(f"coordinator response: {response}")
 
@@ -330,7 +325,6 @@ def coordinator_node(state: State) -> Command[Literal["planner", "__end__"]]:
     update_data = {
         "task_id": task_id,
         "output_directory": output_directory,
-        "execution_summaries": state.get("execution_summaries", [])
     }
     
     if "handoff_to_planner" in response.content:
@@ -342,7 +336,7 @@ def coordinator_node(state: State) -> Command[Literal["planner", "__end__"]]:
     )
 
 
-def reporter_node(state: State) -> Command[Literal["__end__"]]:
+async def reporter_node(state: State) -> Command[Literal["__end__"]]:
     """Reporter node that generates final comprehensive report."""
     logger.info("Reporter agent generating final comprehensive report")
     
@@ -356,7 +350,12 @@ def reporter_node(state: State) -> Command[Literal["__end__"]]:
         from src.prompts.template import apply_prompt_template
         
         logger.info(f"开始为任务 {task_id} 生成最终报告")
-        messages = apply_prompt_template("reporter", state)
+        
+        # 等待之前步骤的总结文件完成重命名，保证报告中引用的文件名稳定
+        if not await asyncio.to_thread(file_manager.wait_for_titles, task_id):
+            logger.warning(f"任务 {task_id} 的标题生成未在时限内完成，使用启发式标题")
+        compacted, compaction = _compact_context("reporter", state)
+        messages = apply_prompt_template("reporter", {**state, "messages": compacted})
         
         # 获取reporter使用的LLM
         llm = get_llm_by_type(AGENT_LLM_MAP["reporter"])
@@ -371,18 +370,18 @@ def reporter_node(state: State) -> Command[Literal["__end__"]]:
         )
         
         # 调用智能体生成报告
-        result = temp_reporter_agent.invoke({"messages": messages})
+        result = await temp_reporter_agent.ainvoke({"messages": messages})
         logger.info("Reporter agent completed final report generation")
         
         # 获取reporter的响应内容
         final_content = result["messages"][-1].content
         
         # 生成执行总结文件
-        execution_summaries = state.get("execution_summaries", [])
+        execution_summaries = []
         
         if task_id:
             try:
-                summary = file_manager.save_execution_summary(
+                summary = await file_manager.asave_execution_summary(
                     task_id=task_id,
                     agent_name="reporter", 
                     result_content=final_content,
@@ -403,7 +402,8 @@ def reporter_node(state: State) -> Command[Literal["__end__"]]:
                         name="reporter",
                     )
                 ],
-                "execution_summaries": execution_summaries
+                "execution_summaries": execution_summaries,
+                "context_compaction": [compaction],
             },
             goto="__end__",
         )
@@ -0,0 +1,121 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import TEAM_MEMBERS
+from src.utils.json_cleaner import clean_json_response
+
+logger = logging.getLogger(__name__)
+
+
+def parse_plan_steps(full_plan: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    从 planner 输出中解析步骤列表
+
+    Args:
+        full_plan: planner 生成的计划JSON字符串
+
+    Returns:
+        步骤列表，解析失败时返回空列表
+    """
+    if not full_plan:
+        return []
+    try:
+        plan = json.loads(clean_json_response(full_plan))
+    except json.JSONDecodeError as e:
+        logger.warning(f"计划解析失败，无法按计划执行: {e}")
+        return []
+    steps = plan.get("steps") if isinstance(plan, dict) else None
+    return steps if isinstance(steps, list) else []
+
+
+def step_dependencies(steps: List[Dict[str, Any]], index: int) -> List[int]:
+    """
+    获取步骤依赖的前置步骤（从0开始的下标）
+
+    未声明 `depends_on` 的步骤依赖上一个步骤，保持顺序执行；reporter
+    始终依赖之前的全部步骤。只允许依赖排在前面的步骤，避免出现环。
+
+    Args:
+        steps: 计划步骤列表
+        index: 步骤下标
+
+    Returns:
+        前置步骤下标列表
+    """
+    step = steps[index]
+    if step.get("agent_name") == "reporter":
+        return list(range(index))
+
+    declared = step.get("depends_on")
+    if declared is None:
+        return [index - 1] if index > 0 else []
+    if not isinstance(declared, list):
+        declared = [declared]
+
+    dependencies = []
+    for dep in declared:
+        try:
+            # depends_on 使用从1开始的步骤编号
+            dep_index = int(dep) - 1
+        except (TypeError, ValueError):
+            logger.warning(f"步骤 {index + 1} 的依赖无法识别: {dep}")
+            continue
+        if 0 <= dep_index < index:
+            dependencies.append(dep_index)
+        else:
+            logger.warning(f"步骤 {index + 1} 只能依赖之前的步骤，已忽略: {dep}")
+    return dependencies
+
+
+def ready_plan_steps(
+    state: Dict[str, Any],
+) -> Optional[List[Tuple[int, Dict[str, Any]]]]:
+    """
+    计划执行模式下确定可以立即执行的步骤
+
+    supervisor 在所有已派发的分支汇合后才会再次运行，因此已派发的步骤
+    即为已完成的步骤。依赖全部完成的步骤可以并行执行。上一轮有步骤失败、
+    计划已执行完毕或步骤指定了未知的智能体时返回None，由 supervisor
+    回退到 LLM 决策。
+
+    Args:
+        state: 当前工作流状态
+
+    Returns:
+        (步骤下标, 步骤) 列表或None
+    """
+    if state.get("plan_step_failed"):
+        logger.info("上一步骤执行失败，回退到 supervisor LLM 决策")
+        return None
+
+    steps = parse_plan_steps(state.get("full_plan"))
+    done = set(state.get("plan_dispatched_steps", []))
+    pending = [i for i in range(len(steps)) if i not in done]
+    if not pending:
+        logger.info("计划步骤已全部执行，回退到 supervisor LLM 决策")
+        return None
+
+    ready = []
+    for index in pending:
+        step = steps[index]
+        if not isinstance(step, dict):
+            logger.warning(f"计划步骤 {index + 1} 格式无效: {step}")
+            return None
+        if not all(dep in done for dep in step_dependencies(steps, index)):
+            continue
+        if step.get("agent_name") not in TEAM_MEMBERS:
+            logger.warning(
+                f"计划步骤 {index + 1} 指定了未知的智能体: {step.get('agent_name')}"
+            )
+            return None
+        ready.append((index, step))
+
+    if not ready:
+        return None
+
+    logger.info(
+        f"按计划执行步骤 {', '.join(str(i + 1) for i, _ in ready)}/{len(steps)}: "
+        f"{', '.join(step['agent_name'] for _, step in ready)}"
+    )
+    return ready
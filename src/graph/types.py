@@ -1,4 +1,5 @@
-from typing import Literal, Union
+import operator
+from typing import Annotated, Literal, Union
 from typing_extensions import TypedDict
 from langgraph.graph import MessagesState
 
@@ -25,6 +26,11 @@ class Router(TypedDict):
     next: RouterNext
 
 
+def last_value(left, right):
+    """并行分支同时写入时保留最后一个值，允许 supervisor 之后重新赋值"""
+    return right
+
+
 class State(MessagesState):
     """State for the agent system, extends MessagesState with next field."""
 
@@ -36,8 +42,18 @@ class State(MessagesState):
     full_plan: str
     deep_thinking_mode: bool
     search_before_planning: bool
+
+    # 计划执行模式：按 full_plan 的步骤依赖路由，跳过 supervisor LLM，
+    # 相互独立的步骤通过 Send 并行执行
+    plan_executor_mode: bool
+    plan_dispatched_steps: Annotated[list[int], operator.add]
+    plan_step_failed: Annotated[bool, last_value]
+    plan_step: int  # 仅存在于 Send 派发给智能体的输入中
     
-    # 新增字段：执行总结追踪
-    execution_summaries: list[dict]  # 使用通用dict类型避免循环导入
+    # 新增字段：执行总结追踪，并行分支的结果在汇合时合并
+    execution_summaries: Annotated[list[dict], operator.add]  # 使用通用dict类型避免循环导入
     output_directory: str
     task_id: str
+
+    # 各节点按角色压缩历史消息的 token 统计
+    context_compaction: Annotated[list[dict], operator.add]
@@ -0,0 +1,277 @@
+import logging
+import uuid
+from typing import Any, Dict, List, Optional
+
+from langchain_community.adapters.openai import convert_message_to_dict
+
+from src.config import TEAM_MEMBERS
+from src.utils.json_stream_parser import PlanStreamParser
+
+logger = logging.getLogger(__name__)
+
+# Cache size for coordinator messages
+MAX_CACHE_SIZE = 2
+
+STREAMING_LLM_AGENTS = [*TEAM_MEMBERS, "planner", "coordinator"]
+
+
+class WorkflowContext:
+    """Streaming state owned by a single workflow run.
+
+    Every call to ``run_agent_workflow`` creates its own context, so concurrent
+    chat streams served by the same worker never share coordinator caches,
+    handoff flags, planner buffers or plan step tracking.
+    """
+
+    def __init__(self, user_input_messages: list, workflow_id: Optional[str] = None):
+        self.workflow_id = workflow_id or str(uuid.uuid4())
+        self.user_input_messages = user_input_messages
+
+        # coordinator 流式输出缓存，用于识别 handoff
+        self.coordinator_cache: List[str] = []
+        self.is_handoff_case = False
+
+        # planner 流式输出的增量解析器
+        self.plan_parser = PlanStreamParser()
+
+        # 用于追踪当前计划步骤
+        self.plan_steps: List[Dict[str, Any]] = []
+        self.step_index = -1
+
+        # 最近一个事件的 data，用于生成 end_of_workflow
+        self.last_data: Optional[Dict[str, Any]] = None
+
+        # 工作流结束时从最终状态中取出的上下文压缩统计
+        self.context_compaction: List[Dict[str, Any]] = []
+
+    def handle_event(self, event: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Translate one ``astream_events`` event into the events sent to the client."""
+        kind = event.get("event")
+        data = event.get("data")
+        name = event.get("name")
+        metadata = event.get("metadata") or {}
+        node = (
+            ""
+            if (metadata.get("checkpoint_ns") is None)
+            else metadata.get("checkpoint_ns").split(":")[0]
+        )
+        langgraph_step = (
+            ""
+            if (metadata.get("langgraph_step") is None)
+            else str(metadata["langgraph_step"])
+        )
+        run_id = "" if (event.get("run_id") is None) else str(event["run_id"])
+        self.last_data = data
+
+        outputs: List[Dict[str, Any]] = []
+
+        if kind == "on_chain_end":
+            logger.debug(
+                f"on_chain_end event - name: {name}, data keys: {list(data.keys()) if data else 'None'}"
+            )
+
+        # 监听 planner 的消息流，每个步骤闭合后立即发送
+        if kind == "on_chat_model_stream" and node == "planner":
+            content = data.get("chunk").content if data.get("chunk") else None
+            if content:
+                for step in self.plan_parser.feed(content):
+                    self.plan_steps.append(step)
+                    outputs.append(
+                        {
+                            "event": "plan_step_generated",
+                            "data": {
+                                "step_index": len(self.plan_steps),
+                                "step_info": step,
+                            },
+                        }
+                    )
+
+        # 顶层图结束时记录上下文压缩统计（智能体内部的子图没有 checkpoint_ns 为空的结束事件）
+        if kind == "on_chain_end" and name == "LangGraph" and not node:
+            output = (data or {}).get("output")
+            if isinstance(output, dict):
+                self.context_compaction = output.get("context_compaction") or []
+
+        # 当 planner 结束时，发送完整计划
+        if kind == "on_chain_end" and name == "planner":
+            plan_event = self._finish_plan()
+            if plan_event:
+                outputs.append(plan_event)
+
+        # 当 agent 开始执行时，发送对应的步骤信息
+        if kind == "on_chain_start" and name in TEAM_MEMBERS and self.plan_steps:
+            for i, step in enumerate(self.plan_steps):
+                if step.get("agent_name") == name and i >= self.step_index:
+                    self.step_index = i
+                    logger.info(f"Yielding step_started event for step {i+1}")
+                    outputs.append(
+                        {
+                            "event": "step_started",
+                            "data": {
+                                "step_index": i + 1,  # 1-based index for user
+                                "total_steps": len(self.plan_steps),
+                                "step_info": step,
+                            },
+                        }
+                    )
+                    break
+
+        # 当 agent 完成执行时，发送步骤完成事件
+        if kind == "on_chain_end" and name in TEAM_MEMBERS and self.plan_steps:
+            for i, step in enumerate(self.plan_steps):
+                if step.get("agent_name") == name:
+                    logger.info(f"Yielding step_end event for step {i+1}")
+                    outputs.append(
+                        {
+                            "event": "step_end",
+                            "data": {
+                                "step_index": i + 1,
+                                "total_steps": len(self.plan_steps),
+                                "step_info": step,
+                            },
+                        }
+                    )
+                    break
+
+        if kind == "on_chain_start" and name in STREAMING_LLM_AGENTS:
+            if name == "planner":
+                outputs.append(
+                    {
+                        "event": "start_of_workflow",
+                        "data": {
+                            "workflow_id": self.workflow_id,
+                            "input": self.user_input_messages,
+                        },
+                    }
+                )
+            ydata = {
+                "event": "start_of_agent",
+                "data": {
+                    "agent_name": name,
+                    "agent_id": f"{self.workflow_id}_{name}_{langgraph_step}",
+                },
+            }
+        elif kind == "on_chain_end" and name in STREAMING_LLM_AGENTS:
+            ydata = {
+                "event": "end_of_agent",
+                "data": {
+                    "agent_name": name,
+                    "agent_id": f"{self.workflow_id}_{name}_{langgraph_step}",
+                },
+            }
+        elif kind == "on_chat_model_start" and node in STREAMING_LLM_AGENTS:
+            ydata = {
+                "event": "start_of_llm",
+                "data": {"agent_name": node},
+            }
+        elif kind == "on_chat_model_end" and node in STREAMING_LLM_AGENTS:
+            ydata = {
+                "event": "end_of_llm",
+                "data": {"agent_name": node},
+            }
+        elif kind == "on_chat_model_stream" and node in STREAMING_LLM_AGENTS:
+            ydata = self._message_event(node, data["chunk"])
+        elif kind == "on_tool_start" and node in TEAM_MEMBERS:
+            ydata = {
+                "event": "tool_call",
+                "data": {
+                    "tool_call_id": f"{self.workflow_id}_{node}_{name}_{run_id}",
+                    "tool_name": name,
+                    "tool_input": data.get("input"),
+                },
+            }
+        elif kind == "on_tool_end" and node in TEAM_MEMBERS:
+            ydata = {
+                "event": "tool_call_result",
+                "data": {
+                    "tool_call_id": f"{self.workflow_id}_{node}_{name}_{run_id}",
+                    "tool_name": name,
+                    "tool_result": data["output"].content if data.get("output") else "",
+                },
+            }
+        else:
+            ydata = None
+
+        if ydata:
+            outputs.append(ydata)
+        return outputs
+
+    def finish(self) -> List[Dict[str, Any]]:
+        """Events to emit after the graph stream is exhausted."""
+        if not self.is_handoff_case:
+            return []
+        output = (self.last_data or {}).get("output") or {}
+        return [
+            {
+                "event": "end_of_workflow",
+                "data": {
+                    "workflow_id": self.workflow_id,
+                    "messages": [
+                        convert_message_to_dict(msg)
+                        for msg in output.get("messages", [])
+                    ],
+                },
+            }
+        ]
+
+    def _finish_plan(self) -> Optional[Dict[str, Any]]:
+        """planner 结束时解析完整计划，成功时返回 plan_generated 事件"""
+        plan_data = self.plan_parser.finish()
+        # 重置解析器，准备接收下一次 planner 输出
+        self.plan_parser = PlanStreamParser()
+        if not plan_data:
+            self.plan_steps = []
+            return None
+
+        self.plan_steps = plan_data["steps"]
+        self.step_index = 0
+        logger.info(f"Plan parsed successfully, {len(self.plan_steps)} steps found")
+        return {
+            "event": "plan_generated",
+            "data": {
+                "plan_steps": self.plan_steps,
+                "total_steps": len(self.plan_steps),
+            },
+        }
+
+    def _message_event(self, node: str, chunk: Any) -> Optional[Dict[str, Any]]:
+        """将 LLM 流式片段转换为 message 事件，coordinator 的 handoff 输出会被过滤"""
+        content = chunk.content
+        if content is None or content == "":
+            if not chunk.additional_kwargs.get("reasoning_content"):
+                # Skip empty messages
+                return None
+            return {
+                "event": "message",
+                "data": {
+                    "message_id": chunk.id,
+                    "delta": {
+                        "reasoning_content": chunk.additional_kwargs[
+                            "reasoning_content"
+                        ]
+                    },
+                },
+            }
+
+        if node == "coordinator":
+            if len(self.coordinator_cache) < MAX_CACHE_SIZE:
+                self.coordinator_cache.append(content)
+                cached_content = "".join(self.coordinator_cache)
+                if cached_content.startswith("handoff"):
+                    self.is_handoff_case = True
+                    return None
+                if len(self.coordinator_cache) < MAX_CACHE_SIZE:
+                    return None
+                # Send the cached message
+                content = cached_content
+            elif self.is_handoff_case:
+                # is_handoff_case is True, skip this message
+                return None
+
+        return {
+            "event": "message",
+            "data": {
+                "message_id": chunk.id,
+                "delta": {"content": content},
+            },
+        }
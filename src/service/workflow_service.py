@@ -1,15 +1,12 @@
+import contextlib
 import logging
-import json
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from contextlib import asynccontextmanager
-from typing import Any, AsyncGenerator
+from typing import Dict
 
 from src.config import TEAM_MEMBERS
-from src.graph import build_graph
-from src.utils.json_cleaner import clean_json_response
-from langchain_community.adapters.openai import convert_message_to_dict
-import uuid
-from ..agents.llm import get_llm_by_type
+from src.graph import get_graph, graph_initialized
+from src.utils.startup import startup_timings
+from src.graph.context_compactor import summarize_compaction
+from .workflow_context import WorkflowContext
 
 # Configure logging
 logging.basicConfig(
@@ -25,12 +22,42 @@ def enable_debug_logging():
 
 logger = logging.getLogger(__name__)
 
-# Create the graph
-graph = build_graph()
 
-# Cache for coordinator messages
-coordinator_cache = []
-MAX_CACHE_SIZE = 2
+def warm_up() -> bool:
+    """Build the LLMs, agents and the workflow graph ahead of the first request.
+
+    Every step is timed in ``startup_timings``. A failing step is logged and the
+    remaining steps still run, so one misconfigured provider only affects the
+    agents that use it.
+
+    Returns:
+        True if every step succeeded
+    """
+    from src.agents import AGENT_NAMES, get_agent
+    from src.utils.title_generator import title_generator
+
+    steps = [("graph", get_graph)]
+    steps += [(name, lambda name=name: get_agent(name)) for name in AGENT_NAMES]
+    steps.append(("title_generator", lambda: title_generator.llm))
+
+    ok = True
+    with startup_timings.step("warm_up"):
+        for name, step in steps:
+            try:
+                step()
+            except Exception as e:
+                ok = False
+                logger.error(f"Warm-up step {name} failed: {e}")
+    return ok
+
+
+def warm_up_status() -> Dict[str, bool]:
+    """Report which of the warm-up singletons (graph and agents) have been built."""
+    from src.agents import AGENT_NAMES, agent_initialized
+
+    status = {"graph": graph_initialized()}
+    status.update((name, agent_initialized(name)) for name in AGENT_NAMES)
+    return status
 
 
 async def run_agent_workflow(
@@ -38,12 +65,16 @@ async def run_agent_workflow(
     debug: bool = False,
     deep_thinking_mode: bool = False,
     search_before_planning: bool = False,
+    plan_executor_mode: bool = False,
 ):
     """Run the agent workflow with the given user input.
 
     Args:
         user_input_messages: The user request messages
         debug: If True, enables debug level logging
+        plan_executor_mode: If True, route the planner's steps by their declared
+            dependencies (running independent steps in parallel) and only consult
+            the supervisor LLM when a step fails or the plan is exhausted
 
     Returns:
         The final state after the workflow completes
@@ -56,22 +87,13 @@ async def run_agent_workflow(
 
     logger.info(f"Starting workflow with user input: {user_input_messages}")
 
-    workflow_id = str(uuid.uuid4())
-
-    streaming_llm_agents = [*TEAM_MEMBERS, "planner", "coordinator"]
-
-    # Reset coordinator cache at the start of each workflow
-    global coordinator_cache
-    coordinator_cache = []
-    global is_handoff_case
-    is_handoff_case = False
-
-    # 用于追踪当前计划步骤
-    current_plan_steps = []
-    current_step_index = -1
+    # 每次运行独立的流式状态，保证并发工作流互不干扰
+    context = WorkflowContext(user_input_messages)
 
     # TODO: extract message content from object, specifically for on_chat_model_stream
-    async for event in graph.astream_events(
+    # Closing this generator (e.g. on client disconnect) closes the event stream right away,
+    # which cancels the graph's in-flight node and tool tasks
+    events = get_graph().astream_events(
         {
             # Constants
             "TEAM_MEMBERS": TEAM_MEMBERS,
@@ -79,247 +101,27 @@ async def run_agent_workflow(
             "messages": user_input_messages,
             "deep_thinking_mode": deep_thinking_mode,
             "search_before_planning": search_before_planning,
+            "plan_executor_mode": plan_executor_mode,
+            "plan_dispatched_steps": [],
+            "plan_step_failed": False,
+            "context_compaction": [],
         },
         version="v2",
         config={"recursion_limit": 50},
-    ):
-        kind = event.get("event")
-        data = event.get("data")
-        name = event.get("name")
-        metadata = event.get("metadata")
-        node = (
-            ""
-            if (metadata.get("checkpoint_ns") is None)
-            else metadata.get("checkpoint_ns").split(":")[0]
+    )
+    async with contextlib.aclosing(events):
+        async for event in events:
+            for ydata in context.handle_event(event):
+                yield ydata
+
+    report = summarize_compaction(context.context_compaction)
+    if report["original_tokens"]:
+        logger.info(
+            f"Workflow {context.workflow_id} context compaction: "
+            f"{report['original_tokens']} -> {report['compacted_tokens']} tokens, "
+            f"saved {report['saved_tokens']} ({report['saved_ratio']:.1%}); "
+            f"by role: {report['by_role']}"
         )
-        langgraph_step = (
-            ""
-            if (metadata.get("langgraph_step") is None)
-            else str(metadata["langgraph_step"])
-        )
-        run_id = "" if (event.get("run_id") is None) else str(event["run_id"])
-
-        # 调试：打印所有 on_chain_end 事件
-        if kind == "on_chain_end":
-            logger.debug(f"on_chain_end event - name: {name}, data keys: {list(data.keys()) if data else 'None'}")
-            if data and "output" in data:
-                output_type = type(data["output"])
-                logger.debug(f"  output type: {output_type}")
-                if isinstance(data["output"], dict):
-                    logger.debug(f"  output keys: {list(data['output'].keys())}")
 
-        # 检查是否有状态更新，获取计划步骤信息
-        if kind == "on_chain_end" and name == "planner":
-            logger.info(f"Planner chain ended, checking for plan in output")
-            # 尝试不同的方式获取 planner 的输出
-            if data:
-                logger.debug(f"Planner output data: {data}")
-                
-        # 另一种方式：监听 planner 的消息流
-        if kind == "on_chat_model_end" and node == "planner":
-            logger.info("Planner model ended, checking for plan")
-            # 这里可能包含了 planner 生成的内容
-            if data and "output" in data:
-                logger.debug(f"Planner model output: {data['output']}")
-                
-        # 监听消息流，查找包含计划的消息
-        if kind == "on_chat_model_stream" and node == "planner":
-            content = data.get("chunk", {}).content if data.get("chunk") else None
-            if content:
-                # 累积 planner 的输出
-                if not hasattr(run_agent_workflow, '_planner_buffer'):
-                    run_agent_workflow._planner_buffer = ""
-                run_agent_workflow._planner_buffer += content
-                
-        # 当 planner 结束时，解析累积的内容
-        if kind == "on_chain_end" and name == "planner":
-            if hasattr(run_agent_workflow, '_planner_buffer'):
-                try:
-                    plan_content = run_agent_workflow._planner_buffer
-                    logger.info(f"Accumulated planner content: {plan_content[:100]}...")
-                    
-                    # 使用统一的JSON清理函数
-                    cleaned_plan_content = clean_json_response(plan_content)
-                    
-                    plan_data = json.loads(cleaned_plan_content)
-                    if isinstance(plan_data, dict) and "steps" in plan_data:
-                        current_plan_steps = plan_data["steps"]
-                        current_step_index = 0
-                        logger.info(f"Plan parsed successfully, {len(current_plan_steps)} steps found")
-                        # 发送计划步骤信息
-                        plan_event = {
-                            "event": "plan_generated",
-                            "data": {
-                                "plan_steps": current_plan_steps,
-                                "total_steps": len(current_plan_steps),
-                            },
-                        }
-                        logger.info(f"Yielding plan_generated event")
-                        yield plan_event
-                    # 清空缓冲区
-                    run_agent_workflow._planner_buffer = ""
-                except json.JSONDecodeError as e:
-                    logger.warning(f"Failed to parse plan: {e}")
-                    logger.debug(f"Original plan content: {plan_content}")
-                    logger.debug(f"Cleaned plan content: {cleaned_plan_content if 'cleaned_plan_content' in locals() else 'N/A'}")
-                    run_agent_workflow._planner_buffer = ""
-
-        # 当 supervisor 开始执行时，检查它要调用哪个 agent
-        if kind == "on_chain_start" and name in TEAM_MEMBERS and current_plan_steps:
-            logger.info(f"Agent {name} started, checking for matching step")
-            # 查找当前 agent 对应的步骤
-            for i, step in enumerate(current_plan_steps):
-                if step.get("agent_name") == name and i >= current_step_index:
-                    current_step_index = i
-                    # 发送当前步骤信息
-                    step_event = {
-                        "event": "step_started",
-                        "data": {
-                            "step_index": i + 1,  # 1-based index for user
-                            "total_steps": len(current_plan_steps),
-                            "step_info": step,
-                        },
-                    }
-                    logger.info(f"Yielding step_started event for step {i+1}: {step_event}")
-                    yield step_event
-                    break
-
-        # 当 agent 完成执行时，发送步骤完成事件
-        if kind == "on_chain_end" and name in TEAM_MEMBERS and current_plan_steps:
-            logger.info(f"Agent {name} ended, checking for matching step")
-            # 查找当前 agent 对应的步骤
-            for i, step in enumerate(current_plan_steps):
-                if step.get("agent_name") == name:
-                    step_end_event = {
-                        "event": "step_end",
-                        "data": {
-                            "step_index": i + 1,
-                            "total_steps": len(current_plan_steps),
-                            "step_info": step,
-                        },
-                    }
-                    logger.info(f"Yielding step_end event for step {i+1}")
-                    yield step_end_event
-                    break
-
-        if kind == "on_chain_start" and name in streaming_llm_agents:
-            if name == "planner":
-                yield {
-                    "event": "start_of_workflow",
-                    "data": {"workflow_id": workflow_id, "input": user_input_messages},
-                }
-            ydata = {
-                "event": "start_of_agent",
-                "data": {
-                    "agent_name": name,
-                    "agent_id": f"{workflow_id}_{name}_{langgraph_step}",
-                },
-            }
-        elif kind == "on_chain_end" and name in streaming_llm_agents:
-            ydata = {
-                "event": "end_of_agent",
-                "data": {
-                    "agent_name": name,
-                    "agent_id": f"{workflow_id}_{name}_{langgraph_step}",
-                },
-            }
-        elif kind == "on_chat_model_start" and node in streaming_llm_agents:
-            ydata = {
-                "event": "start_of_llm",
-                "data": {"agent_name": node},
-            }
-        elif kind == "on_chat_model_end" and node in streaming_llm_agents:
-            ydata = {
-                "event": "end_of_llm",
-                "data": {"agent_name": node},
-            }
-        elif kind == "on_chat_model_stream" and node in streaming_llm_agents:
-            content = data["chunk"].content
-            if content is None or content == "":
-                if not data["chunk"].additional_kwargs.get("reasoning_content"):
-                    # Skip empty messages
-                    continue
-                ydata = {
-                    "event": "message",
-                    "data": {
-                        "message_id": data["chunk"].id,
-                        "delta": {
-                            "reasoning_content": (
-                                data["chunk"].additional_kwargs["reasoning_content"]
-                            )
-                        },
-                    },
-                }
-            else:
-                # Check if the message is from the coordinator
-                if node == "coordinator":
-                    if len(coordinator_cache) < MAX_CACHE_SIZE:
-                        coordinator_cache.append(content)
-                        cached_content = "".join(coordinator_cache)
-                        if cached_content.startswith("handoff"):
-                            is_handoff_case = True
-                            continue
-                        if len(coordinator_cache) < MAX_CACHE_SIZE:
-                            continue
-                        # Send the cached message
-                        ydata = {
-                            "event": "message",
-                            "data": {
-                                "message_id": data["chunk"].id,
-                                "delta": {"content": cached_content},
-                            },
-                        }
-                    elif not is_handoff_case:
-                        # For other agents, send the message directly
-                        ydata = {
-                            "event": "message",
-                            "data": {
-                                "message_id": data["chunk"].id,
-                                "delta": {"content": content},
-                            },
-                        }
-                    else:
-                        # is_handoff_case is True, skip this message
-                        continue
-                else:
-                    # For other agents, send the message directly
-                    ydata = {
-                        "event": "message",
-                        "data": {
-                            "message_id": data["chunk"].id,
-                            "delta": {"content": content},
-                        },
-                    }
-        elif kind == "on_tool_start" and node in TEAM_MEMBERS:
-            ydata = {
-                "event": "tool_call",
-                "data": {
-                    "tool_call_id": f"{workflow_id}_{node}_{name}_{run_id}",
-                    "tool_name": name,
-                    "tool_input": data.get("input"),
-                },
-            }
-        elif kind == "on_tool_end" and node in TEAM_MEMBERS:
-            ydata = {
-                "event": "tool_call_result",
-                "data": {
-                    "tool_call_id": f"{workflow_id}_{node}_{name}_{run_id}",
-                    "tool_name": name,
-                    "tool_result": data["output"].content if data.get("output") else "",
-                },
-            }
-        else:
-            continue
+    for ydata in context.finish():
         yield ydata
-
-    if is_handoff_case:
-        yield {
-            "event": "end_of_workflow",
-            "data": {
-                "workflow_id": workflow_id,
-                "messages": [
-                    convert_message_to_dict(msg)
-                    for msg in data["output"].get("messages", [])
-                ],
-            },
-        }
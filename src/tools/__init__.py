@@ -2,9 +2,13 @@
 from .crawl import crawl_tool
 from .document_tool import document_analysis_tool
 from .oracle_db import oracle_table_info_tool, oracle_query_tool, oracle_relationships_tool
+from .schema_catalog import oracle_schema_search_tool
+from .oracle_export import oracle_export_tool
+from .oracle_profile import oracle_profile_tool
+from .join_graph import oracle_join_path_tool
 from .python_repl import python_repl_tool
 from .bash_tool import bash_tool
-from .search import tavily_tool
+from .search import get_tavily_tool
 from .file_info_tool import task_files_json_tool
 
 __all__ = [
@@ -16,6 +20,17 @@ __all__ = [
     "oracle_table_info_tool",
     "oracle_query_tool",
     "oracle_relationships_tool",
+    "oracle_schema_search_tool",
+    "oracle_export_tool",
+    "oracle_profile_tool",
+    "oracle_join_path_tool",
     "document_analysis_tool",
     "task_files_json_tool",
 ]
+
+
+def __getattr__(name: str):
+    # tavily_tool is created on first access, see search.py
+    if name == "tavily_tool":
+        return get_tavily_tool()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
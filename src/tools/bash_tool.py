@@ -1,16 +1,16 @@
+import asyncio
 import logging
 import subprocess
 from typing import Annotated
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 from .decorators import log_io
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
 
-@tool
 @log_io
-def bash_tool(
+def run_bash(
     cmd: Annotated[str, "The bash command to be executed."],
 ):
     """Use this to execute bash command and do necessary operations."""
@@ -34,5 +34,37 @@ def bash_tool(
         return error_message
 
 
+@log_io
+async def arun_bash(
+    cmd: Annotated[str, "The bash command to be executed."],
+):
+    """Use this to execute bash command and do necessary operations."""
+    logger.info(f"Executing Bash Command: {cmd}")
+    try:
+        # Run the command without blocking the event loop
+        process = await asyncio.create_subprocess_shell(
+            cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        stdout = stdout.decode(errors="replace")
+        stderr = stderr.decode(errors="replace")
+        if process.returncode != 0:
+            error_message = f"Command failed with exit code {process.returncode}.\nStdout: {stdout}\nStderr: {stderr}"
+            logger.error(error_message)
+            return error_message
+        return stdout
+    except Exception as e:
+        error_message = f"Error executing command: {str(e)}"
+        logger.error(error_message)
+        return error_message
+
+
+bash_tool = StructuredTool.from_function(
+    func=run_bash,
+    coroutine=arun_bash,
+    name="bash_tool",
+)
+
+
 if __name__ == "__main__":
     print(bash_tool.invoke("ls -all"))
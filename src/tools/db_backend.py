@@ -0,0 +1,110 @@
+import logging
+from abc import ABC, abstractmethod
+from contextlib import AbstractContextManager
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.config.database import DB_BACKEND
+from src.utils.startup import LazySingleton
+
+logger = logging.getLogger(__name__)
+
+# list_tables 的行：(表名, 表注释)
+TableRow = Tuple[str, Optional[str]]
+# describe_table 的行：(字段名, 数据类型, 长度, 可空 Y/N, 默认值, 字段注释)
+ColumnRow = Tuple[str, str, Optional[int], str, Optional[str], Optional[str]]
+# relationships 的行：(约束名, 本表字段, 引用表, 引用字段, 本表字段注释, 引用字段注释)
+RelationshipRow = Tuple[str, str, str, str, Optional[str], Optional[str]]
+# indexes 的行：(索引名, 索引类型, UNIQUE/NONUNIQUE, 字段名, 位置, 字段注释)
+IndexRow = Tuple[str, str, str, str, int, Optional[str]]
+
+
+class DatabaseBackend(ABC):
+    """
+    db_analyst 数据库工具使用的后端接口
+
+    工具只负责参数处理与结果格式化，会话获取与数据字典查询由后端实现。
+    元数据方法接收游标，同一次工具调用中的多次查询共用一个会话。
+
+    只覆盖 oracle_db 中的表信息、查询、外键与索引工具；表结构检索、连接路径、
+    表画像与导出依赖 Oracle 数据字典与采样，直接使用 Oracle 会话池。
+    """
+
+    # 后端名称，用于日志与健康检查
+    name: str = ""
+    # guard_query 使用的行限制方言
+    dialect: str = ""
+
+    @abstractmethod
+    def session(self, call_timeout: Optional[int] = None) -> AbstractContextManager:
+        """获取一个数据库会话，退出上下文时归还或关闭"""
+
+    @abstractmethod
+    def list_tables(
+        self, cursor, schema_name: Optional[str], limit: int
+    ) -> List[TableRow]:
+        """按表名排序列出表，最多 limit 行"""
+
+    @abstractmethod
+    def describe_table(
+        self, cursor, table_name: str, schema_name: Optional[str]
+    ) -> List[ColumnRow]:
+        """按字段顺序返回表的字段定义与注释，表不存在时返回空列表"""
+
+    @abstractmethod
+    def table_comment(
+        self, cursor, table_name: str, schema_name: Optional[str]
+    ) -> Optional[str]:
+        """表注释"""
+
+    @abstractmethod
+    def column_comments(self, cursor, table_name: str) -> Dict[str, str]:
+        """表的全部字段注释，字段名到注释的映射"""
+
+    @abstractmethod
+    def relationships(
+        self, cursor, table_name: str, schema_name: Optional[str]
+    ) -> List[RelationshipRow]:
+        """表的外键，按约束名与字段位置排序"""
+
+    @abstractmethod
+    def indexes(
+        self, cursor, table_name: str, schema_name: Optional[str]
+    ) -> List[IndexRow]:
+        """表的索引字段，按索引名与字段位置排序"""
+
+    def execute(
+        self, cursor, sql: str, binds: Optional[Dict[str, Any]], max_rows: int
+    ) -> Tuple[List[str], Sequence[tuple]]:
+        """
+        执行查询并取回最多 max_rows 行
+
+        Returns:
+            结果列名与数据行
+        """
+        cursor.arraysize = max_rows
+        cursor.execute(sql, binds or {})
+        columns = [desc[0] for desc in cursor.description]
+        return columns, cursor.fetchmany(max_rows)
+
+
+def _create_backend() -> DatabaseBackend:
+    if DB_BACKEND == "oracle":
+        from .oracle_backend import OracleBackend
+
+        return OracleBackend()
+    if DB_BACKEND == "sqlite":
+        from src.config.database import SQLITE_BACKEND_CONFIG
+        from .sqlite_backend import SQLiteBackend
+
+        return SQLiteBackend(
+            SQLITE_BACKEND_CONFIG["path"], SQLITE_BACKEND_CONFIG["fixture"]
+        )
+    raise ValueError(f"不支持的数据库后端: {DB_BACKEND}，可选 oracle、sqlite")
+
+
+_db_backend = LazySingleton("db_backend", _create_backend)
+
+
+def get_db_backend() -> DatabaseBackend:
+    """获取进程级数据库后端（DB_BACKEND），首次调用时创建"""
+    return _db_backend.get()
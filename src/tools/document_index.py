@@ -0,0 +1,192 @@
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import closing
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Iterable, Optional
+
+from src.config.documents import DOCUMENT_INDEX_CONFIG
+from src.utils.startup import LazySingleton
+
+logger = logging.getLogger(__name__)
+
+# 解析状态
+PARSE_QUEUED = "queued"
+PARSE_PARSING = "parsing"
+PARSE_DONE = "done"
+PARSE_FAILED = "failed"
+
+
+@dataclass
+class DocumentRecord:
+    """索引中的一个文档"""
+
+    file_id: str
+    object_name: str
+    filename: str
+    file_size: int
+    content_type: str
+    content_hash: Optional[str] = None
+    parse_status: str = PARSE_QUEUED
+    uploaded_at: Optional[str] = None
+
+
+@dataclass
+class ParseJob:
+    """一个文档最近一次解析任务的状态"""
+
+    file_id: str
+    status: str = PARSE_QUEUED
+    attempts: int = 0
+    error: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
+class DocumentIndex(ABC):
+    """
+    文档元数据索引接口
+
+    按 file_id 直接定位存储桶中的对象，读取与删除不再需要按前缀列举对象。
+    索引只是存储桶的派生数据，可以随时由 DocumentParser.rebuild_index 从存储桶重建。
+    """
+
+    @abstractmethod
+    def get(self, file_id: str) -> Optional[DocumentRecord]:
+        """按 file_id 查找，不存在时返回 None"""
+
+    @abstractmethod
+    def put(self, record: DocumentRecord) -> None:
+        """新增或覆盖一条记录"""
+
+    @abstractmethod
+    def get_job(self, file_id: str) -> Optional[ParseJob]:
+        """按 file_id 查找解析任务，不存在时返回 None"""
+
+    @abstractmethod
+    def save_job(self, job: ParseJob) -> None:
+        """保存解析任务，内容相同、共用同一对象的文档共用任务状态，同时更新它们的解析状态"""
+
+    @abstractmethod
+    def delete(self, file_id: str) -> None:
+        """删除记录及其解析任务"""
+
+    @abstractmethod
+    def replace_all(self, records: Iterable[DocumentRecord]) -> int:
+        """用给定记录替换整个索引，返回记录数"""
+
+
+_INDEX_DDL = """
+CREATE TABLE IF NOT EXISTS documents (
+    file_id TEXT PRIMARY KEY,
+    object_name TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    content_type TEXT NOT NULL,
+    content_hash TEXT,
+    parse_status TEXT NOT NULL,
+    uploaded_at TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_documents_hash ON documents (content_hash);
+CREATE INDEX IF NOT EXISTS idx_documents_object ON documents (object_name);
+CREATE TABLE IF NOT EXISTS parse_jobs (
+    file_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    error TEXT,
+    updated_at TEXT
+);
+"""
+
+_COLUMNS = [field.name for field in fields(DocumentRecord)]
+_JOB_COLUMNS = [field.name for field in fields(ParseJob)]
+
+
+class SQLiteDocumentIndex(DocumentIndex):
+    """保存在本地 SQLite 文件中的文档索引"""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(_INDEX_DDL)
+
+    def _connect(self) -> "closing[sqlite3.Connection]":
+        return closing(sqlite3.connect(self.path))
+
+    def get(self, file_id: str) -> Optional[DocumentRecord]:
+        with self._connect() as db:
+            row = db.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM documents WHERE file_id = ?",
+                (file_id,),
+            ).fetchone()
+        return DocumentRecord(*row) if row else None
+
+    def put(self, record: DocumentRecord) -> None:
+        with self._lock, self._connect() as db, db:
+            db.execute(
+                f"INSERT OR REPLACE INTO documents ({', '.join(_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                tuple(asdict(record).values()),
+            )
+
+    def get_job(self, file_id: str) -> Optional[ParseJob]:
+        with self._connect() as db:
+            row = db.execute(
+                f"SELECT {', '.join(_JOB_COLUMNS)} FROM parse_jobs WHERE file_id = ?",
+                (file_id,),
+            ).fetchone()
+        return ParseJob(*row) if row else None
+
+    def save_job(self, job: ParseJob) -> None:
+        with self._lock, self._connect() as db, db:
+            db.execute(
+                f"INSERT OR REPLACE INTO parse_jobs ({', '.join(_JOB_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in _JOB_COLUMNS)})",
+                tuple(asdict(job).values()),
+            )
+            # 加入进行中任务的文档没有自己的任务，状态、尝试次数与失败原因按同一对象复制
+            db.execute(
+                f"INSERT OR REPLACE INTO parse_jobs ({', '.join(_JOB_COLUMNS)}) "
+                f"SELECT file_id, ?, ?, ?, ? FROM documents WHERE object_name = "
+                f"(SELECT object_name FROM documents WHERE file_id = ?)",
+                (job.status, job.attempts, job.error, job.updated_at, job.file_id),
+            )
+            db.execute(
+                "UPDATE documents SET parse_status = ? WHERE object_name = "
+                "(SELECT object_name FROM documents WHERE file_id = ?)",
+                (job.status, job.file_id),
+            )
+
+    def delete(self, file_id: str) -> None:
+        with self._lock, self._connect() as db, db:
+            db.execute("DELETE FROM documents WHERE file_id = ?", (file_id,))
+            db.execute("DELETE FROM parse_jobs WHERE file_id = ?", (file_id,))
+
+    def replace_all(self, records: Iterable[DocumentRecord]) -> int:
+        rows = [tuple(asdict(record).values()) for record in records]
+        with self._lock, self._connect() as db, db:
+            db.execute("DELETE FROM documents")
+            db.executemany(
+                f"INSERT OR REPLACE INTO documents ({', '.join(_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in _COLUMNS)})",
+                rows,
+            )
+        return len(rows)
+
+
+def _create_index() -> DocumentIndex:
+    backend = DOCUMENT_INDEX_CONFIG["backend"]
+    if backend == "sqlite":
+        return SQLiteDocumentIndex(DOCUMENT_INDEX_CONFIG["path"])
+    raise ValueError(f"不支持的文档索引实现: {backend}")
+
+
+_document_index = LazySingleton("document_index", _create_index)
+
+
+def get_document_index() -> DocumentIndex:
+    """获取进程级文档索引，首次调用时创建"""
+    return _document_index.get()
@@ -0,0 +1,308 @@
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.config.documents import DOCUMENT_PARSE_CONFIG
+from src.utils.startup import LazySingleton
+from .document_index import (
+    PARSE_DONE,
+    PARSE_FAILED,
+    PARSE_PARSING,
+    DocumentRecord,
+    ParseJob,
+)
+from .document_parser import (
+    build_document_info,
+    expand_page_ranges,
+    extract_pdf_page_range,
+    join_pages,
+    parse_document_bytes,
+    read_pdf_layout,
+)
+
+if TYPE_CHECKING:
+    from .document_parser import DocumentParser
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentNotReady(ValueError):
+    """等待解析结果超时，文档仍在解析中"""
+
+
+def _create_parse_pool() -> ProcessPoolExecutor:
+    # 服务进程中已有 Oracle 执行器等线程，fork 出的子进程可能继承被占用的锁，使用 spawn
+    return ProcessPoolExecutor(
+        max_workers=DOCUMENT_PARSE_CONFIG["workers"],
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+_parse_pool = LazySingleton("document_parse_pool", _create_parse_pool)
+_pool_lock = threading.Lock()
+
+
+def _map_in_pool(
+    func: Callable, calls: List[tuple], timeout: Optional[float] = None
+) -> List[Any]:
+    """
+    把多次调用提交到解析进程池并按顺序返回结果，所有调用共用一个超时
+
+    Raises:
+        ValueError: 内容无法解析或解析超时，超时后进程池已丢弃，下次调用时重建
+        BrokenProcessPool: 解析进程异常退出，进程池已丢弃，下次调用时重建
+    """
+    pool = _parse_pool.get()
+    futures = [pool.submit(func, *args) for args in calls]
+    deadline = time.monotonic() + (timeout or DOCUMENT_PARSE_CONFIG["parse_timeout"])
+    try:
+        return [
+            future.result(max(deadline - time.monotonic(), 0)) for future in futures
+        ]
+    except TimeoutError:
+        # 正在执行的任务无法取消，丢弃进程池，之后的解析不必排在超时的任务后面
+        _discard_pool(pool)
+        raise ValueError("文档解析超时")
+    except BrokenProcessPool:
+        # 例如超大文件耗尽内存，进程池中的其他任务也随之失败
+        _discard_pool(pool)
+        raise
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """丢弃仍是当前进程池的 pool，下次调用时重建"""
+    with _pool_lock:
+        if _parse_pool.initialized and _parse_pool.get() is pool:
+            _parse_pool.reset()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+
+@contextmanager
+def _spooled(file_content: bytes, suffix: str) -> Iterator[str]:
+    """把文件内容写入临时文件，解析进程按路径读取，不必把整个文件传给每个任务"""
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as spool:
+        spool.write(file_content)
+    try:
+        yield spool.name
+    finally:
+        os.unlink(spool.name)
+
+
+def _page_batches(page_numbers: List[int], batch_size: int) -> List[Tuple[int, int]]:
+    """把页码（从 1 开始）按连续段切分为每批不超过 batch_size 页的 [起始, 结束) 区间（从 0 开始）"""
+    batches: List[Tuple[int, int]] = []
+    for number in page_numbers:
+        if (
+            batches
+            and batches[-1][1] == number - 1
+            and batches[-1][1] - batches[-1][0] < batch_size
+        ):
+            batches[-1] = (batches[-1][0], number)
+        else:
+            batches.append((number - 1, number))
+    return batches
+
+
+def extract_pdf_in_pool(
+    file_content: bytes,
+    ranges: Optional[List[Tuple[int, int]]] = None,
+    timeout: Optional[float] = None,
+) -> Tuple[int, Dict[str, str], Dict[int, str]]:
+    """
+    按页分批在解析进程池中并行提取PDF文本
+
+    先读取页数与文档属性，再把所需页按 pdf_pages_per_task 分批提交到进程池。
+
+    Args:
+        file_content: PDF文件内容
+        ranges: 只提取这些页（parse_page_ranges 的结果），None 表示全部页
+
+    Returns:
+        总页数、文档属性与 {页码(从 1 开始): 文本}
+    """
+    with _spooled(file_content, ".pdf") as path:
+        page_count, metadata = _map_in_pool(read_pdf_layout, [(path,)], timeout)[0]
+        if ranges is None:
+            page_numbers = list(range(1, page_count + 1))
+        else:
+            page_numbers = expand_page_ranges(ranges, page_count)
+        batches = _page_batches(
+            page_numbers, DOCUMENT_PARSE_CONFIG["pdf_pages_per_task"]
+        )
+        results = _map_in_pool(
+            extract_pdf_page_range,
+            [(path, start, end) for start, end in batches],
+            timeout,
+        )
+
+    texts = {}
+    for (start, _), batch_texts in zip(batches, results):
+        for offset, text in enumerate(batch_texts):
+            texts[start + offset + 1] = text
+    return page_count, metadata, texts
+
+
+def parse_in_pool(
+    file_content: bytes, filename: str, timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    在解析进程池中解析文档，PyPDF2 与 python-docx 的 CPU 开销不再占用调用方进程的 GIL
+
+    PDF 按页分批并行提取，其他格式整体在一个解析进程中解析。
+
+    Raises:
+        ValueError: 内容无法解析或解析超时
+        BrokenProcessPool: 解析进程异常退出，进程池已丢弃，下次调用时重建
+    """
+    if Path(filename).suffix.lower() != ".pdf":
+        return _map_in_pool(parse_document_bytes, [(file_content, filename)], timeout)[
+            0
+        ]
+
+    page_count, metadata, texts = extract_pdf_in_pool(file_content, timeout=timeout)
+    content, pages = join_pages([texts[number] for number in range(1, page_count + 1)])
+    return build_document_info(filename, content, pages, metadata)
+
+
+def close_document_parse_pool() -> None:
+    """关闭解析进程池，服务退出时调用"""
+    with _pool_lock:
+        if _parse_pool.initialized:
+            _parse_pool.get().shutdown(wait=False, cancel_futures=True)
+            _parse_pool.reset()
+
+
+class DocumentJobQueue:
+    """
+    文档解析任务队列
+
+    每个任务读取原始文件、在进程池中解析、写入解析结果旁路文件，状态与重试次数
+    记录在文档索引的解析任务表中（queued/parsing/done/failed）。同一原始文件同时只有
+    一个任务，内容相同的文档重复提交返回进行中的任务，解析状态随任务一起更新。读取 MinIO 或进程池异常等暂时性错误按
+    retry_delay 递增间隔重试，内容无法解析或解析超时直接标记为失败。
+    """
+
+    def __init__(
+        self,
+        parser: "DocumentParser",
+        workers: int = DOCUMENT_PARSE_CONFIG["workers"],
+        max_retries: int = DOCUMENT_PARSE_CONFIG["max_retries"],
+        retry_delay: float = DOCUMENT_PARSE_CONFIG["retry_delay"],
+        wait_timeout: float = DOCUMENT_PARSE_CONFIG["wait_timeout"],
+    ):
+        self._parser = parser
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.wait_timeout = wait_timeout
+        # 任务线程只做 I/O 并等待进程池，数量与解析进程数一致
+        self._threads = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="document-parse"
+        )
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, record: DocumentRecord) -> Future:
+        """
+        提交解析任务，返回的 Future 结果为解析结果（包含全文）
+
+        内容相同的文档共用任务，结果中的文件信息属于提交任务的文档，调用方按自己的记录覆盖。
+        """
+        key = record.object_name
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return future
+            future = self._threads.submit(self._run, record)
+            self._inflight[key] = future
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def wait(
+        self, record: DocumentRecord, timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        提交（或加入进行中的）解析任务并等待结果
+
+        Raises:
+            DocumentNotReady: 超过等待时间仍未解析完成，任务继续在后台执行
+            ValueError: 解析失败
+        """
+        try:
+            return self.submit(record).result(timeout or self.wait_timeout)
+        except TimeoutError:
+            raise DocumentNotReady(
+                f"文档仍在解析中，请稍后通过状态接口查询: {record.file_id}"
+            )
+
+    def _forget(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def _save(self, job: ParseJob, status: str, error: Optional[str] = None) -> None:
+        job.status = status
+        job.error = error
+        job.updated_at = datetime.now().isoformat()
+        self._parser.index.save_job(job)
+
+    def _attempt(self, record: DocumentRecord) -> Dict[str, Any]:
+        content = self._parser.read_original(record)
+        document_info = parse_in_pool(content, record.filename)
+        return self._parser.store_parsed(record, document_info)
+
+    def _run(self, record: DocumentRecord) -> Dict[str, Any]:
+        job = ParseJob(file_id=record.file_id)
+        for attempt in range(1, self.max_retries + 2):
+            job.attempts = attempt
+            self._save(job, PARSE_PARSING)
+            try:
+                document_info = self._attempt(record)
+            except ValueError as e:
+                self._save(job, PARSE_FAILED, str(e))
+                logger.error(f"文档解析失败 {record.object_name}: {e}")
+                raise
+            except Exception as e:
+                if attempt > self.max_retries:
+                    self._save(job, PARSE_FAILED, str(e))
+                    logger.error(
+                        f"文档解析失败 {record.object_name}，已重试 {self.max_retries} 次: {e}"
+                    )
+                    raise ValueError(f"文档解析失败: {str(e)}")
+                logger.warning(
+                    f"文档解析第 {attempt} 次失败，稍后重试 {record.object_name}: {e}"
+                )
+                time.sleep(self.retry_delay * attempt)
+                continue
+
+            self._save(job, PARSE_DONE)
+            logger.info(f"文档解析完成: {record.object_name}")
+            return document_info
+
+    def extract_pages(
+        self, record: DocumentRecord, ranges: List[Tuple[int, int]]
+    ) -> Tuple[int, Dict[int, str]]:
+        """
+        直接从原始PDF提取指定页，不等待也不影响整个文档的解析任务
+
+        Returns:
+            总页数与 {页码: 文本}
+        """
+        page_count, _, texts = extract_pdf_in_pool(
+            self._parser.read_original(record), ranges
+        )
+        return page_count, texts
+
+    def shutdown(self) -> None:
+        self._threads.shutdown(wait=False, cancel_futures=True)
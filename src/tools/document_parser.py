@@ -1,33 +1,202 @@
+import hashlib
 import io
+import json
+import re
+import shutil
+import tempfile
+import threading
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional
+from typing import BinaryIO, Dict, Any, List, Optional, Tuple
 from pathlib import Path
 import logging
 import traceback
 
 import PyPDF2
 from docx import Document
+from minio.commonconfig import CopySource
 from minio.error import S3Error
 
 # 导入日志配置
 from src.utils.logger_config import setup_logging
+from src.config.documents import DOCUMENT_PARSE_CONFIG, DOCUMENT_UPLOAD_CONFIG
 from src.config.minio import get_minio_client, MINIO_BUCKET_NAME, ensure_bucket_exists
+from src.utils.startup import LazySingleton
+from .document_index import (
+    PARSE_DONE,
+    PARSE_FAILED,
+    PARSE_QUEUED,
+    DocumentRecord,
+    get_document_index,
+)
 
 # 配置日志记录
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
+# 解析结果的格式版本，解析逻辑或旁路文件格式变化时递增，旧版本的旁路文件在读取时重建
+# 2: meta.json 增加每页在 content.txt 中的字节偏移 page_byte_offsets
+PARSER_VERSION = 2
+
+# 解析结果旁路文件：parsed/{key}/meta.json 保存文件信息、统计与分页偏移，
+# parsed/{key}/content.txt 保存全文。key 为内容哈希，内容相同的文件共用一份解析结果；
+# 按内容存储之前上传的文件 key 为 file_id
+SIDECAR_PREFIX = "parsed/"
+
+# 按内容存储的原始文件：blobs/{sha256}，内容相同的多个 file_id 共用一个对象
+BLOB_PREFIX = "blobs/"
+
+# 每个 file_id 的文件记录：files/{file_id}.json，保存文件名、对象名与上传时间，用于重建索引
+FILE_RECORD_PREFIX = "files/"
+
+# 共用原始文件的引用：refs/{sha256}/{file_id}，空对象。按前缀列举即可得到所有实例上传的引用，
+# 各实例的本地索引不必共享
+REFERENCE_PREFIX = "refs/"
+
+# 删除共用原始文件时的服务端副本：deleting/{sha256}/{file_id}。删除后若发现其他实例新登记的引用，
+# 由副本恢复原始文件，确认没有引用后删除副本
+DELETING_PREFIX = "deleting/"
+
+# 按内容存储之前的原始文件对象名：{file_id}_{filename}
+_ORIGINAL_OBJECT = re.compile(r"^([0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})_(.+)$")
+
+# 对象用户元数据中的内容哈希，重建索引时读取
+HASH_METADATA_KEY = "content-sha256"
+
+
+class DocumentTooLarge(ValueError):
+    """上传的文件超过大小上限"""
+
+
+class _HashingReader:
+    """读取时计算 SHA-256 与累计大小，超过大小上限时中止读取"""
+    
+    def __init__(self, stream: BinaryIO, max_size: Optional[int] = None):
+        self._stream = stream
+        self._hash = hashlib.sha256()
+        self.max_size = max_size
+        self.size = 0
+    
+    def read(self, size: int = -1) -> bytes:
+        data = self._stream.read(size)
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            raise DocumentTooLarge(f"文件超过大小上限 {self.max_size // (1024 * 1024)}MB")
+        self._hash.update(data)
+        return data
+    
+    def hexdigest(self) -> str:
+        return self._hash.hexdigest()
+
+
+def compute_content_statistics(content: str, page_count: int) -> Dict[str, int]:
+    """文档内容统计，上传时计算一次并写入旁路文件"""
+    return {
+        "content_length": len(content),
+        "word_count": len(content.split()) if content else 0,
+        "line_count": len(content.split('\n')) if content else 0,
+        "paragraph_count": len([p for p in content.split('\n\n') if p.strip()]) if content else 0,
+        "page_count": page_count,
+    }
+
+
+def join_pages(pages: List[str]) -> Tuple[str, List[List[int]]]:
+    """
+    按原有格式拼接各页文本（每页后加换行，整体去掉首尾空白）
+    
+    Returns:
+        全文与每页在全文中的 [起始, 结束) 字符偏移
+    """
+    text = "".join(page + "\n" for page in pages)
+    lead = len(text) - len(text.lstrip())
+    content = text.strip()
+    offsets = []
+    position = 0
+    for page in pages:
+        start = min(max(position - lead, 0), len(content))
+        end = min(max(position + len(page) - lead, 0), len(content))
+        offsets.append([start, end])
+        position += len(page) + 1
+    return content, offsets
+
+
+def page_byte_offsets(content: str, pages: List[List[int]]) -> List[List[int]]:
+    """把每页的字符偏移换算为 UTF-8 编码后 content.txt 中的 [起始, 结束) 字节偏移"""
+    offsets = []
+    char_position = byte_position = 0
+    for start, end in pages:
+        byte_start = byte_position + len(content[char_position:start].encode("utf-8"))
+        byte_end = byte_start + len(content[start:end].encode("utf-8"))
+        offsets.append([byte_start, byte_end])
+        char_position, byte_position = end, byte_end
+    return offsets
+
+
+_PAGE_RANGE = re.compile(r"^\s*(\d+)\s*(?:-\s*(\d+)\s*)?$")
+
+
+def parse_page_ranges(spec: str) -> List[Tuple[int, int]]:
+    """
+    解析页码范围，例如 "3"、"3-5"、"1,4-6"，页码从 1 开始，范围包含两端
+    
+    Raises:
+        ValueError: 格式错误
+    """
+    ranges = []
+    for part in spec.split(","):
+        match = _PAGE_RANGE.match(part)
+        if match is None:
+            raise ValueError(f"页码范围格式错误: {spec}，应为 3、3-5 或 1,4-6")
+        start = int(match.group(1))
+        end = int(match.group(2) or start)
+        if start < 1 or end < start:
+            raise ValueError(f"页码范围无效: {part.strip()}")
+        ranges.append((start, end))
+    return ranges
+
+
+def expand_page_ranges(ranges: List[Tuple[int, int]], page_count: int) -> List[int]:
+    """展开页码范围并截取到实际页数，返回升序、去重的页码"""
+    pages = set()
+    for start, end in ranges:
+        pages.update(range(start, min(end, page_count) + 1))
+    return sorted(pages)
+
+
+def build_document_info(
+    filename: str, content: str, pages: List[List[int]], metadata: Dict[str, Any]
+) -> Dict[str, Any]:
+    """由全文、每页字符偏移与文档属性生成解析结果"""
+    return {
+        "filename": filename,
+        "file_type": Path(filename).suffix.lower(),
+        "content": content,
+        "content_length": len(content),
+        "statistics": compute_content_statistics(content, len(pages)),
+        "pages": pages,
+        "metadata": metadata,
+        "parser_version": PARSER_VERSION,
+        "parsed_at": datetime.now().isoformat()
+    }
+
 
 class DocumentParser:
     """文档解析器类"""
     
     def __init__(self):
+        # 解析任务模块依赖本模块的 parse_document_bytes，在此处导入避免循环导入
+        from .document_jobs import DocumentJobQueue
+        
         self.minio_client = get_minio_client()
+        self.index = get_document_index()
+        self.jobs = DocumentJobQueue(self)
+        # 本实例内上传时登记引用与删除最后一个引用互斥
+        self._blob_lock = threading.Lock()
         ensure_bucket_exists()
     
-    def extract_pdf_content(self, file_content: bytes) -> str:
-        """提取PDF文档内容"""
+    @staticmethod
+    def extract_pdf_pages(file_content: bytes) -> Tuple[List[str], Dict[str, Any]]:
+        """逐页提取PDF文本，同时返回文档属性"""
         try:
             logger.debug(f"开始解析PDF，文件大小: {len(file_content)} 字节")
             pdf_file = io.BytesIO(file_content)
@@ -36,48 +205,67 @@ class DocumentParser:
             page_count = len(pdf_reader.pages)
             logger.debug(f"PDF总页数: {page_count}")
             
-            text = ""
+            pages = []
             for i, page in enumerate(pdf_reader.pages):
-                logger.debug(f"正在解析第 {i+1} 页")
                 page_text = page.extract_text()
-                text += page_text + "\n"
+                pages.append(page_text)
                 logger.debug(f"第 {i+1} 页提取了 {len(page_text)} 个字符")
             
-            result = text.strip()
-            logger.debug(f"PDF解析完成，总共提取了 {len(result)} 个字符")
-            return result
+            metadata = {
+                key.lstrip('/'): str(value)
+                for key, value in (pdf_reader.metadata or {}).items()
+            }
+            return pages, metadata
         except Exception as e:
             logger.error(f"PDF解析错误: {str(e)}")
             logger.error(f"详细错误信息: {traceback.format_exc()}")
             raise ValueError(f"PDF解析错误: {str(e)}")
     
-    def extract_docx_content(self, file_content: bytes) -> str:
-        """提取Word文档内容"""
+    def extract_pdf_content(self, file_content: bytes) -> str:
+        """提取PDF文档内容"""
+        pages, _ = self.extract_pdf_pages(file_content)
+        result, _ = join_pages(pages)
+        logger.debug(f"PDF解析完成，总共提取了 {len(result)} 个字符")
+        return result
+    
+    @staticmethod
+    def extract_docx_paragraphs(file_content: bytes) -> Tuple[List[str], Dict[str, Any]]:
+        """提取Word文档各段落文本，同时返回文档属性"""
         try:
             logger.debug(f"开始解析Word文档，文件大小: {len(file_content)} 字节")
             docx_file = io.BytesIO(file_content)
             doc = Document(docx_file)
             
-            paragraph_count = len(doc.paragraphs)
-            logger.debug(f"Word文档段落数量: {paragraph_count}")
+            paragraphs = [paragraph.text for paragraph in doc.paragraphs]
+            logger.debug(f"Word文档段落数量: {len(paragraphs)}")
             
-            text = ""
-            for i, paragraph in enumerate(doc.paragraphs):
-                logger.debug(f"正在解析第 {i+1} 个段落")
-                paragraph_text = paragraph.text
-                text += paragraph_text + "\n"
-                logger.debug(f"第 {i+1} 个段落提取了 {len(paragraph_text)} 个字符")
-            
-            result = text.strip()
-            logger.debug(f"Word文档解析完成，总共提取了 {len(result)} 个字符")
-            return result
+            properties = doc.core_properties
+            metadata = {
+                name: str(value)
+                for name in ("title", "author", "subject", "keywords", "created", "modified", "last_modified_by")
+                if (value := getattr(properties, name, None))
+            }
+            return paragraphs, metadata
         except Exception as e:
             logger.error(f"Word文档解析错误: {str(e)}")
             logger.error(f"详细错误信息: {traceback.format_exc()}")
             raise ValueError(f"Word文档解析错误: {str(e)}")
     
-    def parse_document(self, file_content: bytes, filename: str) -> Dict[str, Any]:
-        """解析文档并提取内容"""
+    def extract_docx_content(self, file_content: bytes) -> str:
+        """提取Word文档内容"""
+        paragraphs, _ = self.extract_docx_paragraphs(file_content)
+        result = "".join(paragraph + "\n" for paragraph in paragraphs).strip()
+        logger.debug(f"Word文档解析完成，总共提取了 {len(result)} 个字符")
+        return result
+    
+    @staticmethod
+    def parse_document(file_content: bytes, filename: str) -> Dict[str, Any]:
+        """
+        解析文档并提取内容
+        
+        除全文外还返回统计信息、文档属性，PDF 另有每页在全文中的字符偏移
+        （pages），Word 文档整体视为一页。只依赖文件内容，可在解析进程中执行。
+        """
         logger.debug(f"开始解析文档: {filename}")
         file_ext = Path(filename).suffix.lower()
         logger.debug(f"检测到文件类型: {file_ext}")
@@ -85,156 +273,616 @@ class DocumentParser:
         try:
             if file_ext == '.pdf':
                 logger.debug("使用PDF解析器")
-                content = self.extract_pdf_content(file_content)
+                page_texts, metadata = DocumentParser.extract_pdf_pages(file_content)
+                content, pages = join_pages(page_texts)
             elif file_ext in ['.docx', '.doc']:
                 logger.debug("使用Word文档解析器")
-                content = self.extract_docx_content(file_content)
+                paragraphs, metadata = DocumentParser.extract_docx_paragraphs(file_content)
+                content = "".join(paragraph + "\n" for paragraph in paragraphs).strip()
+                pages = [[0, len(content)]]
             else:
                 logger.error(f"不支持的文件类型: {file_ext}")
                 raise ValueError(f"不支持的文件类型: {file_ext}")
             
             logger.debug(f"解析完成，提取内容长度: {len(content)}")
-            
-            return {
-                "filename": filename,
-                "file_type": file_ext,
-                "content": content,
-                "content_length": len(content),
-                "parsed_at": datetime.now().isoformat()
-            }
+            return build_document_info(filename, content, pages, metadata)
         except Exception as e:
             logger.error(f"文档解析失败: {str(e)}")
             logger.error(f"详细错误信息: {traceback.format_exc()}")
             raise
     
-    def upload_file(self, file_content: bytes, filename: str) -> Dict[str, Any]:
-        """上传文件到MinIO并解析"""
+    def upload_stream(self, stream: BinaryIO, filename: str, max_size: Optional[int] = None) -> DocumentRecord:
+        """
+        按内容存储上传文件，不在内存中保留整个文件
+        
+        先在本地读取一遍计算内容哈希并检查大小上限，存储桶中已有相同内容时不再上传，
+        新的 file_id 与已有文件共用原始文件与解析结果；否则按分段流式上传到 blobs/{sha256}。
+        相同内容已有当前版本的解析结果时记为 done，否则记为待解析（queued），由调用方安排解析。
+        
+        Args:
+            stream: 文件流，按分段大小读取，不可回退的流先暂存到临时文件
+            filename: 原始文件名
+            max_size: 文件大小上限(字节)，超出时中止上传
+        
+        Raises:
+            DocumentTooLarge: 文件超过大小上限
+        """
+        reader = _HashingReader(stream, max_size)
+        if not stream.seekable():
+            # 暂存时即计算哈希并检查大小上限，超大的文件不会被完整写入临时文件
+            spool = tempfile.SpooledTemporaryFile(max_size=DOCUMENT_UPLOAD_CONFIG["part_size"])
+            shutil.copyfileobj(reader, spool, DOCUMENT_UPLOAD_CONFIG["part_size"])
+            spool.seek(0)
+            stream = spool
+            start = 0
+        else:
+            start = stream.tell()
+            while reader.read(DOCUMENT_UPLOAD_CONFIG["part_size"]):
+                pass
+        content_hash = reader.hexdigest()
+        object_name = f"{BLOB_PREFIX}{content_hash}"
+        
+        record = DocumentRecord(
+            file_id=str(uuid.uuid4()),
+            object_name=object_name,
+            filename=filename,
+            file_size=reader.size,
+            content_type=self._get_content_type(filename),
+            content_hash=content_hash,
+            parse_status=PARSE_QUEUED,
+            uploaded_at=datetime.now().isoformat(),
+        )
+        
         try:
-            # 生成唯一的文件ID
-            file_id = str(uuid.uuid4())
-            object_name = f"{file_id}_{filename}"
-            
-            # 上传到MinIO
-            file_stream = io.BytesIO(file_content)
-            self.minio_client.put_object(
-                MINIO_BUCKET_NAME,
-                object_name,
-                file_stream,
-                length=len(file_content),
-                content_type=self._get_content_type(filename)
+            with self._blob_lock:
+                # 先登记引用再检查对象是否存在，同时删除最后一个引用的一方会看到本次引用而保留对象
+                self._put_bytes(self._reference_name(record), b"", "application/octet-stream")
+                shared = self._object_exists(object_name)
+            if shared:
+                # 只复用已完整写入的对象，相同内容的其他上传尚未完成时各自上传同名对象
+                self._apply_sidecar_state(record)
+                logger.info(f"存储桶中已有相同内容，复用 {object_name}: {filename}")
+            else:
+                stream.seek(start)
+                # MinIO 按 part_size 分段上传，失败时中止分段上传
+                self.minio_client.put_object(
+                    MINIO_BUCKET_NAME,
+                    object_name,
+                    stream,
+                    length=reader.size,
+                    part_size=DOCUMENT_UPLOAD_CONFIG["part_size"],
+                    content_type=record.content_type,
+                    metadata={HASH_METADATA_KEY: content_hash},
+                )
+                logger.info(f"文件已上传: {object_name} ({reader.size} 字节)")
+            self._put_bytes(
+                self._file_record_name(record.file_id),
+                json.dumps(self._file_record_fields(record), ensure_ascii=False).encode("utf-8"),
+                "application/json",
             )
-            
-            # 解析文档内容
-            document_info = self.parse_document(file_content, filename)
-            document_info.update({
-                "file_id": file_id,
-                "object_name": object_name,
-                "file_size": len(file_content),
-                "uploaded_at": datetime.now().isoformat()
-            })
-            
-            return document_info
-            
+        except S3Error as e:
+            self._discard_upload(record)
+            raise ValueError(f"文件上传失败: {str(e)}")
+        
+        self.index.put(record)
+        return record
+    
+    def _discard_upload(self, record: DocumentRecord) -> None:
+        """上传失败时删除已写入的文件记录与引用，清理失败不影响抛出原始错误"""
+        try:
+            self.minio_client.remove_object(MINIO_BUCKET_NAME, self._file_record_name(record.file_id))
+            self._release_blob(record)
+        except S3Error as e:
+            logger.warning(f"清理上传失败的文件 {record.file_id} 时出错: {str(e)}")
+    
+    def upload_file(self, file_content: bytes, filename: str) -> Dict[str, Any]:
+        """上传文件到MinIO并等待解析完成，返回文件信息（包含全文）"""
+        try:
+            record = self.upload_stream(io.BytesIO(file_content), filename)
+            if record.parse_status == PARSE_DONE:
+                return self.get_file_info(record.file_id)
+            return self.parse_file(record.file_id)
+        except ValueError:
+            raise
         except S3Error as e:
             raise ValueError(f"文件上传失败: {str(e)}")
         except Exception as e:
             raise ValueError(f"文档处理失败: {str(e)}")
     
-    def get_file_info(self, file_id: str) -> Optional[Dict[str, Any]]:
-        """根据文件ID获取文件信息"""
+    def parse_file(self, file_id: str, force: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        在解析任务队列中解析文件并等待结果，结果写入旁路文件
+        
+        Args:
+            file_id: 文件ID
+            force: 忽略最近一次解析失败的记录，立即重新解析
+        
+        Returns:
+            文件信息（包含全文），原始文件不存在时返回 None
+        
+        Raises:
+            DocumentNotReady: 超过等待时间仍未解析完成
+            ValueError: 解析失败，或最近一次解析失败且未到重新解析的时间
+        """
+        record = self.find_document(file_id)
+        if record is None:
+            return None
+        if not force:
+            self._raise_if_recently_failed(record)
+        document_info = self.jobs.wait(record)
+        # 内容相同的文件共用解析任务，文件信息以本文件的记录为准
+        return {**document_info, **self._file_record_fields(record)}
+    
+    def _raise_if_recently_failed(self, record: DocumentRecord) -> None:
+        """最近一次解析失败且未超过 failed_retry_after 时返回记录的失败原因，避免每次读取都重新解析"""
+        job = self.index.get_job(record.file_id)
+        if job is None or job.status != PARSE_FAILED or job.updated_at is None:
+            return
+        retry_after = timedelta(seconds=DOCUMENT_PARSE_CONFIG["failed_retry_after"])
+        if datetime.now() - datetime.fromisoformat(job.updated_at) < retry_after:
+            raise ValueError(job.error or "文档解析失败")
+    
+    def store_parsed(self, record: DocumentRecord, document_info: Dict[str, Any]) -> Dict[str, Any]:
+        """把解析结果与索引中的文件信息合并后写入旁路文件"""
+        document_info.update(self._file_record_fields(record))
+        self._write_sidecar(self._sidecar_key(record), document_info)
+        return document_info
+    
+    def _file_record_fields(self, record: DocumentRecord) -> Dict[str, Any]:
+        """文件记录中属于单个 file_id 的字段，共用的解析结果读取后以此覆盖"""
+        return {
+            "file_id": record.file_id,
+            "object_name": record.object_name,
+            "filename": record.filename,
+            "file_type": Path(record.filename).suffix.lower(),
+            "file_size": record.file_size,
+            "content_type": record.content_type,
+            "content_hash": record.content_hash,
+            "uploaded_at": record.uploaded_at,
+        }
+    
+    def _sidecar_key(self, record: DocumentRecord) -> str:
+        """解析结果旁路文件的键：按内容存储的文件为内容哈希，之前上传的文件为 file_id"""
+        if record.object_name.startswith(BLOB_PREFIX):
+            return record.object_name[len(BLOB_PREFIX):]
+        return record.file_id
+    
+    def find_parsed(self, content_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        按内容哈希查找已上传文件的解析结果，用于复用相同内容的解析
+        
+        Returns:
+            解析结果（包含全文），没有当前版本的解析结果时返回 None
+        """
+        meta = self._read_sidecar_meta(content_hash)
+        if meta is None or meta.get("parser_version") != PARSER_VERSION:
+            return None
+        meta["content"] = self._read_content(content_hash)
+        return meta
+    
+    def read_original(self, record: DocumentRecord) -> bytes:
+        """读取原始文件内容"""
+        return self._get_object_bytes(record.object_name)
+    
+    def open_original(self, record: DocumentRecord, offset: int = 0, length: int = 0):
+        """
+        打开原始文件的读取流，用于分块转发
+        
+        Args:
+            offset: 起始字节
+            length: 读取的字节数，0 表示读到文件末尾
+        
+        Returns:
+            MinIO 响应对象，调用方读取后负责 close() 与 release_conn()
+        """
+        return self.minio_client.get_object(MINIO_BUCKET_NAME, record.object_name, offset=offset, length=length)
+    
+    def original_etag(self, record: DocumentRecord) -> str:
+        """原始文件的实体标签：内容哈希，没有记录哈希的旧文件使用 MinIO 的 ETag"""
+        if record.content_hash:
+            return record.content_hash
+        return self.minio_client.stat_object(MINIO_BUCKET_NAME, record.object_name).etag
+    
+    def presigned_download_url(self, record: DocumentRecord, expires: int, content_disposition: str) -> str:
+        """
+        生成原始文件的预签名下载地址
+        
+        Args:
+            expires: 有效期(秒)
+            content_disposition: 由 MinIO 在响应中返回的 Content-Disposition，保留原始文件名
+        """
+        return self.minio_client.presigned_get_object(
+            MINIO_BUCKET_NAME,
+            record.object_name,
+            expires=timedelta(seconds=expires),
+            response_headers={
+                "response-content-type": record.content_type,
+                "response-content-disposition": content_disposition,
+            },
+        )
+    
+    def get_file_info(self, file_id: str, include_content: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        根据文件ID获取文件信息
+        
+        从解析结果旁路文件读取，不再下载和解析原始文件。旁路文件不存在或
+        解析器版本已变化时，重新解析原始文件并重建旁路文件；最近一次解析失败时
+        直接返回记录的失败原因，超过 failed_retry_after 后才重新解析。
+        
+        Args:
+            file_id: 文件ID
+            include_content: 是否读取全文，只需要文件信息与统计时传 False
+        
+        Returns:
+            文件信息，文件不存在时返回 None
+        """
         logger.info(f"开始获取文件信息，文件ID: {file_id}")
         
         try:
-            # 检查MinIO连接
-            logger.debug(f"检查MinIO连接，存储桶: {MINIO_BUCKET_NAME}")
-            
-            # 查找以file_id开头的对象
-            logger.debug(f"在存储桶中搜索文件，前缀: {file_id}")
-            objects = self.minio_client.list_objects(MINIO_BUCKET_NAME, prefix=file_id)
-            
-            objects_list = list(objects)
-            logger.debug(f"找到 {len(objects_list)} 个匹配的对象")
+            record = self.find_document(file_id)
+            if record is None:
+                logger.warning(f"未找到匹配的文件，文件ID: {file_id}")
+                return None
             
-            for obj in objects_list:
-                logger.debug(f"检查对象: {obj.object_name}")
-                if obj.object_name.startswith(file_id):
-                    logger.info(f"找到匹配的文件: {obj.object_name}")
-                    
-                    try:
-                        # 获取文件内容
-                        logger.debug("开始下载文件内容")
-                        response = self.minio_client.get_object(MINIO_BUCKET_NAME, obj.object_name)
-                        file_content = response.read()
-                        response.close()
-                        logger.debug(f"下载完成，文件大小: {len(file_content)} 字节")
-                        
-                        # 解析原始文件名
-                        original_filename = obj.object_name[len(file_id) + 1:]  # 去掉file_id和下划线
-                        logger.debug(f"解析得到原始文件名: {original_filename}")
-                        
-                        # 解析文档内容
-                        logger.debug("开始解析文档内容")
-                        document_info = self.parse_document(file_content, original_filename)
-                        
-                        document_info.update({
-                            "file_id": file_id,
-                            "object_name": obj.object_name,
-                            "file_size": obj.size,
-                            "last_modified": obj.last_modified.isoformat() if obj.last_modified else None
-                        })
-                        
-                        logger.info(f"文档解析成功，内容长度: {len(document_info.get('content', ''))}")
-                        return document_info
-                        
-                    except Exception as content_error:
-                        logger.error(f"处理文件内容时发生错误: {str(content_error)}")
-                        logger.error(f"详细错误信息: {traceback.format_exc()}")
-                        raise ValueError(f"处理文件内容失败: {str(content_error)}")
+            key = self._sidecar_key(record)
+            document_info = self._read_sidecar_meta(key)
+            if document_info is None or document_info.get("parser_version") != PARSER_VERSION:
+                logger.info(f"旁路文件不存在或已过期，重新解析: {file_id}")
+                document_info = self.parse_file(file_id)
+                if document_info is None:
+                    return None
+                if not include_content:
+                    document_info.pop("content")
+                return document_info
             
-            logger.warning(f"未找到匹配的文件，文件ID: {file_id}")
-            return None
+            document_info.update(self._file_record_fields(record))
+            if include_content:
+                document_info["content"] = self._read_content(key)
+            return document_info
             
         except S3Error as e:
             logger.error(f"MinIO S3错误: {str(e)}")
             logger.error(f"详细错误信息: {traceback.format_exc()}")
             raise ValueError(f"获取文件信息失败 (S3错误): {str(e)}")
+        except ValueError:
+            raise
         except Exception as e:
             logger.error(f"未知错误: {str(e)}")
             logger.error(f"详细错误信息: {traceback.format_exc()}")
             raise ValueError(f"文档处理失败: {str(e)}")
     
+    def read_content(self, file_id: str, max_chars: Optional[int] = None) -> str:
+        """
+        从旁路文件读取文档全文
+        
+        Args:
+            file_id: 文件ID
+            max_chars: 只读取开头的字符数，用于预览，按字节范围读取而不下载全文
+        """
+        record = self.find_document(file_id)
+        if record is None:
+            return ""
+        return self._read_content(self._sidecar_key(record), max_chars)
+    
+    def _read_content(self, key: str, max_chars: Optional[int] = None) -> str:
+        if max_chars is None:
+            return self._get_object_bytes(self._sidecar_name(key, "content.txt")).decode("utf-8")
+        # UTF-8 每个字符最多4字节，截断处不完整的字符被丢弃
+        data = self._get_object_bytes(self._sidecar_name(key, "content.txt"), length=max_chars * 4)
+        return data.decode("utf-8", errors="ignore")[:max_chars]
+    
+    def read_pages(self, file_id: str, ranges: List[Tuple[int, int]]) -> Optional[Dict[str, Any]]:
+        """
+        读取指定页的文本，页码从 1 开始，超出实际页数的部分被忽略
+        
+        已解析的文档按每页字节偏移对 content.txt 做范围读取，每段连续页只需一次请求。
+        尚未解析完成的 PDF 只在解析进程池中提取所需页，不等待整个文档解析完成；
+        Word 文档整体视为一页，等待解析任务完成后读取。最近解析失败的文档直接返回失败原因。
+        
+        Args:
+            file_id: 文件ID
+            ranges: parse_page_ranges 返回的页码范围
+        
+        Returns:
+            文件名、总页数与各页文本，文件不存在时返回 None
+        """
+        record = self.find_document(file_id)
+        if record is None:
+            return None
+        
+        key = self._sidecar_key(record)
+        meta = self._read_sidecar_meta(key)
+        if meta is not None and meta.get("parser_version") == PARSER_VERSION:
+            offsets = meta["page_byte_offsets"]
+            page_count = len(offsets)
+            page_numbers = expand_page_ranges(ranges, page_count)
+            texts = self._read_page_texts(key, offsets, page_numbers)
+        elif Path(record.filename).suffix.lower() != ".pdf":
+            if self.parse_file(file_id) is None:
+                return None
+            return self.read_pages(file_id, ranges)
+        else:
+            self._raise_if_recently_failed(record)
+            page_count, texts = self.jobs.extract_pages(record, ranges)
+            page_numbers = sorted(texts)
+        
+        return {
+            "file_id": file_id,
+            "filename": record.filename,
+            "page_count": page_count,
+            "pages": [{"page": number, "text": texts[number]} for number in page_numbers],
+        }
+    
+    def _read_page_texts(
+        self, key: str, offsets: List[List[int]], page_numbers: List[int]
+    ) -> Dict[int, str]:
+        """按字节偏移范围读取各页文本，连续的页合并为一次请求"""
+        texts = {}
+        runs: List[List[int]] = []
+        for number in page_numbers:
+            if runs and number == runs[-1][-1] + 1:
+                runs[-1].append(number)
+            else:
+                runs.append([number])
+        for run in runs:
+            start = offsets[run[0] - 1][0]
+            end = offsets[run[-1] - 1][1]
+            # length=0 表示读到对象末尾，全部为空页时不发请求
+            data = b""
+            if end > start:
+                data = self._get_object_bytes(
+                    self._sidecar_name(key, "content.txt"), offset=start, length=end - start
+                )
+            for number in run:
+                page_start, page_end = offsets[number - 1]
+                texts[number] = data[page_start - start:page_end - start].decode("utf-8")
+        return texts
+    
+    def _sidecar_name(self, key: str, part: str) -> str:
+        return f"{SIDECAR_PREFIX}{key}/{part}"
+    
+    def _file_record_name(self, file_id: str) -> str:
+        return f"{FILE_RECORD_PREFIX}{file_id}.json"
+    
+    def _reference_name(self, record: DocumentRecord) -> str:
+        return f"{REFERENCE_PREFIX}{self._sidecar_key(record)}/{record.file_id}"
+    
+    def _object_exists(self, object_name: str) -> bool:
+        try:
+            self.minio_client.stat_object(MINIO_BUCKET_NAME, object_name)
+            return True
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                return False
+            raise
+    
+    def _get_object_bytes(self, object_name: str, offset: int = 0, length: int = 0) -> bytes:
+        response = self.minio_client.get_object(MINIO_BUCKET_NAME, object_name, offset=offset, length=length)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+    
+    def _put_bytes(self, object_name: str, data: bytes, content_type: str) -> None:
+        self.minio_client.put_object(
+            MINIO_BUCKET_NAME, object_name, io.BytesIO(data), length=len(data), content_type=content_type
+        )
+    
+    def _write_sidecar(self, key: str, document_info: Dict[str, Any]) -> None:
+        """写入旁路文件，先写全文再写元数据，元数据存在即表示全文可读"""
+        content = document_info.get("content", "")
+        meta = {k: v for k, v in document_info.items() if k != "content"}
+        meta["page_byte_offsets"] = page_byte_offsets(content, document_info["pages"])
+        self._put_bytes(self._sidecar_name(key, "content.txt"), content.encode("utf-8"), "text/plain; charset=utf-8")
+        self._put_bytes(
+            self._sidecar_name(key, "meta.json"),
+            json.dumps(meta, ensure_ascii=False).encode("utf-8"),
+            "application/json",
+        )
+        logger.debug(f"解析结果已写入旁路文件: {key}")
+    
+    def _read_json(self, object_name: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(self._get_object_bytes(object_name))
+        except S3Error as e:
+            if e.code == "NoSuchKey":
+                return None
+            raise
+    
+    def _read_sidecar_meta(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._read_json(self._sidecar_name(key, "meta.json"))
+    
+    def _read_file_record(self, file_id: str) -> Optional[DocumentRecord]:
+        """读取存储桶中的文件记录，解析状态需由解析结果补全"""
+        fields = self._read_json(self._file_record_name(file_id))
+        if fields is None:
+            return None
+        return DocumentRecord(
+            file_id=fields["file_id"],
+            object_name=fields["object_name"],
+            filename=fields["filename"],
+            file_size=fields["file_size"],
+            content_type=fields["content_type"],
+            content_hash=fields["content_hash"],
+            parse_status=PARSE_QUEUED,
+            uploaded_at=fields["uploaded_at"],
+        )
+    
+    def find_document(self, file_id: str) -> Optional[DocumentRecord]:
+        """
+        查找文件的索引记录
+        
+        索引中没有时（其他实例上传、索引尚未重建）读取存储桶中的文件记录，
+        按内容存储之前上传的文件按前缀列举对象一次，找到后补入索引。
+        """
+        record = self.index.get(file_id)
+        if record is not None:
+            return record
+        
+        record = self._read_file_record(file_id)
+        if record is not None:
+            self._apply_sidecar_state(record)
+            self.index.put(record)
+            logger.info(f"文件不在索引中，已按存储桶补入: {file_id}")
+            return record
+        
+        for obj in self.minio_client.list_objects(MINIO_BUCKET_NAME, prefix=f"{file_id}_"):
+            record = self._record_from_object(obj)
+            if record is not None and record.file_id == file_id:
+                self._apply_sidecar_state(record)
+                self.index.put(record)
+                logger.info(f"文件不在索引中，已按存储桶补入: {record.object_name}")
+                return record
+        return None
+    
+    def _record_from_object(self, obj) -> Optional[DocumentRecord]:
+        """由存储桶中的原始文件对象生成索引记录，解析结果文件等其他对象返回 None"""
+        match = _ORIGINAL_OBJECT.match(obj.object_name)
+        if match is None:
+            return None
+        file_id, filename = match.groups()
+        # 列举对象时返回的用户元数据键名带有 X-Amz-Meta- 前缀，大小写不固定
+        content_hash = next(
+            (value for key, value in (getattr(obj, "metadata", None) or {}).items()
+             if key.lower().endswith(HASH_METADATA_KEY)),
+            None,
+        )
+        return DocumentRecord(
+            file_id=file_id,
+            object_name=obj.object_name,
+            filename=filename,
+            file_size=obj.size,
+            content_type=self._get_content_type(filename),
+            content_hash=content_hash,
+            parse_status=PARSE_QUEUED,
+            uploaded_at=obj.last_modified.isoformat() if obj.last_modified else None,
+        )
+    
+    def _apply_sidecar_state(self, record: DocumentRecord) -> None:
+        """按已有的解析结果补全记录的解析状态，之前上传的文件另补全上传时间与内容哈希"""
+        key = self._sidecar_key(record)
+        meta = self._read_sidecar_meta(key)
+        if meta is None:
+            return
+        if key == record.file_id:
+            record.uploaded_at = meta.get("uploaded_at") or record.uploaded_at
+            record.content_hash = record.content_hash or meta.get("content_hash")
+        if meta.get("parser_version") == PARSER_VERSION:
+            record.parse_status = PARSE_DONE
+    
+    def rebuild_index(self) -> int:
+        """
+        列举整个存储桶重建文档索引
+        
+        已有当前版本解析结果的文档标记为 done，其余为 queued，在首次读取时解析。
+        
+        Returns:
+            索引中的文档数
+        """
+        records = []
+        parsed = set()
+        for obj in self.minio_client.list_objects(MINIO_BUCKET_NAME, recursive=True, include_user_meta=True):
+            name = obj.object_name
+            if name.startswith(SIDECAR_PREFIX):
+                if name.endswith("/meta.json"):
+                    parsed.add(name[len(SIDECAR_PREFIX):].split("/")[0])
+                continue
+            if name.startswith(FILE_RECORD_PREFIX):
+                record = self._read_file_record(name[len(FILE_RECORD_PREFIX):-len(".json")])
+            elif name.startswith((BLOB_PREFIX, REFERENCE_PREFIX, DELETING_PREFIX)):
+                # 共用的原始文件由文件记录引用
+                continue
+            else:
+                record = self._record_from_object(obj)
+            if record is not None:
+                records.append(record)
+        
+        for record in records:
+            if self._sidecar_key(record) in parsed:
+                self._apply_sidecar_state(record)
+        count = self.index.replace_all(records)
+        logger.info(f"文档索引已从存储桶重建，共 {count} 个文档")
+        return count
+    
     def download_file(self, file_id: str) -> Optional[bytes]:
         """下载文件内容"""
         try:
-            objects = self.minio_client.list_objects(MINIO_BUCKET_NAME, prefix=file_id)
-            
-            for obj in objects:
-                if obj.object_name.startswith(file_id):
-                    response = self.minio_client.get_object(MINIO_BUCKET_NAME, obj.object_name)
-                    file_content = response.read()
-                    response.close()
-                    return file_content
-            
-            return None
+            record = self.find_document(file_id)
+            if record is None:
+                return None
+            return self.read_original(record)
             
         except S3Error as e:
             raise ValueError(f"下载文件失败: {str(e)}")
     
     def delete_file(self, file_id: str) -> bool:
-        """删除文件"""
+        """
+        删除文件
+        
+        内容相同的文件共用原始文件与解析结果，存储桶中没有其他引用时才删除，
+        包括其他实例上传的文件，删除过程中其他实例登记的引用见 _release_blob。
+        """
         try:
-            objects = self.minio_client.list_objects(MINIO_BUCKET_NAME, prefix=file_id)
+            record = self.find_document(file_id)
+            if record is None:
+                return False
             
-            for obj in objects:
-                if obj.object_name.startswith(file_id):
-                    self.minio_client.remove_object(MINIO_BUCKET_NAME, obj.object_name)
-                    return True
+            self.index.delete(file_id)
+            if not record.object_name.startswith(BLOB_PREFIX):
+                # 按内容存储之前上传的文件不与其他文件共用
+                self.minio_client.remove_object(MINIO_BUCKET_NAME, record.object_name)
+                for part in ("meta.json", "content.txt"):
+                    self.minio_client.remove_object(MINIO_BUCKET_NAME, self._sidecar_name(file_id, part))
+                return True
             
-            return False
+            self.minio_client.remove_object(MINIO_BUCKET_NAME, self._file_record_name(file_id))
+            if not self._release_blob(record):
+                logger.info(f"文件已删除，原始文件仍被其他文件引用: {record.object_name}")
+            return True
             
         except S3Error as e:
             raise ValueError(f"删除文件失败: {str(e)}")
     
+    def _release_blob(self, record: DocumentRecord) -> bool:
+        """
+        删除文件对共用原始文件的引用，没有其他引用时删除原始文件与解析结果，返回是否已删除
+        
+        _blob_lock 只在本实例内互斥。其他实例可能在列举引用之后登记引用并看到原始文件仍存在，
+        因此删除前先在服务端复制一份，删除后再次列举引用：出现新的引用时由副本恢复原始文件并保留解析结果。
+        上传方先登记引用再检查对象，凡是看到原始文件的上传，其引用都会被第二次列举看到。
+        """
+        key = self._sidecar_key(record)
+        deleting = f"{DELETING_PREFIX}{key}/{record.file_id}"
+        with self._blob_lock:
+            self.minio_client.remove_object(MINIO_BUCKET_NAME, self._reference_name(record))
+            if self._has_references(key):
+                return False
+            try:
+                self.minio_client.copy_object(
+                    MINIO_BUCKET_NAME, deleting, CopySource(MINIO_BUCKET_NAME, record.object_name)
+                )
+            except S3Error as e:
+                if e.code != "NoSuchKey":
+                    raise
+                # 其他实例同时删除了最后一个引用，由它完成删除
+                return True
+            self.minio_client.remove_object(MINIO_BUCKET_NAME, record.object_name)
+            if self._has_references(key):
+                self.minio_client.copy_object(
+                    MINIO_BUCKET_NAME, record.object_name, CopySource(MINIO_BUCKET_NAME, deleting)
+                )
+                self.minio_client.remove_object(MINIO_BUCKET_NAME, deleting)
+                logger.warning(f"删除时其他实例登记了新的引用，已恢复原始文件: {record.object_name}")
+                return False
+            self.minio_client.remove_object(MINIO_BUCKET_NAME, deleting)
+            for part in ("meta.json", "content.txt"):
+                self.minio_client.remove_object(MINIO_BUCKET_NAME, self._sidecar_name(key, part))
+        return True
+    
+    def _has_references(self, key: str) -> bool:
+        return any(True for _ in self.minio_client.list_objects(MINIO_BUCKET_NAME, prefix=f"{REFERENCE_PREFIX}{key}/"))
+    
     def _get_content_type(self, filename: str) -> str:
         """根据文件名获取内容类型"""
         ext = Path(filename).suffix.lower()
@@ -246,5 +894,40 @@ class DocumentParser:
         return content_types.get(ext, 'application/octet-stream')
 
 
-# 创建全局实例
-document_parser = DocumentParser() 
\ No newline at end of file
+# 全局实例在首次使用时创建，导入模块时不连接 MinIO
+_document_parser = LazySingleton("document_parser", DocumentParser)
+
+
+def get_document_parser() -> DocumentParser:
+    """获取全局文档解析器实例"""
+    return _document_parser.get()
+
+
+# 以下函数在解析进程池中执行，不访问 MinIO 与文档索引
+
+
+def parse_document_bytes(file_content: bytes, filename: str) -> Dict[str, Any]:
+    """解析整个文档"""
+    return DocumentParser.parse_document(file_content, filename)
+
+
+def read_pdf_layout(path: str) -> Tuple[int, Dict[str, str]]:
+    """读取PDF的页数与文档属性，不提取文本"""
+    try:
+        pdf_reader = PyPDF2.PdfReader(path)
+        metadata = {
+            key.lstrip('/'): str(value)
+            for key, value in (pdf_reader.metadata or {}).items()
+        }
+        return len(pdf_reader.pages), metadata
+    except Exception as e:
+        raise ValueError(f"PDF解析错误: {str(e)}")
+
+
+def extract_pdf_page_range(path: str, start: int, end: int) -> List[str]:
+    """提取PDF第 start 到 end-1 页（从 0 开始）的文本"""
+    try:
+        pdf_reader = PyPDF2.PdfReader(path)
+        return [pdf_reader.pages[i].extract_text() for i in range(start, end)]
+    except Exception as e:
+        raise ValueError(f"PDF解析错误: 第 {start + 1}-{end} 页: {str(e)}")
@@ -1,8 +1,8 @@
-from langchain.tools import Tool
-from typing import Dict, Any
+from langchain_core.tools import StructuredTool
+from typing import Annotated, Dict, Any
+import hashlib
 import json
 import requests
-import tempfile
 import os
 from urllib.parse import urlparse, unquote
 import time
@@ -11,13 +11,23 @@ import traceback
 
 # 导入日志配置
 from src.utils.logger_config import setup_logging
-from .document_parser import document_parser
+from .document_jobs import parse_in_pool
+from .document_parser import get_document_parser, parse_page_ranges
 
 # 配置日志记录
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 
+def _find_parsed(content_hash: str):
+    """按内容哈希查找已上传文档的解析结果，MinIO 不可用时返回 None"""
+    try:
+        return get_document_parser().find_parsed(content_hash)
+    except Exception as e:
+        logger.warning(f"查找已有解析结果失败，直接解析: {str(e)}")
+        return None
+
+
 def download_and_parse_document(url: str) -> dict:
     """下载并解析文档文件"""
     max_retries = 3
@@ -55,34 +65,15 @@ def download_and_parse_document(url: str) -> dict:
             file_type = os.path.splitext(filename)[1].lower()
             file_size = len(response.content)
             
-            # 保存到临时文件
-            with tempfile.NamedTemporaryFile(delete=False, suffix=file_type) as tmp_file:
-                tmp_file.write(response.content)
-                temp_path = tmp_file.name
-            
             try:
                 # 根据文件类型解析内容
-                content = ""
-                
-                if file_type == '.pdf':
-                    # 解析PDF
-                    import PyPDF2
-                    with open(temp_path, 'rb') as file:
-                        pdf_reader = PyPDF2.PdfReader(file)
-                        for page in pdf_reader.pages:
-                            content += page.extract_text() + "\n\n"
-                
-                elif file_type in ['.docx', '.doc']:
-                    # 解析Word文档
-                    from docx import Document
-                    doc = Document(temp_path)
-                    for paragraph in doc.paragraphs:
-                        content += paragraph.text + "\n"
-                
+                if file_type in ['.pdf', '.docx', '.doc']:
+                    # 内容与已上传的文档相同时复用其解析结果，否则在解析进程池中解析，不占用智能体所在进程的 GIL
+                    parsed = _find_parsed(hashlib.sha256(response.content).hexdigest())
+                    content = (parsed or parse_in_pool(response.content, filename))["content"]
                 else:
                     # 尝试作为文本文件读取
-                    with open(temp_path, 'r', encoding='utf-8', errors='ignore') as file:
-                        content = file.read()
+                    content = response.content.decode('utf-8', errors='ignore')
                 
                 return {
                     "success": True,
@@ -94,11 +85,6 @@ def download_and_parse_document(url: str) -> dict:
                     "download_attempt": attempt + 1
                 }
             
-            except ImportError as e:
-                return {
-                    "success": False,
-                    "error": f"缺少解析库: {e}. 请安装 PyPDF2 或 python-docx"
-                }
             except Exception as e:
                 if attempt < max_retries - 1:
                     time.sleep(retry_delay)
@@ -107,13 +93,6 @@ def download_and_parse_document(url: str) -> dict:
                     "success": False,
                     "error": f"文件解析失败: {e}"
                 }
-            
-            finally:
-                # 清理临时文件
-                try:
-                    os.unlink(temp_path)
-                except:
-                    pass
         
         except requests.exceptions.Timeout:
             if attempt < max_retries - 1:
@@ -138,13 +117,56 @@ def download_and_parse_document(url: str) -> dict:
     }
 
 
-def analyze_document_content_tool(document_url, analysis_request: str = "") -> str:
+def analyze_document_pages(file_id: str, analysis_request: str, pages: str) -> str:
+    """只读取已上传文档的指定页，尚未解析完成的PDF不等待整个文档解析"""
+    try:
+        result = get_document_parser().read_pages(file_id, parse_page_ranges(pages))
+    except Exception as e:
+        logger.error(f"读取文档指定页失败: {str(e)}")
+        return json.dumps({
+            "error": f"读取文档指定页失败: {str(e)}",
+            "success": False,
+            "input_received": file_id,
+            "error_type": "page_retrieval_error"
+        }, ensure_ascii=False)
+    
+    if result is None:
+        return json.dumps({
+            "error": f"未找到文件ID为 {file_id} 的文档",
+            "success": False,
+            "input_received": file_id,
+            "error_type": "file_not_found"
+        }, ensure_ascii=False)
+    
+    content = "\n\n".join(f"[第{page['page']}页]\n{page['text']}" for page in result["pages"])
+    return json.dumps({
+        "success": True,
+        "data": {
+            "document_info": {
+                "filename": result["filename"],
+                "page_count": result["page_count"]
+            },
+            "analysis_request": analysis_request,
+            "requested_pages": pages,
+            "returned_pages": [page["page"] for page in result["pages"]],
+            "document_content": content
+        },
+        "source_type": "file_storage"
+    }, ensure_ascii=False, indent=2)
+
+
+def analyze_document_content_tool(
+    document_url: Annotated[str, "可访问的文档URL或文件ID"],
+    analysis_request: Annotated[str, "具体的分析要求"] = "",
+    pages: Annotated[str, "只读取指定页，如 3、3-5、1,4-6，仅适用于文件ID"] = "",
+) -> str:
     """
     文档解析分析工具 - 接收可访问的URL和用户需求，获取文件并解析分析
     
     Args:
         document_url: 可访问的文档URL或文件ID
         analysis_request: 用户的分析要求
+        pages: 只分析这些页，例如 "3-5"，仅适用于文件ID
         
     Returns:
         文档分析结果的JSON字符串
@@ -157,6 +179,7 @@ def analyze_document_content_tool(document_url, analysis_request: str = "") -> s
         # 参数类型检查和转换
         if isinstance(document_url, dict):
             logger.warning(f"接收到字典类型的输入参数: {document_url}")
+            pages = document_url.get('pages') or pages
             
             # 检查是否是完整的参数字典 (包含document_url和analysis_request字段)
             if 'document_url' in document_url and 'analysis_request' in document_url:
@@ -205,10 +228,14 @@ def analyze_document_content_tool(document_url, analysis_request: str = "") -> s
         if re.match(uuid_pattern, document_url):
             logger.info(f"识别为文件ID格式: {document_url}")
             
-            # 这是一个文件ID，从存储系统获取文档
+            if pages:
+                logger.info(f"只读取指定页: {pages}")
+                return analyze_document_pages(document_url, analysis_request, str(pages))
+            
+            # 这是一个文件ID，从存储系统获取文档；尚未解析完成时等待解析任务的结果
             try:
                 logger.debug("尝试从存储系统获取文件信息")
-                document_info = document_parser.get_file_info(document_url)
+                document_info = get_document_parser().get_file_info(document_url)
                 logger.debug(f"get_file_info返回结果: {document_info is not None}")
             except Exception as e:
                 logger.error(f"调用document_parser.get_file_info失败: {str(e)}")
@@ -244,12 +271,7 @@ def analyze_document_content_tool(document_url, analysis_request: str = "") -> s
                         "uploaded_at": document_info.get("uploaded_at"),
                         "parsed_at": document_info.get("parsed_at")
                     },
-                    "content_statistics": {
-                        "content_length": len(content),
-                        "word_count": len(content.split()) if content else 0,
-                        "line_count": len(content.split('\n')) if content else 0,
-                        "paragraph_count": len([p for p in content.split('\n\n') if p.strip()]) if content else 0
-                    },
+                    "content_statistics": document_info.get("statistics"),
                     "analysis_request": analysis_request,
                     "document_content": content,
                     "content_preview": content[:1000] + "..." if len(content) > 1000 else content
@@ -284,7 +306,7 @@ def analyze_document_content_tool(document_url, analysis_request: str = "") -> s
                 if match:
                     file_id = match.group(1)
                     # 递归调用，使用提取的文件ID
-                    return analyze_document_content_tool(file_id, analysis_request)
+                    return analyze_document_content_tool(file_id, analysis_request, pages)
                 else:
                     return json.dumps({
                         "error": f"无法从API URL中提取有效的文件ID: {document_url}",
@@ -352,7 +374,7 @@ def analyze_document_content_tool(document_url, analysis_request: str = "") -> s
 
 
 # 创建 LangChain 工具
-document_analysis_tool = Tool(
+document_analysis_tool = StructuredTool.from_function(
     name="analyze_document_content",
     description="""
     文档解析分析工具 - 根据可访问的URL和用户需求进行文档分析
@@ -362,6 +384,8 @@ document_analysis_tool = Tool(
       * 支持各种可访问的URL（http/https链接）
       * 支持文件ID（UUID格式）
     - analysis_request (str, 可选): 用户的具体分析要求，如"总结主要内容"、"提取关键信息"等
+    - pages (str, 可选): 只读取指定页，如 "3"、"3-5"、"1,4-6"，页码从 1 开始，仅适用于文件ID。
+      只关心部分章节时使用，不必等待整个文档解析完成
     
     功能:
     - 自动下载指定URL的文档文件
@@ -376,6 +400,7 @@ document_analysis_tool = Tool(
     - document_content: 完整文档内容
     - content_preview: 内容预览（前1000字符）
     - source_type: 数据源类型 (url_download, file_storage)
+    指定 pages 时 document_content 只包含这些页（每页以"[第N页]"开头），并返回 returned_pages
     
     支持的文档格式: PDF (.pdf), Word (.docx, .doc)
     
@@ -0,0 +1,213 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import networkx as nx
+from networkx.algorithms.approximation import steiner_tree
+
+from src.config.database import ORACLE_DB_CONFIG, ORACLE_METADATA_CACHE_TTL
+from src.utils.cache import TTLCache
+from .oracle_db import handle_db_error
+from .oracle_executor import oracle_tool
+from .oracle_pool import oracle_session, should_discard_session
+
+logger = logging.getLogger(__name__)
+
+# 外键关系图缓存：模式名 -> 无向图，节点为表，边记录两表之间的外键
+_join_graph_cache: TTLCache[nx.Graph] = TTLCache(
+    ttl=ORACLE_METADATA_CACHE_TTL, maxsize=20
+)
+
+# 一次取出模式内全部外键的字段对应关系，复合外键按 position 对齐
+FOREIGN_KEYS_SQL = """
+SELECT c.table_name, c.constraint_name, a.column_name, c_pk.owner, c_pk.table_name, b.column_name
+FROM all_constraints c
+JOIN all_cons_columns a ON a.owner = c.owner AND a.constraint_name = c.constraint_name
+JOIN all_constraints c_pk ON c.r_owner = c_pk.owner AND c.r_constraint_name = c_pk.constraint_name
+JOIN all_cons_columns b ON b.owner = c_pk.owner
+    AND b.constraint_name = c_pk.constraint_name AND b.position = a.position
+WHERE c.constraint_type = 'R' AND c.owner = :owner
+ORDER BY c.table_name, c.constraint_name, a.position
+"""
+
+
+def build_join_graph(owner: str, rows) -> nx.Graph:
+    """
+    由外键行构建关系图
+
+    本模式的表以表名作为节点，引用其他模式的表以 "模式.表名" 作为节点。
+    两表之间的每个外键记录在边的 foreign_keys 属性中。
+    """
+    foreign_keys: Dict[str, Dict[str, Any]] = {}
+    for (
+        table_name,
+        constraint_name,
+        column_name,
+        r_owner,
+        r_table_name,
+        r_column_name,
+    ) in rows:
+        parent = r_table_name if r_owner == owner else f"{r_owner}.{r_table_name}"
+        fk = foreign_keys.setdefault(
+            constraint_name,
+            {
+                "constraint": constraint_name,
+                "child": table_name,
+                "parent": parent,
+                "columns": [],
+            },
+        )
+        fk["columns"].append((column_name, r_column_name))
+
+    graph = nx.Graph()
+    for fk in foreign_keys.values():
+        graph.add_node(fk["child"])
+        graph.add_node(fk["parent"])
+        if fk["child"] == fk["parent"]:
+            # 自引用外键不参与表之间的连接
+            continue
+        if graph.has_edge(fk["child"], fk["parent"]):
+            graph[fk["child"]][fk["parent"]]["foreign_keys"].append(fk)
+        else:
+            graph.add_edge(fk["child"], fk["parent"], foreign_keys=[fk])
+    return graph
+
+
+def get_join_graph(cursor, owner: str) -> nx.Graph:
+    """获取模式的外键关系图（带缓存）"""
+
+    def load() -> nx.Graph:
+        cursor.execute(FOREIGN_KEYS_SQL, {"owner": owner})
+        graph = build_join_graph(owner, cursor.fetchall())
+        logger.info(
+            f"外键关系图已加载: {owner} ({graph.number_of_nodes()} 张表, {graph.number_of_edges()} 条连接)"
+        )
+        return graph
+
+    return _join_graph_cache.get_or_load(owner, load)
+
+
+def invalidate_join_graph(owner: Optional[str] = None) -> None:
+    """清除外键关系图缓存，不提供模式名时全部清除"""
+    if owner is None:
+        _join_graph_cache.clear()
+    else:
+        _join_graph_cache.invalidate(owner.upper())
+
+
+def _join_predicate(fk: Dict[str, Any]) -> str:
+    return " AND ".join(
+        f"{fk['child']}.{column} = {fk['parent']}.{r_column}"
+        for column, r_column in fk["columns"]
+    )
+
+
+def find_join_plan(graph: nx.Graph, tables: List[str]) -> Dict[str, Any]:
+    """
+    计算连接一组表的最短外键路径
+
+    两张表时为最短路径，多张表时为连接全部表的近似最小斯坦纳树。
+    不在同一连通分量中的表分别处理。
+
+    Returns:
+        包含 joins（按连接顺序排列的边）、missing（图中不存在的表）与
+        disconnected（无法通过外键与其他表连接的表）
+    """
+    missing = [table for table in tables if table not in graph]
+    present = [table for table in tables if table in graph]
+
+    joins = []
+    for component in nx.connected_components(graph):
+        terminals = [table for table in present if table in component]
+        if len(terminals) < 2:
+            continue
+        if len(terminals) == 2:
+            path = nx.shortest_path(graph, terminals[0], terminals[1])
+            tree = graph.subgraph(path)
+        else:
+            tree = steiner_tree(graph.subgraph(component), terminals)
+        for left, right in nx.bfs_edges(tree, terminals[0]):
+            foreign_keys = graph[left][right]["foreign_keys"]
+            joins.append({"from": left, "to": right, "foreign_keys": foreign_keys})
+
+    joined = {table for join in joins for table in (join["from"], join["to"])}
+    disconnected = [
+        table for table in present if table not in joined and len(present) > 1
+    ]
+    return {"joins": joins, "missing": missing, "disconnected": disconnected}
+
+
+def format_join_plan(tables: List[str], plan: Dict[str, Any]) -> str:
+    """将连接路径格式化为 JOIN 子句"""
+    lines = [f"连接 {', '.join(tables)} 的最短外键路径:"]
+    if plan["joins"]:
+        started = set()
+        for join in plan["joins"]:
+            if join["from"] not in started:
+                lines.append(f"FROM {join['from']}")
+                started.add(join["from"])
+            fk, *alternatives = join["foreign_keys"]
+            lines.append(f"JOIN {join['to']} ON {_join_predicate(fk)}")
+            started.add(join["to"])
+            if alternatives:
+                lines.append(
+                    "  -- 另有外键可连接这两张表: "
+                    + "; ".join(
+                        f"{alt['constraint']}: {_join_predicate(alt)}"
+                        for alt in alternatives
+                    )
+                )
+        intermediate = started - set(tables)
+        if intermediate:
+            lines.append(f"\n需要经过的中间表: {', '.join(sorted(intermediate))}")
+    else:
+        lines.append("没有可用的外键连接路径")
+    if plan["missing"]:
+        lines.append(f"\n以下表没有外键关系或不存在: {', '.join(plan['missing'])}")
+    if plan["disconnected"]:
+        lines.append(
+            f"\n以下表无法通过外键与其他表连接: {', '.join(plan['disconnected'])}"
+        )
+    return "\n".join(lines)
+
+
+@oracle_tool
+@handle_db_error
+def find_join_paths(tables: List[str], schema_name: Optional[str] = None) -> str:
+    """
+    一次性查找连接多张表的最短外键路径，返回可直接使用的 JOIN 条件
+
+    需要关联两张或更多表时使用，代替逐表调用 get_table_relationships。
+
+    Args:
+        tables: 需要连接的表名列表，例如 ["ORDERS", "REGIONS"]
+        schema_name: 模式名，默认当前用户
+
+    Returns:
+        按连接顺序排列的 JOIN 子句、需要经过的中间表与无法连接的表
+    """
+    owner = (schema_name or ORACLE_DB_CONFIG["username"]).upper()
+    tables = list(
+        dict.fromkeys(table.strip().upper() for table in tables if table.strip())
+    )
+    if len(tables) < 2:
+        return "错误：至少需要提供两张表"
+
+    graph = _join_graph_cache.get(owner)
+    if graph is None:
+        with oracle_session() as conn:
+            cursor = conn.cursor()
+            try:
+                graph = get_join_graph(cursor, owner)
+            except Exception as e:
+                if should_discard_session(e):
+                    raise
+                logger.error(f"加载外键关系图失败: {str(e)}")
+                return f"加载外键关系图错误: {str(e)}"
+            finally:
+                cursor.close()
+
+    return format_join_plan(tables, find_join_plan(graph, tables))
+
+
+# 导出工具
+oracle_join_path_tool = find_join_paths
@@ -0,0 +1,233 @@
+from typing import Dict, List, Optional
+
+from src.config.database import ORACLE_DB_CONFIG
+from .db_backend import ColumnRow, DatabaseBackend, IndexRow, RelationshipRow, TableRow
+from .oracle_pool import oracle_session
+
+# 一次取出整张表的字段注释，当前用户模式下的表优先于其他模式的同名表
+COLUMN_COMMENTS_SQL = """
+SELECT column_name, comments FROM all_col_comments
+WHERE table_name = :table_name AND comments IS NOT NULL
+ORDER BY CASE WHEN owner = :owner THEN 0 ELSE 1 END
+"""
+
+LIST_TABLES_SQL = """
+SELECT t.table_name, tc.comments
+FROM all_tables t
+LEFT JOIN all_tab_comments tc ON t.owner = tc.owner AND t.table_name = tc.table_name
+WHERE t.owner = :schema
+ORDER BY t.table_name
+"""
+
+USER_LIST_TABLES_SQL = """
+SELECT t.table_name, tc.comments
+FROM user_tables t
+LEFT JOIN user_tab_comments tc ON t.table_name = tc.table_name
+ORDER BY t.table_name
+"""
+
+DESCRIBE_TABLE_SQL = """
+SELECT
+    tc.column_name,
+    tc.data_type,
+    tc.data_length,
+    tc.nullable,
+    tc.data_default,
+    cc.comments
+FROM all_tab_columns tc
+LEFT JOIN all_col_comments cc ON tc.owner = cc.owner
+    AND tc.table_name = cc.table_name
+    AND tc.column_name = cc.column_name
+WHERE tc.table_name = :table_name AND tc.owner = :schema
+ORDER BY tc.column_id
+"""
+
+USER_DESCRIBE_TABLE_SQL = """
+SELECT
+    tc.column_name,
+    tc.data_type,
+    tc.data_length,
+    tc.nullable,
+    tc.data_default,
+    cc.comments
+FROM user_tab_columns tc
+LEFT JOIN user_col_comments cc ON tc.table_name = cc.table_name
+    AND tc.column_name = cc.column_name
+WHERE tc.table_name = :table_name
+ORDER BY tc.column_id
+"""
+
+TABLE_COMMENT_SQL = """
+SELECT comments FROM all_tab_comments
+WHERE table_name = :table_name AND owner = :schema
+"""
+
+USER_TABLE_COMMENT_SQL = """
+SELECT comments FROM user_tab_comments
+WHERE table_name = :table_name
+"""
+
+RELATIONSHIPS_SQL = """
+SELECT
+    a.constraint_name,
+    a.column_name,
+    c_pk.table_name r_table_name,
+    b.column_name r_column_name,
+    cc1.comments local_comment,
+    cc2.comments ref_comment
+FROM all_cons_columns a
+JOIN all_constraints c ON a.owner = c.owner AND a.constraint_name = c.constraint_name
+JOIN all_constraints c_pk ON c.r_owner = c_pk.owner AND c.r_constraint_name = c_pk.constraint_name
+JOIN all_cons_columns b ON c_pk.owner = b.owner AND c_pk.constraint_name = b.constraint_name
+LEFT JOIN all_col_comments cc1 ON a.owner = cc1.owner
+    AND a.table_name = cc1.table_name AND a.column_name = cc1.column_name
+LEFT JOIN all_col_comments cc2 ON c_pk.owner = cc2.owner
+    AND c_pk.table_name = cc2.table_name AND b.column_name = cc2.column_name
+WHERE c.constraint_type = 'R'
+AND a.table_name = :table_name
+AND a.owner = :schema
+ORDER BY a.constraint_name, a.position
+"""
+
+USER_RELATIONSHIPS_SQL = """
+SELECT
+    a.constraint_name,
+    a.column_name,
+    c_pk.table_name r_table_name,
+    b.column_name r_column_name,
+    cc1.comments local_comment,
+    cc2.comments ref_comment
+FROM user_cons_columns a
+JOIN user_constraints c ON a.constraint_name = c.constraint_name
+JOIN user_constraints c_pk ON c.r_constraint_name = c_pk.constraint_name
+JOIN user_cons_columns b ON c_pk.constraint_name = b.constraint_name
+LEFT JOIN user_col_comments cc1 ON a.table_name = cc1.table_name
+    AND a.column_name = cc1.column_name
+LEFT JOIN user_col_comments cc2 ON c_pk.table_name = cc2.table_name
+    AND b.column_name = cc2.column_name
+WHERE c.constraint_type = 'R'
+AND a.table_name = :table_name
+ORDER BY a.constraint_name, a.position
+"""
+
+INDEXES_SQL = """
+SELECT
+    i.index_name,
+    i.index_type,
+    i.uniqueness,
+    ic.column_name,
+    ic.column_position,
+    cc.comments
+FROM all_indexes i
+JOIN all_ind_columns ic ON i.owner = ic.index_owner AND i.index_name = ic.index_name
+LEFT JOIN all_col_comments cc ON ic.table_owner = cc.owner
+    AND ic.table_name = cc.table_name AND ic.column_name = cc.column_name
+WHERE i.table_name = :table_name AND i.owner = :schema
+ORDER BY i.index_name, ic.column_position
+"""
+
+USER_INDEXES_SQL = """
+SELECT
+    i.index_name,
+    i.index_type,
+    i.uniqueness,
+    ic.column_name,
+    ic.column_position,
+    cc.comments
+FROM user_indexes i
+JOIN user_ind_columns ic ON i.index_name = ic.index_name
+LEFT JOIN user_col_comments cc ON ic.table_name = cc.table_name
+    AND ic.column_name = cc.column_name
+WHERE i.table_name = :table_name
+ORDER BY i.index_name, ic.column_position
+"""
+
+
+def _execute_dictionary_query(
+    cursor, schema_sql: str, user_sql: str, params: dict, schema_name: Optional[str]
+):
+    """指定模式时查询 all_* 视图，否则查询当前用户的 user_* 视图"""
+    if schema_name:
+        cursor.execute(schema_sql, {**params, "schema": schema_name.upper()})
+    else:
+        cursor.execute(user_sql, params)
+
+
+class OracleBackend(DatabaseBackend):
+    """通过会话池访问Oracle，元数据来自数据字典视图"""
+
+    name = "oracle"
+    dialect = "oracle"
+
+    def session(self, call_timeout: Optional[int] = None):
+        return oracle_session(call_timeout=call_timeout)
+
+    def list_tables(
+        self, cursor, schema_name: Optional[str], limit: int
+    ) -> List[TableRow]:
+        _execute_dictionary_query(
+            cursor, LIST_TABLES_SQL, USER_LIST_TABLES_SQL, {}, schema_name
+        )
+        return cursor.fetchmany(limit)
+
+    def describe_table(
+        self, cursor, table_name: str, schema_name: Optional[str]
+    ) -> List[ColumnRow]:
+        _execute_dictionary_query(
+            cursor,
+            DESCRIBE_TABLE_SQL,
+            USER_DESCRIBE_TABLE_SQL,
+            {"table_name": table_name.upper()},
+            schema_name,
+        )
+        return cursor.fetchall()
+
+    def table_comment(
+        self, cursor, table_name: str, schema_name: Optional[str]
+    ) -> Optional[str]:
+        _execute_dictionary_query(
+            cursor,
+            TABLE_COMMENT_SQL,
+            USER_TABLE_COMMENT_SQL,
+            {"table_name": table_name.upper()},
+            schema_name,
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def column_comments(self, cursor, table_name: str) -> Dict[str, str]:
+        cursor.execute(
+            COLUMN_COMMENTS_SQL,
+            {
+                "table_name": table_name.upper(),
+                "owner": ORACLE_DB_CONFIG["username"].upper(),
+            },
+        )
+        comments: Dict[str, str] = {}
+        for column_name, comment in cursor.fetchall():
+            comments.setdefault(column_name, comment)
+        return comments
+
+    def relationships(
+        self, cursor, table_name: str, schema_name: Optional[str]
+    ) -> List[RelationshipRow]:
+        _execute_dictionary_query(
+            cursor,
+            RELATIONSHIPS_SQL,
+            USER_RELATIONSHIPS_SQL,
+            {"table_name": table_name.upper()},
+            schema_name,
+        )
+        return cursor.fetchall()
+
+    def indexes(
+        self, cursor, table_name: str, schema_name: Optional[str]
+    ) -> List[IndexRow]:
+        _execute_dictionary_query(
+            cursor,
+            INDEXES_SQL,
+            USER_INDEXES_SQL,
+            {"table_name": table_name.upper()},
+            schema_name,
+        )
+        return cursor.fetchall()
@@ -1,13 +1,33 @@
-import cx_Oracle
 import re
-from typing import Dict, Any, List, Optional
-from langchain_core.tools import tool
+from typing import Dict, Any, List, Optional, Tuple
 import functools
 import logging
-from src.config.database import ORACLE_DB_CONFIG, validate_db_config, get_connection_string
+import time
+from src.config.database import (
+    ORACLE_METADATA_CACHE_TTL,
+    ORACLE_RESULT_CACHE_CONFIG,
+)
+from src.utils.cache import TTLCache
+from .db_backend import get_db_backend
+from .oracle_executor import oracle_tool
+from .oracle_pool import should_discard_session
+from .sql_guard import SQLGuardError, guard_query, tokenize_sql
 
 logger = logging.getLogger(__name__)
 
+# 字段注释缓存：表名 -> {字段名: 注释}
+_column_comment_cache: TTLCache[Dict[str, str]] = TTLCache(
+    ttl=ORACLE_METADATA_CACHE_TTL, maxsize=1000
+)
+
+# 查询结果缓存：(规范化SQL, 绑定变量, 引用的表) -> (结果文本, 查询时间)
+_query_result_cache: TTLCache[Tuple[str, float]] = TTLCache(
+    ttl=ORACLE_RESULT_CACHE_CONFIG["ttl"], maxsize=ORACLE_RESULT_CACHE_CONFIG["maxsize"]
+)
+
+# 不指定表名时最多列出的表数量，更大的模式应通过 search_schema 检索
+MAX_TABLE_LIST = 200
+
 def handle_db_error(func):
     """数据库操作错误处理装饰器"""
     @functools.wraps(func)
@@ -21,33 +41,7 @@ def handle_db_error(func):
     return wrapper
 
 
-def get_oracle_connection():
-    """获取Oracle数据库连接"""
-    if not validate_db_config():
-        raise ValueError(
-            "数据库连接参数未完整配置，请设置环境变量: "
-            "ORACLE_HOST, ORACLE_SERVICE_NAME, ORACLE_USERNAME, ORACLE_PASSWORD"
-        )
-    
-    try:
-        dsn = cx_Oracle.makedsn(
-            ORACLE_DB_CONFIG["host"], 
-            ORACLE_DB_CONFIG["port"], 
-            service_name=ORACLE_DB_CONFIG["service_name"]
-        )
-        connection = cx_Oracle.connect(
-            user=ORACLE_DB_CONFIG["username"],
-            password=ORACLE_DB_CONFIG["password"],
-            dsn=dsn
-        )
-        logger.info(f"成功连接到Oracle数据库: {get_connection_string()}")
-        return connection
-    except Exception as e:
-        logger.error(f"连接Oracle数据库失败: {str(e)}")
-        raise
-
-
-@tool
+@oracle_tool
 @handle_db_error
 def get_table_info(table_name: Optional[str] = None, schema_name: Optional[str] = None) -> str:
     """
@@ -60,302 +54,320 @@ def get_table_info(table_name: Optional[str] = None, schema_name: Optional[str]
     Returns:
         表信息的字符串描述
     """
-    conn = get_oracle_connection()
-    cursor = conn.cursor()
-    
-    try:
-        if table_name is None:
-            # 获取所有表列表（包含表注释）
-            if schema_name:
-                sql = """
-                SELECT t.table_name, tc.comments
-                FROM all_tables t
-                LEFT JOIN all_tab_comments tc ON t.owner = tc.owner AND t.table_name = tc.table_name
-                WHERE t.owner = :schema 
-                ORDER BY t.table_name
-                """
-                cursor.execute(sql, {"schema": schema_name.upper()})
-            else:
-                sql = """
-                SELECT t.table_name, tc.comments
-                FROM user_tables t
-                LEFT JOIN user_tab_comments tc ON t.table_name = tc.table_name
-                ORDER BY t.table_name
-                """
-                cursor.execute(sql)
-            
-            tables = cursor.fetchall()
-            result = "数据库中的表列表:\n"
-            result += "表名 | 表注释\n"
-            result += "-" * 50 + "\n"
-            for table in tables:
-                table_name, table_comment = table
-                comment = table_comment if table_comment else "无注释"
-                result += f"{table_name} | {comment}\n"
-            return result
-        else:
-            # 获取指定表的详细信息（包含字段注释）
-            if schema_name:
-                sql = """
-                SELECT 
-                    tc.column_name,
-                    tc.data_type,
-                    tc.data_length,
-                    tc.nullable,
-                    tc.data_default,
-                    cc.comments
-                FROM all_tab_columns tc
-                LEFT JOIN all_col_comments cc ON tc.owner = cc.owner 
-                    AND tc.table_name = cc.table_name 
-                    AND tc.column_name = cc.column_name
-                WHERE tc.table_name = :table_name AND tc.owner = :schema
-                ORDER BY tc.column_id
-                """
-                cursor.execute(sql, {"table_name": table_name.upper(), "schema": schema_name.upper()})
-            else:
-                sql = """
-                SELECT 
-                    tc.column_name,
-                    tc.data_type,
-                    tc.data_length,
-                    tc.nullable,
-                    tc.data_default,
-                    cc.comments
-                FROM user_tab_columns tc
-                LEFT JOIN user_col_comments cc ON tc.table_name = cc.table_name 
-                    AND tc.column_name = cc.column_name
-                WHERE tc.table_name = :table_name
-                ORDER BY tc.column_id
-                """
-                cursor.execute(sql, {"table_name": table_name.upper()})
-            
-            columns = cursor.fetchall()
-            if not columns:
-                return f"未找到表 {table_name}"
-            
-            # 获取表注释
-            if schema_name:
-                table_comment_sql = """
-                SELECT comments FROM all_tab_comments 
-                WHERE table_name = :table_name AND owner = :schema
-                """
-                cursor.execute(table_comment_sql, {"table_name": table_name.upper(), "schema": schema_name.upper()})
+    backend = get_db_backend()
+    with backend.session() as conn:
+        cursor = conn.cursor()
+        
+        try:
+            if table_name is None:
+                # 获取所有表列表（包含表注释）
+                tables = backend.list_tables(cursor, schema_name, MAX_TABLE_LIST + 1)
+                result = "数据库中的表列表:\n"
+                result += "表名 | 表注释\n"
+                result += "-" * 50 + "\n"
+                for table in tables[:MAX_TABLE_LIST]:
+                    table_name, table_comment = table
+                    comment = table_comment if table_comment else "无注释"
+                    result += f"{table_name} | {comment}\n"
+                if len(tables) > MAX_TABLE_LIST:
+                    result += (
+                        f"\n仅列出前 {MAX_TABLE_LIST} 张表，"
+                        "请使用 search_schema 按业务关键词检索相关表\n"
+                    )
+                return result
             else:
-                table_comment_sql = """
-                SELECT comments FROM user_tab_comments 
-                WHERE table_name = :table_name
-                """
-                cursor.execute(table_comment_sql, {"table_name": table_name.upper()})
-            
-            table_comment_result = cursor.fetchone()
-            table_comment = table_comment_result[0] if table_comment_result and table_comment_result[0] else "无注释"
-            
-            result = f"表 {table_name} 的详细信息:\n"
-            result += f"表注释: {table_comment}\n\n"
-            result += "字段名 | 数据类型 | 长度 | 可空 | 默认值 | 字段注释\n"
-            result += "-" * 80 + "\n"
-            
-            for col in columns:
-                column_name, data_type, data_length, nullable, default_value, column_comment = col
-                length_info = f"({data_length})" if data_length else ""
-                nullable_info = "是" if nullable == "Y" else "否"
-                default_info = str(default_value) if default_value else ""
-                comment_info = column_comment if column_comment else "无注释"
-                result += f"{column_name} | {data_type}{length_info} | {data_length or ''} | {nullable_info} | {default_info} | {comment_info}\n"
-            
-            return result
-            
-    finally:
-        cursor.close()
-        conn.close()
+                # 获取指定表的详细信息（包含字段注释）
+                columns = backend.describe_table(cursor, table_name, schema_name)
+                if not columns:
+                    return f"未找到表 {table_name}"
+                
+                # 获取表注释
+                table_comment = backend.table_comment(cursor, table_name, schema_name) or "无注释"
+                
+                result = f"表 {table_name} 的详细信息:\n"
+                result += f"表注释: {table_comment}\n\n"
+                result += "字段名 | 数据类型 | 长度 | 可空 | 默认值 | 字段注释\n"
+                result += "-" * 80 + "\n"
+                
+                for col in columns:
+                    column_name, data_type, data_length, nullable, default_value, column_comment = col
+                    length_info = f"({data_length})" if data_length else ""
+                    nullable_info = "是" if nullable == "Y" else "否"
+                    default_info = str(default_value) if default_value else ""
+                    comment_info = column_comment if column_comment else "无注释"
+                    result += f"{column_name} | {data_type}{length_info} | {data_length or ''} | {nullable_info} | {default_info} | {comment_info}\n"
+                
+                return result
+                
+        finally:
+            cursor.close()
 
 
-@tool
+@oracle_tool
 @handle_db_error
-def execute_oracle_query(sql: str, fetch_size: int = 100) -> str:
+def execute_oracle_query(sql: str, fetch_size: int = 100, binds: Optional[Dict[str, Any]] = None) -> str:
     """
     执行Oracle SQL查询（自动添加中文别名）
     
     Args:
         sql: 要执行的SQL查询语句
         fetch_size: 最大返回行数，默认100行
+        binds: 绑定变量，例如 {"start_date": "2024-01-01"}，对应SQL中的 :start_date
     
     Returns:
         查询结果的字符串格式（包含中文别名）
     """
-    # 安全检查：只允许SELECT语句
-    sql_upper = sql.strip().upper()
-    if not sql_upper.startswith("SELECT"):
-        return "错误：只允许执行SELECT查询语句"
-    
-    # 检查是否包含危险关键字
-    dangerous_keywords = ["DELETE", "UPDATE", "INSERT", "DROP", "CREATE", "ALTER", "TRUNCATE"]
-    for keyword in dangerous_keywords:
-        if keyword in sql_upper:
-            return f"错误：查询中包含不允许的关键字: {keyword}"
+    backend = get_db_backend()
+    # 只读检查，并把行数限制写入语句，多取一行用于判断结果是否被截断
+    try:
+        guarded = guard_query(sql, fetch_size + 1, backend.dialect)
+    except SQLGuardError as e:
+        return f"错误：{e}"
     
-    conn = get_oracle_connection()
-    cursor = conn.cursor()
+    tables = frozenset(extract_table_names_from_sql(guarded.normalized))
+    ttl = _result_cache_ttl(tables)
+    key = (guarded.sql, _bind_key(binds), tables)
+    if ttl > 0:
+        cached = _query_result_cache.get(key)
+        if cached is not None:
+            result, queried_at = cached
+            return result + f"\n\n（结果来自缓存，{int(time.time() - queried_at)}秒前查询）"
     
     try:
-        # 执行原始查询
-        cursor.execute(sql)
-        
-        # 获取列名
-        columns = []
-        for desc in cursor.description:
-            column_name = desc[0]
-            columns.append(column_name)
-        
-        # 获取数据 - 先获取数据，避免后续查询影响结果集
-        rows = cursor.fetchmany(fetch_size)
-        
-        # 检查是否有结果
-        if not rows:
-            return "查询无结果"
-        
-        # 使用新的连接获取中文别名，避免影响原始查询
-        chinese_columns = []
-        try:
-            alias_conn = get_oracle_connection()
-            alias_cursor = alias_conn.cursor()
-            
-            for column_name in columns:
-                chinese_alias = get_column_chinese_alias(alias_cursor, column_name, sql)
-                chinese_columns.append(chinese_alias if chinese_alias else column_name)
-            
-            alias_cursor.close()
-            alias_conn.close()
-        except Exception as e:
-            logger.debug(f"获取中文别名失败，使用原始列名: {e}")
-            chinese_columns = columns.copy()
-        
-        # 格式化输出（使用中文别名）
-        result = "查询结果:\n"
-        result += " | ".join(chinese_columns) + "\n"
-        result += "-" * (len(" | ".join(chinese_columns)) + 10) + "\n"
-        
-        for row in rows:
-            formatted_row = []
-            for item in row:
-                if item is None:
-                    formatted_row.append("NULL")
-                else:
-                    formatted_row.append(str(item))
-            result += " | ".join(formatted_row) + "\n"
-        
-        if len(rows) == fetch_size:
-            result += f"\n注意：结果已限制为前{fetch_size}行"
-        
-        # 添加字段映射说明
-        if any(chinese_columns[i] != columns[i] for i in range(len(columns))):
-            result += "\n\n字段映射说明:\n"
-            for i, (orig, chinese) in enumerate(zip(columns, chinese_columns)):
-                if orig != chinese:
-                    result += f"{chinese} -> {orig}\n"
-        
-        return result
-        
+        result = _run_query(backend, guarded, sql, fetch_size, binds)
     except Exception as e:
+        if should_discard_session(e):
+            # oracle_session 已丢弃断开的会话
+            raise
         logger.error(f"执行SQL查询失败: {str(e)}")
         return f"查询执行错误: {str(e)}"
+    
+    if ttl > 0:
+        _query_result_cache.set(key, (result, time.time()), ttl=ttl)
+    return result
+
+
+def _run_query(backend, guarded, sql: str, fetch_size: int, binds: Optional[Dict[str, Any]]) -> str:
+    """执行已通过检查的查询并格式化结果"""
+    with backend.session() as conn:
+        cursor = conn.cursor()
         
-    finally:
-        cursor.close()
-        conn.close()
+        try:
+            # 先获取数据，避免后续查询影响结果集
+            columns, rows = backend.execute(cursor, guarded.sql, binds, fetch_size + 1)
+            truncated = len(rows) > fetch_size
+            rows = rows[:fetch_size]
+            
+            # 检查是否有结果
+            if not rows:
+                return "查询无结果"
+            
+            # 结果已取出，在同一会话上用新的游标获取中文别名
+            try:
+                alias_cursor = conn.cursor()
+                try:
+                    chinese_columns = resolve_chinese_aliases(alias_cursor, columns, sql)
+                finally:
+                    alias_cursor.close()
+            except Exception as e:
+                logger.debug(f"获取中文别名失败，使用原始列名: {e}")
+                chinese_columns = columns.copy()
+            
+            # 格式化输出（使用中文别名）
+            header = " | ".join(chinese_columns)
+            lines = ["查询结果:", header, "-" * (len(header) + 10)]
+            lines.extend(
+                " | ".join("NULL" if item is None else str(item) for item in row)
+                for row in rows
+            )
+            result = "\n".join(lines) + "\n"
+            
+            if truncated:
+                result += (
+                    f"\n注意：结果已限制为前{fetch_size}行，"
+                    "需要完整数据请使用 export_oracle_query 导出为文件"
+                )
+            
+            # 添加字段映射说明
+            if any(chinese_columns[i] != columns[i] for i in range(len(columns))):
+                result += "\n\n字段映射说明:\n"
+                for i, (orig, chinese) in enumerate(zip(columns, chinese_columns)):
+                    if orig != chinese:
+                        result += f"{chinese} -> {orig}\n"
+            
+            return result
+            
+        finally:
+            cursor.close()
+
+
+def _bind_key(binds: Optional[Dict[str, Any]]) -> Tuple:
+    """绑定变量的缓存键，名称不区分大小写"""
+    return tuple(sorted((name.upper().lstrip(":"), repr(value)) for name, value in (binds or {}).items()))
+
+
+def _result_cache_ttl(tables) -> float:
+    """
+    查询结果的缓存时间
+    
+    取默认缓存时间与所引用表的规则中的最小值，任一表的规则为0时不缓存。
+    """
+    if not ORACLE_RESULT_CACHE_CONFIG["enabled"]:
+        return 0
+    table_ttl = ORACLE_RESULT_CACHE_CONFIG["table_ttl"]
+    return min([ORACLE_RESULT_CACHE_CONFIG["ttl"]] + [table_ttl[t] for t in tables if t in table_ttl])
 
 
-def get_column_chinese_alias(cursor, column_name: str, original_sql: str) -> Optional[str]:
+def invalidate_query_results(table_name: Optional[str] = None) -> int:
     """
-    获取字段的中文别名（从注释中获取）
+    清除查询结果缓存
+    
+    Args:
+        table_name: 只清除引用该表的查询，不提供则全部清除
+    
+    Returns:
+        清除的条目数
+    """
+    if table_name is None:
+        count = len(_query_result_cache)
+        _query_result_cache.clear()
+        return count
+    table_name = table_name.upper()
+    return _query_result_cache.invalidate_where(lambda key: table_name in key[2])
+
+
+def query_result_cache_stats() -> Dict[str, Any]:
+    """查询结果缓存的命中统计"""
+    return _query_result_cache.stats()
+
+
+def get_column_comments(cursor, table_name: str) -> Dict[str, str]:
+    """
+    获取表的全部字段注释（带缓存）
+    
+    每张表只执行一次数据字典查询，结果在进程内缓存
+    ORACLE_METADATA_CACHE_TTL 秒。
     
     Args:
         cursor: 数据库游标
-        column_name: 字段名
+        table_name: 表名
+    
+    Returns:
+        字段名到注释的映射
+    """
+    table_name = table_name.upper()
+    return _column_comment_cache.get_or_load(
+        table_name, lambda: get_db_backend().column_comments(cursor, table_name)
+    )
+
+
+def invalidate_column_comments(table_name: Optional[str] = None) -> None:
+    """
+    使字段注释缓存失效
+    
+    Args:
+        table_name: 表名，不提供时清空全部缓存
+    """
+    if table_name is None:
+        _column_comment_cache.clear()
+    else:
+        _column_comment_cache.invalidate(table_name.upper())
+
+
+def resolve_chinese_aliases(cursor, columns: List[str], original_sql: str) -> List[str]:
+    """
+    将结果列名解析为中文别名（字段注释），没有注释的列保留原名
+    
+    Args:
+        cursor: 数据库游标
+        columns: 结果列名
         original_sql: 原始SQL语句
     
     Returns:
-        中文别名或None
+        与 columns 一一对应的列名
     """
-    try:
-        # 尝试从SQL中提取表名
-        table_names = extract_table_names_from_sql(original_sql)
-        
-        for table_name in table_names:
-            # 首先尝试user_col_comments
-            try:
-                comment_sql = """
-                SELECT comments FROM user_col_comments 
-                WHERE table_name = :table_name AND column_name = :column_name
-                """
-                cursor.execute(comment_sql, {
-                    "table_name": table_name.upper(), 
-                    "column_name": column_name.upper()
-                })
-                
-                result = cursor.fetchone()
-                if result and result[0]:
-                    return result[0]
-                    
-            except Exception:
-                pass
-            
-            # 如果user_col_comments没有结果，尝试all_col_comments
-            try:
-                comment_sql = """
-                SELECT comments FROM all_col_comments 
-                WHERE table_name = :table_name AND column_name = :column_name
-                AND rownum = 1
-                """
-                cursor.execute(comment_sql, {
-                    "table_name": table_name.upper(), 
-                    "column_name": column_name.upper()
-                })
-                
-                result = cursor.fetchone()
-                if result and result[0]:
-                    return result[0]
-            except Exception:
-                continue
-                    
-    except Exception as e:
-        logger.debug(f"获取字段中文别名失败: {e}")
+    table_comments = []
+    for table_name in extract_table_names_from_sql(original_sql):
+        try:
+            table_comments.append(get_column_comments(cursor, table_name))
+        except Exception as e:
+            logger.debug(f"获取表 {table_name} 的字段注释失败: {e}")
     
-    return None
+    aliases = []
+    for column_name in columns:
+        alias = next(
+            (comments[column_name.upper()] for comments in table_comments
+             if comments.get(column_name.upper())),
+            None,
+        )
+        aliases.append(alias or column_name)
+    return aliases
 
 
 def extract_table_names_from_sql(sql: str) -> List[str]:
     """
     从SQL语句中提取表名
     
+    按 sql_guard 的记号扫描，只在 SELECT 之后的 FROM 子句中取表名：逗号分隔的每一项、
+    每个 JOIN 之后的表以及子查询中的表都会被提取，EXTRACT(YEAR FROM col) 这类函数参数中的
+    FROM 不会被当作表。schema.table 只取表名，引号标识符保留原样大小写。
+    
     Args:
         sql: SQL语句
     
     Returns:
-        表名列表
+        表名列表，按在SQL中出现的顺序去重
     """
-    # 简单的表名提取逻辑
-    sql_upper = sql.upper()
-    
-    # 匹配FROM子句中的表名（支持schema.table格式）
-    from_pattern = r'FROM\s+(?:[A-Z_][A-Z0-9_]*\.)?([A-Z_][A-Z0-9_]*)'
-    from_matches = re.findall(from_pattern, sql_upper)
-    
-    # 匹配JOIN子句中的表名（支持schema.table格式）
-    join_pattern = r'JOIN\s+(?:[A-Z_][A-Z0-9_]*\.)?([A-Z_][A-Z0-9_]*)'
-    join_matches = re.findall(join_pattern, sql_upper)
-    
-    # 匹配UPDATE语句中的表名
-    update_pattern = r'UPDATE\s+(?:[A-Z_][A-Z0-9_]*\.)?([A-Z_][A-Z0-9_]*)'
-    update_matches = re.findall(update_pattern, sql_upper)
+    try:
+        tokens = tokenize_sql(sql)
+    except SQLGuardError:
+        return []
     
-    # 合并所有表名并去重
-    table_names = list(set(from_matches + join_matches + update_matches))
+    table_names = []
+    # 每层括号一个状态：是否已出现 SELECT、是否在 FROM 子句中、下一个标识符是否为表名
+    levels = [{"select": False, "in_from": False, "expect": False}]
+    for i, token in enumerate(tokens):
+        level = levels[-1]
+        keyword = token.keyword
+        if token.value == "(":
+            level["expect"] = False
+            levels.append({"select": False, "in_from": False, "expect": False})
+        elif token.value == ")":
+            if len(levels) > 1:
+                levels.pop()
+        elif keyword == "SELECT":
+            level.update(select=True, in_from=False, expect=False)
+        elif keyword == "FROM" and level["select"]:
+            level.update(in_from=True, expect=True)
+        elif keyword in ("JOIN", "APPLY") and level["in_from"]:
+            level["expect"] = True
+        elif token.value == "," and level["in_from"]:
+            level["expect"] = True
+        elif keyword in _FROM_CLAUSE_END:
+            level.update(in_from=False, expect=False)
+        elif level["expect"]:
+            following = tokens[i + 1].value if i + 1 < len(tokens) else None
+            if token.value == "." or following == "." or keyword in ("LATERAL", "ONLY"):
+                # schema.table 只取表名
+                continue
+            level["expect"] = False
+            if following == "(" or token.kind not in ("word", "quoted"):
+                # TABLE(...) 等表函数
+                continue
+            table_names.append(keyword or token.value.strip('"'))
     
-    return table_names
+    return list(dict.fromkeys(table_names))
 
 
-@tool
+# 结束 FROM 子句的关键字
+_FROM_CLAUSE_END = {
+    "WHERE", "GROUP", "HAVING", "ORDER", "CONNECT", "START", "UNION", "INTERSECT", "MINUS",
+    "EXCEPT", "FETCH", "OFFSET", "LIMIT", "MODEL", "WINDOW", "FOR", "PIVOT", "UNPIVOT",
+}
+
+
+
+@oracle_tool
 @handle_db_error
 def get_table_relationships(table_name: str, schema_name: Optional[str] = None) -> str:
     """
@@ -368,87 +380,41 @@ def get_table_relationships(table_name: str, schema_name: Optional[str] = None)
     Returns:
         表关系信息的字符串描述
     """
-    conn = get_oracle_connection()
-    cursor = conn.cursor()
-    
-    try:
-        if schema_name:
-            sql = """
-            SELECT 
-                a.constraint_name,
-                a.column_name,
-                c_pk.table_name r_table_name,
-                b.column_name r_column_name,
-                cc1.comments local_comment,
-                cc2.comments ref_comment
-            FROM all_cons_columns a
-            JOIN all_constraints c ON a.owner = c.owner AND a.constraint_name = c.constraint_name
-            JOIN all_constraints c_pk ON c.r_owner = c_pk.owner AND c.r_constraint_name = c_pk.constraint_name
-            JOIN all_cons_columns b ON c_pk.owner = b.owner AND c_pk.constraint_name = b.constraint_name
-            LEFT JOIN all_col_comments cc1 ON a.owner = cc1.owner 
-                AND a.table_name = cc1.table_name AND a.column_name = cc1.column_name
-            LEFT JOIN all_col_comments cc2 ON c_pk.owner = cc2.owner 
-                AND c_pk.table_name = cc2.table_name AND b.column_name = cc2.column_name
-            WHERE c.constraint_type = 'R'
-            AND a.table_name = :table_name
-            AND a.owner = :schema
-            ORDER BY a.constraint_name, a.position
-            """
-            cursor.execute(sql, {"table_name": table_name.upper(), "schema": schema_name.upper()})
-        else:
-            sql = """
-            SELECT 
-                a.constraint_name,
-                a.column_name,
-                c_pk.table_name r_table_name,
-                b.column_name r_column_name,
-                cc1.comments local_comment,
-                cc2.comments ref_comment
-            FROM user_cons_columns a
-            JOIN user_constraints c ON a.constraint_name = c.constraint_name
-            JOIN user_constraints c_pk ON c.r_constraint_name = c_pk.constraint_name
-            JOIN user_cons_columns b ON c_pk.constraint_name = b.constraint_name
-            LEFT JOIN user_col_comments cc1 ON a.table_name = cc1.table_name 
-                AND a.column_name = cc1.column_name
-            LEFT JOIN user_col_comments cc2 ON c_pk.table_name = cc2.table_name 
-                AND b.column_name = cc2.column_name
-            WHERE c.constraint_type = 'R'
-            AND a.table_name = :table_name
-            ORDER BY a.constraint_name, a.position
-            """
-            cursor.execute(sql, {"table_name": table_name.upper()})
+    backend = get_db_backend()
+    with backend.session() as conn:
+        cursor = conn.cursor()
         
-        relationships = cursor.fetchall()
-        
-        if not relationships:
-            return f"表 {table_name} 没有外键关系"
-        
-        result = f"表 {table_name} 的外键关系:\n"
-        result += "约束名 | 本表字段(注释) | 引用表 | 引用字段(注释)\n"
-        result += "-" * 80 + "\n"
-        
-        for rel in relationships:
-            constraint_name, column_name, r_table_name, r_column_name, local_comment, ref_comment = rel
+        try:
+            relationships = backend.relationships(cursor, table_name, schema_name)
+            
+            if not relationships:
+                return f"表 {table_name} 没有外键关系"
             
-            # 格式化字段显示（包含注释）
-            local_field = f"{column_name}"
-            if local_comment:
-                local_field += f"({local_comment})"
+            result = f"表 {table_name} 的外键关系:\n"
+            result += "约束名 | 本表字段(注释) | 引用表 | 引用字段(注释)\n"
+            result += "-" * 80 + "\n"
+            
+            for rel in relationships:
+                constraint_name, column_name, r_table_name, r_column_name, local_comment, ref_comment = rel
+                
+                # 格式化字段显示（包含注释）
+                local_field = f"{column_name}"
+                if local_comment:
+                    local_field += f"({local_comment})"
+                    
+                ref_field = f"{r_column_name}"
+                if ref_comment:
+                    ref_field += f"({ref_comment})"
                 
-            ref_field = f"{r_column_name}"
-            if ref_comment:
-                ref_field += f"({ref_comment})"
+                result += f"{constraint_name} | {local_field} | {r_table_name} | {ref_field}\n"
             
-            result += f"{constraint_name} | {local_field} | {r_table_name} | {ref_field}\n"
-        
-        return result
-        
-    finally:
-        cursor.close()
-        conn.close()
+            return result
+            
+        finally:
+            cursor.close()
 
 
-@tool
+@oracle_tool
 @handle_db_error
 def get_table_indexes(table_name: str, schema_name: Optional[str] = None) -> str:
     """
@@ -461,71 +427,36 @@ def get_table_indexes(table_name: str, schema_name: Optional[str] = None) -> str
     Returns:
         索引信息的字符串描述
     """
-    conn = get_oracle_connection()
-    cursor = conn.cursor()
-    
-    try:
-        if schema_name:
-            sql = """
-            SELECT 
-                i.index_name,
-                i.index_type,
-                i.uniqueness,
-                ic.column_name,
-                ic.column_position,
-                cc.comments
-            FROM all_indexes i
-            JOIN all_ind_columns ic ON i.owner = ic.index_owner AND i.index_name = ic.index_name
-            LEFT JOIN all_col_comments cc ON ic.table_owner = cc.owner 
-                AND ic.table_name = cc.table_name AND ic.column_name = cc.column_name
-            WHERE i.table_name = :table_name AND i.owner = :schema
-            ORDER BY i.index_name, ic.column_position
-            """
-            cursor.execute(sql, {"table_name": table_name.upper(), "schema": schema_name.upper()})
-        else:
-            sql = """
-            SELECT 
-                i.index_name,
-                i.index_type,
-                i.uniqueness,
-                ic.column_name,
-                ic.column_position,
-                cc.comments
-            FROM user_indexes i
-            JOIN user_ind_columns ic ON i.index_name = ic.index_name
-            LEFT JOIN user_col_comments cc ON ic.table_name = cc.table_name 
-                AND ic.column_name = cc.column_name
-            WHERE i.table_name = :table_name
-            ORDER BY i.index_name, ic.column_position
-            """
-            cursor.execute(sql, {"table_name": table_name.upper()})
-        
-        indexes = cursor.fetchall()
-        
-        if not indexes:
-            return f"表 {table_name} 没有索引"
-        
-        result = f"表 {table_name} 的索引信息:\n"
-        result += "索引名 | 类型 | 唯一性 | 字段名(注释) | 位置\n"
-        result += "-" * 70 + "\n"
+    backend = get_db_backend()
+    with backend.session() as conn:
+        cursor = conn.cursor()
         
-        for idx in indexes:
-            index_name, index_type, uniqueness, column_name, position, comment = idx
+        try:
+            indexes = backend.indexes(cursor, table_name, schema_name)
             
-            # 格式化字段显示（包含注释）
-            field_display = column_name
-            if comment:
-                field_display += f"({comment})"
+            if not indexes:
+                return f"表 {table_name} 没有索引"
             
-            uniqueness_display = "唯一" if uniqueness == "UNIQUE" else "非唯一"
+            result = f"表 {table_name} 的索引信息:\n"
+            result += "索引名 | 类型 | 唯一性 | 字段名(注释) | 位置\n"
+            result += "-" * 70 + "\n"
             
-            result += f"{index_name} | {index_type} | {uniqueness_display} | {field_display} | {position}\n"
-        
-        return result
-        
-    finally:
-        cursor.close()
-        conn.close()
+            for idx in indexes:
+                index_name, index_type, uniqueness, column_name, position, comment = idx
+                
+                # 格式化字段显示（包含注释）
+                field_display = column_name
+                if comment:
+                    field_display += f"({comment})"
+                
+                uniqueness_display = "唯一" if uniqueness == "UNIQUE" else "非唯一"
+                
+                result += f"{index_name} | {index_type} | {uniqueness_display} | {field_display} | {position}\n"
+            
+            return result
+            
+        finally:
+            cursor.close()
 
 
 # 导出工具
@@ -0,0 +1,222 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from langchain_core.tools import BaseTool, tool
+
+from src.config.database import ORACLE_EXECUTOR_CONFIG
+from src.utils.startup import LazySingleton
+
+logger = logging.getLogger(__name__)
+
+# 工作线程正在执行的调用，oracle_session 获取会话后登记到这里，用于取消
+_current_call = threading.local()
+
+
+class OracleExecutorBusy(RuntimeError):
+    """等待执行的Oracle调用超过队列上限"""
+
+
+class OracleCall:
+    """提交到执行器的一次调用，记录其使用的会话以便中途取消"""
+
+    def __init__(self):
+        self.future: Optional[Future] = None
+        self.submitted_at = time.monotonic()
+        self.started_at: Optional[float] = None
+        self._connection = None
+        self._cancelled = False
+        self._lock = threading.Lock()
+
+    def attach(self, connection) -> None:
+        with self._lock:
+            self._connection = connection
+            cancelled = self._cancelled
+        if cancelled:
+            connection.cancel()
+
+    def detach(self) -> None:
+        with self._lock:
+            self._connection = None
+
+    def cancel(self) -> None:
+        """未开始的调用直接移出队列，执行中的调用中断当前数据库操作"""
+        if self.future is not None and self.future.cancel():
+            return
+        with self._lock:
+            self._cancelled = True
+            connection = self._connection
+        if connection is not None:
+            try:
+                connection.cancel()
+            except Exception as e:
+                logger.warning(f"取消Oracle调用失败: {e}")
+
+
+class OracleExecutor:
+    """
+    Oracle工具专用的有界线程池
+
+    数据库调用不再占用事件循环的默认线程池，慢查询只会在本执行器内排队。
+    排队数量超过 max_queue 时直接拒绝。队列深度、耗时与取消次数记录在
+    stats() 中。
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="oracle"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "rejected": 0,
+            "timeouts": 0,
+        }
+        self._peak_queued = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+
+    def submit(self, func: Callable, *args, **kwargs) -> OracleCall:
+        call = OracleCall()
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._counters["rejected"] += 1
+                raise OracleExecutorBusy(
+                    f"数据库执行队列已满（{self._queued} 个调用等待中），请稍后重试"
+                )
+            self._queued += 1
+            self._peak_queued = max(self._peak_queued, self._queued)
+            self._counters["submitted"] += 1
+
+        context = contextvars.copy_context()
+        call.future = self._executor.submit(
+            context.run, self._run, call, func, args, kwargs
+        )
+        call.future.add_done_callback(functools.partial(self._on_done, call))
+        return call
+
+    def _run(self, call: OracleCall, func: Callable, args, kwargs) -> Any:
+        call.started_at = time.monotonic()
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+            self._wait_total += call.started_at - call.submitted_at
+        _current_call.value = call
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current_call.value = None
+            with self._lock:
+                self._running -= 1
+                self._run_total += time.monotonic() - call.started_at
+
+    def _on_done(self, call: OracleCall, future: Future) -> None:
+        with self._lock:
+            if future.cancelled():
+                # 在队列中被取消，_run 没有执行
+                self._queued -= 1
+                self._counters["cancelled"] += 1
+            elif call._cancelled:
+                self._counters["cancelled"] += 1
+            elif future.exception() is not None:
+                self._counters["failed"] += 1
+            else:
+                self._counters["completed"] += 1
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self._counters["timeouts"] += 1
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            started = self._counters["submitted"] - self._queued
+            finished = started - self._running
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self._queued,
+                "running": self._running,
+                "peak_queued": self._peak_queued,
+                **self._counters,
+                "avg_wait_ms": (
+                    round(self._wait_total / started * 1000, 2) if started > 0 else 0.0
+                ),
+                "avg_run_ms": (
+                    round(self._run_total / finished * 1000, 2) if finished > 0 else 0.0
+                ),
+            }
+
+
+_oracle_executor = LazySingleton(
+    "oracle_executor",
+    lambda: OracleExecutor(
+        ORACLE_EXECUTOR_CONFIG["workers"], ORACLE_EXECUTOR_CONFIG["max_queue"]
+    ),
+)
+
+
+def get_oracle_executor() -> OracleExecutor:
+    """获取进程级Oracle执行器，首次调用时创建"""
+    return _oracle_executor.get()
+
+
+def current_oracle_call() -> Optional[OracleCall]:
+    """当前工作线程正在执行的调用，不在执行器中时为 None"""
+    return getattr(_current_call, "value", None)
+
+
+async def run_oracle_call(func: Callable, *args, **kwargs) -> Any:
+    """
+    在Oracle执行器上运行同步调用并等待结果
+
+    等待方被取消（例如客户端断开导致工作流停止）时，同时取消排队中的调用
+    或中断正在执行的数据库操作。
+    """
+    call = get_oracle_executor().submit(func, *args, **kwargs)
+    try:
+        return await asyncio.wrap_future(call.future)
+    except asyncio.CancelledError:
+        call.cancel()
+        raise
+
+
+def oracle_tool(func: Callable) -> BaseTool:
+    """
+    与 @tool 相同，另外为工具提供在Oracle执行器上运行的异步实现
+
+    智能体通过 ainvoke 调用工具时走执行器；同步 invoke 仍在调用线程中执行。
+    """
+    oracle_tool_ = tool(func)
+
+    async def coroutine(*args, **kwargs):
+        try:
+            return await run_oracle_call(func, *args, **kwargs)
+        except OracleExecutorBusy as e:
+            logger.warning(str(e))
+            return f"数据库操作错误: {e}"
+
+    oracle_tool_.coroutine = coroutine
+    return oracle_tool_
+
+
+def close_oracle_executor() -> None:
+    """关闭执行器（如已创建），排队中的调用被取消"""
+    if not _oracle_executor.initialized:
+        return
+    _oracle_executor.get().shutdown()
+    _oracle_executor.reset()
@@ -0,0 +1,305 @@
+import csv
+import hashlib
+import logging
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import cx_Oracle
+
+from src.config.database import ORACLE_EXPORT_CONFIG
+from src.utils.file_manager import EXECUTIONS_DIR, current_task_id
+from .oracle_db import handle_db_error
+from .oracle_executor import oracle_tool
+from .oracle_pool import oracle_session, should_discard_session
+from .sql_guard import SQLGuardError, guard_query
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 未安装 pyarrow 时只能导出 CSV
+    pa = None
+    pq = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FORMATS = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+# 统计预览中每列精确计数的不同值上限
+DISTINCT_LIMIT = 1000
+PREVIEW_ROWS = 5
+PREVIEW_VALUE_CHARS = 40
+
+_NAME_PATTERN = re.compile(r"[^0-9A-Za-z_\-一-鿿]+")
+_TASK_ID_PATTERN = re.compile(r"^[0-9A-Za-z_\-]+$")
+
+
+class _ColumnProfile:
+    """边写边统计的列概要：空值、不同值、最小/最大值与均值"""
+
+    def __init__(self, name: str, type_name: str):
+        self.name = name
+        self.type_name = type_name
+        self.nulls = 0
+        self.count = 0
+        self.minimum = None
+        self.maximum = None
+        self.total = 0.0
+        self.numeric = True
+        self.distinct: Optional[set] = set()
+
+    def update(self, values: List[Any]) -> None:
+        for value in values:
+            if value is None:
+                self.nulls += 1
+                continue
+            self.count += 1
+            if self.distinct is not None:
+                self.distinct.add(value)
+                if len(self.distinct) > DISTINCT_LIMIT:
+                    self.distinct = None
+            try:
+                if self.minimum is None or value < self.minimum:
+                    self.minimum = value
+                if self.maximum is None or value > self.maximum:
+                    self.maximum = value
+            except TypeError:
+                pass
+            if self.numeric:
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    self.total += value
+                else:
+                    self.numeric = False
+
+    def describe(self) -> str:
+        rows = self.count + self.nulls
+        parts = [f"{self.name} {self.type_name}"]
+        parts.append(f"空值 {self.nulls / rows:.1%}" if rows else "空值 -")
+        distinct = (
+            f">{DISTINCT_LIMIT}" if self.distinct is None else str(len(self.distinct))
+        )
+        parts.append(f"不同值 {distinct}")
+        if self.count:
+            parts.append(f"最小 {_short(self.minimum)}")
+            parts.append(f"最大 {_short(self.maximum)}")
+            if self.numeric:
+                parts.append(f"均值 {self.total / self.count:.4g}")
+        return " | ".join(parts)
+
+
+def _short(value: Any) -> str:
+    text = "NULL" if value is None else str(value)
+    return (
+        text if len(text) <= PREVIEW_VALUE_CHARS else text[:PREVIEW_VALUE_CHARS] + "…"
+    )
+
+
+def _arrow_type(description):
+    """按 cursor.description 的 Oracle 类型确定 Arrow 列类型"""
+    _, type_code, _, _, precision, scale, _ = description
+    if type_code == cx_Oracle.DB_TYPE_NUMBER:
+        if scale == 0 and precision and precision <= 18:
+            return pa.int64()
+        return pa.float64()
+    if type_code in (cx_Oracle.DB_TYPE_BINARY_FLOAT, cx_Oracle.DB_TYPE_BINARY_DOUBLE):
+        return pa.float64()
+    if type_code == cx_Oracle.DB_TYPE_BINARY_INTEGER:
+        return pa.int64()
+    if type_code in (
+        cx_Oracle.DB_TYPE_DATE,
+        cx_Oracle.DB_TYPE_TIMESTAMP,
+        cx_Oracle.DB_TYPE_TIMESTAMP_TZ,
+        cx_Oracle.DB_TYPE_TIMESTAMP_LTZ,
+    ):
+        return pa.timestamp("us")
+    if type_code in (
+        cx_Oracle.DB_TYPE_RAW,
+        cx_Oracle.DB_TYPE_LONG_RAW,
+        cx_Oracle.DB_TYPE_BLOB,
+    ):
+        return pa.binary()
+    return pa.string()
+
+
+def _type_name(description) -> str:
+    type_code = description[1]
+    return getattr(type_code, "name", str(type_code)).replace("DB_TYPE_", "")
+
+
+def _output_type_handler(cursor, name, default_type, size, precision, scale):
+    # LOB 按值取回，避免每行一次额外往返
+    if default_type in (cx_Oracle.DB_TYPE_CLOB, cx_Oracle.DB_TYPE_NCLOB):
+        return cursor.var(cx_Oracle.DB_TYPE_LONG, arraysize=cursor.arraysize)
+    if default_type == cx_Oracle.DB_TYPE_BLOB:
+        return cursor.var(cx_Oracle.DB_TYPE_LONG_RAW, arraysize=cursor.arraysize)
+
+
+class _CsvWriter:
+    def __init__(self, path: Path, columns: List[str]):
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(columns)
+
+    def write(self, rows: List[tuple]) -> None:
+        self._writer.writerows(rows)
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ArrowWriter:
+    def __init__(self, path: Path, description, export_format: str):
+        self.schema = pa.schema([(d[0], _arrow_type(d)) for d in description])
+        if export_format == "parquet":
+            self._writer = pq.ParquetWriter(str(path), self.schema)
+        else:
+            self._writer = pa.ipc.new_file(str(path), self.schema)
+
+    def write(self, rows: List[tuple]) -> None:
+        arrays = []
+        for values, field in zip(zip(*rows), self.schema):
+            if pa.types.is_string(field.type):
+                values = [
+                    v if v is None or isinstance(v, str) else str(v) for v in values
+                ]
+            arrays.append(pa.array(values, type=field.type))
+        self._writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def _export_path(
+    task_id: str, name: Optional[str], normalized_sql: str, suffix: str
+) -> Path:
+    export_dir = Path(EXECUTIONS_DIR) / task_id / "exports"
+    export_dir.mkdir(parents=True, exist_ok=True)
+    stem = _NAME_PATTERN.sub("_", name).strip("_") if name else ""
+    if not stem:
+        digest = hashlib.sha1(normalized_sql.encode("utf-8")).hexdigest()[:8]
+        stem = f"query_{datetime.now().strftime('%H%M%S')}_{digest}"
+    return export_dir / f"{stem}{suffix}"
+
+
+@oracle_tool
+@handle_db_error
+def export_oracle_query(
+    sql: str,
+    export_format: str = "parquet",
+    name: Optional[str] = None,
+    binds: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    将大结果集查询流式导出为 Parquet/Arrow/CSV 文件，只返回文件路径、字段结构、行数和统计预览
+
+    适用于需要交给 coder 在 Python 中分析或绘图的大量数据（数万行以上）。
+    读取方式：pandas.read_parquet(路径) / pyarrow.ipc.open_file(路径) / pandas.read_csv(路径)
+
+    Args:
+        sql: 只读查询语句
+        export_format: parquet（默认）、arrow 或 csv
+        name: 导出文件名（不含扩展名），默认按查询生成
+        binds: 绑定变量，例如 {"start_date": "2024-01-01"}，对应SQL中的 :start_date
+
+    Returns:
+        导出文件的路径、字段结构、行数与统计预览
+    """
+    # 只写入当前任务的目录，任务ID不由模型指定
+    task_id = current_task_id.get()
+    if not task_id or not _TASK_ID_PATTERN.match(task_id):
+        return "错误：无法确定当前任务ID，只能在任务执行中导出"
+
+    export_format = export_format.lower()
+    if export_format not in EXPORT_FORMATS:
+        return (
+            f"错误：不支持的导出格式 {export_format}，可选: {', '.join(EXPORT_FORMATS)}"
+        )
+    note = ""
+    if export_format != "csv" and pa is None:
+        note = "（未安装 pyarrow，已改为导出 CSV）"
+        export_format = "csv"
+
+    max_rows = ORACLE_EXPORT_CONFIG["max_rows"]
+    try:
+        guarded = guard_query(sql, max_rows + 1)
+    except SQLGuardError as e:
+        return f"错误：{e}"
+
+    path = _export_path(
+        task_id, name, guarded.normalized, EXPORT_FORMATS[export_format]
+    )
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    with oracle_session(call_timeout=ORACLE_EXPORT_CONFIG["call_timeout"]) as conn:
+        cursor = conn.cursor()
+        writer = None
+        try:
+            cursor.arraysize = ORACLE_EXPORT_CONFIG["arraysize"]
+            cursor.prefetchrows = ORACLE_EXPORT_CONFIG["prefetchrows"]
+            cursor.outputtypehandler = _output_type_handler
+            cursor.execute(guarded.sql, binds or {})
+
+            description = cursor.description
+            columns = [d[0] for d in description]
+            profiles = [_ColumnProfile(d[0], _type_name(d)) for d in description]
+            if export_format == "csv":
+                writer = _CsvWriter(tmp_path, columns)
+            else:
+                writer = _ArrowWriter(tmp_path, description, export_format)
+
+            row_count = 0
+            preview: List[tuple] = []
+            truncated = False
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+                if row_count + len(rows) > max_rows:
+                    rows = rows[: max_rows - row_count]
+                    truncated = True
+                writer.write(rows)
+                for profile, values in zip(profiles, zip(*rows)):
+                    profile.update(values)
+                preview.extend(rows[: PREVIEW_ROWS - len(preview)])
+                row_count += len(rows)
+                if truncated:
+                    break
+
+            writer.close()
+            writer = None
+            os.replace(tmp_path, path)
+
+        except Exception as e:
+            if should_discard_session(e):
+                raise
+            logger.error(f"导出查询结果失败: {str(e)}")
+            return f"导出执行错误: {str(e)}"
+
+        finally:
+            if writer is not None:
+                writer.close()
+            if tmp_path.exists():
+                tmp_path.unlink()
+            cursor.close()
+
+    logger.info(f"查询结果已导出: {path} ({row_count} 行)")
+    lines = [
+        f"查询结果已导出{note}: {path}",
+        f"格式: {export_format} | 行数: {row_count}"
+        + (f"（已截断为前 {max_rows} 行）" if truncated else ""),
+        "",
+        "字段统计:",
+    ]
+    lines.extend(f"- {profile.describe()}" for profile in profiles)
+    if preview:
+        lines.append("")
+        lines.append(f"前 {len(preview)} 行:")
+        lines.append(" | ".join(columns))
+        lines.extend(" | ".join(_short(value) for value in row) for row in preview)
+    return "\n".join(lines)
+
+
+# 导出工具
+oracle_export_tool = export_oracle_query
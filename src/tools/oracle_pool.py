@@ -0,0 +1,173 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+import cx_Oracle
+
+from src.config.database import (
+    ORACLE_DB_CONFIG,
+    ORACLE_POOL_CONFIG,
+    get_connection_string,
+    validate_db_config,
+)
+from src.utils.startup import LazySingleton
+from .oracle_executor import current_oracle_call, get_oracle_executor
+
+logger = logging.getLogger(__name__)
+
+# 表示会话已断开的 ORA 错误码，出现时会话从池中丢弃而不是归还
+_CONNECTION_LOST_CODES = {28, 1012, 1092, 2396, 3113, 3114, 3135, 12153, 12537, 12547}
+_CONNECTION_LOST_MESSAGES = ("DPI-1010", "DPI-1080")
+# 超过 callTimeout 后会话状态不确定，同样丢弃
+_CALL_TIMEOUT_MESSAGE = "DPI-1067"
+
+
+def _create_pool() -> cx_Oracle.SessionPool:
+    if not validate_db_config():
+        raise ValueError(
+            "数据库连接参数未完整配置，请设置环境变量: "
+            "ORACLE_HOST, ORACLE_SERVICE_NAME, ORACLE_USERNAME, ORACLE_PASSWORD"
+        )
+
+    dsn = cx_Oracle.makedsn(
+        ORACLE_DB_CONFIG["host"],
+        ORACLE_DB_CONFIG["port"],
+        service_name=ORACLE_DB_CONFIG["service_name"],
+    )
+    pool = cx_Oracle.SessionPool(
+        user=ORACLE_DB_CONFIG["username"],
+        password=ORACLE_DB_CONFIG["password"],
+        dsn=dsn,
+        min=ORACLE_POOL_CONFIG["min"],
+        max=ORACLE_POOL_CONFIG["max"],
+        increment=ORACLE_POOL_CONFIG["increment"],
+        threaded=True,
+        getmode=cx_Oracle.SPOOL_ATTRVAL_TIMEDWAIT,
+        wait_timeout=ORACLE_POOL_CONFIG["wait_timeout"],
+        timeout=ORACLE_POOL_CONFIG["timeout"],
+        ping_interval=ORACLE_POOL_CONFIG["ping_interval"],
+        stmtcachesize=ORACLE_POOL_CONFIG["stmtcachesize"],
+        encoding="UTF-8",
+    )
+    logger.info(
+        f"Oracle会话池已创建: {get_connection_string()} "
+        f"(min={pool.min}, max={pool.max}, increment={pool.increment})"
+    )
+    return pool
+
+
+_oracle_pool = LazySingleton("oracle_pool", _create_pool)
+
+
+def get_oracle_pool() -> cx_Oracle.SessionPool:
+    """获取进程级Oracle会话池，首次调用时创建"""
+    return _oracle_pool.get()
+
+
+def is_connection_lost(error: Exception) -> bool:
+    """判断数据库错误是否表示会话已断开"""
+    err = error.args[0] if getattr(error, "args", None) else None
+    if getattr(err, "code", None) in _CONNECTION_LOST_CODES:
+        return True
+    message = getattr(err, "message", None) or str(error)
+    return any(marker in message for marker in _CONNECTION_LOST_MESSAGES)
+
+
+def is_call_timeout(error: Exception) -> bool:
+    """判断数据库错误是否为单次往返超时"""
+    return _CALL_TIMEOUT_MESSAGE in str(error)
+
+
+def should_discard_session(error: Exception) -> bool:
+    """
+    判断错误发生后是否需要丢弃会话
+
+    工具在会话内捕获异常时，这类错误需要重新抛出，交给 oracle_session 处理。
+    """
+    return isinstance(error, cx_Oracle.DatabaseError) and (
+        is_connection_lost(error) or is_call_timeout(error)
+    )
+
+
+@contextmanager
+def oracle_session(
+    call_timeout: Optional[int] = None,
+) -> Iterator[cx_Oracle.Connection]:
+    """
+    从会话池获取一个会话，使用完毕后归还
+
+    每次往返受 call_timeout 毫秒限制（默认 ORACLE_CALL_TIMEOUT）。在Oracle
+    执行器中运行时，会话登记到当前调用，调用被取消时中断正在执行的操作。
+    会话已断开或往返超时时丢弃该会话，由会话池按需重新创建。
+
+    Args:
+        call_timeout: 单次往返超时时间(毫秒)，0 表示不限制
+
+    Yields:
+        Oracle连接
+    """
+    pool = get_oracle_pool()
+    connection = pool.acquire()
+    connection.callTimeout = (
+        ORACLE_POOL_CONFIG["call_timeout"] if call_timeout is None else call_timeout
+    )
+    call = current_oracle_call()
+    if call is not None:
+        call.attach(connection)
+    lost = False
+    try:
+        yield connection
+    except cx_Oracle.DatabaseError as e:
+        if is_call_timeout(e):
+            logger.warning(f"Oracle调用超过 {connection.callTimeout}ms，已中断")
+            get_oracle_executor().record_timeout()
+            lost = True
+        else:
+            lost = is_connection_lost(e)
+        raise
+    finally:
+        if call is not None:
+            call.detach()
+        if lost:
+            logger.warning("Oracle会话已断开，从会话池中丢弃")
+            pool.drop(connection)
+        else:
+            pool.release(connection)
+
+
+def check_oracle_pool() -> Dict[str, Any]:
+    """
+    会话池健康检查：获取一个会话并ping数据库
+
+    Returns:
+        会话池状态与检查结果
+    """
+    status: Dict[str, Any] = {"healthy": False}
+    try:
+        pool = get_oracle_pool()
+        started = time.perf_counter()
+        with oracle_session() as connection:
+            connection.ping()
+        status.update(
+            healthy=True,
+            ping_ms=round((time.perf_counter() - started) * 1000, 2),
+        )
+        status.update(opened=pool.opened, busy=pool.busy, max=pool.max)
+    except Exception as e:
+        logger.error(f"Oracle会话池健康检查失败: {e}")
+        status["error"] = str(e)
+    return status
+
+
+def close_oracle_pool() -> None:
+    """关闭会话池（如已创建），用于进程退出时释放数据库会话"""
+    if not _oracle_pool.initialized:
+        return
+    try:
+        _oracle_pool.get().close(force=True)
+        logger.info("Oracle会话池已关闭")
+    except Exception as e:
+        logger.error(f"关闭Oracle会话池失败: {e}")
+    finally:
+        _oracle_pool.reset()
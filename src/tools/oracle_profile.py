@@ -0,0 +1,360 @@
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+
+from src.config.database import (
+    ORACLE_DB_CONFIG,
+    ORACLE_METADATA_CACHE_TTL,
+    ORACLE_PROFILE_CONFIG,
+)
+from src.utils.cache import TTLCache
+from .oracle_db import handle_db_error
+from .oracle_executor import oracle_tool
+from .oracle_pool import oracle_session, should_discard_session
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_TYPES = {"NUMBER", "FLOAT", "INTEGER", "BINARY_FLOAT", "BINARY_DOUBLE"}
+TEXT_TYPES = {"VARCHAR2", "CHAR", "NVARCHAR2", "NCHAR"}
+# 只统计空值的类型，不能比较大小或计算不同值
+NULL_ONLY_TYPES = {"CLOB", "NCLOB", "BLOB", "RAW"}
+
+HISTOGRAM_BUCKETS = 10
+# 固定种子，同一次画像的多条查询读取同一个样本
+SAMPLE_SEED = 42
+VALUE_CHARS = 30
+
+# 表画像缓存：(模式, 表名, top_k) -> 画像文本
+_profile_cache: TTLCache[str] = TTLCache(ttl=ORACLE_METADATA_CACHE_TTL, maxsize=100)
+
+TABLE_STATS_SQL = """
+SELECT t.num_rows, t.last_analyzed, s.stale_stats
+FROM all_tables t
+LEFT JOIN all_tab_statistics s ON s.owner = t.owner AND s.table_name = t.table_name
+    AND s.partition_name IS NULL
+WHERE t.owner = :owner AND t.table_name = :table_name
+"""
+
+COLUMN_STATS_SQL = """
+SELECT c.column_name, c.data_type, s.num_distinct, s.num_nulls
+FROM all_tab_columns c
+LEFT JOIN all_tab_col_statistics s ON s.owner = c.owner AND s.table_name = c.table_name
+    AND s.column_name = c.column_name
+WHERE c.owner = :owner AND c.table_name = :table_name
+ORDER BY c.column_id
+"""
+
+
+def _base_type(data_type: str) -> str:
+    # TIMESTAMP(6) WITH TIME ZONE -> TIMESTAMP
+    return data_type.split("(")[0].split(" ")[0]
+
+
+def _is_ordered(data_type: str) -> bool:
+    base = _base_type(data_type)
+    return base in NUMERIC_TYPES or base in TEXT_TYPES or base in ("DATE", "TIMESTAMP")
+
+
+def _is_histogram_type(data_type: str) -> bool:
+    base = _base_type(data_type)
+    return base in NUMERIC_TYPES or base in ("DATE", "TIMESTAMP")
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _stats_are_fresh(num_rows, last_analyzed, stale_stats) -> bool:
+    if num_rows is None or last_analyzed is None or stale_stats == "YES":
+        return False
+    max_age = timedelta(days=ORACLE_PROFILE_CONFIG["stats_max_age_days"])
+    return datetime.now() - last_analyzed <= max_age
+
+
+def _sample_source(
+    owner: str, table_name: str, columns: List[str], num_rows: Optional[int]
+) -> Tuple[str, str]:
+    """
+    生成样本子查询与样本说明
+
+    有行数统计时按 sample_rows 换算 SAMPLE 百分比；没有统计信息时只读取
+    前 sample_rows 行，避免对未知大小的表做全表扫描。
+    """
+    sample_rows = ORACLE_PROFILE_CONFIG["sample_rows"]
+    select_list = ", ".join(_quote(c) for c in columns)
+    source = f"{_quote(owner)}.{_quote(table_name)}"
+    if num_rows is None:
+        return (
+            f"SELECT /*+ MATERIALIZE */ {select_list} FROM {source} WHERE ROWNUM <= {sample_rows}",
+            f"无统计信息，读取前 {sample_rows} 行",
+        )
+    if num_rows > sample_rows:
+        percent = max(sample_rows * 100 / num_rows, 0.000001)
+        return (
+            f"SELECT /*+ MATERIALIZE */ {select_list} FROM {source} "
+            f"SAMPLE ({percent:.6f}) SEED ({SAMPLE_SEED})",
+            f"SAMPLE {percent:.4g}%",
+        )
+    return f"SELECT /*+ MATERIALIZE */ {select_list} FROM {source}", "全表"
+
+
+class _ColumnStats:
+    def __init__(self, name: str, data_type: str, num_distinct=None, num_nulls=None):
+        self.name = name
+        self.data_type = data_type
+        self.num_distinct = num_distinct
+        self.num_nulls = num_nulls
+        self.num_rows: Optional[int] = None
+        self.non_null: Optional[int] = None
+        self.distinct: Optional[int] = None
+        self.minimum = None
+        self.maximum = None
+        self.top_values: List[Tuple[str, int]] = []
+        self.histogram: Dict[int, int] = {}
+
+
+def _aggregate_sql(
+    sample_sql: str, columns: List[_ColumnStats], fresh: bool
+) -> Tuple[str, List[Tuple[_ColumnStats, str]]]:
+    """生成一次扫描样本的聚合查询，返回SQL与结果列的含义"""
+    expressions = ["COUNT(*)"]
+    fields: List[Tuple[_ColumnStats, str]] = []
+    for column in columns:
+        name = _quote(column.name)
+        if not fresh:
+            expressions.append(f"COUNT({name})")
+            fields.append((column, "non_null"))
+            if _base_type(column.data_type) not in NULL_ONLY_TYPES:
+                expressions.append(f"APPROX_COUNT_DISTINCT({name})")
+                fields.append((column, "distinct"))
+        if _is_ordered(column.data_type):
+            expressions.extend([f"MIN({name})", f"MAX({name})"])
+            fields.extend([(column, "minimum"), (column, "maximum")])
+    return f"WITH s AS ({sample_sql}) SELECT {', '.join(expressions)} FROM s", fields
+
+
+def _distribution_sql(
+    sample_sql: str, columns: List[_ColumnStats], top_k: int
+) -> Tuple[Optional[str], Dict[str, Any]]:
+    """生成 top-k 与等宽直方图的 UNION ALL 查询"""
+    branches = []
+    binds: Dict[str, Any] = {}
+    for i, column in enumerate(columns):
+        name = _quote(column.name)
+        column_branches = []
+        if column.non_null is None:
+            # 统计信息未过期时，不同值与非空行数都取自统计信息
+            distinct = column.num_distinct
+            non_null = (column.num_rows or 0) - (column.num_nulls or 0)
+        else:
+            distinct, non_null = column.distinct, column.non_null
+        # 只对有重复值的列统计高频值，主键一类的列没有意义
+        if (
+            _is_ordered(column.data_type)
+            and distinct
+            and non_null
+            and distinct <= non_null / 2
+        ):
+            column_branches.append(
+                f"SELECT * FROM (SELECT :c{i} col, 'T' kind, SUBSTR(TO_CHAR({name}), 1, 100) val, "
+                f"COUNT(*) cnt FROM s WHERE {name} IS NOT NULL GROUP BY {name} "
+                f"ORDER BY cnt DESC FETCH FIRST {top_k} ROWS ONLY)"
+            )
+        if (
+            _is_histogram_type(column.data_type)
+            and column.minimum is not None
+            and column.maximum is not None
+            and column.minimum < column.maximum
+        ):
+            binds[f"lo{i}"] = column.minimum
+            binds[f"hi{i}"] = column.maximum
+            bucket = f"LEAST(WIDTH_BUCKET({name}, :lo{i}, :hi{i}, {HISTOGRAM_BUCKETS}), {HISTOGRAM_BUCKETS})"
+            column_branches.append(
+                f"SELECT :c{i} col, 'H' kind, TO_CHAR({bucket}) val, COUNT(*) cnt "
+                f"FROM s WHERE {name} IS NOT NULL GROUP BY {bucket}"
+            )
+        if column_branches:
+            binds[f"c{i}"] = column.name
+            branches.extend(column_branches)
+    if not branches:
+        return None, {}
+    return f"WITH s AS ({sample_sql}) " + " UNION ALL ".join(branches), binds
+
+
+def _short(value: Any) -> str:
+    if isinstance(value, datetime):
+        text = value.strftime("%Y-%m-%d %H:%M:%S").replace(" 00:00:00", "")
+    elif isinstance(value, float):
+        text = f"{value:.6g}"
+    else:
+        text = str(value)
+    return text if len(text) <= VALUE_CHARS else text[:VALUE_CHARS] + "…"
+
+
+def format_profile(
+    owner: str,
+    table_name: str,
+    row_info: str,
+    sample_info: str,
+    sample_count: int,
+    columns: List[_ColumnStats],
+    skipped: int,
+) -> str:
+    """将画像整理为每列一行的紧凑摘要"""
+    lines = [
+        f"表画像 {owner}.{table_name}",
+        f"{row_info} | 样本: {sample_info}, {sample_count} 行",
+        "",
+        "字段 | 类型 | 空值率 | 不同值 | 最小 | 最大 | 高频值 | 分布",
+    ]
+    for column in columns:
+        if column.non_null is not None:
+            null_ratio = (
+                (sample_count - column.non_null) / sample_count
+                if sample_count
+                else None
+            )
+        elif column.num_nulls is not None and column.num_rows:
+            null_ratio = column.num_nulls / column.num_rows
+        else:
+            null_ratio = None
+        distinct = column.num_distinct if column.distinct is None else column.distinct
+        top_values = (
+            ", ".join(
+                f"{_short(value)}({count / sample_count:.0%})"
+                for value, count in column.top_values
+            )
+            if sample_count
+            else ""
+        )
+        histogram = (
+            " ".join(
+                str(column.histogram.get(bucket, 0))
+                for bucket in range(1, HISTOGRAM_BUCKETS + 1)
+            )
+            if column.histogram
+            else ""
+        )
+        lines.append(
+            " | ".join(
+                [
+                    column.name,
+                    column.data_type,
+                    "-" if null_ratio is None else f"{null_ratio:.1%}",
+                    "-" if distinct is None else f"≈{distinct}",
+                    "-" if column.minimum is None else _short(column.minimum),
+                    "-" if column.maximum is None else _short(column.maximum),
+                    top_values or "-",
+                    histogram or "-",
+                ]
+            )
+        )
+    if skipped:
+        lines.append(f"\n另有 {skipped} 列未统计")
+    lines.append(f"\n分布为最小值到最大值之间 {HISTOGRAM_BUCKETS} 个等宽区间的样本行数")
+    return "\n".join(lines)
+
+
+@oracle_tool
+@handle_db_error
+def profile_table(
+    table_name: str, schema_name: Optional[str] = None, top_k: int = 5
+) -> str:
+    """
+    一次性生成表画像：每列的空值率、不同值估计、最小/最大值、高频值与分布直方图
+
+    基于 SAMPLE 抽样与聚合查询，优化器统计信息未过期时直接使用其中的行数、
+    空值数与不同值数。用于了解表内容，代替多次 SELECT 浏览原始数据。
+
+    Args:
+        table_name: 表名
+        schema_name: 模式名，默认当前用户
+        top_k: 每列返回的高频值数量，默认5个
+
+    Returns:
+        表画像摘要
+    """
+    owner = (schema_name or ORACLE_DB_CONFIG["username"]).upper()
+    table_name = table_name.upper()
+    key = (owner, table_name, top_k)
+    cached = _profile_cache.get(key)
+    if cached is not None:
+        return cached
+
+    with oracle_session() as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(TABLE_STATS_SQL, {"owner": owner, "table_name": table_name})
+            table_row = cursor.fetchone()
+            if table_row is None:
+                return f"未找到表 {owner}.{table_name}"
+            num_rows, last_analyzed, stale_stats = table_row
+            fresh = _stats_are_fresh(num_rows, last_analyzed, stale_stats)
+
+            cursor.execute(COLUMN_STATS_SQL, {"owner": owner, "table_name": table_name})
+            profiled: List[_ColumnStats] = []
+            skipped = 0
+            for name, data_type, num_distinct, num_nulls in cursor.fetchall():
+                base = _base_type(data_type)
+                if len(profiled) >= ORACLE_PROFILE_CONFIG["max_columns"] or not (
+                    _is_ordered(data_type) or base in NULL_ONLY_TYPES
+                ):
+                    skipped += 1
+                    continue
+                column = _ColumnStats(name, data_type)
+                if fresh:
+                    column.num_distinct = num_distinct
+                    column.num_nulls = num_nulls
+                column.num_rows = num_rows
+                profiled.append(column)
+            if not profiled:
+                return f"表 {owner}.{table_name} 没有可统计的字段"
+
+            sample_sql, sample_info = _sample_source(
+                owner, table_name, [c.name for c in profiled], num_rows
+            )
+            sql, fields = _aggregate_sql(sample_sql, profiled, fresh)
+            cursor.execute(sql)
+            row = cursor.fetchone()
+            sample_count = row[0]
+            for (column, attribute), value in zip(fields, row[1:]):
+                setattr(column, attribute, value)
+
+            sql, binds = _distribution_sql(sample_sql, profiled, top_k)
+            if sql:
+                by_name = {column.name: column for column in profiled}
+                cursor.execute(sql, binds)
+                for name, kind, value, count in cursor.fetchall():
+                    column = by_name[name]
+                    if kind == "T":
+                        column.top_values.append((value, count))
+                    else:
+                        column.histogram[int(value)] = count
+                for column in profiled:
+                    column.top_values.sort(key=lambda item: item[1], reverse=True)
+
+        except Exception as e:
+            if should_discard_session(e):
+                raise
+            logger.error(f"生成表画像失败: {str(e)}")
+            return f"表画像生成错误: {str(e)}"
+
+        finally:
+            cursor.close()
+
+    if fresh:
+        row_info = f"行数 {num_rows}（优化器统计信息，收集于 {_short(last_analyzed)}）"
+    elif num_rows is not None:
+        row_info = f"行数约 {num_rows}（统计信息已过期，空值率与不同值按样本计算）"
+    else:
+        row_info = "行数未知（无统计信息，空值率与不同值按样本计算）"
+    result = format_profile(
+        owner, table_name, row_info, sample_info, sample_count, profiled, skipped
+    )
+    _profile_cache.set(key, result)
+    return result
+
+
+# 导出工具
+oracle_profile_tool = profile_table
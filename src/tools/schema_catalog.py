@@ -0,0 +1,490 @@
+import logging
+import math
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+from src.config.database import ORACLE_DB_CONFIG, SCHEMA_CATALOG_CONFIG
+from src.utils.startup import LazySingleton
+from .join_graph import invalidate_join_graph
+from .oracle_db import (
+    handle_db_error,
+    invalidate_column_comments,
+    invalidate_query_results,
+)
+from .oracle_executor import oracle_tool
+from .oracle_pool import oracle_session
+
+logger = logging.getLogger(__name__)
+
+# Oracle IN 列表最多1000项，分批查询变更的表
+_IN_CHUNK_SIZE = 500
+
+# 检索结果的大小控制
+MAX_COLUMNS_PER_TABLE = 8
+MAX_RESULT_CHARS = 4000
+
+_CATALOG_DDL = """
+CREATE TABLE IF NOT EXISTS catalog_tables (
+    owner TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    comments TEXT,
+    last_ddl_time TEXT,
+    PRIMARY KEY (owner, table_name)
+);
+CREATE TABLE IF NOT EXISTS catalog_columns (
+    owner TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    column_name TEXT NOT NULL,
+    column_id INTEGER,
+    data_type TEXT,
+    nullable TEXT,
+    comments TEXT,
+    PRIMARY KEY (owner, table_name, column_name)
+);
+CREATE TABLE IF NOT EXISTS catalog_foreign_keys (
+    owner TEXT NOT NULL,
+    table_name TEXT NOT NULL,
+    constraint_name TEXT NOT NULL,
+    position INTEGER,
+    column_name TEXT,
+    r_owner TEXT,
+    r_table_name TEXT,
+    r_column_name TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_catalog_fk_table ON catalog_foreign_keys (owner, table_name);
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+_TABLES_SQL = """
+SELECT owner, object_name, last_ddl_time
+FROM all_objects
+WHERE object_type = 'TABLE' AND owner = :owner AND object_name NOT LIKE 'BIN$%'
+"""
+
+_TABLE_COMMENTS_SQL = """
+SELECT owner, table_name, comments
+FROM all_tab_comments
+WHERE owner = :owner AND table_name IN ({names})
+"""
+
+_COLUMNS_SQL = """
+SELECT c.owner, c.table_name, c.column_name, c.column_id, c.data_type, c.nullable, cc.comments
+FROM all_tab_columns c
+LEFT JOIN all_col_comments cc ON cc.owner = c.owner
+    AND cc.table_name = c.table_name AND cc.column_name = c.column_name
+WHERE c.owner = :owner AND c.table_name IN ({names})
+"""
+
+_FOREIGN_KEYS_SQL = """
+SELECT a.owner, a.table_name, a.constraint_name, a.position, a.column_name,
+    c_pk.owner, c_pk.table_name, b.column_name
+FROM all_constraints c
+JOIN all_cons_columns a ON a.owner = c.owner AND a.constraint_name = c.constraint_name
+JOIN all_constraints c_pk ON c.r_owner = c_pk.owner AND c.r_constraint_name = c_pk.constraint_name
+JOIN all_cons_columns b ON b.owner = c_pk.owner
+    AND b.constraint_name = c_pk.constraint_name AND b.position = a.position
+WHERE c.constraint_type = 'R' AND c.owner = :owner AND c.table_name IN ({names})
+"""
+
+_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+_CJK_PATTERN = re.compile(r"[一-鿿]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """
+    将表名、字段名、注释或自然语言查询切分为检索词
+
+    英文按单词切分（标识符按下划线拆开），中文按相邻两字切分，单个汉字
+    保留原样。
+    """
+    if not text:
+        return []
+    text = text.lower()
+    tokens = _WORD_PATTERN.findall(text.replace("_", " "))
+    for run in _CJK_PATTERN.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+class _BM25:
+    """BM25 相关度评分"""
+
+    def __init__(
+        self, documents: Sequence[List[str]], k1: float = 1.2, b: float = 0.75
+    ):
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(doc) for doc in documents]
+        self.lengths = [len(doc) for doc in documents]
+        self.avg_length = (sum(self.lengths) / len(self.lengths)) if documents else 0.0
+        doc_freq = Counter(term for doc in self.term_freqs for term in doc)
+        n = len(documents)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in doc_freq.items()
+        }
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        for i, freqs in enumerate(self.term_freqs):
+            for term in freqs:
+                self.postings[term].append(i)
+
+    def scores(self, query: List[str]) -> Dict[int, float]:
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(query):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for i in self.postings[term]:
+                tf = self.term_freqs[i][term]
+                norm = 1 - self.b + self.b * self.lengths[i] / (self.avg_length or 1)
+                scores[i] += idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        return scores
+
+
+class _SearchIndex:
+    """由目录快照构建的内存检索索引"""
+
+    def __init__(self, tables: List[Tuple], columns: List[Tuple]):
+        self.tables = tables
+        self.columns = columns
+        self.table_bm25 = _BM25(
+            [tokenize(f"{name} {comments or ''}") for _, name, comments in tables]
+        )
+        self.column_bm25 = _BM25([tokenize(f"{c[2]} {c[5] or ''}") for c in columns])
+        self.table_ids = {(owner, name): i for i, (owner, name, _) in enumerate(tables)}
+        self.columns_by_table: Dict[Tuple[str, str], List[int]] = defaultdict(list)
+        for i, column in enumerate(columns):
+            self.columns_by_table[(column[0], column[1])].append(i)
+
+    def search(self, query: str, top_k: int) -> List[Dict[str, Any]]:
+        terms = tokenize(query)
+        table_scores = self.table_bm25.scores(terms)
+        column_scores = self.column_bm25.scores(terms)
+
+        matched_columns: Dict[int, List[Tuple[float, int]]] = defaultdict(list)
+        for i, score in column_scores.items():
+            column = self.columns[i]
+            table_id = self.table_ids.get((column[0], column[1]))
+            if table_id is not None:
+                matched_columns[table_id].append((score, i))
+
+        ranked = []
+        for table_id in set(table_scores) | set(matched_columns):
+            columns = sorted(matched_columns.get(table_id, []), reverse=True)
+            column_part = sum(score for score, _ in columns[:1]) + 0.5 * sum(
+                score for score, _ in columns[1:3]
+            )
+            ranked.append(
+                (2.0 * table_scores.get(table_id, 0.0) + column_part, table_id, columns)
+            )
+        ranked.sort(key=lambda item: item[0], reverse=True)
+
+        results = []
+        for score, table_id, columns in ranked[:top_k]:
+            owner, name, comments = self.tables[table_id]
+            results.append(
+                {
+                    "owner": owner,
+                    "table_name": name,
+                    "comments": comments,
+                    "score": round(score, 3),
+                    "column_count": len(self.columns_by_table[(owner, name)]),
+                    "columns": [
+                        {
+                            "column_name": self.columns[i][2],
+                            "data_type": self.columns[i][4],
+                            "comments": self.columns[i][5],
+                        }
+                        for _, i in columns[:MAX_COLUMNS_PER_TABLE]
+                    ],
+                }
+            )
+        return results
+
+
+class SchemaCatalog:
+    """
+    本地数据字典目录
+
+    将 all_tables、all_tab_columns、注释与外键约束快照到 SQLite 文件中，
+    之后按 all_objects.last_ddl_time 增量刷新，只重新读取结构发生变化的表。
+    检索在内存索引上按 BM25 对表和字段排序，不访问数据库。
+    """
+
+    def __init__(
+        self, path: str, owners: Optional[List[str]] = None, refresh_interval: int = 600
+    ):
+        self.path = Path(path)
+        self.owners = [owner.upper() for owner in owners or []]
+        self.refresh_interval = refresh_interval
+        self._lock = threading.Lock()
+        self._index: Optional[_SearchIndex] = None
+        self._index_version: Optional[str] = None
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript(_CATALOG_DDL)
+
+    def _connect(self) -> "closing[sqlite3.Connection]":
+        return closing(sqlite3.connect(self.path))
+
+    def _owners(self) -> List[str]:
+        return self.owners or [ORACLE_DB_CONFIG["username"].upper()]
+
+    def _get_meta(self, db: sqlite3.Connection, key: str) -> Optional[str]:
+        row = db.execute(
+            "SELECT value FROM catalog_meta WHERE key = ?", (key,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, db: sqlite3.Connection, key: str, value: Any) -> None:
+        db.execute(
+            "INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)",
+            (key, str(value)),
+        )
+
+    def refresh(self, cursor) -> Dict[str, int]:
+        """
+        按 last_ddl_time 增量刷新目录
+
+        Args:
+            cursor: Oracle游标
+
+        Returns:
+            新增、更新、删除的表数量
+        """
+        stats = {"added": 0, "updated": 0, "removed": 0}
+        with self._lock, self._connect() as db, db:
+            for owner in self._owners():
+                cursor.execute(_TABLES_SQL, {"owner": owner})
+                current = {
+                    name: str(ddl_time) for _, name, ddl_time in cursor.fetchall()
+                }
+                stored = dict(
+                    db.execute(
+                        "SELECT table_name, last_ddl_time FROM catalog_tables WHERE owner = ?",
+                        (owner,),
+                    ).fetchall()
+                )
+
+                changed = [
+                    name
+                    for name, ddl_time in current.items()
+                    if stored.get(name) != ddl_time
+                ]
+                removed = [name for name in stored if name not in current]
+                stats["added"] += sum(1 for name in changed if name not in stored)
+                stats["updated"] += sum(1 for name in changed if name in stored)
+                stats["removed"] += len(removed)
+
+                self._delete_tables(db, owner, changed + removed)
+                for chunk in _chunks(changed, _IN_CHUNK_SIZE):
+                    self._load_tables(db, cursor, owner, chunk, current)
+                for name in changed + removed:
+                    invalidate_column_comments(name)
+                    invalidate_query_results(name)
+                if changed or removed:
+                    invalidate_join_graph(owner)
+
+            self._set_meta(db, "last_refresh", time.time())
+            if any(stats.values()):
+                self._set_meta(db, "version", time.time_ns())
+
+        if any(stats.values()):
+            logger.info(f"数据字典目录已刷新: {stats}")
+        return stats
+
+    def _delete_tables(
+        self, db: sqlite3.Connection, owner: str, names: List[str]
+    ) -> None:
+        for table in ("catalog_tables", "catalog_columns", "catalog_foreign_keys"):
+            db.executemany(
+                f"DELETE FROM {table} WHERE owner = ? AND table_name = ?",
+                [(owner, name) for name in names],
+            )
+
+    def _load_tables(
+        self,
+        db: sqlite3.Connection,
+        cursor,
+        owner: str,
+        names: List[str],
+        ddl_times: Dict[str, str],
+    ) -> None:
+        binds = {f"t{i}": name for i, name in enumerate(names)}
+        binds["owner"] = owner
+        placeholders = ", ".join(f":t{i}" for i in range(len(names)))
+
+        cursor.execute(_TABLE_COMMENTS_SQL.format(names=placeholders), binds)
+        comments = {name: comment for _, name, comment in cursor.fetchall()}
+        db.executemany(
+            "INSERT INTO catalog_tables VALUES (?, ?, ?, ?)",
+            [(owner, name, comments.get(name), ddl_times[name]) for name in names],
+        )
+
+        cursor.execute(_COLUMNS_SQL.format(names=placeholders), binds)
+        db.executemany(
+            "INSERT OR REPLACE INTO catalog_columns VALUES (?, ?, ?, ?, ?, ?, ?)",
+            cursor.fetchall(),
+        )
+
+        cursor.execute(_FOREIGN_KEYS_SQL.format(names=placeholders), binds)
+        db.executemany(
+            "INSERT INTO catalog_foreign_keys VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            cursor.fetchall(),
+        )
+
+    def is_stale(self) -> bool:
+        with self._connect() as db:
+            last_refresh = self._get_meta(db, "last_refresh")
+        return (
+            last_refresh is None
+            or time.time() - float(last_refresh) > self.refresh_interval
+        )
+
+    def ensure_fresh(self) -> None:
+        """距上次刷新超过 refresh_interval 时从数据库增量刷新"""
+        if not self.is_stale():
+            return
+        with oracle_session() as conn:
+            cursor = conn.cursor()
+            try:
+                self.refresh(cursor)
+            finally:
+                cursor.close()
+
+    def _get_index(self) -> _SearchIndex:
+        with self._connect() as db:
+            version = self._get_meta(db, "version")
+            if self._index is None or version != self._index_version:
+                tables = db.execute(
+                    "SELECT owner, table_name, comments FROM catalog_tables ORDER BY owner, table_name"
+                ).fetchall()
+                columns = db.execute(
+                    "SELECT owner, table_name, column_name, column_id, data_type, comments "
+                    "FROM catalog_columns ORDER BY owner, table_name, column_id"
+                ).fetchall()
+                self._index = _SearchIndex(tables, columns)
+                self._index_version = version
+        return self._index
+
+    def search(self, query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+        """
+        按自然语言查询检索相关的表和字段
+
+        Args:
+            query: 业务描述或关键词
+            top_k: 返回的表数量
+
+        Returns:
+            按相关度排序的表，包含最相关的字段与外键
+        """
+        results = self._get_index().search(query, top_k)
+        with self._connect() as db:
+            for result in results:
+                result["foreign_keys"] = [
+                    {
+                        "column_name": column,
+                        "references": f"{r_owner}.{r_table}.{r_column}",
+                    }
+                    for column, r_owner, r_table, r_column in db.execute(
+                        "SELECT column_name, r_owner, r_table_name, r_column_name "
+                        "FROM catalog_foreign_keys WHERE owner = ? AND table_name = ? "
+                        "ORDER BY constraint_name, position",
+                        (result["owner"], result["table_name"]),
+                    ).fetchall()
+                ]
+        return results
+
+
+def format_search_results(query: str, results: List[Dict[str, Any]]) -> str:
+    """将检索结果格式化为紧凑的文本，总长度不超过 MAX_RESULT_CHARS"""
+    if not results:
+        return f"未找到与“{query}”相关的表，请换用其他关键词或调用 get_table_info 查看表列表"
+
+    lines = [f"与“{query}”相关的表（按相关度排序）:"]
+    for rank, result in enumerate(results, 1):
+        block = [
+            f"\n{rank}. {result['owner']}.{result['table_name']} | "
+            f"{result['comments'] or '无注释'} (相关度 {result['score']}, 共 {result['column_count']} 列)"
+        ]
+        if result["columns"]:
+            block.append(
+                "   相关字段: "
+                + "; ".join(
+                    f"{c['column_name']} {c['data_type']} {c['comments'] or ''}".rstrip()
+                    for c in result["columns"]
+                )
+            )
+        if result["foreign_keys"]:
+            block.append(
+                "   外键: "
+                + "; ".join(
+                    f"{fk['column_name']} -> {fk['references']}"
+                    for fk in result["foreign_keys"]
+                )
+            )
+        if sum(len(line) for line in lines + block) > MAX_RESULT_CHARS:
+            break
+        lines.extend(block)
+    lines.append("\n如需完整字段列表，请调用 get_table_info 查看具体表。")
+    return "\n".join(lines)
+
+
+def _chunks(items: List[str], size: int) -> Iterable[List[str]]:
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+_schema_catalog = LazySingleton(
+    "schema_catalog",
+    lambda: SchemaCatalog(
+        SCHEMA_CATALOG_CONFIG["path"],
+        owners=SCHEMA_CATALOG_CONFIG["owners"],
+        refresh_interval=SCHEMA_CATALOG_CONFIG["refresh_interval"],
+    ),
+)
+
+
+def get_schema_catalog() -> SchemaCatalog:
+    """获取全局数据字典目录"""
+    return _schema_catalog.get()
+
+
+@oracle_tool
+@handle_db_error
+def search_schema(query: str, top_k: int = 5) -> str:
+    """
+    根据业务描述检索相关的数据库表和字段（包含注释与外键）
+
+    Args:
+        query: 自然语言描述或关键词，例如“客户订单金额”
+        top_k: 返回的表数量，默认5张
+
+    Returns:
+        按相关度排序的表、相关字段与外键关系
+    """
+    catalog = get_schema_catalog()
+    try:
+        catalog.ensure_fresh()
+    except Exception as e:
+        # 数据库暂不可用时使用已有的目录快照
+        logger.warning(f"数据字典目录刷新失败，使用已有快照: {e}")
+    return format_search_results(query, catalog.search(query, top_k=top_k))
+
+
+# 导出工具
+oracle_schema_search_tool = search_schema
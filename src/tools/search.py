@@ -1,10 +1,27 @@
 import logging
 from langchain_community.tools.tavily_search import TavilySearchResults
 from src.config import TAVILY_MAX_RESULTS
+from src.utils.startup import LazySingleton
 from .decorators import create_logged_tool
 
 logger = logging.getLogger(__name__)
 
 # Initialize Tavily search tool with logging
 LoggedTavilySearch = create_logged_tool(TavilySearchResults)
-tavily_tool = LoggedTavilySearch(name="tavily_search", max_results=TAVILY_MAX_RESULTS)
+
+# The Tavily client validates its API key on construction, so it is created on
+# first use instead of at import time
+_tavily_tool = LazySingleton(
+    "tavily_search",
+    lambda: LoggedTavilySearch(name="tavily_search", max_results=TAVILY_MAX_RESULTS),
+)
+
+
+def get_tavily_tool():
+    return _tavily_tool.get()
+
+
+def __getattr__(name: str):
+    if name == "tavily_tool":
+        return _tavily_tool.get()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
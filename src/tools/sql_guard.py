@@ -0,0 +1,271 @@
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from src.utils.cache import TTLCache
+
+# 只读查询允许的起始关键字
+READ_ONLY_STARTS = {"SELECT", "WITH"}
+
+# Oracle 保留字中的 DML/DDL 关键字，不能作为未加引号的标识符，出现在语句任意位置即拒绝
+# （引号内的标识符和字符串不受影响）
+FORBIDDEN_KEYWORDS = {
+    "INSERT",
+    "UPDATE",
+    "DELETE",
+    "DROP",
+    "CREATE",
+    "ALTER",
+    "GRANT",
+    "REVOKE",
+    "RENAME",
+    "LOCK",
+}
+
+# 非保留的语句关键字可以用作表名或列名（例如 MERGE、EXEC 列），只在语句开头时拒绝。
+# 语句只能以 SELECT/WITH 开头且不允许用分号连接多条语句，其他位置出现时只能是标识符
+STATEMENT_KEYWORDS = {
+    "MERGE",
+    "TRUNCATE",
+    "COMMIT",
+    "ROLLBACK",
+    "SAVEPOINT",
+    "BEGIN",
+    "DECLARE",
+    "EXECUTE",
+    "EXEC",
+    "CALL",
+}
+
+# 守卫结果只取决于规范化后的语句文本，不需要过期
+_guard_cache: TTLCache["GuardedQuery"] = TTLCache(ttl=float("inf"), maxsize=512)
+
+_TOKEN_PATTERN = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<line_comment>--[^\n]*)
+    | (?P<hint>/\*\+.*?\*/)
+    | (?P<block_comment>/\*.*?\*/)
+    | (?P<string>[nN]?'(?:[^']|'')*')
+    | (?P<quoted>"[^"]*")
+    | (?P<number>\d+(?:\.\d*)?(?:[eE][+-]?\d+)?|\.\d+(?:[eE][+-]?\d+)?)
+    | (?P<word>[A-Za-z_][A-Za-z0-9_$#]*)
+    | (?P<punct>\|\||<=|>=|<>|!=|\^=|=>|\S)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+# Oracle 的 q'[...]' 字符串，括号类定界符需要配对
+_Q_STRING_START = re.compile(r"[nN]?[qQ]'(.)", re.DOTALL)
+_Q_CLOSERS = {"[": "]", "{": "}", "(": ")", "<": ">"}
+
+
+class SQLGuardError(ValueError):
+    """SQL语句未通过只读检查"""
+
+
+@dataclass(frozen=True)
+class Token:
+    kind: str
+    value: str
+    # 与前一个记号之间是否有空白或注释，规范化时据此决定是否保留一个空格
+    spaced: bool = False
+
+    @property
+    def keyword(self) -> Optional[str]:
+        return self.value.upper() if self.kind == "word" else None
+
+
+@dataclass(frozen=True)
+class GuardedQuery:
+    """通过检查并改写后的查询"""
+
+    sql: str
+    normalized: str
+    max_rows: int
+    # 原语句已带行限制子句时不再追加 FETCH FIRST
+    limit_added: bool
+
+
+def tokenize_sql(sql: str) -> List[Token]:
+    """
+    将SQL切分为记号，丢弃普通注释，保留优化器提示
+
+    Raises:
+        SQLGuardError: 字符串或注释未闭合
+    """
+    tokens: List[Token] = []
+    position = 0
+    spaced = False
+    while position < len(sql):
+        q_string = _Q_STRING_START.match(sql, position)
+        if q_string:
+            closer = _Q_CLOSERS.get(q_string.group(1), q_string.group(1)) + "'"
+            end = sql.find(closer, q_string.end())
+            if end < 0:
+                raise SQLGuardError("SQL中存在未闭合的字符串")
+            position = end + len(closer)
+            tokens.append(Token("string", sql[q_string.start() : position], spaced))
+            spaced = False
+            continue
+
+        match = _TOKEN_PATTERN.match(sql, position)
+        kind = match.lastgroup
+        if kind == "punct" and sql.startswith(("'", '"', "/*"), position):
+            raise SQLGuardError("SQL中存在未闭合的字符串、标识符或注释")
+        position = match.end()
+        if kind in ("space", "line_comment", "block_comment"):
+            spaced = True
+            continue
+        tokens.append(Token(kind, match.group(), spaced))
+        spaced = False
+    return tokens
+
+
+def normalize_tokens(tokens: List[Token]) -> str:
+    """
+    生成规范化的语句文本
+
+    关键字与未加引号的标识符统一大写，空白与注释折叠为单个空格，字符串、
+    引号标识符与优化器提示保持原样。语义相同、仅格式不同的语句得到相同
+    文本，Oracle 可以复用已解析的游标。
+    """
+    parts = []
+    for token in tokens:
+        if parts and token.spaced:
+            parts.append(" ")
+        parts.append(token.keyword or token.value)
+    return "".join(parts)
+
+
+def _strip_terminators(tokens: List[Token]) -> List[Token]:
+    while tokens and tokens[-1].value in (";", "/"):
+        tokens = tokens[:-1]
+    return tokens
+
+
+def _check_read_only(tokens: List[Token]) -> None:
+    if not tokens:
+        raise SQLGuardError("SQL语句为空")
+
+    first = next((token for token in tokens if token.value != "("), None)
+    if first is not None and first.keyword in STATEMENT_KEYWORDS | FORBIDDEN_KEYWORDS:
+        raise SQLGuardError(f"查询中包含不允许的关键字: {first.keyword}")
+    if first is None or first.keyword not in READ_ONLY_STARTS:
+        raise SQLGuardError("只允许执行SELECT查询语句")
+    following = tokens[tokens.index(first) + 1 :][:1]
+    if (
+        first.keyword == "WITH"
+        and following
+        and following[0].keyword in ("FUNCTION", "PROCEDURE")
+    ):
+        raise SQLGuardError("不允许在WITH子句中定义PL/SQL函数或过程")
+
+    depth = 0
+    for token in tokens:
+        if token.value == ";":
+            raise SQLGuardError("只允许执行单条SQL语句")
+        if token.value == "(":
+            depth += 1
+        elif token.value == ")":
+            depth -= 1
+            if depth < 0:
+                raise SQLGuardError("SQL括号不匹配")
+        elif token.keyword in FORBIDDEN_KEYWORDS:
+            raise SQLGuardError(f"查询中包含不允许的关键字: {token.keyword}")
+    if depth != 0:
+        raise SQLGuardError("SQL括号不匹配")
+
+
+def _has_row_limit(tokens: List[Token]) -> Tuple[bool, bool]:
+    """返回顶层查询是否已有 FETCH FIRST/NEXT 子句、是否已有 OFFSET n ROWS 子句"""
+    has_fetch = has_offset = False
+    depth = 0
+    for i, token in enumerate(tokens):
+        if token.value == "(":
+            depth += 1
+        elif token.value == ")":
+            depth -= 1
+        elif depth == 0 and token.keyword in ("FETCH", "OFFSET"):
+            following = [t.keyword for t in tokens[i + 1 : i + 3]]
+            if token.keyword == "FETCH" and following[:1] in (["FIRST"], ["NEXT"]):
+                has_fetch = True
+            elif token.keyword == "OFFSET" and following[1:] in (["ROW"], ["ROWS"]):
+                has_offset = True
+    return has_fetch, has_offset
+
+
+def _has_limit_clause(tokens: List[Token]) -> bool:
+    """顶层查询是否已有 LIMIT 子句（SQLite）"""
+    depth = 0
+    for token in tokens:
+        if token.value == "(":
+            depth += 1
+        elif token.value == ")":
+            depth -= 1
+        elif depth == 0 and token.keyword == "LIMIT":
+            return True
+    return False
+
+
+def _add_row_limit(
+    tokens: List[Token], normalized: str, max_rows: int, dialect: str
+) -> Tuple[str, bool]:
+    """按方言在顶层查询末尾加入行数限制，返回改写后的语句与是否加入了限制"""
+    if dialect == "sqlite":
+        if _has_limit_clause(tokens):
+            return normalized, False
+        return f"{normalized} LIMIT {max_rows}", True
+
+    has_fetch, has_offset = _has_row_limit(tokens)
+    if has_fetch:
+        return normalized, False
+    if has_offset:
+        return f"{normalized} FETCH NEXT {max_rows} ROWS ONLY", True
+    return f"{normalized} FETCH FIRST {max_rows} ROWS ONLY", True
+
+
+def guard_query(sql: str, max_rows: int, dialect: str = "oracle") -> GuardedQuery:
+    """
+    检查SQL是否为只读查询，并在语句中加入行数限制
+
+    只接受以 SELECT 或 WITH 开头的单条语句。保留的 DML/DDL 关键字出现在
+    任意位置即拒绝，MERGE、COMMIT、BEGIN 等非保留关键字只在语句开头拒绝，
+    可以用作列名；CREATED_AT 这类标识符以及字符串中的内容不受影响。顶层查询没有行限制子句时追加 FETCH FIRST n ROWS ONLY，使优化器
+    可以选择带停止条件的执行计划，而不是执行完整的扫描和排序。
+
+    结果按规范化文本缓存，格式不同的相同语句共享同一个改写结果。
+
+    Args:
+        sql: 原始SQL
+        max_rows: 最多返回的行数
+        dialect: 行限制子句的方言，oracle 使用 FETCH FIRST，sqlite 使用 LIMIT
+
+    Returns:
+        改写后的查询
+
+    Raises:
+        SQLGuardError: 语句不是只读查询
+    """
+    if max_rows < 1:
+        raise SQLGuardError("返回行数必须大于0")
+
+    tokens = _strip_terminators(tokenize_sql(sql))
+    normalized = normalize_tokens(tokens)
+    key = (normalized, max_rows, dialect)
+    cached = _guard_cache.get(key)
+    if cached is not None:
+        return cached
+
+    _check_read_only(tokens)
+    rewritten, limit_added = _add_row_limit(tokens, normalized, max_rows, dialect)
+
+    guarded = GuardedQuery(
+        sql=rewritten, normalized=normalized, max_rows=max_rows, limit_added=limit_added
+    )
+    _guard_cache.set(key, guarded)
+    return guarded
+
+
+def guard_cache_stats() -> dict:
+    return _guard_cache.stats()
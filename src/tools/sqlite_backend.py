@@ -0,0 +1,198 @@
+import logging
+import re
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .db_backend import ColumnRow, DatabaseBackend, IndexRow, RelationshipRow, TableRow
+from .oracle_executor import current_oracle_call
+
+logger = logging.getLogger(__name__)
+
+# SQLite 没有表与字段注释，由这两张表保存，夹具脚本向其中插入注释
+COMMENT_TABLES_DDL = """
+CREATE TABLE IF NOT EXISTS _table_comments (
+    table_name TEXT PRIMARY KEY,
+    comments TEXT
+);
+CREATE TABLE IF NOT EXISTS _column_comments (
+    table_name TEXT,
+    column_name TEXT,
+    comments TEXT,
+    PRIMARY KEY (table_name, column_name)
+);
+"""
+
+LIST_TABLES_SQL = """
+SELECT m.name, c.comments
+FROM sqlite_master m
+LEFT JOIN _table_comments c ON c.table_name = m.name
+WHERE m.type = 'table' AND m.name NOT LIKE 'sqlite\\_%' ESCAPE '\\' AND m.name NOT LIKE '\\_%' ESCAPE '\\'
+ORDER BY m.name
+LIMIT :limit
+"""
+
+DESCRIBE_TABLE_SQL = """
+SELECT p.name, p.type, p."notnull" OR p.pk > 0, p.dflt_value, c.comments
+FROM pragma_table_info(:table_name) p
+LEFT JOIN _column_comments c ON c.table_name = :table_name AND c.column_name = p.name
+ORDER BY p.cid
+"""
+
+RELATIONSHIPS_SQL = """
+SELECT f.id, f."from", f."table", f."to", c1.comments, c2.comments
+FROM pragma_foreign_key_list(:table_name) f
+LEFT JOIN _column_comments c1 ON c1.table_name = :table_name AND c1.column_name = f."from"
+LEFT JOIN _column_comments c2 ON c2.table_name = f."table" AND c2.column_name = f."to"
+ORDER BY f.id, f.seq
+"""
+
+INDEXES_SQL = """
+SELECT l.name, l."unique", i.name, i.seqno + 1, c.comments
+FROM pragma_index_list(:table_name) l
+JOIN pragma_index_info(l.name) i
+LEFT JOIN _column_comments c ON c.table_name = :table_name AND c.column_name = i.name
+ORDER BY l.name, i.seqno
+"""
+
+# 声明类型中的长度，例如 VARCHAR2(100)
+_TYPE_LENGTH = re.compile(r"^\s*([^(]+?)\s*\((\d+)")
+
+
+def _split_type(declared: str) -> Tuple[str, Optional[int]]:
+    match = _TYPE_LENGTH.match(declared or "")
+    if match is None:
+        return (declared or "").upper(), None
+    return match.group(1).upper(), int(match.group(2))
+
+
+class _Interrupt:
+    """供 OracleCall 取消调用，SQLite 以 interrupt() 中断正在执行的语句"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def cancel(self) -> None:
+        self._connection.interrupt()
+
+
+class SQLiteBackend(DatabaseBackend):
+    """
+    以 SQLite 文件代替Oracle的后端，用于离线测试与基准测试
+
+    首次创建时如果数据库中还没有表，执行夹具脚本建立表结构与示例数据。
+    表与字段注释保存在 _table_comments、_column_comments 中，外键与索引
+    来自 SQLite 自身的 PRAGMA。不区分模式，schema_name 被忽略。
+    """
+
+    name = "sqlite"
+    dialect = "sqlite"
+
+    def __init__(self, path: str, fixture: Optional[str] = None):
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as connection:
+            connection.executescript(COMMENT_TABLES_DDL)
+            if fixture and not self._has_tables(connection):
+                connection.executescript(Path(fixture).read_text(encoding="utf-8"))
+                logger.info(f"SQLite数据库已按夹具初始化: {path} <- {fixture}")
+        connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path)
+
+    @staticmethod
+    def _has_tables(connection: sqlite3.Connection) -> bool:
+        row = connection.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name NOT LIKE '\\_%' ESCAPE '\\'"
+        ).fetchone()
+        return row[0] > 0
+
+    @contextmanager
+    def session(
+        self, call_timeout: Optional[int] = None
+    ) -> Iterator[sqlite3.Connection]:
+        connection = self._connect()
+        call = current_oracle_call()
+        if call is not None:
+            call.attach(_Interrupt(connection))
+        try:
+            yield connection
+        finally:
+            if call is not None:
+                call.detach()
+            connection.close()
+
+    def execute(
+        self, cursor, sql: str, binds: Optional[Dict[str, Any]], max_rows: int
+    ) -> Tuple[List[str], Sequence[tuple]]:
+        # guard_query 规范化后绑定变量名为大写，SQLite 的绑定变量名区分大小写
+        binds = {
+            name.upper().lstrip(":"): value for name, value in (binds or {}).items()
+        }
+        return super().execute(cursor, sql, binds, max_rows)
+
+    def list_tables(
+        self, cursor, schema_name: Optional[str], limit: int
+    ) -> List[TableRow]:
+        cursor.execute(LIST_TABLES_SQL, {"limit": limit})
+        return cursor.fetchall()
+
+    def describe_table(
+        self, cursor, table_name: str, schema_name: Optional[str]
+    ) -> List[ColumnRow]:
+        cursor.execute(DESCRIBE_TABLE_SQL, {"table_name": table_name.upper()})
+        columns = []
+        for name, declared, not_null, default, comment in cursor.fetchall():
+            data_type, length = _split_type(declared)
+            columns.append(
+                (name, data_type, length, "N" if not_null else "Y", default, comment)
+            )
+        return columns
+
+    def table_comment(
+        self, cursor, table_name: str, schema_name: Optional[str]
+    ) -> Optional[str]:
+        cursor.execute(
+            "SELECT comments FROM _table_comments WHERE table_name = :table_name",
+            {"table_name": table_name.upper()},
+        )
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def column_comments(self, cursor, table_name: str) -> Dict[str, str]:
+        cursor.execute(
+            "SELECT column_name, comments FROM _column_comments "
+            "WHERE table_name = :table_name AND comments IS NOT NULL",
+            {"table_name": table_name.upper()},
+        )
+        return dict(cursor.fetchall())
+
+    def relationships(
+        self, cursor, table_name: str, schema_name: Optional[str]
+    ) -> List[RelationshipRow]:
+        table_name = table_name.upper()
+        cursor.execute(RELATIONSHIPS_SQL, {"table_name": table_name})
+        # SQLite 的外键没有名称，按序号生成
+        return [
+            (f"FK_{table_name}_{fk_id}", column, r_table, r_column, comment, r_comment)
+            for fk_id, column, r_table, r_column, comment, r_comment in cursor.fetchall()
+        ]
+
+    def indexes(
+        self, cursor, table_name: str, schema_name: Optional[str]
+    ) -> List[IndexRow]:
+        cursor.execute(INDEXES_SQL, {"table_name": table_name.upper()})
+        return [
+            (
+                index_name,
+                "NORMAL",
+                "UNIQUE" if unique else "NONUNIQUE",
+                column,
+                position,
+                comment,
+            )
+            for index_name, unique, column, position, comment in cursor.fetchall()
+        ]
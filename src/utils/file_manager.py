@@ -1,15 +1,33 @@
 import os
 import json
 import logging
+import threading
+import uuid
+from contextvars import ContextVar
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, TypedDict
+from typing import List, Dict, Any, Optional, TypedDict
+
+import aiofiles
 # 延迟导入title_generator以避免循环导入
 
 logger = logging.getLogger(__name__)
 
+# 任务目录下记录总结文件及标题状态的清单
+MANIFEST_FILENAME = "manifest.json"
+
+# reporter 运行前等待后台标题生成的最长时间(秒)
+TITLE_WAIT_TIMEOUT = 10.0
+
+# 任务输出根目录
+EXECUTIONS_DIR = "docs/executions"
+
+# 当前智能体步骤所属的任务ID，工具据此把产物写入任务目录
+current_task_id: ContextVar[Optional[str]] = ContextVar("current_task_id", default=None)
+
 class ExecutionSummary(TypedDict):
     """执行总结信息"""
+    summary_id: str
     agent_name: str
     file_path: str
     completed_at: str
@@ -18,9 +36,11 @@ class ExecutionSummary(TypedDict):
 class ExecutionFileManager:
     """执行文件管理器，负责.md总结文件的管理"""
     
-    def __init__(self, base_output_dir: str = "docs/executions"):
+    def __init__(self, base_output_dir: str = EXECUTIONS_DIR):
         self.base_output_dir = Path(base_output_dir)
         self.base_output_dir.mkdir(parents=True, exist_ok=True)
+        # 保护文件名占用、重命名与清单读写
+        self._lock = threading.RLock()
     
     def create_task_directory(self, task_id: str) -> str:
         """为任务创建专用目录"""
@@ -34,50 +54,169 @@ class ExecutionFileManager:
         plan_file = task_dir / "plan.md"
         
         with open(plan_file, 'w', encoding='utf-8') as f:
-            f.write(f"# 任务执行计划\n\n")
-            f.write(f"**生成时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write(f"## 详细计划\n\n")
-            f.write(plan_content)
+            f.write(self._format_plan(plan_content))
+        
+        return str(plan_file)
+    
+    async def asave_plan(self, task_id: str, plan_content: str) -> str:
+        """异步保存原始计划为.md文件，不阻塞事件循环"""
+        task_dir = self.base_output_dir / task_id
+        plan_file = task_dir / "plan.md"
+        
+        async with aiofiles.open(plan_file, 'w', encoding='utf-8') as f:
+            await f.write(self._format_plan(plan_content))
         
         return str(plan_file)
     
-    def save_execution_summary(self, task_id: str, agent_name: str, 
-                             result_content: str, original_messages: List[Any]) -> ExecutionSummary:
-        """保存执行节点的总结为.md文件"""
+    def _format_plan(self, plan_content: str) -> str:
+        """生成计划文件内容"""
+        return (
+            f"# 任务执行计划\n\n"
+            f"**生成时间**: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+            f"## 详细计划\n\n"
+            f"{plan_content}"
+        )
+    
+    async def asave_execution_summary(self, task_id: str, agent_name: str,
+                                      result_content: str, original_messages: List[Any]) -> ExecutionSummary:
+        """异步保存执行节点的总结为.md文件，不阻塞事件循环"""
+        summary_content = self._generate_summary_content(agent_name, result_content, original_messages)
+        summary_file = self._reserve_summary_file(task_id, agent_name, summary_content)
+        
+        async with aiofiles.open(summary_file, 'w', encoding='utf-8') as f:
+            await f.write(summary_content)
+        
+        return self._register_summary(task_id, agent_name, summary_file, summary_content)
+    
+    def _reserve_summary_file(self, task_id: str, agent_name: str, summary_content: str) -> Path:
+        """以启发式标题占用总结文件名，大模型标题由后台生成后再重命名"""
+        # 延迟导入以避免循环导入
+        from src.utils.title_generator import title_generator
+        
         task_dir = self.base_output_dir / task_id
         # 确保任务目录存在
         task_dir.mkdir(parents=True, exist_ok=True)
         
-        # 生成总结内容
-        summary_content = self._generate_summary_content(agent_name, result_content, original_messages)
+        title = title_generator.extract_heuristic_title(summary_content, agent_name)
+        with self._lock:
+            summary_file = self._unique_summary_path(task_dir, title)
+            summary_file.touch()
+        return summary_file
+    
+    def _register_summary(self, task_id: str, agent_name: str, summary_file: Path,
+                          summary_content: str) -> ExecutionSummary:
+        """写入清单并提交后台标题生成"""
+        from src.utils.title_generator import title_worker
+        
+        logger.info(f"执行总结已保存到: {summary_file}")
+        summary = self._build_execution_summary(agent_name, summary_file, summary_content)
+        with self._lock:
+            manifest = self._load_manifest(task_id)
+            manifest["summaries"].append({
+                "summary_id": summary["summary_id"],
+                "agent_name": agent_name,
+                "title": summary_file.stem,
+                "title_status": "provisional",
+                "file_path": str(summary_file),
+                "completed_at": summary["completed_at"],
+            })
+            self._write_manifest(task_id, manifest)
+        
+        title_worker.submit(
+            task_id, summary_content, agent_name,
+            lambda title: self.rename_summary(task_id, str(summary_file), title)
+        )
+        return summary
+    
+    def rename_summary(self, task_id: str, file_path: str, title: str) -> str:
+        """
+        将总结文件重命名为最终标题并更新清单
         
-        # 使用大模型生成中文标题作为文件名
-        logger.info(f"正在为{agent_name}的执行结果生成中文标题...")
+        Args:
+            task_id: 任务ID
+            file_path: 当前文件路径
+            title: 最终标题
+            
+        Returns:
+            重命名后的文件路径，文件已不存在时返回原路径
+        """
+        task_dir = self.base_output_dir / task_id
+        current = Path(file_path)
+        with self._lock:
+            if not current.exists():
+                logger.warning(f"总结文件已不存在，跳过重命名: {current}")
+                return file_path
+            
+            target = current
+            if title != current.stem:
+                target = self._unique_summary_path(task_dir, title)
+                os.replace(current, target)
+                logger.info(f"总结文件已重命名: {current.name} -> {target.name}")
+            
+            manifest = self._load_manifest(task_id)
+            for entry in manifest["summaries"]:
+                if entry["file_path"] == file_path:
+                    entry.update(title=target.stem, title_status="final", file_path=str(target))
+            self._write_manifest(task_id, manifest)
+        return str(target)
+    
+    def wait_for_titles(self, task_id: str, timeout: float = TITLE_WAIT_TIMEOUT) -> bool:
+        """等待任务的后台标题生成完成，超时后保留启发式标题"""
+        from src.utils.title_generator import title_worker
+        
+        return title_worker.flush(task_id, timeout)
+    
+    def read_manifest(self, task_id: str) -> Dict[str, Any]:
+        """读取任务的总结清单"""
+        with self._lock:
+            return self._load_manifest(task_id)
+    
+    def summary_references(self, task_id: str) -> Dict[str, str]:
+        """summary_id 到当前总结文件路径的映射，文件重命名后依然有效"""
+        return {
+            entry["summary_id"]: entry["file_path"]
+            for entry in self.read_manifest(task_id)["summaries"]
+            if "summary_id" in entry
+        }
+    
+    def _load_manifest(self, task_id: str) -> Dict[str, Any]:
+        manifest_file = self.base_output_dir / task_id / MANIFEST_FILENAME
+        if not manifest_file.exists():
+            return {"task_id": task_id, "summaries": []}
         try:
-            # 延迟导入以避免循环导入
-            from src.utils.title_generator import title_generator
-            chinese_title = title_generator.generate_chinese_title(summary_content, agent_name)
-            filename = f"{chinese_title}.md"
-            logger.info(f"生成的文件名: {filename}")
-        except Exception as e:
-            logger.error(f"生成标题失败，使用默认文件名: {e}")
-            filename = f"{agent_name}_summary.md"
-        
-        summary_file = task_dir / filename
-        
-        with open(summary_file, 'w', encoding='utf-8') as f:
-            f.write(summary_content)
-        
-        # 创建执行总结信息
-        execution_summary: ExecutionSummary = {
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.error(f"读取清单 {manifest_file} 失败: {e}")
+            return {"task_id": task_id, "summaries": []}
+    
+    def _write_manifest(self, task_id: str, manifest: Dict[str, Any]) -> None:
+        manifest_file = self.base_output_dir / task_id / MANIFEST_FILENAME
+        tmp_file = manifest_file.with_suffix(".json.tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, manifest_file)
+    
+    def _unique_summary_path(self, task_dir: Path, title: str) -> Path:
+        """生成不与已有文件冲突的总结文件路径"""
+        reserved = {'plan', 'final_integration'}
+        candidate = task_dir / f"{title}.md"
+        index = 2
+        while candidate.stem in reserved or candidate.exists():
+            candidate = task_dir / f"{title}_{index}.md"
+            index += 1
+        return candidate
+    
+    def _build_execution_summary(self, agent_name: str, summary_file: Path,
+                                 summary_content: str) -> ExecutionSummary:
+        """创建执行总结信息"""
+        return {
+            "summary_id": uuid.uuid4().hex,
             "agent_name": agent_name,
             "file_path": str(summary_file),
             "completed_at": datetime.now().isoformat(),
             "summary_content": summary_content[:500] + "..." if len(summary_content) > 500 else summary_content
         }
-        
-        logger.info(f"执行总结已保存到: {summary_file}")
-        return execution_summary
     
     def _generate_summary_content(self, agent_name: str, result_content: str, 
                                 original_messages: List[Any]) -> str:
@@ -94,6 +233,11 @@ class ExecutionFileManager:
         
         # 读取所有.md文件（除了plan.md和final_integration.md）
         excluded_files = {'plan.md', 'final_integration.md'}
+        # 清单中记录了总结文件对应的智能体
+        manifest_agents = {
+            Path(entry["file_path"]).name: entry["agent_name"]
+            for entry in self.read_manifest(task_id)["summaries"]
+        }
         
         for md_file in task_dir.glob("*.md"):
             if md_file.name in excluded_files:
@@ -104,7 +248,7 @@ class ExecutionFileManager:
                     content = f.read()
                     
                     # 尝试从文件内容或文件名推断智能体名称
-                    agent_name = self._infer_agent_name(md_file.name, content)
+                    agent_name = manifest_agents.get(md_file.name) or self._infer_agent_name(md_file.name, content)
                     
                     summaries.append({
                         "agent_name": agent_name,
@@ -0,0 +1,149 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from src.utils.json_cleaner import clean_json_response
+
+logger = logging.getLogger(__name__)
+
+
+class PlanStreamParser:
+    """
+    增量解析 planner 的流式 JSON 输出
+
+    逐字符跟踪 JSON 的嵌套结构（字符串与转义会被正确跳过），当根对象中
+    `steps` 数组的某个元素对象闭合时立即解析并返回该步骤，而不必等待整个
+    计划输出完毕。根对象之前的 markdown 代码块标记或说明文字会被忽略，
+    无法解析的单个步骤会被跳过，不影响后续步骤。
+    """
+
+    def __init__(self, array_key: str = "steps"):
+        self.array_key = array_key
+        self.buffer = ""
+        self.steps: List[Dict[str, Any]] = []
+
+        self._pos = 0
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_string: Optional[str] = None
+        self._current_key: Optional[str] = None
+        self._in_steps = False
+        self._step_start = -1
+        self._done = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        追加一段流式输出
+
+        Args:
+            chunk: planner 新输出的文本片段
+
+        Returns:
+            本次输入中新闭合的步骤列表
+        """
+        if not chunk:
+            return []
+        self.buffer += chunk
+        new_steps = []
+
+        while self._pos < len(self.buffer):
+            i = self._pos
+            ch = self.buffer[i]
+            self._pos += 1
+
+            if self._done:
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = self._decode_string(self._string_start, i + 1)
+                continue
+
+            if not self._stack:
+                # 根对象之前的内容（如 ```json 标记）直接忽略
+                if ch == "{":
+                    self._stack.append("{")
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch == ":":
+                if len(self._stack) == 1:
+                    self._current_key = self._last_string
+            elif ch == ",":
+                if len(self._stack) == 1:
+                    self._current_key = None
+            elif ch == "[":
+                if len(self._stack) == 1 and self._current_key == self.array_key:
+                    self._in_steps = True
+                self._stack.append("[")
+            elif ch == "{":
+                if self._in_steps and len(self._stack) == 2:
+                    self._step_start = i
+                self._stack.append("{")
+            elif ch in "]}":
+                self._stack.pop()
+                if self._in_steps and ch == "}" and len(self._stack) == 2:
+                    step = self._parse_step(self._step_start, i + 1)
+                    if step is not None:
+                        self.steps.append(step)
+                        new_steps.append(step)
+                    self._step_start = -1
+                elif self._in_steps and ch == "]" and len(self._stack) == 1:
+                    self._in_steps = False
+                elif not self._stack:
+                    self._done = True
+
+        return new_steps
+
+    def finish(self) -> Optional[Dict[str, Any]]:
+        """
+        planner 输出结束后解析完整计划
+
+        Returns:
+            完整计划；整体解析失败但已增量解析出步骤时，返回仅包含这些步骤的计划；
+            否则返回None
+        """
+        if not self.buffer:
+            return None
+
+        cleaned = clean_json_response(self.buffer)
+        try:
+            plan = json.loads(cleaned)
+            if isinstance(plan, dict) and isinstance(plan.get(self.array_key), list):
+                return plan
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse plan: {e}")
+            logger.debug(f"Original plan content: {self.buffer}")
+            logger.debug(f"Cleaned plan content: {cleaned}")
+
+        if self.steps:
+            logger.info(f"使用增量解析得到的 {len(self.steps)} 个计划步骤")
+            return {self.array_key: list(self.steps)}
+        return None
+
+    def _decode_string(self, start: int, end: int) -> Optional[str]:
+        try:
+            return json.loads(self.buffer[start:end])
+        except json.JSONDecodeError:
+            return None
+
+    def _parse_step(self, start: int, end: int) -> Optional[Dict[str, Any]]:
+        if start < 0:
+            return None
+        text = self.buffer[start:end]
+        try:
+            step = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning(f"跳过无法解析的计划步骤: {e}")
+            logger.debug(f"Step content: {text}")
+            return None
+        return step if isinstance(step, dict) else None
@@ -0,0 +1,104 @@
+import importlib
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Generic, Iterator, List, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class StartupTimings:
+    """记录启动阶段各模块导入与各初始化步骤的耗时"""
+
+    def __init__(self):
+        self._records: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def record(
+        self, kind: str, name: str, seconds: float, error: Optional[str] = None
+    ) -> None:
+        with self._lock:
+            self._records.append(
+                {"kind": kind, "name": name, "seconds": seconds, "error": error}
+            )
+
+    @contextmanager
+    def step(self, name: str, kind: str = "init") -> Iterator[None]:
+        """记录一个初始化步骤的耗时，失败时同样记录并继续抛出异常"""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record(kind, name, time.perf_counter() - started, error=str(e))
+            raise
+        self.record(kind, name, time.perf_counter() - started)
+
+    def timed_import(self, module_name: str) -> Any:
+        """导入模块并记录耗时，已导入的模块耗时接近0"""
+        with self.step(module_name, kind="import"):
+            return importlib.import_module(module_name)
+
+    def records(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._records)
+
+    def report(self) -> str:
+        """生成启动耗时报告"""
+        records = self.records()
+        lines = [f"{'类型':<6} {'耗时(s)':>8}  名称"]
+        for record in records:
+            status = f"  失败: {record['error']}" if record["error"] else ""
+            lines.append(
+                f"{record['kind']:<6} {record['seconds']:>8.3f}  {record['name']}{status}"
+            )
+        return "\n".join(lines)
+
+    def log_report(self, title: str = "启动耗时统计") -> None:
+        logger.info("=" * 60)
+        logger.info(title)
+        logger.info("=" * 60)
+        for line in self.report().splitlines():
+            logger.info(line)
+
+
+startup_timings = StartupTimings()
+
+
+class LazySingleton(Generic[T]):
+    """
+    线程安全的延迟初始化单例
+
+    首次调用 get() 时执行工厂函数并缓存结果，初始化耗时计入
+    startup_timings。初始化失败时不缓存，下次调用会重新尝试，
+    一个配置错误的依赖只影响实际使用它的功能。
+    """
+
+    def __init__(self, name: str, factory: Callable[[], T]):
+        self.name = name
+        self._factory = factory
+        self._instance: Optional[T] = None
+        self._initialized = False
+        self._lock = threading.Lock()
+
+    @property
+    def initialized(self) -> bool:
+        return self._initialized
+
+    def get(self) -> T:
+        if self._initialized:
+            return self._instance
+        with self._lock:
+            if not self._initialized:
+                with startup_timings.step(self.name):
+                    self._instance = self._factory()
+                self._initialized = True
+        return self._instance
+
+    def reset(self) -> None:
+        """丢弃已创建的实例，下次调用 get() 时重新初始化"""
+        with self._lock:
+            self._instance = None
+            self._initialized = False
@@ -1,34 +1,127 @@
+import json
 import logging
+import os
 import re
-from typing import Optional
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
 from src.agents.llm import get_llm_by_type
+from src.utils.json_cleaner import clean_json_response
 from langchain_core.messages import HumanMessage
 
 logger = logging.getLogger(__name__)
 
+# 后台批量生成标题的参数：单次LLM调用最多处理的文档数、凑批等待时间(秒)
+TITLE_BATCH_SIZE = int(os.getenv("TITLE_BATCH_SIZE", "8"))
+TITLE_BATCH_WINDOW = float(os.getenv("TITLE_BATCH_WINDOW", "0.5"))
+
 class TitleGenerator:
     """智能标题生成器，根据内容生成合适的中文标题"""
     
-    def __init__(self):
-        self.llm = get_llm_by_type("basic")  # 使用基础模型生成标题
+    @property
+    def llm(self):
+        # 使用基础模型生成标题，首次使用时才创建
+        return get_llm_by_type("basic")
     
-    def generate_chinese_title(self, content: str, agent_name: str, max_length: int = 50) -> str:
+    def generate_titles_batch(self, items: List[Tuple[str, str]], max_length: int = 50) -> List[Optional[str]]:
         """
-        根据内容生成中文标题
+        一次LLM调用为多份文档生成中文标题
         
         Args:
-            content: 文档内容
-            agent_name: 智能体名称
+            items: (文档内容, 智能体名称) 列表
             max_length: 标题最大长度
             
         Returns:
-            生成的中文标题
+            与输入顺序一致的标题列表，生成失败的位置为None
         """
+        if not items:
+            return []
+        if len(items) == 1:
+            content, agent_name = items[0]
+            messages = [HumanMessage(content=self._build_prompt(content, agent_name, max_length))]
+            try:
+                return [self._clean_title(self.llm.invoke(messages).content, max_length)]
+            except Exception as e:
+                logger.error(f"生成标题失败: {e}")
+                return [None]
+        
         try:
-            # 截取内容前1000字符进行分析
-            content_preview = content[:1000] if len(content) > 1000 else content
+            messages = [HumanMessage(content=self._build_batch_prompt(items, max_length))]
+            response = self.llm.invoke(messages)
+            titles = json.loads(clean_json_response(response.content))
+        except Exception as e:
+            logger.error(f"批量生成标题失败: {e}")
+            return [None] * len(items)
+        
+        if not isinstance(titles, list) or len(titles) != len(items):
+            logger.warning(f"批量标题数量不匹配，期望{len(items)}个: {titles}")
+            return [None] * len(items)
+        
+        return [
+            self._clean_title(title, max_length) if isinstance(title, str) and title.strip() else None
+            for title in titles
+        ]
+    
+    def extract_heuristic_title(self, content: str, agent_name: str, max_length: int = 50) -> str:
+        """
+        不调用LLM，直接从内容中提取标题
+        
+        优先使用第一个markdown标题，其次使用第一行非空文本，均不可用时
+        返回按智能体类型生成的后备标题。
+        
+        Args:
+            content: 文档内容
+            agent_name: 智能体名称
+            max_length: 标题最大长度
             
-            prompt = f"""
+        Returns:
+            提取出的标题
+        """
+        lines = [line.strip() for line in (content or "").splitlines() if line.strip()]
+        candidate = next((line for line in lines if line.startswith("#")), None)
+        if candidate is None:
+            candidate = next((line for line in lines if not line.startswith("```")), "")
+        
+        # 去除markdown标记
+        candidate = re.sub(r'^[#>*\-+\s]+', '', candidate)
+        candidate = re.sub(r'[*_`~\[\]]', '', candidate)
+        # 只取第一句
+        candidate = re.split(r'[。！？!?]', candidate)[0]
+        
+        if not candidate.strip():
+            return self._generate_fallback_title(agent_name)
+        return self._clean_title(candidate, max_length)
+    
+    def _build_batch_prompt(self, items: List[Tuple[str, str]], max_length: int) -> str:
+        """构建批量标题生成提示词"""
+        documents = "\n\n".join(
+            f"## 文档{i}\n智能体类型：{agent_name}\n文档内容预览：\n{content[:1000]}"
+            for i, (content, agent_name) in enumerate(items, 1)
+        )
+        
+        return f"""
+请为以下{len(items)}份文档分别生成一个简洁、准确的中文标题。
+
+{documents}
+
+要求：
+1. 标题必须是中文
+2. 长度控制在{max_length}个字符以内
+3. 准确反映文档的核心内容和主题
+4. 不包含特殊字符（如/、\、:、*、?、"、<、>、|）
+5. 根据智能体类型和内容特点生成对应的标题
+
+按文档顺序返回JSON字符串数组，数组长度必须为{len(items)}，例如 ["标题一", "标题二"]。
+只返回JSON数组，不要其他说明文字。
+"""
+    
+    def _build_prompt(self, content: str, agent_name: str, max_length: int) -> str:
+        """构建标题生成提示词"""
+        # 截取内容前1000字符进行分析
+        content_preview = content[:1000] if len(content) > 1000 else content
+        
+        return f"""
 请根据以下内容为文档生成一个简洁、准确的中文标题。
 
 智能体类型：{agent_name}
@@ -54,23 +147,6 @@ class TitleGenerator:
 
 只返回标题，不要其他说明文字。
 """
-            
-            logger.debug(f"正在为{agent_name}生成标题，内容长度: {len(content)}")
-            
-            # 调用LLM生成标题
-            messages = [HumanMessage(content=prompt)]
-            response = self.llm.invoke(messages)
-            
-            # 提取并清理标题
-            title = self._clean_title(response.content, max_length)
-            
-            logger.info(f"为{agent_name}生成标题: {title}")
-            return title
-            
-        except Exception as e:
-            logger.error(f"生成标题失败: {e}")
-            # 返回默认标题
-            return self._generate_fallback_title(agent_name)
     
     def _clean_title(self, raw_title: str, max_length: int) -> str:
         """清理和格式化标题"""
@@ -114,5 +190,101 @@ class TitleGenerator:
         
         return fallback_titles.get(agent_name, f"{agent_name}执行结果")
 
+
+class TitleWorker:
+    """
+    后台标题生成线程
+    
+    执行总结先以启发式标题落盘，标题生成请求提交到这里排队。后台线程在
+    TITLE_BATCH_WINDOW 内凑批，单次LLM调用为最多 TITLE_BATCH_SIZE 份
+    文档生成标题，再通过回调完成重命名。LLM调用失败时不回调，文件保留
+    启发式标题。
+    """
+    
+    def __init__(self, generator: TitleGenerator, batch_size: int = TITLE_BATCH_SIZE,
+                 batch_window: float = TITLE_BATCH_WINDOW):
+        self.generator = generator
+        self.batch_size = max(1, batch_size)
+        self.batch_window = batch_window
+        
+        self._queue: Deque[Tuple[str, str, str, Callable[[str], None]]] = deque()
+        self._pending: Dict[str, int] = defaultdict(int)
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+    
+    def submit(self, key: str, content: str, agent_name: str, callback: Callable[[str], None]) -> None:
+        """
+        提交标题生成请求
+        
+        Args:
+            key: 分组键（任务ID），用于按任务等待
+            content: 文档内容
+            agent_name: 智能体名称
+            callback: 标题生成成功后以标题为参数调用
+        """
+        with self._condition:
+            self._queue.append((key, content, agent_name, callback))
+            self._pending[key] += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="title-worker", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+    
+    def flush(self, key: Optional[str] = None, timeout: Optional[float] = None) -> bool:
+        """
+        等待已提交的标题请求处理完毕
+        
+        Args:
+            key: 只等待该任务的请求，为None时等待全部请求
+            timeout: 最长等待时间(秒)
+            
+        Returns:
+            是否在超时前处理完毕
+        """
+        def done() -> bool:
+            if key is None:
+                return not any(self._pending.values())
+            return not self._pending.get(key)
+        
+        with self._condition:
+            return self._condition.wait_for(done, timeout)
+    
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                titles = self.generator.generate_titles_batch(
+                    [(content, agent_name) for _, content, agent_name, _ in batch]
+                )
+            except Exception as e:
+                logger.error(f"后台生成标题失败: {e}")
+                titles = [None] * len(batch)
+            
+            for (key, _, agent_name, callback), title in zip(batch, titles):
+                try:
+                    if title:
+                        callback(title)
+                except Exception as e:
+                    logger.error(f"应用{agent_name}的标题失败: {e}")
+                finally:
+                    with self._condition:
+                        self._pending[key] -= 1
+                        if not self._pending[key]:
+                            del self._pending[key]
+                        self._condition.notify_all()
+    
+    def _next_batch(self) -> List[Tuple[str, str, str, Callable[[str], None]]]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._queue)
+            # 等待更多请求凑成一批
+            deadline = time.monotonic() + self.batch_window
+            while len(self._queue) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return [self._queue.popleft() for _ in range(min(self.batch_size, len(self._queue)))]
+
 # 创建全局实例
-title_generator = TitleGenerator() 
\ No newline at end of file
+title_generator = TitleGenerator()
+title_worker = TitleWorker(title_generator) 
\ No newline at end of file
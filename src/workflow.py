@@ -1,6 +1,7 @@
+import asyncio
 import logging
 from src.config import TEAM_MEMBERS
-from src.graph import build_graph
+from src.graph import get_graph
 
 # Configure logging
 logging.basicConfig(
@@ -16,9 +17,6 @@ def enable_debug_logging():
 
 logger = logging.getLogger(__name__)
 
-# Create the graph
-graph = build_graph()
-
 
 def run_agent_workflow(user_input: str, debug: bool = False):
     """Run the agent workflow with the given user input.
@@ -37,15 +35,18 @@ def run_agent_workflow(user_input: str, debug: bool = False):
         enable_debug_logging()
 
     logger.info(f"Starting workflow with user input: {user_input}")
-    result = graph.invoke(
-        {
-            # Constants
-            "TEAM_MEMBERS": TEAM_MEMBERS,
-            # Runtime Variables
-            "messages": [{"role": "user", "content": user_input}],
-            "deep_thinking_mode": True,
-            "search_before_planning": True,
-        }
+    # Graph nodes are async, so drive the graph on an event loop
+    result = asyncio.run(
+        get_graph().ainvoke(
+            {
+                # Constants
+                "TEAM_MEMBERS": TEAM_MEMBERS,
+                # Runtime Variables
+                "messages": [{"role": "user", "content": user_input}],
+                "deep_thinking_mode": True,
+                "search_before_planning": True,
+            }
+        )
     )
     logger.debug(f"Final workflow state: {result}")
     logger.info("Workflow completed successfully")
@@ -53,4 +54,4 @@ def run_agent_workflow(user_input: str, debug: bool = False):
 
 
 if __name__ == "__main__":
-    print(graph.get_graph().draw_mermaid())
+    print(get_graph().get_graph().draw_mermaid())
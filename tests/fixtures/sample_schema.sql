@@ -0,0 +1,110 @@
+-- SQLite 后端的夹具：模拟一个小型销售模式，供离线测试与基准测试使用
+-- 表与字段注释写入 _table_comments、_column_comments（由 SQLiteBackend 创建）
+
+CREATE TABLE REGIONS (
+    ID INTEGER PRIMARY KEY,
+    NAME VARCHAR2(50) NOT NULL
+);
+
+CREATE TABLE CUSTOMERS (
+    ID INTEGER PRIMARY KEY,
+    NAME VARCHAR2(100) NOT NULL,
+    REGION_ID INTEGER REFERENCES REGIONS (ID),
+    LEVEL_CODE VARCHAR2(10) DEFAULT 'NORMAL',
+    CREATED_AT DATE
+);
+CREATE INDEX IDX_CUSTOMERS_REGION ON CUSTOMERS (REGION_ID);
+
+CREATE TABLE EMPLOYEES (
+    ID INTEGER PRIMARY KEY,
+    NAME VARCHAR2(100) NOT NULL,
+    MANAGER_ID INTEGER REFERENCES EMPLOYEES (ID)
+);
+
+CREATE TABLE PRODUCTS (
+    ID INTEGER PRIMARY KEY,
+    NAME VARCHAR2(100) NOT NULL,
+    CATEGORY VARCHAR2(50),
+    PRICE NUMBER(10)
+);
+
+CREATE TABLE ORDERS (
+    ID INTEGER PRIMARY KEY,
+    CUSTOMER_ID INTEGER NOT NULL REFERENCES CUSTOMERS (ID),
+    SALESMAN_ID INTEGER REFERENCES EMPLOYEES (ID),
+    STATUS VARCHAR2(20) DEFAULT 'NEW',
+    AMOUNT NUMBER(12),
+    ORDER_DATE DATE
+);
+CREATE INDEX IDX_ORDERS_CUSTOMER ON ORDERS (CUSTOMER_ID);
+CREATE INDEX IDX_ORDERS_STATUS_DATE ON ORDERS (STATUS, ORDER_DATE);
+
+CREATE TABLE ORDER_ITEMS (
+    ORDER_ID INTEGER NOT NULL REFERENCES ORDERS (ID),
+    LINE_NO INTEGER NOT NULL,
+    PRODUCT_ID INTEGER NOT NULL REFERENCES PRODUCTS (ID),
+    QUANTITY INTEGER NOT NULL,
+    PRIMARY KEY (ORDER_ID, LINE_NO)
+);
+
+INSERT INTO _table_comments (table_name, comments) VALUES
+    ('REGIONS', '销售区域'),
+    ('CUSTOMERS', '客户'),
+    ('EMPLOYEES', '员工'),
+    ('PRODUCTS', '产品'),
+    ('ORDERS', '订单'),
+    ('ORDER_ITEMS', '订单明细');
+
+INSERT INTO _column_comments (table_name, column_name, comments) VALUES
+    ('REGIONS', 'ID', '区域编号'),
+    ('REGIONS', 'NAME', '区域名称'),
+    ('CUSTOMERS', 'ID', '客户编号'),
+    ('CUSTOMERS', 'NAME', '客户名称'),
+    ('CUSTOMERS', 'REGION_ID', '所属区域'),
+    ('CUSTOMERS', 'LEVEL_CODE', '客户等级'),
+    ('CUSTOMERS', 'CREATED_AT', '注册日期'),
+    ('EMPLOYEES', 'ID', '员工编号'),
+    ('EMPLOYEES', 'NAME', '员工姓名'),
+    ('EMPLOYEES', 'MANAGER_ID', '上级员工'),
+    ('PRODUCTS', 'ID', '产品编号'),
+    ('PRODUCTS', 'NAME', '产品名称'),
+    ('PRODUCTS', 'CATEGORY', '产品类别'),
+    ('PRODUCTS', 'PRICE', '单价'),
+    ('ORDERS', 'ID', '订单编号'),
+    ('ORDERS', 'CUSTOMER_ID', '客户编号'),
+    ('ORDERS', 'SALESMAN_ID', '销售员'),
+    ('ORDERS', 'STATUS', '订单状态'),
+    ('ORDERS', 'AMOUNT', '订单金额'),
+    ('ORDERS', 'ORDER_DATE', '下单日期'),
+    ('ORDER_ITEMS', 'ORDER_ID', '订单编号'),
+    ('ORDER_ITEMS', 'LINE_NO', '行号'),
+    ('ORDER_ITEMS', 'PRODUCT_ID', '产品编号'),
+    ('ORDER_ITEMS', 'QUANTITY', '数量');
+
+INSERT INTO REGIONS (ID, NAME) VALUES (1, '华东'), (2, '华南'), (3, '华北'), (4, '西南');
+
+INSERT INTO EMPLOYEES (ID, NAME, MANAGER_ID) VALUES
+    (1, '张伟', NULL), (2, '王芳', 1), (3, '李娜', 1), (4, '刘洋', 2), (5, '陈静', 3);
+
+INSERT INTO PRODUCTS (ID, NAME, CATEGORY, PRICE)
+WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < 50)
+SELECT n, '产品' || n, CASE n % 3 WHEN 0 THEN '硬件' WHEN 1 THEN '软件' ELSE '服务' END, 100 + n * 37 % 900
+FROM seq;
+
+INSERT INTO CUSTOMERS (ID, NAME, REGION_ID, LEVEL_CODE, CREATED_AT)
+WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < 500)
+SELECT n, '客户' || n, n % 4 + 1, CASE WHEN n % 10 = 0 THEN 'VIP' ELSE 'NORMAL' END,
+       date('2023-01-01', '+' || (n % 365) || ' days')
+FROM seq;
+
+INSERT INTO ORDERS (ID, CUSTOMER_ID, SALESMAN_ID, STATUS, AMOUNT, ORDER_DATE)
+WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < 5000)
+SELECT n, n % 500 + 1, n % 5 + 1,
+       CASE n % 4 WHEN 0 THEN 'NEW' WHEN 1 THEN 'PAID' WHEN 2 THEN 'SHIPPED' ELSE 'CLOSED' END,
+       n * 7919 % 10000, date('2024-01-01', '+' || (n % 366) || ' days')
+FROM seq;
+
+INSERT INTO ORDER_ITEMS (ORDER_ID, LINE_NO, PRODUCT_ID, QUANTITY)
+WITH RECURSIVE seq(n) AS (SELECT 0 UNION ALL SELECT n + 1 FROM seq WHERE n < 14999)
+SELECT n / 3 + 1, n % 3 + 1, n * 31 % 50 + 1, n % 5 + 1
+FROM seq;
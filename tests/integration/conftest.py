@@ -0,0 +1,108 @@
+import pytest
+
+import src.tools.oracle_pool as oracle_pool
+
+
+class FakeCursor:
+    """记录执行的语句与绑定变量，结果由所属 FakePool 的 responses 决定"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.description = pool.description
+        self.arraysize = 100
+        self.fetches = 0
+        self._rows = iter(())
+
+    def execute(self, sql, params=None):
+        if self.pool.error is not None:
+            raise self.pool.error
+        self.pool.executed.append((sql, params))
+        responses = self.pool.responses
+        if callable(responses):
+            rows = responses(sql, params)
+        else:
+            rows = responses[len(self.pool.executed) - 1]
+        self._rows = iter(rows)
+
+    def fetchone(self):
+        return next(self._rows, None)
+
+    def fetchall(self):
+        return list(self._rows)
+
+    def fetchmany(self, size=None):
+        self.fetches += 1
+        return [row for _, row in zip(range(size or self.arraysize), self._rows)]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self):
+        cursor = FakeCursor(self.pool)
+        self.pool.cursors.append(cursor)
+        return cursor
+
+
+class FakePool:
+    """
+    可配置的 Oracle 会话池
+
+    responses 为按执行顺序排列的结果列表，或按 (sql, params) 返回结果的函数；
+    error 不为 None 时每次执行都抛出该异常。connection 指定时每次都借出同一个连接。
+    """
+
+    def __init__(self):
+        self.responses = lambda sql, params: []
+        self.description = None
+        self.error = None
+        self.connection = None
+        self.executed = []
+        self.cursors = []
+        self.acquired = []
+        self.released = []
+        self.dropped = []
+
+    def acquire(self):
+        connection = self.connection or FakeConnection(self)
+        self.acquired.append(connection)
+        return connection
+
+    def release(self, connection):
+        self.released.append(connection)
+
+    def drop(self, connection):
+        self.dropped.append(connection)
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    """替换全局 Oracle 会话池的 FakePool"""
+    pool = FakePool()
+    monkeypatch.setattr(oracle_pool, "get_oracle_pool", lambda: pool)
+    return pool
+
+
+class RecordingCursor:
+    """包装 SQLite 游标，记录每次执行的绑定变量，用 SQLite 表模拟 Oracle 数据字典"""
+
+    def __init__(self, conn):
+        self._cursor = conn.cursor()
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append(params)
+        return self._cursor.execute(sql, params or {})
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+
+@pytest.fixture
+def recording_cursor():
+    """返回 RecordingCursor，按 SQLite 连接创建"""
+    return RecordingCursor
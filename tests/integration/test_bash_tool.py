@@ -1,3 +1,4 @@
+import asyncio
 import unittest
 import subprocess
 from unittest.mock import patch
@@ -39,6 +40,13 @@ class TestBashTool(unittest.TestCase):
         )
         self.assertEqual(result.strip(), "test content")
 
+    def test_async_command_is_logged(self):
+        """Test the async path used by the graph logs tool I/O like the sync path"""
+        with self.assertLogs("src.tools.decorators", level="DEBUG") as logs:
+            result = asyncio.run(bash_tool.ainvoke("echo 'async'"))
+        self.assertEqual(result.strip(), "async")
+        self.assertTrue(any("Tool arun_bash returned: async" in line for line in logs.output))
+
 
 if __name__ == "__main__":
     unittest.main()
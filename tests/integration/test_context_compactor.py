@@ -0,0 +1,86 @@
+import json
+
+from langchain_core.messages import HumanMessage
+
+from src.graph.context_compactor import (
+    compact_messages,
+    estimate_tokens,
+    summarize_compaction,
+)
+from src.graph.nodes import RESPONSE_FORMAT
+
+PLAN = json.dumps(
+    {
+        "steps": [
+            {"agent_name": "researcher", "title": "调研"},
+            {"agent_name": "db_analyst", "title": "查询", "depends_on": []},
+            {"agent_name": "coder", "title": "计算", "depends_on": [1]},
+        ]
+    },
+    ensure_ascii=False,
+)
+
+
+def agent_output(agent_name: str, content: str, plan_step: int) -> HumanMessage:
+    return HumanMessage(
+        content=RESPONSE_FORMAT.format(agent_name, content),
+        name=agent_name,
+        additional_kwargs={"summary_id": f"id-{plan_step}", "plan_step": plan_step},
+    )
+
+
+def build_state(**extra):
+    return {
+        "messages": [
+            HumanMessage(content="分析销售数据"),
+            HumanMessage(content=PLAN, name="planner"),
+            agent_output("researcher", "研究" * 2000, 0),
+            agent_output("db_analyst", "数据" * 2000, 1),
+        ],
+        "full_plan": PLAN,
+        **extra,
+    }
+
+
+def test_earlier_outputs_are_compacted_to_references():
+    references = {
+        "id-0": "docs/executions/t/研究.md",
+        "id-1": "docs/executions/t/数据.md",
+    }
+    messages, record = compact_messages(
+        "supervisor", build_state(), references, budget=1000
+    )
+
+    assert messages[0].content == "分析销售数据"
+    assert messages[1].content == PLAN
+    assert "docs/executions/t/研究.md" in messages[2].content
+    assert "docs/executions/t/数据.md" in messages[3].content
+    assert record["compacted_tokens"] <= 1000
+    assert record["original_tokens"] > 8000
+
+
+def test_dependencies_of_current_step_are_kept_in_full():
+    state = build_state(plan_step=2)
+    budget = estimate_tokens("研究" * 2000) + 800
+    messages, _ = compact_messages("coder", state, budget=budget)
+
+    # 步骤3只依赖步骤1，步骤2虽然更近也只保留摘要
+    assert messages[2].content == state["messages"][2].content
+    assert "<summary>" in messages[3].content
+
+
+def test_summarize_compaction_reports_savings():
+    report = summarize_compaction(
+        [
+            {"role": "supervisor", "original_tokens": 1000, "compacted_tokens": 200},
+            {"role": "coder", "original_tokens": 500, "compacted_tokens": 500},
+            {"role": "supervisor", "original_tokens": 1500, "compacted_tokens": 300},
+        ]
+    )
+    assert report["saved_tokens"] == 2000
+    assert report["saved_ratio"] == 0.6667
+    assert report["by_role"]["supervisor"] == {
+        "calls": 2,
+        "original_tokens": 2500,
+        "compacted_tokens": 500,
+    }
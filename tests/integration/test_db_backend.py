@@ -0,0 +1,79 @@
+from pathlib import Path
+
+import pytest
+
+import src.agents.agents as agents
+import src.tools.oracle_db as oracle_db
+from src.tools.oracle_db import (
+    execute_oracle_query,
+    get_table_indexes,
+    get_table_info,
+    get_table_relationships,
+    invalidate_column_comments,
+    invalidate_query_results,
+)
+from src.tools.sql_guard import guard_query
+from src.tools.sqlite_backend import SQLiteBackend
+
+FIXTURE = Path(__file__).parent.parent / "fixtures" / "sample_schema.sql"
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    backend = SQLiteBackend(str(tmp_path / "backend.sqlite"), str(FIXTURE))
+    monkeypatch.setattr(oracle_db, "get_db_backend", lambda: backend)
+    invalidate_query_results()
+    invalidate_column_comments()
+    yield backend
+    invalidate_query_results()
+    invalidate_column_comments()
+
+
+def test_metadata_tools_on_sqlite_fixture(backend):
+    tables = get_table_info.invoke({})
+    assert "ORDERS | 订单" in tables and "_column_comments" not in tables
+
+    columns = get_table_info.invoke({"table_name": "orders"})
+    assert "表注释: 订单" in columns
+    assert "ID | INTEGER |  | 否 |  | 订单编号" in columns
+    assert "STATUS | VARCHAR2(20) | 20 | 是 | 'NEW' | 订单状态" in columns
+
+    relationships = get_table_relationships.invoke({"table_name": "order_items"})
+    assert "ORDER_ID(订单编号) | ORDERS | ID(订单编号)" in relationships
+
+    indexes = get_table_indexes.invoke({"table_name": "orders"})
+    assert (
+        "IDX_ORDERS_STATUS_DATE | NORMAL | 非唯一 | ORDER_DATE(下单日期) | 2" in indexes
+    )
+
+
+def test_query_tool_uses_sqlite_dialect(backend):
+    sql = "select o.id, c.name from orders o join customers c on c.id = o.customer_id where o.status = :status"
+    result = execute_oracle_query.invoke(
+        {"sql": sql, "fetch_size": 2, "binds": {"status": "PAID"}}
+    )
+    assert result.splitlines()[1] == "订单编号 | 客户名称"
+    assert "结果已限制为前2行" in result
+
+    assert guard_query(sql, 3, "sqlite").sql.endswith("LIMIT 3")
+    assert guard_query(
+        "SELECT * FROM (SELECT * FROM t LIMIT 1) x LIMIT 5", 3, "sqlite"
+    ).sql.endswith("LIMIT 5")
+
+
+def test_fixture_is_applied_once(backend):
+    # 已有表的数据库不再执行夹具
+    SQLiteBackend(backend.path, str(FIXTURE))
+    with backend.session() as connection:
+        assert connection.execute("SELECT COUNT(*) FROM REGIONS").fetchone()[0] == 4
+
+
+def test_db_analyst_only_gets_backend_tools_on_sqlite(monkeypatch):
+    monkeypatch.setattr(agents, "DB_BACKEND", "sqlite")
+    assert [tool.name for tool in agents._db_analyst_tools()] == [
+        "get_table_info",
+        "execute_oracle_query",
+        "get_table_relationships",
+    ]
+    monkeypatch.setattr(agents, "DB_BACKEND", "oracle")
+    assert len(agents._db_analyst_tools()) == 7
@@ -0,0 +1,585 @@
+import hashlib
+import io
+import json
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from docx import Document
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from minio.error import S3Error
+from reportlab.pdfgen import canvas
+
+import src.api.document_routes as document_routes
+import src.tools.document_jobs as document_jobs
+import src.tools.document_parser as document_parser
+import src.tools.document_tool as document_tool
+from src.tools.document_index import (
+    PARSE_DONE,
+    PARSE_FAILED,
+    PARSE_QUEUED,
+    SQLiteDocumentIndex,
+)
+from src.tools.document_jobs import DOCUMENT_PARSE_CONFIG, DocumentNotReady
+from src.tools.document_parser import (
+    PARSER_VERSION,
+    DocumentParser,
+    DocumentTooLarge,
+    page_byte_offsets,
+    parse_page_ranges,
+)
+
+
+class FakeObject:
+    def __init__(self, data: bytes):
+        self._data = data
+
+    def read(self):
+        return self._data
+
+    def stream(self, amt):
+        for start in range(0, len(self._data), amt):
+            yield self._data[start : start + amt]
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    """内存中的 MinIO，记录每类请求的次数"""
+
+    def __init__(self):
+        self.objects = {}
+        self.metadata = {}
+        self.calls = {"get": 0, "put": 0, "list": 0, "remove": 0}
+
+    def _missing(self, name):
+        return S3Error("NoSuchKey", "missing", name, "req", "host", None)
+
+    def put_object(
+        self, bucket, name, stream, length, content_type=None, metadata=None, **kwargs
+    ):
+        self.calls["put"] += 1
+        if length == -1:
+            # 长度未知时按分段读取，与真实客户端的分段上传一致
+            parts = iter(lambda: stream.read(kwargs["part_size"]), b"")
+            self.objects[name] = b"".join(parts)
+        else:
+            self.objects[name] = stream.read()
+        self.metadata[name] = {
+            f"X-Amz-Meta-{key}": value for key, value in (metadata or {}).items()
+        }
+
+    def get_object(self, bucket, name, offset=0, length=0, **kwargs):
+        self.calls["get"] += 1
+        if name not in self.objects:
+            raise self._missing(name)
+        data = self.objects[name][offset:]
+        return FakeObject(data[:length] if length else data)
+
+    def list_objects(
+        self, bucket, prefix="", recursive=False, include_user_meta=False, **kwargs
+    ):
+        self.calls["list"] += 1
+        now = datetime.now(timezone.utc)
+        return [
+            SimpleNamespace(
+                object_name=name,
+                size=len(data),
+                last_modified=now,
+                metadata=self.metadata.get(name) if include_user_meta else None,
+            )
+            for name, data in sorted(self.objects.items())
+            if name.startswith(prefix)
+        ]
+
+    def stat_object(self, bucket, name, **kwargs):
+        if name not in self.objects:
+            raise self._missing(name)
+        return SimpleNamespace(
+            etag=hashlib.md5(self.objects[name]).hexdigest(),
+            size=len(self.objects[name]),
+        )
+
+    def copy_object(self, bucket, name, source, **kwargs):
+        if source.object_name not in self.objects:
+            raise self._missing(source.object_name)
+        self.objects[name] = self.objects[source.object_name]
+        self.metadata[name] = self.metadata.get(source.object_name, {})
+
+    def presigned_get_object(
+        self, bucket, name, expires, response_headers=None, **kwargs
+    ):
+        return (
+            f"http://minio.test/{bucket}/{name}?expires={int(expires.total_seconds())}"
+        )
+
+    def remove_object(self, bucket, name):
+        self.calls["remove"] += 1
+        self.objects.pop(name, None)
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SQLiteDocumentIndex(str(tmp_path / "document_index.sqlite"))
+
+
+@pytest.fixture
+def minio(monkeypatch, index):
+    fake = FakeMinio()
+    monkeypatch.setattr(document_parser, "get_minio_client", lambda: fake)
+    monkeypatch.setattr(document_parser, "ensure_bucket_exists", lambda: None)
+    monkeypatch.setattr(document_parser, "get_document_index", lambda: index)
+    return fake
+
+
+def make_docx(*paragraphs: str) -> bytes:
+    doc = Document()
+    doc.core_properties.title = "测试文档"
+    for paragraph in paragraphs:
+        doc.add_paragraph(paragraph)
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def make_pdf(*pages: str) -> bytes:
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer)
+    for text in pages:
+        pdf.drawString(72, 720, text)
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
+
+
+def test_reads_are_served_from_sidecar(minio):
+    parser = DocumentParser()
+    uploaded = parser.upload_file(
+        make_docx("first paragraph", "", "second paragraph"), "report.docx"
+    )
+    file_id = uploaded["file_id"]
+    minio.calls.update(get=0, list=0, put=0)
+
+    info = parser.get_file_info(file_id, include_content=False)
+    assert "content" not in info
+    assert info["statistics"]["paragraph_count"] == 2
+    assert info["metadata"]["title"] == "测试文档"
+    # 元数据只需要一次 GET，不列举对象，也不下载原始文件
+    assert minio.calls == {"get": 1, "put": 0, "list": 0, "remove": 0}
+
+    assert (
+        parser.get_file_info(file_id)["content"]
+        == "first paragraph\n\nsecond paragraph"
+    )
+    assert parser.read_content(file_id, max_chars=5) == "first"
+
+    assert parser.delete_file(file_id)
+    assert minio.objects == {}
+
+
+def test_pdf_page_offsets(minio):
+    parser = DocumentParser()
+    info = parser.upload_file(make_pdf("page one", "page two"), "contract.pdf")
+    content = parser.read_content(info["file_id"])
+    assert [content[start:end].strip() for start, end in info["pages"]] == [
+        "page one",
+        "page two",
+    ]
+    assert info["statistics"]["page_count"] == 2
+
+
+def test_stale_sidecar_is_rebuilt(minio):
+    parser = DocumentParser()
+    uploaded = parser.upload_file(make_docx("hello"), "a.docx")
+    file_id, content_hash = uploaded["file_id"], uploaded["content_hash"]
+
+    minio.objects.pop(f"parsed/{content_hash}/meta.json")
+    info = parser.get_file_info(file_id, include_content=False)
+    assert info["parser_version"] == PARSER_VERSION
+    assert info["statistics"]["content_length"] == len("hello")
+    assert f"parsed/{content_hash}/meta.json" in minio.objects
+
+    assert parser.get_file_info("00000000-0000-0000-0000-000000000000") is None
+
+
+def test_index_lookup_and_rebuild_from_bucket(minio, index):
+    parser = DocumentParser()
+    content = make_docx("indexed")
+    file_id = parser.upload_file(content, "plan.docx")["file_id"]
+    record = index.get(file_id)
+    assert record.object_name == f"blobs/{hashlib.sha256(content).hexdigest()}"
+    assert record.parse_status == PARSE_DONE and len(record.content_hash) == 64
+
+    # 下载只需一次索引查找和一次 GET
+    minio.calls.update(get=0, list=0)
+    assert parser.download_file(file_id) == content
+    assert minio.calls["get"] == 1 and minio.calls["list"] == 0
+
+    # 索引丢失后从存储桶重建，包括尚未解析的文件
+    minio.objects["11111111-1111-1111-1111-111111111111_old.pdf"] = b"%PDF"
+    index.replace_all([])
+    assert parser.rebuild_index() == 2
+    assert index.get(file_id) == record
+    assert (
+        index.get("11111111-1111-1111-1111-111111111111").parse_status == PARSE_QUEUED
+    )
+
+    # 其他实例上传、本地索引中没有的文件按存储桶中的文件记录补入索引
+    index.delete(file_id)
+    assert parser.download_file(file_id) == content
+    assert index.get(file_id).parse_status == PARSE_DONE
+
+    assert parser.delete_file(file_id)
+    assert index.get(file_id) is None
+
+
+def test_identical_content_is_stored_and_parsed_once(minio, index):
+    parser = DocumentParser()
+    content = make_docx("shared")
+    first = parser.upload_file(content, "first.docx")
+    minio.calls.update(put=0)
+
+    # 相同内容只写入新文件的引用与记录，不重复上传原始文件，也不重新解析
+    second = parser.upload_stream(io.BytesIO(content), "second.docx")
+    assert (
+        second.object_name == first["object_name"] and second.parse_status == PARSE_DONE
+    )
+    assert minio.calls["put"] == 2
+    assert parser.get_file_info(second.file_id)["filename"] == "second.docx"
+    assert parser.get_file_info(first["file_id"])["filename"] == "first.docx"
+    assert sorted(name for name in minio.objects if name.startswith("refs/")) == sorted(
+        f"refs/{second.content_hash}/{file_id}"
+        for file_id in (first["file_id"], second.file_id)
+    )
+
+    # 删除其中一个文件不影响另一个，最后一个引用被删除时才删除原始文件与解析结果
+    assert parser.delete_file(first["file_id"])
+    assert parser.download_file(second.file_id) == content
+    assert parser.read_content(second.file_id) == "shared"
+    assert parser.delete_file(second.file_id)
+    assert minio.objects == {}
+
+    # 尚未解析时上传的相同内容共用解析任务的状态
+    first = parser.upload_stream(io.BytesIO(content), "first.docx")
+    second = parser.upload_stream(io.BytesIO(content), "second.docx")
+    assert second.parse_status == PARSE_QUEUED
+    parser.jobs.wait(first)
+    job = index.get_job(second.file_id)
+    assert (job.status, job.attempts) == (PARSE_DONE, 1)
+    assert index.get(second.file_id).parse_status == PARSE_DONE
+
+
+def test_shared_blob_survives_failed_upload_and_other_instances(
+    minio, index, tmp_path, monkeypatch
+):
+    content = make_docx("raced")
+    parser = DocumentParser()
+    put_object = minio.put_object
+    uploads = []
+
+    # 第一次上传原始文件时，相同内容的第二次上传先完成，随后第一次上传失败
+    def failing_put_object(bucket, name, *args, **kwargs):
+        if name.startswith("blobs/") and not uploads:
+            uploads.append(None)
+            uploads[0] = parser.upload_stream(io.BytesIO(content), "second.docx")
+            raise S3Error("InternalError", "failed", name, "req", "host", None)
+        return put_object(bucket, name, *args, **kwargs)
+
+    monkeypatch.setattr(minio, "put_object", failing_put_object)
+    with pytest.raises(ValueError, match="文件上传失败"):
+        parser.upload_stream(io.BytesIO(content), "first.docx")
+    second = uploads[0]
+    assert minio.objects[second.object_name] == content
+    assert [name for name in minio.objects if name.startswith(("refs/", "files/"))] == [
+        f"refs/{second.content_hash}/{second.file_id}",
+        f"files/{second.file_id}.json",
+    ]
+    assert parser.parse_file(second.file_id)["content"] == "raced"
+
+    # 另一个实例（各自的本地索引）上传相同内容后，本实例删除自己的文件不删除共用对象
+    other = DocumentParser()
+    other.index = SQLiteDocumentIndex(str(tmp_path / "other.sqlite"))
+    third = other.upload_stream(io.BytesIO(content), "third.docx")
+    assert third.parse_status == PARSE_DONE
+    assert parser.delete_file(second.file_id)
+    assert other.read_content(third.file_id) == "raced"
+    assert other.delete_file(third.file_id)
+    assert minio.objects == {}
+
+
+def test_delete_restores_blob_referenced_by_other_instance(
+    minio, tmp_path, monkeypatch
+):
+    content = make_docx("shared")
+    parser = DocumentParser()
+    first = parser.upload_file(content, "first.docx")
+    other = DocumentParser()
+    other.index = SQLiteDocumentIndex(str(tmp_path / "other.sqlite"))
+    copy_object = minio.copy_object
+    uploads = []
+
+    # 本实例列举引用之后、删除原始文件之前，另一个实例登记引用并看到原始文件仍存在
+    def racing_copy_object(bucket, name, source, **kwargs):
+        if name.startswith("deleting/") and not uploads:
+            uploads.append(other.upload_stream(io.BytesIO(content), "second.docx"))
+        return copy_object(bucket, name, source, **kwargs)
+
+    monkeypatch.setattr(minio, "copy_object", racing_copy_object)
+    assert parser.delete_file(first["file_id"])
+    second = uploads[0]
+    assert second.parse_status == PARSE_DONE
+    assert minio.objects[second.object_name] == content
+    assert not any(name.startswith("deleting/") for name in minio.objects)
+    assert other.read_content(second.file_id) == "shared"
+
+
+class NonSeekableStream(io.RawIOBase):
+    """不可回退的流，记录已读取的字节数"""
+
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+        self.consumed = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        buffer[: len(data)] = data
+        self.consumed += len(data)
+        return len(data)
+
+
+def test_streaming_upload_hashes_and_enforces_size_cap(minio, index, monkeypatch):
+    parser = DocumentParser()
+    content = make_docx("streamed " * 200)
+    record = parser.upload_stream(
+        io.BytesIO(content), "big.docx", max_size=len(content)
+    )
+    assert record.file_size == len(content)
+    assert record.content_hash == hashlib.sha256(content).hexdigest()
+    assert index.get(record.file_id).parse_status == PARSE_QUEUED
+    assert minio.objects[record.object_name] == content
+
+    # 解析在上传之后单独进行，结果中带有上传时计算的哈希
+    info = parser.parse_file(record.file_id)
+    assert info["content_hash"] == record.content_hash
+    assert index.get(record.file_id).parse_status == PARSE_DONE
+
+    with pytest.raises(DocumentTooLarge):
+        parser.upload_stream(io.BytesIO(content), "big.docx", max_size=len(content) - 1)
+
+    # 不可回退的流在暂存时即检查大小上限，超出后不再继续读取
+    monkeypatch.setitem(document_parser.DOCUMENT_UPLOAD_CONFIG, "part_size", 1024)
+    stream = NonSeekableStream(content * 10)
+    with pytest.raises(DocumentTooLarge):
+        parser.upload_stream(stream, "big.docx", max_size=len(content))
+    assert stream.consumed <= len(content) + 1024
+    record = parser.upload_stream(
+        NonSeekableStream(content), "piped.docx", max_size=len(content)
+    )
+    assert record.content_hash == hashlib.sha256(content).hexdigest()
+    assert minio.objects[record.object_name] == content
+
+
+def test_parse_jobs_retry_transient_errors_only(minio, index, monkeypatch):
+    parser = DocumentParser()
+    parser.jobs.retry_delay = 0
+    record = parser.upload_stream(io.BytesIO(make_pdf("retried")), "retry.pdf")
+
+    # 第一次读取原始文件失败，重试后在解析进程中完成
+    get_object = minio.get_object
+    failures = []
+
+    def flaky_get_object(bucket, name, **kwargs):
+        if name == record.object_name and not failures:
+            failures.append(name)
+            raise minio._missing(name)
+        return get_object(bucket, name, **kwargs)
+
+    monkeypatch.setattr(minio, "get_object", flaky_get_object)
+    assert parser.jobs.wait(record)["content"].strip() == "retried"
+    job = index.get_job(record.file_id)
+    assert (job.status, job.attempts, job.error) == (PARSE_DONE, 2, None)
+    assert index.get(record.file_id).parse_status == PARSE_DONE
+
+    # 内容无法解析时不重试
+    broken = parser.upload_stream(io.BytesIO(b"not a pdf"), "broken.pdf")
+    with pytest.raises(ValueError, match="PDF解析错误"):
+        parser.get_file_info(broken.file_id)
+    job = index.get_job(broken.file_id)
+    assert (job.status, job.attempts) == (PARSE_FAILED, 1)
+    assert index.get(broken.file_id).parse_status == PARSE_FAILED
+
+
+def test_failed_parse_is_not_requeued_until_retry_after(minio, index, monkeypatch):
+    parser = DocumentParser()
+    broken = parser.upload_stream(io.BytesIO(b"not a pdf"), "broken.pdf")
+    with pytest.raises(ValueError, match="PDF解析错误"):
+        parser.parse_file(broken.file_id)
+
+    submitted = []
+    submit = parser.jobs.submit
+    monkeypatch.setattr(
+        parser.jobs, "submit", lambda record: submitted.append(record) or submit(record)
+    )
+
+    # 失败记录未过期时直接返回失败原因，不重新排队
+    with pytest.raises(ValueError, match="PDF解析错误"):
+        parser.get_file_info(broken.file_id)
+    with pytest.raises(ValueError, match="PDF解析错误"):
+        parser.read_pages(broken.file_id, parse_page_ranges("1"))
+    assert submitted == []
+
+    # 显式重新解析或超过 failed_retry_after 后重新排队
+    with pytest.raises(ValueError, match="PDF解析错误"):
+        parser.parse_file(broken.file_id, force=True)
+    monkeypatch.setitem(DOCUMENT_PARSE_CONFIG, "failed_retry_after", 0)
+    with pytest.raises(ValueError, match="PDF解析错误"):
+        parser.get_file_info(broken.file_id)
+    assert len(submitted) == 2
+    assert index.get_job(broken.file_id).attempts == 1
+
+
+def test_parse_timeout_discards_pool():
+    pool = document_jobs._parse_pool.get()
+    with pytest.raises(ValueError, match="文档解析超时"):
+        document_jobs._map_in_pool(time.sleep, [(5,)], timeout=0.5)
+    # 超时的任务仍在旧进程池中执行，之后的解析使用新的进程池
+    assert document_jobs._parse_pool.get() is not pool
+    assert document_jobs._map_in_pool(len, [("abc",)])[0] == 3
+
+
+def test_pdf_pages_are_extracted_in_batches_and_read_by_range(minio, monkeypatch):
+    monkeypatch.setitem(DOCUMENT_PARSE_CONFIG, "pdf_pages_per_task", 2)
+    parser = DocumentParser()
+    record = parser.upload_stream(
+        io.BytesIO(make_pdf(*(f"page {n}" for n in range(1, 8)))), "long.pdf"
+    )
+
+    # 尚未解析时只提取所需页，不生成解析结果
+    result = parser.read_pages(record.file_id, parse_page_ranges("2-3,7,9"))
+    assert result["page_count"] == 7
+    assert [(page["page"], page["text"].strip()) for page in result["pages"]] == [
+        (2, "page 2"),
+        (3, "page 3"),
+        (7, "page 7"),
+    ]
+    assert f"parsed/{record.content_hash}/meta.json" not in minio.objects
+
+    # 分批并行解析后的全文与逐页顺序一致，按字节偏移读取指定页
+    info = parser.parse_file(record.file_id)
+    assert info["statistics"]["page_count"] == 7
+    minio.calls.update(get=0)
+    result = parser.read_pages(record.file_id, parse_page_ranges("3-5"))
+    assert [page["text"].strip() for page in result["pages"]] == [
+        "page 3",
+        "page 4",
+        "page 5",
+    ]
+    # 一次读取元数据，一次范围读取全文
+    assert minio.calls["get"] == 2
+
+    # 多字节字符按 UTF-8 字节数换算
+    assert page_byte_offsets("一\n二三", [[0, 1], [2, 4]]) == [[0, 3], [4, 10]]
+    with pytest.raises(ValueError):
+        parse_page_ranges("5-3")
+
+
+def test_analysis_tool_reads_requested_pages(minio, monkeypatch):
+    parser = DocumentParser()
+    record = parser.upload_stream(
+        io.BytesIO(make_pdf("page 1", "page 2", "page 3")), "tool.pdf"
+    )
+    monkeypatch.setattr(document_tool, "get_document_parser", lambda: parser)
+
+    result = json.loads(
+        document_tool.document_analysis_tool.invoke(
+            {
+                "document_url": record.file_id,
+                "analysis_request": "总结第二页",
+                "pages": "2",
+            }
+        )
+    )
+    assert result["success"] and result["data"]["returned_pages"] == [2]
+    assert result["data"]["document_content"].startswith("[第2页]\npage 2")
+
+
+def test_download_streams_ranges_and_redirects(minio, monkeypatch):
+    parser = DocumentParser()
+    content = make_pdf(*(f"page {n}" for n in range(1, 30)))
+    record = parser.upload_stream(io.BytesIO(content), "报告.pdf")
+    monkeypatch.setattr(document_routes, "get_document_parser", lambda: parser)
+    monkeypatch.setitem(document_routes.DOCUMENT_DOWNLOAD_CONFIG, "chunk_size", 1024)
+    app = FastAPI()
+    app.include_router(document_routes.router, prefix="/api")
+    client = TestClient(app)
+    url = f"/api/documents/{record.file_id}/download"
+
+    response = client.get(url)
+    assert response.status_code == 200 and response.content == content
+    assert response.headers["etag"] == f'"{record.content_hash}"'
+    assert response.headers["accept-ranges"] == "bytes"
+    assert (
+        "filename*=UTF-8''%E6%8A%A5%E5%91%8A.pdf"
+        in response.headers["content-disposition"]
+    )
+
+    etag = response.headers["etag"]
+    assert client.get(url, headers={"If-None-Match": etag}).status_code == 304
+
+    response = client.get(url, headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206 and response.content == content[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(content)}"
+    assert client.get(url, headers={"Range": "bytes=-10"}).content == content[-10:]
+    # If-Range 与当前版本不一致时返回完整文件
+    response = client.get(url, headers={"Range": "bytes=0-9", "If-Range": '"stale"'})
+    assert response.status_code == 200 and len(response.content) == len(content)
+    response = client.get(url, headers={"Range": f"bytes={len(content)}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{len(content)}"
+
+    response = client.get(url, params={"redirect": True}, follow_redirects=False)
+    assert response.status_code == 307
+    location = response.headers["location"]
+    assert (
+        location.startswith("http://minio.test/")
+        and record.content_hash in location
+        and "expires=300" in location
+    )
+
+
+def test_routes_report_documents_still_parsing(minio, monkeypatch):
+    parser = DocumentParser()
+    record = parser.upload_stream(io.BytesIO(make_docx("pending")), "pending.docx")
+    monkeypatch.setattr(document_routes, "get_document_parser", lambda: parser)
+
+    def not_ready(record, timeout=None):
+        raise DocumentNotReady(f"文档仍在解析中: {record.file_id}")
+
+    monkeypatch.setattr(parser.jobs, "wait", not_ready)
+    app = FastAPI()
+    app.include_router(document_routes.router, prefix="/api")
+    client = TestClient(app)
+
+    for method, path in [
+        ("get", "info"),
+        ("get", "content"),
+        ("get", "pages?pages=1"),
+        ("post", "analyze"),
+    ]:
+        response = getattr(client, method)(f"/api/documents/{record.file_id}/{path}")
+        assert response.status_code == 202
+        assert response.json()["status_url"].endswith(
+            f"/api/documents/{record.file_id}/status"
+        )
+
+    missing = "00000000-0000-0000-0000-000000000000"
+    assert client.get(f"/api/documents/{missing}/info").status_code == 404
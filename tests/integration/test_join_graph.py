@@ -0,0 +1,44 @@
+from src.tools.join_graph import find_join_paths, invalidate_join_graph
+
+FOREIGN_KEYS = [
+    ("ORDERS", "FK_ORDERS_CUSTOMER", "CUSTOMER_ID", "APP", "CUSTOMERS", "ID"),
+    ("ORDERS", "FK_ORDERS_SALESMAN", "SALESMAN_ID", "APP", "EMPLOYEES", "ID"),
+    ("CUSTOMERS", "FK_CUSTOMERS_REGION", "REGION_ID", "APP", "REGIONS", "ID"),
+    ("CUSTOMERS", "FK_CUSTOMERS_REGION2", "BILLING_REGION_ID", "APP", "REGIONS", "ID"),
+    ("ORDER_ITEMS", "FK_ITEMS_ORDER", "ORDER_ID", "APP", "ORDERS", "ID"),
+    ("ORDER_ITEMS", "FK_ITEMS_ORDER", "ORDER_VERSION", "APP", "ORDERS", "VERSION"),
+    ("EMPLOYEES", "FK_EMP_MANAGER", "MANAGER_ID", "APP", "EMPLOYEES", "ID"),
+    ("AUDIT_LOG", "FK_AUDIT_USER", "USER_ID", "SEC", "USERS", "ID"),
+]
+
+
+def test_join_paths_through_intermediate_tables(fake_pool):
+    fake_pool.responses = lambda sql, params: FOREIGN_KEYS
+    invalidate_join_graph()
+
+    result = find_join_paths.invoke(
+        {"tables": ["order_items", "regions"], "schema_name": "app"}
+    )
+    assert result.splitlines()[1:5] == [
+        "FROM ORDER_ITEMS",
+        "JOIN ORDERS ON ORDER_ITEMS.ORDER_ID = ORDERS.ID AND ORDER_ITEMS.ORDER_VERSION = ORDERS.VERSION",
+        "JOIN CUSTOMERS ON ORDERS.CUSTOMER_ID = CUSTOMERS.ID",
+        "JOIN REGIONS ON CUSTOMERS.REGION_ID = REGIONS.ID",
+    ]
+    assert "FK_CUSTOMERS_REGION2: CUSTOMERS.BILLING_REGION_ID = REGIONS.ID" in result
+    assert "需要经过的中间表: CUSTOMERS, ORDERS" in result
+
+    # 多张表一次求出连接树，关系图只加载一次
+    result = find_join_paths.invoke(
+        {
+            "tables": ["EMPLOYEES", "REGIONS", "ORDER_ITEMS", "AUDIT_LOG", "MISSING"],
+            "schema_name": "APP",
+        }
+    )
+    assert result.splitlines()[1:3] == [
+        "FROM EMPLOYEES",
+        "JOIN ORDERS ON ORDERS.SALESMAN_ID = EMPLOYEES.ID",
+    ]
+    assert "无法通过外键与其他表连接: AUDIT_LOG" in result
+    assert "没有外键关系或不存在: MISSING" in result
+    assert len(fake_pool.executed) == 1
@@ -0,0 +1,64 @@
+import json
+
+from src.utils.json_stream_parser import PlanStreamParser
+
+PLAN = {
+    "thought": "用户想了解 {steps: [...]} 的含义",
+    "title": "示例计划",
+    "steps": [
+        {"agent_name": "researcher", "title": "搜索", "description": 'say "hi" {x}'},
+        {"agent_name": "coder", "title": "计算", "description": "a\\nb", "note": "[1]"},
+        {"agent_name": "reporter", "title": "报告", "description": "汇总"},
+    ],
+}
+
+
+def feed_in_chunks(parser: PlanStreamParser, text: str, size: int) -> list:
+    emitted = []
+    for i in range(0, len(text), size):
+        emitted.append(parser.feed(text[i : i + size]))
+    return emitted
+
+
+def test_steps_are_emitted_as_soon_as_they_close():
+    text = "```json\n" + json.dumps(PLAN, ensure_ascii=False) + "\n```"
+    parser = PlanStreamParser()
+    emitted = feed_in_chunks(parser, text, 3)
+
+    flat = [step for batch in emitted for step in batch]
+    assert flat == PLAN["steps"]
+
+    # 第一个步骤在输出结束前就已经返回
+    first_batch = next(i for i, batch in enumerate(emitted) if batch)
+    assert first_batch < len(emitted) - 1
+    assert parser.finish() == PLAN
+
+
+def test_single_character_chunks():
+    parser = PlanStreamParser()
+    emitted = feed_in_chunks(parser, json.dumps(PLAN), 1)
+    assert [step for batch in emitted for step in batch] == PLAN["steps"]
+
+
+def test_truncated_plan_falls_back_to_streamed_steps():
+    text = json.dumps(PLAN, ensure_ascii=False)
+    cut = text.index('{"agent_name": "reporter"')
+    parser = PlanStreamParser()
+    parser.feed(text[: cut + 10])
+
+    assert parser.finish() == {"steps": PLAN["steps"][:2]}
+
+
+def test_invalid_step_is_skipped():
+    text = (
+        '{"steps": [{"agent_name": "coder", "title": x}, '
+        '{"agent_name": "reporter", "title": "ok"}]}'
+    )
+    parser = PlanStreamParser()
+    assert parser.feed(text) == [{"agent_name": "reporter", "title": "ok"}]
+
+
+def test_nested_steps_key_is_ignored():
+    text = '{"meta": {"steps": [{"a": 1}]}, "steps": [{"b": 2}]}'
+    parser = PlanStreamParser()
+    assert parser.feed(text) == [{"b": 2}]
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+
+import pytest
+from langgraph.graph import START, StateGraph
+
+import src.service.workflow_service as workflow_service
+from src.graph.types import State
+from src.tools.oracle_executor import OracleExecutor, OracleExecutorBusy, oracle_tool
+from src.tools.oracle_pool import oracle_session
+
+
+class BlockingConnection:
+    """execute 阻塞直到被 cancel()，模拟长时间运行的查询"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.cancelled = threading.Event()
+        self.callTimeout = None
+
+    def cancel(self):
+        self.cancelled.set()
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    executor = OracleExecutor(workers=1, max_queue=1)
+    monkeypatch.setattr(
+        "src.tools.oracle_executor.get_oracle_executor", lambda: executor
+    )
+    monkeypatch.setattr("src.tools.oracle_pool.get_oracle_executor", lambda: executor)
+    yield executor
+    executor.shutdown()
+
+
+@oracle_tool
+def slow_query(sql: str) -> str:
+    """测试用的慢查询工具"""
+    with oracle_session() as conn:
+        conn.started.set()
+        conn.cancelled.wait(5)
+        return f"{threading.current_thread().name}: {conn.callTimeout}"
+
+
+def build_query_graph():
+    """只有一个 db_analyst 节点的工作流，节点中调用慢查询工具"""
+
+    async def db_analyst(state):
+        await slow_query.ainvoke({"sql": "SELECT 1 FROM DUAL"})
+        return {}
+
+    builder = StateGraph(State)
+    builder.add_edge(START, "db_analyst")
+    builder.add_node("db_analyst", db_analyst)
+    return builder.compile()
+
+
+def test_tool_runs_on_executor_and_cancels_on_disconnect(
+    executor, fake_pool, monkeypatch
+):
+    connection = BlockingConnection()
+    fake_pool.connection = connection
+    monkeypatch.setattr(workflow_service, "get_graph", build_query_graph)
+
+    async def scenario():
+        workflow = workflow_service.run_agent_workflow(
+            [{"role": "user", "content": "查询"}]
+        )
+        async for event in workflow:
+            if event["event"] == "tool_call":
+                break
+        await asyncio.to_thread(connection.started.wait, 5)
+
+        # 唯一的工作线程被占用，再提交一个排队，第三个被拒绝
+        queued = asyncio.create_task(slow_query.ainvoke({"sql": "SELECT 2 FROM DUAL"}))
+        await asyncio.sleep(0.05)
+        assert "数据库执行队列已满" in await slow_query.ainvoke(
+            {"sql": "SELECT 3 FROM DUAL"}
+        )
+
+        # 与客户端断开时的 SSE 接口一样关闭工作流生成器，进行中的查询随之取消
+        await workflow.aclose()
+        assert connection.cancelled.is_set()
+        return await queued
+
+    result = asyncio.run(scenario())
+    assert connection.cancelled.is_set()
+    assert result.startswith("oracle") and result.endswith(": 60000")
+    assert len(fake_pool.released) == 2
+
+    stats = executor.stats()
+    assert stats["submitted"] == 2 and stats["rejected"] == 1
+    assert stats["cancelled"] == 1 and stats["completed"] == 1
+    assert stats["queued"] == 0 and stats["running"] == 0 and stats["peak_queued"] == 1
+
+
+def test_submit_rejects_when_queue_full():
+    executor = OracleExecutor(workers=1, max_queue=0)
+    with pytest.raises(OracleExecutorBusy):
+        executor.submit(lambda: None)
+    executor.shutdown()
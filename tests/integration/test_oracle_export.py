@@ -0,0 +1,75 @@
+import csv
+
+import cx_Oracle
+import pytest
+
+import src.tools.oracle_export as oracle_export
+from src.utils.file_manager import current_task_id
+
+ROWS = [(i, f"客户{i % 7}", None if i % 10 == 0 else i * 1.5) for i in range(1, 12001)]
+
+DESCRIPTION = [
+    ("ID", cx_Oracle.DB_TYPE_NUMBER, None, None, 10, 0, False),
+    ("NAME", cx_Oracle.DB_TYPE_VARCHAR, None, None, 0, 0, True),
+    ("AMOUNT", cx_Oracle.DB_TYPE_NUMBER, None, None, 12, 2, True),
+]
+
+
+@pytest.fixture
+def pool(fake_pool, monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    fake_pool.responses = lambda sql, params: ROWS
+    fake_pool.description = DESCRIPTION
+    token = current_task_id.set("task_1")
+    yield fake_pool
+    current_task_id.reset(token)
+
+
+def test_export_streams_rows_to_csv(pool, tmp_path):
+    result = oracle_export.export_oracle_query.invoke(
+        {
+            "sql": "select id, name, amount from orders where region = :region",
+            "export_format": "csv",
+            "name": "订单",
+            "binds": {"region": "华东"},
+        }
+    )
+
+    path = tmp_path / "docs/executions/task_1/exports/订单.csv"
+    with open(path, encoding="utf-8") as f:
+        assert sum(1 for _ in csv.reader(f)) == len(ROWS) + 1
+    assert "行数: 12000" in result
+    assert "AMOUNT NUMBER | 空值 10.0%" in result
+    assert "NAME VARCHAR | 空值 0.0% | 不同值 7" in result
+
+    sql, params = pool.executed[0]
+    assert sql.endswith("FETCH FIRST 1000001 ROWS ONLY")
+    assert params == {"region": "华东"}
+    cursor = pool.cursors[0]
+    assert cursor.prefetchrows == cursor.arraysize == 5000
+    assert cursor.fetches == 4
+
+
+@pytest.mark.skipif(oracle_export.pa is None, reason="pyarrow 未安装")
+def test_export_writes_parquet(pool, tmp_path):
+    import pandas as pd
+
+    oracle_export.export_oracle_query.invoke(
+        {"sql": "select * from orders", "name": "orders"}
+    )
+    frame = pd.read_parquet(tmp_path / "docs/executions/task_1/exports/orders.parquet")
+    assert len(frame) == len(ROWS)
+    assert str(frame["ID"].dtype) == "int64"
+
+
+def test_export_requires_current_task(pool, tmp_path):
+    token = current_task_id.set(None)
+    try:
+        result = oracle_export.export_oracle_query.invoke(
+            {"sql": "select * from orders"}
+        )
+    finally:
+        current_task_id.reset(token)
+    assert result.startswith("错误：无法确定当前任务ID")
+    assert "task_id" not in oracle_export.export_oracle_query.args
+    assert pool.executed == []
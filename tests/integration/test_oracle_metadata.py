@@ -0,0 +1,48 @@
+import sqlite3
+
+import pytest
+
+from src.tools.oracle_db import invalidate_column_comments, resolve_chinese_aliases
+
+
+@pytest.fixture
+def cursor(recording_cursor):
+    conn = sqlite3.connect(":memory:")
+    conn.execute(
+        "CREATE TABLE all_col_comments (owner TEXT, table_name TEXT, column_name TEXT, comments TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO all_col_comments VALUES (?, ?, ?, ?)",
+        [
+            ("OTHER", "ORDERS", "AMOUNT", "其他模式金额"),
+            ("", "ORDERS", "AMOUNT", "订单金额"),
+            ("", "ORDERS", "ID", "订单编号"),
+            ("", "CUSTOMERS", "NAME", "客户名称"),
+        ],
+    )
+    invalidate_column_comments()
+    yield recording_cursor(conn)
+    invalidate_column_comments()
+
+
+def test_aliases_use_one_query_per_table_and_cache(cursor):
+    sql = (
+        "SELECT o.id, o.amount, c.name, o.note FROM orders o JOIN customers c ON 1 = 1"
+    )
+    columns = ["ID", "AMOUNT", "NAME", "NOTE"]
+
+    assert resolve_chinese_aliases(cursor, columns, sql) == [
+        "订单编号",
+        "订单金额",
+        "客户名称",
+        "NOTE",
+    ]
+    assert [p["table_name"] for p in cursor.executed] == ["ORDERS", "CUSTOMERS"]
+
+    # 再次查询命中缓存，不再访问数据字典
+    resolve_chinese_aliases(cursor, columns, sql)
+    assert len(cursor.executed) == 2
+
+    invalidate_column_comments("orders")
+    resolve_chinese_aliases(cursor, columns, sql)
+    assert [p["table_name"] for p in cursor.executed[2:]] == ["ORDERS"]
@@ -0,0 +1,46 @@
+import cx_Oracle
+import pytest
+
+from src.tools.oracle_db import (
+    execute_oracle_query,
+    get_table_indexes,
+    invalidate_query_results,
+)
+
+INDEX_ROW = ("IDX_T", "NORMAL", "UNIQUE", "ID", 1, "主键")
+
+
+def respond(sql, params):
+    if "_ind_columns" in sql:
+        return [INDEX_ROW]
+    if "col_comments" in sql:
+        return []
+    return [(1, "a")]
+
+
+@pytest.fixture
+def pool(fake_pool):
+    fake_pool.responses = respond
+    fake_pool.description = [("ID",), ("NAME",)]
+    invalidate_query_results()
+    return fake_pool
+
+
+def test_tools_release_sessions_to_pool(pool):
+    assert "IDX_T" in get_table_indexes.invoke({"table_name": "t"})
+    result = execute_oracle_query.invoke({"sql": "SELECT id, name FROM t"})
+    assert "查询结果" in result
+
+    # 中文别名查询复用同一个会话，不再单独建立连接
+    assert len(pool.acquired) == 2
+    assert pool.released == pool.acquired
+    assert not pool.dropped
+
+
+def test_lost_session_is_dropped(pool):
+    pool.error = cx_Oracle.DatabaseError("DPI-1080: connection was closed by ORA-3113")
+    result = execute_oracle_query.invoke({"sql": "SELECT id FROM t"})
+
+    assert "DPI-1080" in result
+    assert pool.dropped == pool.acquired
+    assert not pool.released
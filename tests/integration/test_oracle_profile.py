@@ -0,0 +1,74 @@
+from datetime import datetime
+
+import pytest
+
+from src.tools.oracle_profile import _profile_cache, profile_table
+
+COLUMNS = [
+    ("ID", "NUMBER", 1_000_000, 0),
+    ("STATUS", "VARCHAR2", 3, 10),
+    ("AMOUNT", "NUMBER", 5000, 100_000),
+    ("NOTE", "CLOB", None, 400_000),
+    ("SHAPE", "SDO_GEOMETRY", None, None),
+]
+
+
+@pytest.fixture
+def run_profile(fake_pool):
+    def run(table_row, aggregate_row, distribution_rows):
+        fake_pool.responses = [[table_row], COLUMNS, [aggregate_row], distribution_rows]
+        fake_pool.executed.clear()
+        _profile_cache.clear()
+        return (
+            profile_table.invoke({"table_name": "orders", "schema_name": "app"}),
+            fake_pool.executed,
+        )
+
+    return run
+
+
+def test_profile_uses_fresh_statistics_and_sample(run_profile):
+    result, executed = run_profile(
+        (1_000_000, datetime.now(), "NO"),
+        (100_000, 1, 999_999, "A", "C", 0.5, 900.0),
+        [
+            ("STATUS", "T", "A", 60_000),
+            ("STATUS", "T", "B", 30_000),
+            ("AMOUNT", "H", "1", 50_000),
+            ("AMOUNT", "H", "10", 20),
+            ("ID", "H", "5", 10_000),
+        ],
+    )
+
+    aggregate_sql = executed[2][0]
+    assert "SAMPLE (10.000000) SEED (42)" in aggregate_sql
+    # 统计信息未过期时不再按样本计算空值与不同值
+    assert (
+        "APPROX_COUNT_DISTINCT" not in aggregate_sql and '"SHAPE"' not in aggregate_sql
+    )
+
+    distribution_sql, binds = executed[3]
+    assert distribution_sql.count("'T' kind") == 2  # STATUS、AMOUNT，ID 近似唯一
+    assert binds["lo2"] == 0.5 and binds["hi2"] == 900.0
+
+    assert "STATUS | VARCHAR2 | 0.0% | ≈3 | A | C | A(60%), B(30%) | -" in result
+    assert (
+        "AMOUNT | NUMBER | 10.0% | ≈5000 | 0.5 | 900 | - | 50000 0 0 0 0 0 0 0 0 20"
+        in result
+    )
+    assert "NOTE | CLOB | 40.0% | -" in result
+    assert "另有 1 列未统计" in result
+
+
+def test_profile_without_statistics_reads_bounded_prefix(run_profile):
+    result, executed = run_profile(
+        (None, None, None),
+        (500, 500, 500, 1, 500, 450, 2, "A", "B", 300, 20, 1.0, 9.0, 400),
+        [],
+    )
+
+    aggregate_sql = executed[2][0]
+    assert "WHERE ROWNUM <= 100000" in aggregate_sql
+    assert 'APPROX_COUNT_DISTINCT("STATUS")' in aggregate_sql
+    assert "STATUS | VARCHAR2 | 10.0% | ≈2" in result
+    assert "行数未知" in result
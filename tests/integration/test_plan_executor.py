@@ -0,0 +1,185 @@
+import asyncio
+import json
+from typing import Literal
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.types import Command, Send
+
+import src.agents
+import src.graph.builder as builder
+import src.graph.nodes as nodes
+from src.config import TEAM_MEMBERS
+from src.graph.plan_executor import ready_plan_steps, step_dependencies
+from src.utils.file_manager import ExecutionFileManager
+from src.utils.title_generator import title_worker
+
+
+def make_step(agent_name, **fields):
+    return {"agent_name": agent_name, "title": f"{agent_name} step", **fields}
+
+
+def make_state(*steps, **fields):
+    return {
+        "TEAM_MEMBERS": TEAM_MEMBERS,
+        "messages": [HumanMessage(content="分析订单数据", name="user")],
+        "full_plan": json.dumps({"title": "plan", "steps": list(steps)}),
+        "plan_executor_mode": True,
+        "plan_dispatched_steps": [],
+        **fields,
+    }
+
+
+class FakeRouterLLM:
+    """supervisor 的结构化输出 LLM，记录调用次数"""
+
+    def __init__(self, next_step="FINISH"):
+        self.next_step = next_step
+        self.calls = 0
+
+    def with_structured_output(self, schema):
+        return self
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        return {"next": self.next_step}
+
+
+class BarrierAgent:
+    """两个智能体都开始执行后才返回，只有并行派发时才能完成"""
+
+    def __init__(self, name, started, both_started):
+        self.name = name
+        self.started = started
+        self.both_started = both_started
+
+    async def ainvoke(self, state):
+        self.started.append(self.name)
+        if len(self.started) == 2:
+            self.both_started.set()
+        await asyncio.wait_for(self.both_started.wait(), timeout=5)
+        return {"messages": [AIMessage(content=f"{self.name} result")]}
+
+
+def test_steps_without_depends_on_run_in_order():
+    steps = [make_step("researcher"), make_step("coder"), make_step("reporter")]
+    dispatched = []
+    for expected in range(len(steps)):
+        ready = ready_plan_steps(make_state(*steps, plan_dispatched_steps=dispatched))
+        assert [index for index, _ in ready] == [expected]
+        dispatched = dispatched + [expected]
+
+
+def test_depends_on_uses_one_based_numbers_and_ignores_invalid_references():
+    steps = [
+        make_step("researcher", depends_on=[]),
+        make_step("db_analyst", depends_on=[]),
+        # 自身、之后的步骤与无法识别的编号被忽略
+        make_step("coder", depends_on=[1, "2", 3, 5, "x"]),
+        make_step("chart_generator", depends_on=3),
+        make_step("reporter", depends_on=[1]),
+    ]
+    assert step_dependencies(steps, 0) == []
+    assert step_dependencies(steps, 2) == [0, 1]
+    assert step_dependencies(steps, 3) == [2]
+    # reporter 始终依赖之前的全部步骤
+    assert step_dependencies(steps, 4) == [0, 1, 2, 3]
+
+    ready = ready_plan_steps(make_state(*steps))
+    assert [index for index, _ in ready] == [0, 1]
+    ready = ready_plan_steps(make_state(*steps, plan_dispatched_steps=[0, 1]))
+    assert [index for index, _ in ready] == [2]
+
+
+def test_llm_fallbacks():
+    # 未知的智能体、上一步骤失败与计划执行完毕时交给 supervisor LLM
+    assert ready_plan_steps(make_state(make_step("browser"))) is None
+    assert (
+        ready_plan_steps(make_state(make_step("researcher"), plan_step_failed=True))
+        is None
+    )
+    assert (
+        ready_plan_steps(make_state(make_step("researcher"), plan_dispatched_steps=[0]))
+        is None
+    )
+
+
+def test_supervisor_dispatches_ready_steps_and_falls_back_to_llm(monkeypatch):
+    llm = FakeRouterLLM()
+    monkeypatch.setattr(nodes, "get_llm_by_type", lambda llm_type: llm)
+    steps = [
+        make_step("researcher", depends_on=[]),
+        make_step("db_analyst", depends_on=[]),
+        make_step("reporter"),
+    ]
+
+    command = asyncio.run(nodes.supervisor_node(make_state(*steps)))
+    assert command.goto == [
+        Send("researcher", {**make_state(*steps), "plan_step": 0}),
+        Send("db_analyst", {**make_state(*steps), "plan_step": 1}),
+    ]
+    assert command.update == {
+        "next": "researcher,db_analyst",
+        "plan_dispatched_steps": [0, 1],
+    }
+    assert llm.calls == 0
+
+    # 派发过的步骤按 reducer 累加后，只剩依赖已满足的 reporter
+    command = asyncio.run(
+        nodes.supervisor_node(make_state(*steps, plan_dispatched_steps=[0, 1]))
+    )
+    assert [send.node for send in command.goto] == ["reporter"]
+    assert command.update["plan_dispatched_steps"] == [2]
+
+    command = asyncio.run(
+        nodes.supervisor_node(make_state(*steps, plan_dispatched_steps=[0, 1, 2]))
+    )
+    assert command.goto == "__end__" and command.update["plan_step_failed"] is False
+    assert llm.calls == 1
+
+
+def test_graph_runs_independent_steps_in_parallel_and_joins(tmp_path, monkeypatch):
+    llm = FakeRouterLLM()
+    monkeypatch.setattr(nodes, "get_llm_by_type", lambda llm_type: llm)
+    monkeypatch.setattr(nodes, "file_manager", ExecutionFileManager(str(tmp_path)))
+    monkeypatch.setattr(title_worker, "submit", lambda *args: None)
+    steps = [
+        make_step("researcher", depends_on=[]),
+        make_step("db_analyst", depends_on=[]),
+    ]
+
+    async def coordinator_node(state) -> Command[Literal["supervisor"]]:
+        # 跳过 coordinator 与 planner，直接进入计划执行
+        return Command(
+            goto="supervisor",
+            update={"full_plan": make_state(*steps)["full_plan"], "task_id": "task"},
+        )
+
+    monkeypatch.setattr(builder, "coordinator_node", coordinator_node)
+
+    async def run():
+        started = []
+        both_started = asyncio.Event()
+        monkeypatch.setattr(
+            src.agents,
+            "get_agent",
+            lambda name: BarrierAgent(name, started, both_started),
+        )
+        state = make_state()
+        del state["full_plan"]
+        return await builder.build_graph().ainvoke(state)
+
+    result = asyncio.run(run())
+    assert sorted(result["plan_dispatched_steps"]) == [0, 1]
+    # 两个分支的消息与执行总结在汇合时都被合并
+    responses = result["messages"][1:]
+    assert sorted(message.name for message in responses) == ["db_analyst", "researcher"]
+    summaries = result["execution_summaries"]
+    assert sorted(summary["agent_name"] for summary in summaries) == [
+        "db_analyst",
+        "researcher",
+    ]
+    assert {message.additional_kwargs["summary_id"] for message in responses} == {
+        summary["summary_id"] for summary in summaries
+    }
+    # 汇合后计划执行完毕，supervisor 只调用一次 LLM 结束工作流
+    assert llm.calls == 1
@@ -0,0 +1,61 @@
+import pytest
+
+import src.tools.oracle_db as oracle_db
+from src.tools.oracle_db import execute_oracle_query, invalidate_query_results
+
+
+@pytest.fixture
+def pool(fake_pool):
+    # 字段注释查询没有结果，别名保持原字段名
+    fake_pool.responses = lambda sql, params: (
+        [] if "col_comments" in sql else [(1, "a")]
+    )
+    fake_pool.description = [("ID",), ("NAME",)]
+    invalidate_query_results()
+    yield fake_pool
+    invalidate_query_results()
+
+
+def test_repeated_queries_are_served_from_cache(pool, monkeypatch):
+    first = execute_oracle_query.invoke(
+        {"sql": "SELECT id, name FROM t WHERE id = :id", "binds": {"id": 1}}
+    )
+    again = execute_oracle_query.invoke(
+        {"sql": "select ID,  name\nfrom T where id = :ID", "binds": {"ID": 1}}
+    )
+    assert again.startswith(first) and "结果来自缓存" in again
+    assert len(pool.acquired) == 1
+
+    execute_oracle_query.invoke(
+        {"sql": "SELECT id, name FROM t WHERE id = :id", "binds": {"id": 2}}
+    )
+    assert len(pool.acquired) == 2
+
+    assert invalidate_query_results("t") == 2
+    execute_oracle_query.invoke(
+        {"sql": "SELECT id, name FROM t WHERE id = :id", "binds": {"id": 1}}
+    )
+    assert len(pool.acquired) == 3
+
+    # 规则为0的表不缓存
+    monkeypatch.setitem(oracle_db.ORACLE_RESULT_CACHE_CONFIG, "table_ttl", {"T": 0})
+    execute_oracle_query.invoke({"sql": "SELECT id FROM t"})
+    execute_oracle_query.invoke({"sql": "SELECT id FROM t"})
+    assert len(pool.acquired) == 5
+
+
+def test_cache_rules_cover_every_table_in_from_list(pool, monkeypatch):
+    sql = "SELECT EXTRACT(YEAR FROM a.created) y, b.name FROM a, hr.b WHERE a.id = b.id"
+    assert oracle_db.extract_table_names_from_sql(sql) == ["A", "B"]
+
+    # 逗号连接的第二个表同样按规则不缓存
+    monkeypatch.setitem(oracle_db.ORACLE_RESULT_CACHE_CONFIG, "table_ttl", {"B": 0})
+    execute_oracle_query.invoke({"sql": sql})
+    execute_oracle_query.invoke({"sql": sql})
+    assert len(pool.acquired) == 2
+
+    # 按第二个表清除缓存
+    monkeypatch.setitem(oracle_db.ORACLE_RESULT_CACHE_CONFIG, "table_ttl", {})
+    execute_oracle_query.invoke({"sql": sql})
+    assert invalidate_query_results("b") == 1
+    assert invalidate_query_results("created") == 0
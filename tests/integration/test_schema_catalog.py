@@ -0,0 +1,132 @@
+import sqlite3
+
+import pytest
+
+from src.tools.schema_catalog import SchemaCatalog, format_search_results, tokenize
+
+DICTIONARY_DDL = """
+CREATE TABLE all_objects (owner TEXT, object_name TEXT, object_type TEXT, last_ddl_time TEXT);
+CREATE TABLE all_tab_comments (owner TEXT, table_name TEXT, comments TEXT);
+CREATE TABLE all_tab_columns (
+    owner TEXT, table_name TEXT, column_name TEXT, column_id INTEGER, data_type TEXT, nullable TEXT
+);
+CREATE TABLE all_col_comments (owner TEXT, table_name TEXT, column_name TEXT, comments TEXT);
+CREATE TABLE all_constraints (
+    owner TEXT, constraint_name TEXT, constraint_type TEXT, table_name TEXT,
+    r_owner TEXT, r_constraint_name TEXT
+);
+CREATE TABLE all_cons_columns (
+    owner TEXT, constraint_name TEXT, table_name TEXT, column_name TEXT, position INTEGER
+);
+"""
+
+
+def add_table(conn, name, comment, columns, ddl_time="2026-01-01"):
+    conn.execute(
+        "INSERT INTO all_objects VALUES ('APP', ?, 'TABLE', ?)", (name, ddl_time)
+    )
+    conn.execute("INSERT INTO all_tab_comments VALUES ('APP', ?, ?)", (name, comment))
+    for column_id, (column, data_type, column_comment) in enumerate(columns, 1):
+        conn.execute(
+            "INSERT INTO all_tab_columns VALUES ('APP', ?, ?, ?, ?, 'Y')",
+            (name, column, column_id, data_type),
+        )
+        conn.execute(
+            "INSERT INTO all_col_comments VALUES ('APP', ?, ?, ?)",
+            (name, column, column_comment),
+        )
+
+
+@pytest.fixture
+def dictionary():
+    conn = sqlite3.connect(":memory:")
+    conn.executescript(DICTIONARY_DDL)
+    add_table(
+        conn,
+        "CUSTOMERS",
+        "客户信息",
+        [
+            ("ID", "NUMBER", "客户编号"),
+            ("NAME", "VARCHAR2", "客户名称"),
+            ("CREATED_AT", "DATE", "注册时间"),
+        ],
+    )
+    add_table(
+        conn,
+        "ORDERS",
+        "销售订单",
+        [
+            ("ID", "NUMBER", "订单编号"),
+            ("CUSTOMER_ID", "NUMBER", "客户编号"),
+            ("AMOUNT", "NUMBER", "订单金额"),
+        ],
+    )
+    add_table(conn, "AUDIT_LOG", "操作日志", [("ID", "NUMBER", "日志编号")])
+    conn.executescript("""
+        INSERT INTO all_constraints VALUES ('APP', 'PK_CUSTOMERS', 'P', 'CUSTOMERS', NULL, NULL);
+        INSERT INTO all_constraints VALUES ('APP', 'FK_ORDERS_CUSTOMER', 'R', 'ORDERS', 'APP', 'PK_CUSTOMERS');
+        INSERT INTO all_cons_columns VALUES ('APP', 'PK_CUSTOMERS', 'CUSTOMERS', 'ID', 1);
+        INSERT INTO all_cons_columns VALUES ('APP', 'FK_ORDERS_CUSTOMER', 'ORDERS', 'CUSTOMER_ID', 1);
+    """)
+    return conn
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    return SchemaCatalog(str(tmp_path / "catalog.sqlite"), owners=["app"])
+
+
+def test_tokenize_splits_identifiers_and_chinese():
+    assert tokenize("CUSTOMER_ID 订单金额") == [
+        "customer",
+        "id",
+        "订单",
+        "单金",
+        "金额",
+    ]
+
+
+def test_search_ranks_relevant_tables(catalog, dictionary, recording_cursor):
+    assert catalog.refresh(recording_cursor(dictionary)) == {
+        "added": 3,
+        "updated": 0,
+        "removed": 0,
+    }
+
+    results = catalog.search("订单金额", top_k=2)
+    assert results[0]["table_name"] == "ORDERS"
+    assert results[0]["columns"][0]["column_name"] == "AMOUNT"
+    assert results[0]["foreign_keys"] == [
+        {"column_name": "CUSTOMER_ID", "references": "APP.CUSTOMERS.ID"}
+    ]
+    assert "APP.ORDERS" in format_search_results("订单金额", results)
+
+
+def test_refresh_only_reloads_changed_tables(catalog, dictionary, recording_cursor):
+    catalog.refresh(recording_cursor(dictionary))
+
+    add_table(dictionary, "ORDERS_ARCHIVE", "历史订单", [("ID", "NUMBER", "订单编号")])
+    dictionary.execute(
+        "UPDATE all_objects SET last_ddl_time = '2026-02-01' WHERE object_name = 'CUSTOMERS'"
+    )
+    dictionary.execute(
+        "INSERT INTO all_tab_columns VALUES ('APP', 'CUSTOMERS', 'PHONE', 4, 'VARCHAR2', 'Y')"
+    )
+    dictionary.execute(
+        "INSERT INTO all_col_comments VALUES ('APP', 'CUSTOMERS', 'PHONE', '联系电话')"
+    )
+    dictionary.execute("DELETE FROM all_objects WHERE object_name = 'AUDIT_LOG'")
+
+    cursor = recording_cursor(dictionary)
+    assert catalog.refresh(cursor) == {"added": 1, "updated": 1, "removed": 1}
+    # 只为变更的两张表读取注释、字段和外键
+    reloaded = {
+        name
+        for params in cursor.executed[1:]
+        for key, name in params.items()
+        if key != "owner"
+    }
+    assert reloaded == {"CUSTOMERS", "ORDERS_ARCHIVE"}
+
+    assert catalog.search("联系电话")[0]["table_name"] == "CUSTOMERS"
+    assert not catalog.search("操作日志")
@@ -0,0 +1,55 @@
+import pytest
+
+from src.tools.sql_guard import SQLGuardError, guard_query
+
+
+def test_identifiers_and_literals_are_not_rejected():
+    guarded = guard_query(
+        "select created_at, updated_by from orders where note = 'DELETE me';", 101
+    )
+    assert guarded.sql == (
+        "SELECT CREATED_AT, UPDATED_BY FROM ORDERS WHERE NOTE = 'DELETE me' "
+        "FETCH FIRST 101 ROWS ONLY"
+    )
+
+    # 非保留的语句关键字可以作为列名
+    guarded = guard_query("select t.merge, t.exec, t.commit from audit_log t", 10)
+    assert guarded.sql.startswith("SELECT T.MERGE, T.EXEC, T.COMMIT FROM AUDIT_LOG T")
+
+
+@pytest.mark.parametrize(
+    "sql",
+    [
+        "DELETE FROM orders",
+        "MERGE INTO orders o USING dual ON (1 = 1) WHEN MATCHED THEN UPDATE SET o.id = 1",
+        "BEGIN NULL; END;",
+        "CALL refresh_orders()",
+        "SELECT * FROM orders FOR UPDATE",
+        "SELECT 1 FROM dual; DROP TABLE orders",
+        "WITH FUNCTION f RETURN NUMBER IS BEGIN RETURN 1; END; SELECT f FROM dual",
+        "SELECT 'unterminated FROM dual",
+    ],
+)
+def test_non_read_only_statements_are_rejected(sql):
+    with pytest.raises(SQLGuardError):
+        guard_query(sql, 10)
+
+
+def test_existing_row_limits_are_respected():
+    assert guard_query("SELECT * FROM t FETCH FIRST 3 ROWS ONLY", 10).sql.endswith(
+        "FETCH FIRST 3 ROWS ONLY"
+    )
+    assert guard_query("SELECT * FROM t ORDER BY id OFFSET 5 ROWS", 10).sql.endswith(
+        "OFFSET 5 ROWS FETCH NEXT 10 ROWS ONLY"
+    )
+    # 子查询中的行限制不影响外层
+    assert guard_query(
+        "SELECT * FROM (SELECT * FROM t FETCH FIRST 3 ROWS ONLY) x", 10
+    ).sql.endswith(") X FETCH FIRST 10 ROWS ONLY")
+
+
+def test_equivalent_statements_share_cache_entry():
+    first = guard_query("select /*+ FIRST_ROWS */ id\n  from t -- note", 50)
+    second = guard_query("SELECT /*+ FIRST_ROWS */ ID FROM T", 50)
+    assert second is first
+    assert first.sql == "SELECT /*+ FIRST_ROWS */ ID FROM T FETCH FIRST 50 ROWS ONLY"
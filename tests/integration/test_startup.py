@@ -0,0 +1,68 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from src.utils.startup import LazySingleton, startup_timings
+
+
+def test_lazy_singleton_initializes_once_across_threads():
+    calls = []
+
+    def factory():
+        calls.append(threading.get_ident())
+        time.sleep(0.05)
+        return object()
+
+    singleton = LazySingleton("test:shared", factory)
+    assert not singleton.initialized
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        instances = list(pool.map(lambda _: singleton.get(), range(32)))
+
+    assert len(calls) == 1
+    assert all(instance is instances[0] for instance in instances)
+    assert any(r["name"] == "test:shared" for r in startup_timings.records())
+
+
+def test_lazy_singleton_retries_after_failure():
+    attempts = []
+
+    def factory():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("provider misconfigured")
+        return "ready"
+
+    singleton = LazySingleton("test:flaky", factory)
+    with pytest.raises(RuntimeError):
+        singleton.get()
+    assert not singleton.initialized
+    assert singleton.get() == "ready"
+
+    failed = [
+        r for r in startup_timings.records() if r["name"] == "test:flaky" and r["error"]
+    ]
+    assert failed and "provider misconfigured" in failed[0]["error"]
+
+
+def test_readiness_reports_lazy_singletons(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import src.api.app as app_module
+
+    initialized = {"graph": True, "research_agent": False}
+    monkeypatch.setattr(app_module, "warm_up_status", lambda: dict(initialized))
+    client = TestClient(app_module.app)
+
+    # 未开启预热时按需初始化，只报告状态
+    monkeypatch.setattr(app_module, "STARTUP_WARMUP", False)
+    response = client.get("/api/health/ready")
+    assert response.status_code == 200 and response.json()["initialized"] == initialized
+
+    # 开启预热时任一步骤未完成即未就绪，之后初始化成功即恢复
+    monkeypatch.setattr(app_module, "STARTUP_WARMUP", True)
+    assert client.get("/api/health/ready").status_code == 503
+    initialized["research_agent"] = True
+    assert client.get("/api/health/ready").status_code == 200
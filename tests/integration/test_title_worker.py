@@ -0,0 +1,72 @@
+import asyncio
+import json
+from pathlib import Path
+
+import src.utils.title_generator as title_module
+from src.utils.file_manager import ExecutionFileManager
+from src.utils.title_generator import TitleGenerator, TitleWorker
+
+
+class FakeTitleGenerator(TitleGenerator):
+    """不调用LLM，记录每次批量请求的大小"""
+
+    def __init__(self):
+        self.batches = []
+
+    def generate_titles_batch(self, items, max_length=50):
+        self.batches.append(len(items))
+        return [f"最终标题{content[-1]}" for content, _ in items]
+
+
+def test_heuristic_title_prefers_markdown_heading():
+    generator = TitleGenerator.__new__(TitleGenerator)
+    assert (
+        generator.extract_heuristic_title("前言\n## 销售数据/分析\n正文", "researcher")
+        == "销售数据分析"
+    )
+    assert (
+        generator.extract_heuristic_title("**季度总结**。其余内容", "reporter")
+        == "季度总结"
+    )
+    assert generator.extract_heuristic_title("", "coder") == "代码开发总结"
+
+
+def test_summaries_are_renamed_in_background(tmp_path, monkeypatch):
+    generator = FakeTitleGenerator()
+    monkeypatch.setattr(
+        title_module, "title_worker", TitleWorker(generator, batch_window=0.2)
+    )
+    manager = ExecutionFileManager(base_output_dir=str(tmp_path))
+
+    async def save_all():
+        return await asyncio.gather(
+            *(
+                manager.asave_execution_summary(
+                    "task", "researcher", f"# 研究结果\n内容{i}", []
+                )
+                for i in range(3)
+            )
+        )
+
+    summaries = asyncio.run(save_all())
+
+    # 立即以启发式标题落盘，同名时自动加序号
+    provisional = sorted(Path(s["file_path"]).name for s in summaries)
+    assert provisional == ["研究结果.md", "研究结果_2.md", "研究结果_3.md"]
+
+    assert manager.wait_for_titles("task", timeout=5)
+    assert generator.batches == [3]
+
+    manifest = json.loads(
+        (tmp_path / "task" / "manifest.json").read_text(encoding="utf-8")
+    )
+    assert sorted(e["title"] for e in manifest["summaries"]) == [
+        "最终标题0",
+        "最终标题1",
+        "最终标题2",
+    ]
+    assert all(e["title_status"] == "final" for e in manifest["summaries"])
+    assert all(Path(e["file_path"]).exists() for e in manifest["summaries"])
+    assert {s["agent_name"] for s in manager.read_all_summaries("task")} == {
+        "researcher"
+    }
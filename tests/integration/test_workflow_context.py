@@ -0,0 +1,145 @@
+import asyncio
+import json
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.types import Command
+
+from src.service.workflow_context import WorkflowContext
+
+
+class FakeState(MessagesState):
+    tag: int
+
+
+def fake_llm(content: str) -> GenericFakeChatModel:
+    return GenericFakeChatModel(messages=iter([AIMessage(content=content)]))
+
+
+async def stream_content(llm: GenericFakeChatModel, state: FakeState) -> str:
+    content = ""
+    async for chunk in llm.astream(state["messages"]):
+        content += chunk.content
+    return content
+
+
+async def coordinator(state: FakeState) -> Command:
+    tag = state["tag"]
+    # 偶数编号的工作流交给 planner，奇数编号的直接回复
+    reply = "handoff_to_planner" if tag % 2 == 0 else f"direct reply <{tag}>"
+    await stream_content(fake_llm(reply), state)
+    return Command(goto="planner" if tag % 2 == 0 else END)
+
+
+async def planner(state: FakeState) -> Command:
+    tag = state["tag"]
+    plan = {
+        "thought": f"thought {tag}",
+        "title": f"plan {tag}",
+        "steps": [
+            {"agent_name": "researcher", "title": f"step {tag}", "description": "d"}
+        ],
+    }
+    content = await stream_content(fake_llm(json.dumps(plan)), state)
+    return Command(
+        goto="researcher",
+        update={"messages": [HumanMessage(content=content, name="planner")]},
+    )
+
+
+async def researcher(state: FakeState) -> Command:
+    tag = state["tag"]
+    content = await stream_content(fake_llm(f"research result <{tag}>"), state)
+    return Command(
+        goto=END,
+        update={"messages": [HumanMessage(content=content, name="researcher")]},
+    )
+
+
+def build_fake_graph():
+    builder = StateGraph(FakeState)
+    builder.add_edge(START, "coordinator")
+    builder.add_node("coordinator", coordinator)
+    builder.add_node("planner", planner)
+    builder.add_node("researcher", researcher)
+    return builder.compile()
+
+
+async def run_fake_workflow(graph, tag: int) -> tuple[WorkflowContext, list]:
+    messages = [{"role": "user", "content": f"question {tag}"}]
+    context = WorkflowContext(messages)
+    events = []
+    async for event in graph.astream_events(
+        {"messages": messages, "tag": tag}, version="v2"
+    ):
+        events.extend(context.handle_event(event))
+    events.extend(context.finish())
+    return context, events
+
+
+def test_concurrent_workflows_have_isolated_streams():
+    """Many workflows sharing one graph must not leak streaming state."""
+    graph = build_fake_graph()
+
+    async def run_all():
+        return await asyncio.gather(
+            *(run_fake_workflow(graph, tag) for tag in range(40))
+        )
+
+    results = asyncio.run(run_all())
+
+    for tag, (context, events) in enumerate(results):
+        content = "".join(
+            e["data"]["delta"].get("content", "")
+            for e in events
+            if e["event"] == "message"
+        )
+        agent_ids = [
+            e["data"]["agent_id"]
+            for e in events
+            if e["event"] in ("start_of_agent", "end_of_agent")
+        ]
+        assert all(agent_id.startswith(context.workflow_id) for agent_id in agent_ids)
+
+        if tag % 2 == 0:
+            assert context.is_handoff_case
+            assert "handoff" not in content
+            assert f"research result <{tag}>" in content
+            plans = [e for e in events if e["event"] == "plan_generated"]
+            assert len(plans) == 1
+            assert plans[0]["data"]["plan_steps"][0]["title"] == f"step {tag}"
+            # 步骤在 planner 结束之前就已经发送
+            kinds = [e["event"] for e in events]
+            assert kinds.index("plan_step_generated") < kinds.index("plan_generated")
+            assert events[-1]["event"] == "end_of_workflow"
+            assert events[-1]["data"]["workflow_id"] == context.workflow_id
+        else:
+            assert not context.is_handoff_case
+            assert content == f"direct reply <{tag}>"
+            assert not any(e["event"] == "plan_generated" for e in events)
+            assert events[-1]["event"] != "end_of_workflow"
+
+        # 其他工作流的内容不能出现在当前事件流中
+        for other in range(40):
+            if other != tag:
+                assert f"reply <{other}>" not in content
+                assert f"result <{other}>" not in content
+
+
+def test_plan_parser_is_reset_on_invalid_plan():
+    context = WorkflowContext([{"role": "user", "content": "hi"}])
+    context.plan_parser.feed("not a json plan")
+    assert context.handle_event(
+        {"event": "on_chain_end", "name": "planner", "data": {}, "metadata": {}}
+    ) == [
+        {
+            "event": "end_of_agent",
+            "data": {
+                "agent_name": "planner",
+                "agent_id": f"{context.workflow_id}_planner_",
+            },
+        }
+    ]
+    assert context.plan_parser.buffer == ""
+    assert context.plan_steps == []